@@ -0,0 +1,41 @@
+#
+#  Reportes de Asistencia (PDF)
+#
+# Funciones que dibujan sobre un destino de archivo: las usa la vista
+# síncrona y el trabajo de exportación en segundo plano de nomina_cal.
+#
+
+from datetime import datetime
+from django.db.models import Sum
+from reportlab.pdfgen import canvas
+
+from .models import RegistroAsistencia
+
+
+def asistencia_pdf(destino, mes, anio):
+    """Reporte mensual de asistencia en PDF."""
+    registros = (
+        RegistroAsistencia.objects
+        .filter(fecha__month=mes, fecha__year=anio)
+        .values("empleado__nombre", "empleado__cedula", "estado")
+        .annotate(minutos_trabajados=Sum("minutos_trabajados"))
+        .order_by("empleado__nombre")
+    )
+
+    p = canvas.Canvas(destino)
+    p.setFont("Helvetica-Bold", 14)
+    p.drawString(150, 800, f"Reporte de Asistencia - {mes}/{anio}")
+
+    y = 770
+    p.setFont("Helvetica", 10)
+    for r in registros.iterator():
+        linea = f"{r['empleado__nombre']} ({r['empleado__cedula']}) - {r['estado'].capitalize()} - {r['minutos_trabajados'] or 0} min"
+        p.drawString(50, y, linea)
+        y -= 20
+        if y < 50:
+            p.showPage()
+            y = 770
+
+    p.setFont("Helvetica", 9)
+    p.drawString(50, 40, f"Generado el {datetime.now().strftime('%d/%m/%Y %H:%M')}")
+    p.save()
@@ -9,10 +9,10 @@ from django.db.models import Sum, Count, Q
 from datetime import datetime
 import io
 import openpyxl
-from reportlab.pdfgen import canvas
 
 from usuarios.permissions import IsAdmin, IsGerenteRRHH, IsAsistenteRRHH
 from .models import Fichada, RegistroAsistencia
+from .reportes import asistencia_pdf
 from .serializers import FichadaSerializer, RegistroAsistenciaSerializer
 
 # Permiso unificado para roles administrativos de RRHH
@@ -185,34 +185,8 @@ def exportar_reporte_pdf_asistencia(request):
     except ValueError:
         return Response({"error": "Parámetros 'mes' o 'anio' inválidos."}, status=400)
 
-    registros = (
-        RegistroAsistencia.objects
-        .filter(fecha__month=mes, fecha__year=anio)
-        .select_related("empleado")
-        .values("empleado__nombre", "empleado__cedula", "estado")
-        .annotate(minutos_trabajados=Sum("minutos_trabajados"))
-        .order_by("empleado__nombre")
-    )
-
     buffer = io.BytesIO()
-    p = canvas.Canvas(buffer)
-    p.setFont("Helvetica-Bold", 14)
-    p.drawString(150, 800, f"Reporte de Asistencia - {mes}/{anio}")
-
-    y = 770
-    p.setFont("Helvetica", 10)
-    for r in registros:
-        linea = f"{r['empleado__nombre']} ({r['empleado__cedula']}) - {r['estado'].capitalize()} - {r['minutos_trabajados'] or 0} min"
-        p.drawString(50, y, linea)
-        y -= 20
-        if y < 50:
-            p.showPage()
-            y = 770
-
-    p.setFont("Helvetica", 9)
-    p.drawString(50, 40, f"Generado el {datetime.now().strftime('%d/%m/%Y %H:%M')}")
-    p.save()
-
+    asistencia_pdf(buffer, mes, anio)
     buffer.seek(0)
     return HttpResponse(buffer, content_type="application/pdf")
 # Resumen visual HTML (Dashboard)
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('empleados', '0009_alter_empleado_options_alter_hijo_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='empleado',
+            options={'ordering': ['apellido', 'nombre'], 'verbose_name': 'Empleado', 'verbose_name_plural': 'Empleados'},
+        ),
+        migrations.AddField(
+            model_name='empleado',
+            name='area',
+            field=models.CharField(blank=True, choices=[('ADMIN', 'Administración'), ('RRHH', 'Recursos Humanos'), ('IT', 'Tecnología'), ('VENTAS', 'Ventas'), ('OTROS', 'Otros')], default='OTROS', help_text='Departamento o área donde trabaja el empleado.', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='empleado',
+            name='tipo_contrato',
+            field=models.CharField(blank=True, choices=[('INDEFINIDO', 'Indefinido'), ('PLAZO_FIJO', 'Plazo fijo'), ('TEMPORAL', 'Temporal')], default='INDEFINIDO', help_text='Tipo de contrato laboral (indefinido, temporal, etc.).', max_length=20),
+        ),
+    ]
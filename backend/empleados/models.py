@@ -33,11 +33,6 @@ class Empleado(models.Model):
     direccion = models.TextField(blank=True, null=True)
     activo = models.BooleanField(default=True)
 
-class Meta:
-    ordering = ["apellido", "nombre"]
-    verbose_name = "Empleado"
-    verbose_name_plural = "Empleados"
-
     # NUEVOS CAMPOS Sprint 6 (para dashboards y reportes)
     AREA_CHOICES = [
         ("ADMIN", "Administración"),
@@ -89,6 +84,36 @@ class Meta:
 
 #  MODELO HIJO / DEPENDIENTE
 
+MAX_HIJOS_BONIFICACION = 4
+
+
+def fecha_corte_menor(ref: date) -> date:
+    """
+    Nacidos después de esta fecha son menores de 18 años en ref
+    (mismo día/mes 18 años antes; un 29/02 sin equivalente pasa a 28/02).
+    """
+    try:
+        return ref.replace(year=ref.year - 18)
+    except ValueError:
+        return date(ref.year - 18, 2, 28)
+
+
+class HijoQuerySet(models.QuerySet):
+    def elegibles_en(self, ref: date):
+        """Hijos válidos para la bonificación a la fecha ref: menores, activos y con residencia vigente."""
+        return self.filter(
+            models.Q(fecha_vencimiento_residencia__isnull=True) | models.Q(fecha_vencimiento_residencia__gte=ref),
+            activo=True,
+            residente=True,
+            fecha_nacimiento__gt=fecha_corte_menor(ref),
+        )
+
+    def conteo_elegibles(self, ref: date) -> dict:
+        """{empleado_id: hijos elegibles (máx. 4)} en una sola consulta agregada."""
+        filas = self.elegibles_en(ref).order_by().values("empleado_id").annotate(n=models.Count("id"))
+        return {f["empleado_id"]: min(f["n"], MAX_HIJOS_BONIFICACION) for f in filas}
+
+
 class Hijo(models.Model):
     empleado = models.ForeignKey(Empleado, on_delete=models.CASCADE, related_name="hijos")
     nombre = models.CharField(max_length=150)
@@ -109,6 +134,8 @@ class Hijo(models.Model):
     )
 
     activo = models.BooleanField(default=True)
+
+    objects = HijoQuerySet.as_manager()
 class Meta:
     ordering = ["nombre"]
     verbose_name = "Hijo"
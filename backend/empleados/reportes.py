@@ -0,0 +1,33 @@
+#
+#  Reportes de Empleados (PDF)
+#
+# Funciones que dibujan sobre un destino de archivo: las usa la vista
+# síncrona y el trabajo de exportación en segundo plano de nomina_cal.
+#
+
+from reportlab.pdfgen import canvas
+
+from .models import Empleado
+
+
+def empleados_pdf(destino):
+    """Listado general de empleados en PDF."""
+    p = canvas.Canvas(destino)
+    p.setTitle("Listado de Empleados")
+    y = 800
+    p.setFont("Helvetica", 10)
+    p.drawString(100, y, "Listado general de empleados — Sistema Nómina IS2")
+    y -= 30
+
+    for nombre, apellido, cargo, salario_base in Empleado.objects.values_list(
+        "nombre", "apellido", "cargo", "salario_base"
+    ).iterator():
+        texto = f"{nombre} {apellido} and {cargo or '-'} and Gs. {salario_base:,}"
+        p.drawString(100, y, texto)
+        y -= 18
+        if y < 100:
+            p.showPage()
+            y = 800
+
+    p.showPage()
+    p.save()
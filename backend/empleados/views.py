@@ -14,7 +14,6 @@ from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from django.http import HttpResponse
 import openpyxl
-from reportlab.pdfgen import canvas
 
 from usuarios.permissions import (
     IsAdmin,
@@ -24,6 +23,7 @@ from usuarios.permissions import (
     ReadOnly,
 )
 from .models import Empleado, Hijo
+from .reportes import empleados_pdf
 from .serializers import EmpleadoSerializer, HijoSerializer
 #  ViewSet: Empleado
 class EmpleadoViewSet(viewsets.ModelViewSet):
@@ -123,22 +123,5 @@ def exportar_empleados_pdf(request):
     """
     response = HttpResponse(content_type="application/pdf")
     response["Content-Disposition"] = 'attachment; filename="empleados.pdf"'
-
-    p = canvas.Canvas(response)
-    p.setTitle("Listado de Empleados")
-    y = 800
-    p.setFont("Helvetica", 10)
-    p.drawString(100, y, "Listado general de empleados — Sistema Nómina IS2")
-    y -= 30
-
-    for e in Empleado.objects.all():
-        texto = f"{e.nombre} {e.apellido} and {e.cargo or '-'} and Gs. {e.salario_base:,}"
-        p.drawString(100, y, texto)
-        y -= 18
-        if y < 100:
-            p.showPage()
-            y = 800
-
-    p.showPage()
-    p.save()
+    empleados_pdf(response)
     return response
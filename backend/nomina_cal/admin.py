@@ -8,9 +8,9 @@ from django.utils.html import format_html
 from django.http import HttpResponse
 from django.contrib.admin import SimpleListFilter
 from datetime import date
-import io, openpyxl
+import io
 from reportlab.pdfgen import canvas
-from django.db.models import Sum
+from django.db.models import Exists, OuterRef, Sum
 
 # Modelos
 from .models import Concepto, SalarioMinimo, Liquidacion, DetalleLiquidacion
@@ -19,6 +19,10 @@ from .models import Concepto, SalarioMinimo, Liquidacion, DetalleLiquidacion
 from .models_descuento import Descuento
 
 #from .utils import calcular_liquidacion
+from .services.calculo_individual import calcular_liquidacion
+from .services.envio_masivo import enviar_recibos
+from .services.exportacion_xlsx import CHUNK_SIZE as CHUNK_SIZE_XLSX, con_total, respuesta_xlsx
+from .services.kpis import kpis
 
 
 # ADMIN: CONCEPTO SALARIAL
@@ -27,14 +31,15 @@ from .models_descuento import Descuento
 class ConceptoAdmin(admin.ModelAdmin):
     list_display = (
         "descripcion",
+        "codigo",
         "es_debito",
         "es_recurrente",
         "afecta_ips",
         "para_aguinaldo",
         "created_at",
     )
-    list_filter = ("es_debito", "es_recurrente", "afecta_ips", "para_aguinaldo")
-    search_fields = ("descripcion",)
+    list_filter = ("codigo", "es_debito", "es_recurrente", "afecta_ips", "para_aguinaldo")
+    search_fields = ("descripcion", "codigo")
     ordering = ("descripcion",)
     readonly_fields = ("created_at", "updated_at")
 
@@ -92,6 +97,11 @@ class DetalleInline(admin.TabularInline):
     readonly_fields = ("concepto", "monto", "created_at", "updated_at")
 
 
+def _tiene_detalle(codigo):
+    """Exists de un detalle con Concepto.codigo = codigo (usa el índice del código)."""
+    return Exists(DetalleLiquidacion.objects.filter(liquidacion=OuterRef("pk"), concepto__codigo=codigo))
+
+
 #
 # # FILTRO PERSONALIZADO: IPS aplicado
 #
@@ -104,9 +114,9 @@ class IPSFilter(SimpleListFilter):
 
     def queryset(self, request, queryset):
         if self.value() == "si":
-            return queryset.filter(detalles__concepto__descripcion__icontains="IPS").distinct()
+            return queryset.filter(_tiene_detalle(Concepto.IPS))
         if self.value() == "no":
-            return queryset.exclude(detalles__concepto__descripcion__icontains="IPS").distinct()
+            return queryset.exclude(_tiene_detalle(Concepto.IPS))
         return queryset
 
 
@@ -156,26 +166,11 @@ class LiquidacionAdmin(admin.ModelAdmin):
     #
     @admin.action(description=" Enviar recibos seleccionados por correo")
     def enviar_recibos_email(self, request, queryset):
-        """Envía los recibos PDF por correo a los empleados seleccionados."""
-        enviados = 0
-        sin_correo = 0
-        errores = 0
-
-        for liq in queryset:
-            try:
-                if getattr(liq, "enviado_email", False):
-                    continue  # ya enviado antes
-
-                if not getattr(liq.empleado, "email", None):
-                    sin_correo += 1
-                    continue
-
-                enviado = enviar_recibo_email(liq)
-                if enviado:
-                    enviados += 1
-            except Exception as e:
-                errores += 1
-                self.message_user(request, f" Error al enviar a {liq}: {e}", level=messages.ERROR)
+        """Envía los recibos PDF por correo a los empleados seleccionados (omite los ya enviados)."""
+        resultado = enviar_recibos(queryset)
+        enviados, sin_correo, errores = resultado["enviados"], resultado["sin_correo"], resultado["errores"]
+        if errores:
+            self.message_user(request, " Ver el detalle de los errores en Envíos de correo.", level=messages.ERROR)
 
         msg = f" {enviados} recibos enviados correctamente."
         if sin_correo:
@@ -224,23 +219,18 @@ class LiquidacionAdmin(admin.ModelAdmin):
     #
     @admin.action(description=" Exportar seleccionadas a Excel")
     def exportar_excel_seleccionadas(self, request, queryset):
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Liquidaciones"
-        ws.append(["Empleado", "Cédula", "Mes/Año", "Neto a Cobrar"])
-        for l in queryset:
-            ws.append([l.empleado.nombre, l.empleado.cedula, f"{l.mes}/{l.anio}", float(l.neto_cobrar)])
-        total_general = sum([l.neto_cobrar for l in queryset])
-        ws.append(["", "", "TOTAL", float(total_general)])
-        buffer = io.BytesIO()
-        wb.save(buffer)
-        buffer.seek(0)
-        response = HttpResponse(
-            buffer,
-            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        filas = (
+            (nombre, cedula, f"{mes}/{anio}", neto)
+            for nombre, cedula, mes, anio, neto in queryset.values_list(
+                "empleado__nombre", "empleado__cedula", "mes", "anio", "neto_cobrar"
+            ).iterator(chunk_size=CHUNK_SIZE_XLSX)
+        )
+        return respuesta_xlsx(
+            con_total(filas, 3, lambda total: ["", "", "TOTAL", total]),
+            "liquidaciones_seleccionadas.xlsx",
+            hoja="Liquidaciones",
+            encabezado=[["Empleado", "Cédula", "Mes/Año", "Neto a Cobrar"]],
         )
-        response["Content-Disposition"] = 'attachment; filename="liquidaciones_seleccionadas.xlsx"'
-        return response
 
     @admin.action(description=" Exportar seleccionadas a PDF")
     def exportar_pdf_seleccionadas(self, request, queryset):
@@ -268,15 +258,22 @@ class LiquidacionAdmin(admin.ModelAdmin):
     #
     #  INDICADORES VISUALES Y FORMATOS
     #
+    def get_queryset(self, request):
+        # Banderas de la lista en la misma consulta (sin una consulta por fila)
+        return super().get_queryset(request).annotate(
+            tiene_ips=_tiene_detalle(Concepto.IPS),
+            tiene_bonificacion=_tiene_detalle(Concepto.BONIF_FAMILIAR),
+        )
+
     def estado_ips(self, obj):
-        detalle = obj.detalles.filter(concepto__descripcion__icontains="IPS").exists()
+        detalle = obj.tiene_ips
         icono = "" if detalle else ""
         texto = "Sí" if detalle else "No"
         return format_html("{} <b>{}</b>", icono, texto)
     estado_ips.short_description = "IPS 9% Aplicado"
 
     def estado_bonificacion(self, obj):
-        detalle = obj.detalles.filter(concepto__descripcion__icontains="hijo").exists()
+        detalle = obj.tiene_bonificacion
         icono = "" if detalle else ""
         texto = "Sí" if detalle else "No"
         return format_html("{} <b>{}</b>", icono, texto)
@@ -316,16 +313,12 @@ class LiquidacionAdmin(admin.ModelAdmin):
         response = super().changelist_view(request, extra_context)
         try:
             qs = response.context_data["cl"].queryset
-            resumen = qs.aggregate(
-                total_general=Sum("neto_cobrar"),
-                total_ingresos=Sum("total_ingresos"),
-                total_descuentos=Sum("total_descuentos"),
-            )
+            resumen = kpis(qs, "total_neto", "total_ingresos", "total_descuentos")
             extra_context = response.context_data
             extra_context["summary"] = {
-                "total_ingresos": resumen["total_ingresos"] or 0,
-                "total_descuentos": resumen["total_descuentos"] or 0,
-                "total_general": resumen["total_general"] or 0,
+                "total_ingresos": resumen["total_ingresos"],
+                "total_descuentos": resumen["total_descuentos"],
+                "total_general": resumen["total_neto"],
             }
         except Exception:
             pass
@@ -0,0 +1,5 @@
+#
+# Benchmarks de nómina: generador de empresas sintéticas, medición
+# (tiempo, consultas, memoria pico) y escenarios de los caminos críticos.
+# Se ejecutan con: python manage.py benchmark_nomina
+#
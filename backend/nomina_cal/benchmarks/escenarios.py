@@ -0,0 +1,155 @@
+#
+# Escenarios de benchmark: caminos críticos de la nómina
+#
+# Cada escenario recibe la EmpresaSintetica y un ContextoBenchmark y retorna
+# un dict pequeño con lo procesado. Las vistas se invocan directamente con
+# APIRequestFactory (sin middleware) para medir solo el trabajo de la vista.
+# El orden importa: calculo_periodo crea las liquidaciones del período que
+# usan los escenarios siguientes.
+#
+
+import io
+from dataclasses import dataclass, field
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from nomina_cal.models import Liquidacion
+from usuarios.models import Usuario
+
+
+@dataclass
+class ContextoBenchmark:
+    max_recibos: int = 500
+    procesos_recibos: int = None
+    usuario: Usuario = field(default_factory=lambda: Usuario(
+        username="benchmark", rol=Usuario.ADMIN, is_staff=True, is_superuser=True
+    ))
+    factory: APIRequestFactory = field(default_factory=APIRequestFactory)
+
+
+def _invocar(ctx, vista, ruta, metodo="get", datos=None):
+    if metodo == "post":
+        request = ctx.factory.post(ruta, datos or {}, format="json")
+    else:
+        request = ctx.factory.get(ruta, datos or {})
+    force_authenticate(request, user=ctx.usuario)
+    response = vista(request)
+    if hasattr(response, "render"):
+        response.render()
+    contenido = b"".join(response) if getattr(response, "streaming", False) else response.content
+    if response.status_code >= 400:
+        raise RuntimeError(f"HTTP {response.status_code}: {contenido[:200]!r}")
+    return {"status": response.status_code, "bytes": len(contenido)}
+
+
+def _periodo(empresa):
+    return {"mes": empresa.mes, "anio": empresa.anio}
+
+
+#
+# # Cálculo
+#
+def calculo_periodo(empresa, ctx):
+    from nomina_cal.services.calculo_nomina import PeriodoLiquidacion, calcular_liquidaciones_periodo
+
+    n = calcular_liquidaciones_periodo(PeriodoLiquidacion(anio=empresa.anio, mes=empresa.mes), modo="bulk")
+    return {"liquidaciones": n}
+
+
+def calcular_todas(empresa, ctx):
+    from nomina_cal.views import calcular_todas as vista
+
+    return _invocar(ctx, vista, reverse("calcular_todas_alias"), "post", {"forzar": True})
+
+
+#
+# # Exportaciones
+#
+def export_excel(empresa, ctx):
+    from nomina_cal.views import exportar_reporte_excel
+
+    return _invocar(ctx, exportar_reporte_excel, reverse("exportar_reporte_excel"))
+
+
+def export_pdf(empresa, ctx):
+    from nomina_cal.views import exportar_reporte_pdf
+
+    return _invocar(ctx, exportar_reporte_pdf, reverse("exportar_reporte_pdf"))
+
+
+def export_excel_periodo(empresa, ctx):
+    from nomina_cal.views_export import ExportExcelView
+
+    return _invocar(ctx, ExportExcelView.as_view(), reverse("export_excel_cbv"), datos=_periodo(empresa))
+
+
+def export_pdf_periodo(empresa, ctx):
+    from nomina_cal.views_export import ExportPDFView
+
+    return _invocar(ctx, ExportPDFView.as_view(), reverse("export_pdf_cbv"), datos=_periodo(empresa))
+
+
+#
+# # Dashboards (sin caché de respuestas: se mide el cálculo)
+#
+@override_settings(DASHBOARD_CACHE_TTL=0)
+def dashboard_admin(empresa, ctx):
+    from nomina_cal.views_dashboard import ReporteGeneralAdminView
+
+    return _invocar(ctx, ReporteGeneralAdminView.as_view(), reverse("dashboard_admin_cbv"))
+
+
+@override_settings(DASHBOARD_CACHE_TTL=0)
+def dashboard_gerente(empresa, ctx):
+    from nomina_cal.views_dashboard import DashboardGerenteView
+
+    return _invocar(ctx, DashboardGerenteView.as_view(), reverse("dashboard_gerente_cbv"))
+
+
+@override_settings(DASHBOARD_CACHE_TTL=0)
+def analytics_kpis(empresa, ctx):
+    from nomina_cal.views_analytics import kpis_resumen
+
+    return _invocar(ctx, kpis_resumen, reverse("analytics_kpis"), datos=_periodo(empresa))
+
+
+#
+# # Recibos
+#
+def recibos(empresa, ctx):
+    from nomina_cal.utils_email import generar_recibo_pdf
+
+    qs = (
+        Liquidacion.objects.filter(mes=empresa.mes, anio=empresa.anio)
+        .select_related("empleado")
+        .order_by("id")[: ctx.max_recibos]
+    )
+    total_bytes, n = 0, 0
+    for liq in qs:
+        total_bytes += len(generar_recibo_pdf(liq).getvalue())
+        n += 1
+    return {"recibos": n, "bytes": total_bytes}
+
+
+def recibos_lote(empresa, ctx):
+    from nomina_cal.services.recibos_lote import generar_recibos, liquidaciones_periodo
+
+    salida = io.BytesIO()
+    n = generar_recibos(liquidaciones_periodo(empresa.mes, empresa.anio), salida, procesos=ctx.procesos_recibos)
+    return {"recibos": n, "bytes": salida.tell()}
+
+
+ESCENARIOS = {
+    "calculo_periodo": calculo_periodo,
+    "calcular_todas": calcular_todas,
+    "export_excel": export_excel,
+    "export_pdf": export_pdf,
+    "export_excel_periodo": export_excel_periodo,
+    "export_pdf_periodo": export_pdf_periodo,
+    "dashboard_admin": dashboard_admin,
+    "dashboard_gerente": dashboard_gerente,
+    "analytics_kpis": analytics_kpis,
+    "recibos": recibos,
+    "recibos_lote": recibos_lote,
+}
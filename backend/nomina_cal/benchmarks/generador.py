@@ -0,0 +1,149 @@
+#
+# Generador de empresas sintéticas para benchmarks
+#
+# Crea con bulk_create (sin señales de auditoría ni de recálculo) una
+# plantilla de empleados con hijos, descuentos, asistencia del período e
+# historial de liquidaciones de meses anteriores. Es determinista para una
+# misma semilla, de modo que dos corridas del benchmark sean comparables.
+#
+
+import random
+from dataclasses import dataclass, field
+from datetime import date, time, timedelta
+from decimal import Decimal
+
+from asistencia.models import RegistroAsistencia
+from empleados.models import Empleado, Hijo
+from nomina_cal.models import Descuento, Liquidacion, SalarioMinimo
+from nomina_cal.services import resumen_nomina
+
+PREFIJO_CEDULA = "BM"
+LOTE = 2000
+
+CARGOS = ["Analista", "Asistente", "Técnico", "Supervisor", "Operario", "Contador"]
+TIPOS_DESCUENTO = ["prestamo", "embargo", "retencion", "otro"]
+SALARIO_MINIMO_BENCHMARK = Decimal("2798309")
+
+
+@dataclass
+class ParametrosEmpresa:
+    empleados: int = 1000
+    hijos_por_empleado: float = 1.0
+    descuentos_por_empleado: float = 0.5
+    dias_asistencia: int = 5
+    meses_historial: int = 3
+    semilla: int = 42
+
+
+@dataclass
+class EmpresaSintetica:
+    mes: int
+    anio: int
+    cantidades: dict = field(default_factory=dict)
+
+
+def _meses_anteriores(mes, anio, n):
+    for _ in range(n):
+        mes, anio = (12, anio - 1) if mes == 1 else (mes - 1, anio)
+        yield mes, anio
+
+
+def _cantidad(rng, promedio):
+    """Cantidad entera con media ≈ promedio (parte fraccionaria al azar)."""
+    base = int(promedio)
+    return base + (1 if rng.random() < promedio - base else 0)
+
+
+def _asegurar_salario_minimo(mes, anio):
+    desde = date(anio, mes, 1)
+    if not SalarioMinimo.objects.filter(vigente=True, vigente_desde__lte=desde).exists():
+        SalarioMinimo.objects.create(
+            monto=SALARIO_MINIMO_BENCHMARK, vigente_desde=date(anio - 1, 1, 1), vigente=True
+        )
+
+
+def generar_empresa(mes, anio, parametros=None) -> EmpresaSintetica:
+    """
+    Genera una empresa sintética para el período (mes, anio).
+    Debe ejecutarse dentro de una transacción que luego se revierta.
+    """
+    p = parametros or ParametrosEmpresa()
+    rng = random.Random(p.semilla)
+    ref = date(anio, mes, 1)
+    _asegurar_salario_minimo(mes, anio)
+
+    empleados = Empleado.objects.bulk_create(
+        [
+            Empleado(
+                nombre=f"Empleado{i}",
+                apellido=f"Sintetico{i % 97}",
+                cedula=f"{PREFIJO_CEDULA}{p.semilla}-{i}",
+                fecha_ingreso=ref - timedelta(days=rng.randint(30, 3650)),
+                cargo=rng.choice(CARGOS),
+                salario_base=Decimal(rng.randrange(2_800_000, 15_000_000, 1000)),
+                email=f"empleado{i}@benchmark.local",
+                activo=True,
+            )
+            for i in range(p.empleados)
+        ],
+        batch_size=LOTE,
+    )
+
+    hijos, descuentos, asistencias = [], [], []
+    for emp in empleados:
+        for j in range(_cantidad(rng, p.hijos_por_empleado)):
+            hijos.append(Hijo(
+                empleado=emp,
+                nombre=f"Hijo{j} {emp.apellido}",
+                fecha_nacimiento=ref - timedelta(days=rng.randint(0, 25 * 365)),
+                residente=True,
+                activo=True,
+            ))
+        for _ in range(_cantidad(rng, p.descuentos_por_empleado)):
+            recurrente = rng.random() < 0.5
+            descuentos.append(Descuento(
+                empleado=emp,
+                tipo=rng.choice(TIPOS_DESCUENTO),
+                descripcion="Descuento sintético",
+                monto=Decimal(rng.randrange(50_000, 500_000, 1000)),
+                fecha_inicio=ref - timedelta(days=rng.randint(0, 180)),
+                fecha_fin=None if recurrente else ref + timedelta(days=rng.randint(0, 90)),
+                recurrente=recurrente,
+                activo=True,
+            ))
+        for d in range(p.dias_asistencia):
+            asistencias.append(RegistroAsistencia(
+                empleado=emp,
+                fecha=ref + timedelta(days=d),
+                hora_entrada=time(8, rng.randint(0, 30)),
+                hora_salida=time(17, 0),
+                minutos_trabajados=480,
+                estado="presente",
+            ))
+    Hijo.objects.bulk_create(hijos, batch_size=LOTE)
+    Descuento.objects.bulk_create(descuentos, batch_size=LOTE)
+    RegistroAsistencia.objects.bulk_create(asistencias, batch_size=LOTE)
+
+    historial = []
+    for m, a in _meses_anteriores(mes, anio, p.meses_historial):
+        for emp in empleados:
+            neto = emp.salario_base * Decimal("0.91")
+            historial.append(Liquidacion(
+                empleado=emp, mes=m, anio=a,
+                sueldo_base=emp.salario_base,
+                total_ingresos=emp.salario_base,
+                total_descuentos=emp.salario_base - neto,
+                neto_cobrar=neto,
+                cerrada=True,
+                requiere_recalculo=False,
+            ))
+    Liquidacion.objects.bulk_create(historial, batch_size=LOTE)
+    resumen_nomina.marcar_periodos((a, m) for m, a in _meses_anteriores(mes, anio, p.meses_historial))
+
+    return EmpresaSintetica(mes=mes, anio=anio, cantidades={
+        "empleados": len(empleados),
+        "hijos": len(hijos),
+        "descuentos": len(descuentos),
+        "asistencias": len(asistencias),
+        "liquidaciones_historial": len(historial),
+    })
@@ -0,0 +1,52 @@
+#
+# Medición de escenarios: tiempo de reloj, consultas SQL y memoria pico
+#
+# tracemalloc encarece la ejecución de Python; con memoria=False el tiempo
+# medido es más fiel y memoria_pico_kb queda en None.
+#
+
+import time
+import tracemalloc
+from django.db import connection
+
+
+class ContadorConsultas:
+    """
+    Cuenta consultas vía execute_wrapper (CaptureQueriesContext se satura
+    en 9000 consultas, un límite que el modo fila supera con facilidad).
+    """
+
+    def __init__(self):
+        self.total = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.total += 1
+        return execute(sql, params, many, context)
+
+
+def medir(funcion, *args, memoria=True, **kwargs) -> dict:
+    """
+    Ejecuta funcion(*args, **kwargs) y retorna
+    {segundos, consultas, memoria_pico_kb, resultado | error}.
+    Los errores se registran en lugar de propagarse, para que un escenario
+    roto no impida medir el resto.
+    """
+    contador = ContadorConsultas()
+    if memoria:
+        tracemalloc.start()
+    pico = None
+    inicio = time.perf_counter()
+    medicion = {}
+    try:
+        with connection.execute_wrapper(contador):
+            medicion["resultado"] = funcion(*args, **kwargs)
+    except Exception as e:
+        medicion["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        medicion["segundos"] = round(time.perf_counter() - inicio, 4)
+        if memoria:
+            _, pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+    medicion["consultas"] = contador.total
+    medicion["memoria_pico_kb"] = round(pico / 1024, 1) if memoria else None
+    return medicion
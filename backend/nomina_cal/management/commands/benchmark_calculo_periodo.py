@@ -0,0 +1,70 @@
+#
+#  benchmark_calculo_periodo — Compara el cálculo por fila vs. bulk
+#
+# Uso:
+#   python manage.py benchmark_calculo_periodo --mes 10 --anio 2025
+#   python manage.py benchmark_calculo_periodo --mes 10 --anio 2025 --repeticiones 3
+#
+# Ejecuta calcular_liquidaciones_periodo en ambos modos sobre los datos
+# actuales de la base, mide tiempo y cantidad de consultas, y verifica
+# que los totales resultantes sean idénticos.
+#
+
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Sum
+
+from nomina_cal.benchmarks.medicion import ContadorConsultas
+from nomina_cal.models import Liquidacion
+from nomina_cal.services.calculo_nomina import calcular_liquidaciones_periodo, PeriodoLiquidacion
+
+
+class Command(BaseCommand):
+    help = "Compara tiempo y consultas del cálculo de período en modo fila vs. bulk."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--mes", type=int, required=True)
+        parser.add_argument("--anio", type=int, required=True)
+        parser.add_argument("--repeticiones", type=int, default=1)
+
+    def _medir(self, periodo, modo, repeticiones):
+        mejor, consultas, count = None, 0, 0
+        for _ in range(repeticiones):
+            contador = ContadorConsultas()
+            with connection.execute_wrapper(contador):
+                inicio = time.perf_counter()
+                count = calcular_liquidaciones_periodo(periodo, modo=modo)
+                duracion = time.perf_counter() - inicio
+            mejor = duracion if mejor is None else min(mejor, duracion)
+            consultas = contador.total
+        totales = Liquidacion.objects.filter(mes=periodo.mes, anio=periodo.anio).aggregate(
+            ingresos=Sum("total_ingresos"),
+            descuentos=Sum("total_descuentos"),
+            neto=Sum("neto_cobrar"),
+        )
+        return {"segundos": mejor, "consultas": consultas, "liquidaciones": count, "totales": totales}
+
+    def handle(self, *args, **opts):
+        if not (1 <= opts["mes"] <= 12):
+            raise CommandError("El mes debe estar entre 1 y 12.")
+        periodo = PeriodoLiquidacion(anio=opts["anio"], mes=opts["mes"])
+        repeticiones = max(1, opts["repeticiones"])
+
+        fila = self._medir(periodo, "fila", repeticiones)
+        bulk = self._medir(periodo, "bulk", repeticiones)
+
+        for modo, r in (("fila", fila), ("bulk", bulk)):
+            self.stdout.write(
+                f"{modo:>5}: {r['liquidaciones']} liquidaciones | "
+                f"{r['segundos']:.3f} s | {r['consultas']} consultas | neto={r['totales']['neto']}"
+            )
+
+        if fila["totales"] != bulk["totales"]:
+            raise CommandError(f"Los totales difieren: fila={fila['totales']} bulk={bulk['totales']}")
+
+        if bulk["segundos"]:
+            self.stdout.write(self.style.SUCCESS(
+                f"bulk es {fila['segundos'] / bulk['segundos']:.1f}x más rápido "
+                f"({fila['consultas']} → {bulk['consultas']} consultas); totales idénticos."
+            ))
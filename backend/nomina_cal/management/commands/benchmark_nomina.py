@@ -0,0 +1,169 @@
+#
+#  benchmark_nomina — Benchmarks de los caminos críticos sobre empresas sintéticas
+#
+# Uso:
+#   python manage.py benchmark_nomina --tamanios 1000,5000 --salida benchmarks/base.json
+#   python manage.py benchmark_nomina --tamanios 1000 --escenarios calculo_periodo,recibos
+#   python manage.py benchmark_nomina --tamanios 1000 --comparar benchmarks/base.json
+#
+# Por cada tamaño genera una empresa sintética (ver nomina_cal/benchmarks),
+# ejecuta los escenarios en orden y registra segundos, consultas y memoria
+# pico. Todo corre dentro de una transacción que se revierte al final, así
+# que la base queda intacta. Por defecto el registro de AuditLog se desactiva
+# (su snapshot no serializa fechas ni Decimal); --con-auditoria lo mantiene.
+# Con --comparar se marcan como regresión los
+# escenarios cuyas consultas o tiempo superan la línea base más la tolerancia.
+#
+
+import json
+import platform
+from contextlib import nullcontext
+from pathlib import Path
+from unittest import mock
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from nomina_cal.benchmarks.escenarios import ESCENARIOS, ContextoBenchmark
+from nomina_cal.benchmarks.generador import ParametrosEmpresa, generar_empresa
+from nomina_cal.benchmarks.medicion import medir
+
+TAMANIOS_DEFECTO = "1000"
+
+
+def _lista(valor):
+    return [v.strip() for v in valor.split(",") if v.strip()]
+
+
+class _Revertir(Exception):
+    pass
+
+
+def _en_savepoint(escenario, empresa, ctx):
+    """Aísla cada escenario: si falla, se revierte solo lo suyo y el resto sigue."""
+    with transaction.atomic():
+        return escenario(empresa, ctx)
+
+
+class Command(BaseCommand):
+    help = "Mide tiempo, consultas y memoria de los caminos críticos de la nómina sobre empresas sintéticas."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tamanios", default=TAMANIOS_DEFECTO, help="Cantidades de empleados, separadas por coma (1000 a 50000).")
+        parser.add_argument("--escenarios", default=",".join(ESCENARIOS), help="Escenarios a ejecutar, separados por coma.")
+        parser.add_argument("--mes", type=int, default=None)
+        parser.add_argument("--anio", type=int, default=None)
+        parser.add_argument("--hijos", type=float, default=1.0, help="Hijos promedio por empleado.")
+        parser.add_argument("--descuentos", type=float, default=0.5, help="Descuentos promedio por empleado.")
+        parser.add_argument("--dias-asistencia", type=int, default=5)
+        parser.add_argument("--meses-historial", type=int, default=3)
+        parser.add_argument("--max-recibos", type=int, default=500)
+        parser.add_argument("--procesos-recibos", type=int, default=None, help="Procesos para recibos_lote (por defecto, CPUs).")
+        parser.add_argument("--semilla", type=int, default=42)
+        parser.add_argument("--sin-memoria", action="store_true", help="No usar tracemalloc (tiempos más fieles, sin memoria pico).")
+        parser.add_argument("--con-auditoria", action="store_true", help="Mantener el registro de AuditLog.")
+        parser.add_argument("--salida", default=None, help="Archivo JSON donde guardar la línea base.")
+        parser.add_argument("--comparar", default=None, help="Línea base JSON contra la cual comparar.")
+        parser.add_argument("--tolerancia", type=float, default=0.2, help="Margen relativo antes de marcar regresión (0.2 = 20%%).")
+
+    #
+    # # Ejecución
+    #
+    def _ejecutar_tamanio(self, tamanio, escenarios, mes, anio, opts):
+        parametros = ParametrosEmpresa(
+            empleados=tamanio,
+            hijos_por_empleado=opts["hijos"],
+            descuentos_por_empleado=opts["descuentos"],
+            dias_asistencia=opts["dias_asistencia"],
+            meses_historial=opts["meses_historial"],
+            semilla=opts["semilla"],
+        )
+        ctx = ContextoBenchmark(max_recibos=opts["max_recibos"], procesos_recibos=opts["procesos_recibos"])
+        memoria = not opts["sin_memoria"]
+        resultado = {}
+        try:
+            with transaction.atomic():
+                generacion = medir(generar_empresa, mes, anio, parametros, memoria=memoria)
+                if "error" in generacion:
+                    raise CommandError(f"No se pudo generar la empresa sintética: {generacion['error']}")
+                empresa = generacion.pop("resultado")
+                resultado["empresa"] = empresa.cantidades
+                resultado["generacion"] = generacion
+                resultado["escenarios"] = {}
+                for nombre in escenarios:
+                    medicion = medir(_en_savepoint, ESCENARIOS[nombre], empresa, ctx, memoria=memoria)
+                    resultado["escenarios"][nombre] = medicion
+                    self._informar(tamanio, nombre, medicion)
+                raise _Revertir()
+        except _Revertir:
+            pass
+        return resultado
+
+    def _informar(self, tamanio, nombre, m):
+        linea = (
+            f"{tamanio:>6} | {nombre:<22} | {m['segundos']:>9.3f} s | "
+            f"{m['consultas']:>7} consultas | {m['memoria_pico_kb'] or 0:>10.1f} KB"
+        )
+        if "error" in m:
+            self.stdout.write(self.style.WARNING(f"{linea} | ERROR {m['error']}"))
+        else:
+            self.stdout.write(linea)
+
+    #
+    # # Comparación con la línea base
+    #
+    def _comparar(self, actual, base, tolerancia):
+        regresiones = []
+        for tamanio, datos in actual["tamanios"].items():
+            previos = base.get("tamanios", {}).get(tamanio, {}).get("escenarios", {})
+            for nombre, m in datos["escenarios"].items():
+                p = previos.get(nombre)
+                if not p or "error" in m:
+                    continue
+                for metrica in ("consultas", "segundos", "memoria_pico_kb"):
+                    if p.get(metrica) and m[metrica] is not None and m[metrica] > p[metrica] * (1 + tolerancia):
+                        regresiones.append(f"{tamanio} {nombre}: {metrica} {p[metrica]} → {m[metrica]}")
+        return regresiones
+
+    def handle(self, *args, **opts):
+        try:
+            tamanios = [int(t) for t in _lista(opts["tamanios"])]
+        except ValueError:
+            raise CommandError("--tamanios debe ser una lista de enteros separados por coma.")
+        escenarios = _lista(opts["escenarios"])
+        desconocidos = [e for e in escenarios if e not in ESCENARIOS]
+        if desconocidos:
+            raise CommandError(f"Escenarios desconocidos: {', '.join(desconocidos)} (use {', '.join(ESCENARIOS)}).")
+
+        hoy = timezone.now().date()
+        mes, anio = opts["mes"] or hoy.month, opts["anio"] or hoy.year
+        if not (1 <= mes <= 12):
+            raise CommandError("El mes debe estar entre 1 y 12.")
+
+        informe = {
+            "generado_en": timezone.now().isoformat(),
+            "motor": connection.vendor,
+            "python": platform.python_version(),
+            "periodo": {"mes": mes, "anio": anio},
+            "auditoria": opts["con_auditoria"],
+            "tamanios": {},
+        }
+        auditoria = nullcontext() if opts["con_auditoria"] else mock.patch("auditoria.signals._create_audit")
+        with auditoria:
+            for tamanio in tamanios:
+                informe["tamanios"][str(tamanio)] = self._ejecutar_tamanio(tamanio, escenarios, mes, anio, opts)
+
+        if opts["salida"]:
+            salida = Path(opts["salida"])
+            salida.parent.mkdir(parents=True, exist_ok=True)
+            salida.write_text(json.dumps(informe, indent=2, ensure_ascii=False, default=str), encoding="utf-8")
+            self.stdout.write(self.style.SUCCESS(f"Línea base guardada en {salida}"))
+
+        if opts["comparar"]:
+            base = json.loads(Path(opts["comparar"]).read_text(encoding="utf-8"))
+            regresiones = self._comparar(informe, base, opts["tolerancia"])
+            for r in regresiones:
+                self.stdout.write(self.style.ERROR(f"Regresión: {r}"))
+            if regresiones:
+                raise CommandError(f"{len(regresiones)} regresiones respecto de {opts['comparar']}.")
+            self.stdout.write(self.style.SUCCESS("Sin regresiones respecto de la línea base."))
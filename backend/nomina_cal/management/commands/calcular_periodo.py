@@ -0,0 +1,61 @@
+#
+#  calcular_periodo — Cálculo particionado de un período de nómina
+#
+# Uso:
+#   python manage.py calcular_periodo --mes 10 --anio 2025
+#   python manage.py calcular_periodo --mes 10 --anio 2025 --backend celery --chunk 2000
+#   python manage.py calcular_periodo --mes 10 --anio 2025 --workers 8 --reintentos 2
+#
+# Reparte los empleados activos en rangos, calcula cada rango en una
+# transacción corta y muestra el resumen consolidado. Los rangos fallidos
+# se reintentan (solo ellos) hasta --reintentos veces.
+#
+
+from django.core.management.base import BaseCommand, CommandError
+
+from nomina_cal.services.calculo_nomina import PeriodoLiquidacion
+from nomina_cal.services.calculo_paralelo import (
+    BACKENDS,
+    CHUNK_SIZE_RANGO,
+    calcular_periodo_particionado,
+    reintentar_fallidos,
+)
+
+
+class Command(BaseCommand):
+    help = "Calcula un período de nómina repartiendo rangos de empleados entre procesos o workers Celery."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--mes", type=int, required=True)
+        parser.add_argument("--anio", type=int, required=True)
+        parser.add_argument("--backend", choices=BACKENDS, default="procesos")
+        parser.add_argument("--workers", type=int, default=None)
+        parser.add_argument("--chunk", type=int, default=CHUNK_SIZE_RANGO)
+        parser.add_argument("--reintentos", type=int, default=1)
+
+    def handle(self, *args, **opts):
+        if not (1 <= opts["mes"] <= 12):
+            raise CommandError("El mes debe estar entre 1 y 12.")
+        periodo = PeriodoLiquidacion(anio=opts["anio"], mes=opts["mes"])
+
+        resumen = calcular_periodo_particionado(
+            periodo, backend=opts["backend"], workers=opts["workers"], chunk_size=opts["chunk"]
+        )
+        for intento in range(opts["reintentos"]):
+            if not resumen["fallidos"]:
+                break
+            self.stdout.write(self.style.WARNING(
+                f"Reintento {intento + 1}: {len(resumen['fallidos'])} rangos fallidos"
+            ))
+            resumen = reintentar_fallidos(resumen, backend=opts["backend"], workers=opts["workers"])
+
+        self.stdout.write(
+            f"{resumen['count']} liquidaciones en {resumen['chunks_ok']}/{resumen['chunks']} rangos | "
+            f"ingresos={resumen['total_ingresos']} descuentos={resumen['total_descuentos']} "
+            f"neto={resumen['neto_cobrar']}"
+        )
+        for f in resumen["fallidos"]:
+            self.stderr.write(f"Rango {f['rango']} falló: {f['error']}")
+        if resumen["fallidos"]:
+            raise CommandError("Hay rangos sin calcular; vuelva a ejecutar para reintentarlos.")
+        self.stdout.write(self.style.SUCCESS("Período calculado correctamente."))
@@ -0,0 +1,73 @@
+#
+#  enviar_recibos — Envío masivo de recibos de un período por correo
+#
+# Uso:
+#   python manage.py enviar_recibos --mes 10 --anio 2025
+#   python manage.py enviar_recibos --mes 10 --anio 2025 --por-minuto 300 --reenviar
+#   python manage.py enviar_recibos --reanudar 42
+#
+# Registra una corrida de envío (CorridaNomina "envio_recibos") con el
+# estado de cada destinatario y un punto de control por bloque: si el
+# proceso se corta, --reanudar sólo envía a los pendientes o fallidos.
+# Prepara los PDF por adelantado (caché de recibos), envía por una sola
+# conexión respetando el cupo por minuto y registra cada envío en EnvioCorreo.
+#
+
+import time
+from django.core.management.base import BaseCommand, CommandError
+
+from nomina_cal.models_corrida import CorridaNomina
+from nomina_cal.services.corridas import ejecutar_corrida, reanudar_corrida
+from nomina_cal.services.envio_masivo import LOTE_ENVIO
+
+
+class Command(BaseCommand):
+    help = "Envía por correo los recibos de un período (omite los ya enviados)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--mes", type=int)
+        parser.add_argument("--anio", type=int)
+        parser.add_argument("--por-minuto", type=int, default=None,
+                            help="Cupo de mensajes por minuto (por defecto ENVIO_CORREOS_POR_MINUTO; 0 = sin límite).")
+        parser.add_argument("--lote", type=int, default=LOTE_ENVIO, help="Mensajes por punto de control.")
+        parser.add_argument("--reenviar", action="store_true", help="Incluye las liquidaciones ya enviadas.")
+        parser.add_argument("--reanudar", type=int, metavar="CORRIDA",
+                            help="Reanuda una corrida de envío interrumpida o con errores.")
+
+    def _corrida(self, opts):
+        if opts["reanudar"]:
+            try:
+                return reanudar_corrida(CorridaNomina.objects.get(pk=opts["reanudar"]))
+            except CorridaNomina.DoesNotExist:
+                raise CommandError(f"No existe la corrida #{opts['reanudar']}.")
+            except ValueError as e:
+                raise CommandError(str(e))
+
+        if opts["mes"] is None or opts["anio"] is None:
+            raise CommandError("Indique --mes y --anio, o --reanudar.")
+        if not (1 <= opts["mes"] <= 12):
+            raise CommandError("El mes debe estar entre 1 y 12.")
+        parametros = {
+            "mes": opts["mes"],
+            "anio": opts["anio"],
+            "reenviar": opts["reenviar"],
+            "lote": max(1, opts["lote"]),
+        }
+        if opts["por_minuto"] is not None:
+            parametros["por_minuto"] = opts["por_minuto"]
+        return CorridaNomina.objects.create(tipo="envio_recibos", parametros=parametros)
+
+    def handle(self, *args, **opts):
+        corrida = self._corrida(opts)
+        inicio = time.perf_counter()
+        corrida = ejecutar_corrida(corrida.pk)
+        duracion = time.perf_counter() - inicio
+
+        resultado = corrida.resultado or {}
+        if corrida.estado == "fallida":
+            raise CommandError(f"Corrida #{corrida.pk} fallida: {resultado.get('error')} (reanudable con --reanudar).")
+        ritmo = resultado["enviados"] * 60 / duracion if duracion else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Corrida #{corrida.pk}: {resultado['enviados']} enviados, {resultado['fallidos']} fallidos "
+            f"en {duracion:.1f} s ({ritmo:,.0f} por minuto)"
+        ))
@@ -0,0 +1,42 @@
+#
+#  generar_recibos — Recibos PDF de un período en lote
+#
+# Uso:
+#   python manage.py generar_recibos --mes 10 --anio 2025 --destino recibos_10_2025.zip
+#   python manage.py generar_recibos --mes 10 --anio 2025 --destino media/recibos/2025-10 --procesos 8
+#
+# Lee los datos del período por bloques, renderiza en un pool de procesos
+# y escribe los PDF en un directorio o en un archivo ZIP.
+#
+
+import time
+from django.core.management.base import BaseCommand, CommandError
+
+from nomina_cal.services.recibos_lote import LOTE_DATOS, generar_recibos, liquidaciones_periodo
+
+
+class Command(BaseCommand):
+    help = "Genera los recibos PDF de un período en un directorio o archivo ZIP."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--mes", type=int, required=True)
+        parser.add_argument("--anio", type=int, required=True)
+        parser.add_argument("--destino", required=True, help="Directorio o archivo .zip.")
+        parser.add_argument("--procesos", type=int, default=None, help="Procesos de render (por defecto, CPUs).")
+        parser.add_argument("--lote", type=int, default=LOTE_DATOS)
+
+    def handle(self, *args, **opts):
+        if not (1 <= opts["mes"] <= 12):
+            raise CommandError("El mes debe estar entre 1 y 12.")
+        inicio = time.perf_counter()
+        n = generar_recibos(
+            liquidaciones_periodo(opts["mes"], opts["anio"]),
+            opts["destino"],
+            procesos=opts["procesos"],
+            lote=max(1, opts["lote"]),
+        )
+        duracion = time.perf_counter() - inicio
+        ritmo = n * 60 / duracion if duracion else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"{n} recibos en {duracion:.1f} s ({ritmo:,.0f} por minuto) → {opts['destino']}"
+        ))
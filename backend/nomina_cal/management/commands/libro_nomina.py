@@ -0,0 +1,43 @@
+#
+#  libro_nomina — Libro de sueldos del período en un único PDF
+#
+# Uso:
+#   python manage.py libro_nomina --mes 10 --anio 2025 --salida libro_2025_10.pdf
+#   python manage.py libro_nomina --mes 10 --anio 2025 --area IT --salida libro_it.pdf
+#
+# Escribe el PDF por partes (página a página), con el índice de empleados y
+# los totales del período al final.
+#
+
+import time
+from django.core.management.base import BaseCommand, CommandError
+
+from nomina_cal.services.libro_nomina import generar_libro, liquidaciones_libro
+
+
+class Command(BaseCommand):
+    help = "Genera el libro de sueldos (todos los recibos del período) en un único PDF."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--mes", type=int, required=True)
+        parser.add_argument("--anio", type=int, required=True)
+        parser.add_argument("--area", default=None, help="Solo empleados de esta área.")
+        parser.add_argument("--salida", required=True, help="Archivo PDF de salida.")
+
+    def handle(self, *args, **opts):
+        mes, anio = opts["mes"], opts["anio"]
+        if not (1 <= mes <= 12):
+            raise CommandError("El mes debe estar entre 1 y 12.")
+        qs = liquidaciones_libro(mes, anio, area=opts["area"])
+        if not qs.exists():
+            raise CommandError(f"No hay liquidaciones para {mes}/{anio}.")
+
+        inicio = time.perf_counter()
+        escritos = 0
+        with open(opts["salida"], "wb") as f:
+            for parte in generar_libro(qs, mes, anio):
+                escritos += f.write(parte)
+        self.stdout.write(self.style.SUCCESS(
+            f"Libro {mes:02d}/{anio} → {opts['salida']} ({escritos / 1024:,.0f} KB, "
+            f"{time.perf_counter() - inicio:.1f} s)"
+        ))
@@ -0,0 +1,37 @@
+#
+#  reconstruir_resumen_nomina — Rehace el resumen mensual de nómina
+#
+# Uso:
+#   python manage.py reconstruir_resumen_nomina
+#   python manage.py reconstruir_resumen_nomina --mes 10 --anio 2025
+#
+# El resumen (ResumenNominaMensual) se mantiene solo a partir de las
+# escrituras; este comando lo rehace desde Liquidacion, completo o para
+# un período (p. ej. después de cargas masivas o cambios hechos por SQL).
+#
+
+import time
+from django.core.management.base import BaseCommand, CommandError
+
+from nomina_cal.services.resumen_nomina import agregar_periodo, reconstruir
+
+
+class Command(BaseCommand):
+    help = "Reconstruye el resumen mensual de nómina usado por los dashboards."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--mes", type=int)
+        parser.add_argument("--anio", type=int)
+
+    def handle(self, *args, **opts):
+        if (opts["mes"] is None) != (opts["anio"] is None):
+            raise CommandError("Indique --mes y --anio juntos, o ninguno.")
+        inicio = time.perf_counter()
+        if opts["mes"] is not None:
+            if not (1 <= opts["mes"] <= 12):
+                raise CommandError("El mes debe estar entre 1 y 12.")
+            grupos = agregar_periodo(opts["anio"], opts["mes"])
+            mensaje = f"Resumen {opts['mes']}/{opts['anio']}: {grupos} grupos"
+        else:
+            mensaje = f"Resumen reconstruido: {reconstruir()} períodos"
+        self.stdout.write(self.style.SUCCESS(f"{mensaje} en {time.perf_counter() - inicio:.1f} s"))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nomina_cal', '0008_alter_liquidacion_options_enviocorreo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='liquidacion',
+            name='requiere_recalculo',
+            field=models.BooleanField(db_index=True, default=True, help_text='Marcada cuando cambió algún dato que afecta el cálculo (ver services/recalculo_incremental.py)'),
+        ),
+    ]
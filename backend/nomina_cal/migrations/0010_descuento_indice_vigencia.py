@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:29
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('empleados', '0009_alter_empleado_options_alter_hijo_options_and_more'),
+        ('nomina_cal', '0009_liquidacion_requiere_recalculo'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='descuento',
+            index=models.Index(fields=['empleado', 'activo', 'fecha_inicio', 'fecha_fin'], name='nomina_cal__emplead_01f15d_idx'),
+        ),
+    ]
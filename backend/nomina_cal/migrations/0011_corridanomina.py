@@ -0,0 +1,38 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:32
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nomina_cal', '0010_descuento_indice_vigencia'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CorridaNomina',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('calcular_todas', 'Recalcular liquidaciones abiertas'), ('periodo', 'Calcular período'), ('cierre', 'Cerrar período')], max_length=20)),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('en_proceso', 'En proceso'), ('completada', 'Completada'), ('con_errores', 'Completada con errores'), ('fallida', 'Fallida')], db_index=True, default='pendiente', max_length=20)),
+                ('parametros', models.JSONField(blank=True, default=dict)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('procesadas', models.PositiveIntegerField(default=0)),
+                ('errores', models.JSONField(blank=True, default=list, help_text='[{liquidacion_id, empleado_id, empleado, error}]')),
+                ('resultado', models.JSONField(blank=True, null=True)),
+                ('creado_en', models.DateTimeField(auto_now_add=True)),
+                ('iniciado_en', models.DateTimeField(blank=True, null=True)),
+                ('finalizado_en', models.DateTimeField(blank=True, null=True)),
+                ('creado_por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='corridas_nomina', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Corrida de nómina',
+                'verbose_name_plural': 'Corridas de nómina',
+                'ordering': ['-creado_en'],
+            },
+        ),
+    ]
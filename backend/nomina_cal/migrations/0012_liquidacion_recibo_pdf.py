@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nomina_cal', '0011_corridanomina'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='liquidacion',
+            name='recibo_pdf',
+            field=models.CharField(blank=True, default='', help_text='Ruta del recibo PDF cacheado en el storage (ver services/cache_recibos.py)', max_length=255),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nomina_cal', '0012_liquidacion_recibo_pdf'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportacionReporte',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(max_length=40)),
+                ('parametros', models.JSONField(blank=True, default=dict)),
+                ('clave', models.CharField(db_index=True, help_text='sha256 de tipo + parámetros', max_length=64)),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('en_proceso', 'En proceso'), ('completada', 'Completada'), ('fallida', 'Fallida'), ('vencida', 'Vencida')], db_index=True, default='pendiente', max_length=20)),
+                ('archivo', models.CharField(blank=True, default='', help_text='Ruta en default_storage', max_length=255)),
+                ('nombre_archivo', models.CharField(blank=True, default='', max_length=120)),
+                ('content_type', models.CharField(blank=True, default='', max_length=100)),
+                ('tamanio', models.PositiveBigIntegerField(default=0)),
+                ('error', models.TextField(blank=True, default='')),
+                ('creado_en', models.DateTimeField(auto_now_add=True)),
+                ('iniciado_en', models.DateTimeField(blank=True, null=True)),
+                ('finalizado_en', models.DateTimeField(blank=True, null=True)),
+                ('expira_en', models.DateTimeField(blank=True, db_index=True, null=True)),
+                ('creado_por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='exportaciones_reporte', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Exportación de reporte',
+                'verbose_name_plural': 'Exportaciones de reportes',
+                'ordering': ['-creado_en'],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('estado__in', ['pendiente', 'en_proceso'])), fields=('clave',), name='exportacion_activa_unica')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:06
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nomina_cal', '0013_exportacionreporte'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalidaCorreo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('recibo', 'Recibo de sueldo')], default='recibo', max_length=20)),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('enviando', 'Enviando'), ('enviado', 'Enviado'), ('fallido', 'Fallido')], default='pendiente', max_length=20)),
+                ('intentos', models.PositiveSmallIntegerField(default=0)),
+                ('proximo_intento', models.DateTimeField(default=django.utils.timezone.now)),
+                ('ultimo_error', models.TextField(blank=True, default='')),
+                ('creado_en', models.DateTimeField(auto_now_add=True)),
+                ('enviado_en', models.DateTimeField(blank=True, null=True)),
+                ('liquidacion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='salidas_correo', to='nomina_cal.liquidacion')),
+            ],
+            options={
+                'ordering': ['proximo_intento', 'id'],
+                'indexes': [models.Index(fields=['estado', 'proximo_intento'], name='salida_correo_cola_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('estado__in', ['pendiente', 'enviando'])), fields=('liquidacion', 'tipo'), name='salida_correo_en_curso_unica')],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nomina_cal', '0014_salidacorreo'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='corridanomina',
+            name='tipo',
+            field=models.CharField(choices=[('calcular_todas', 'Recalcular liquidaciones abiertas'), ('periodo', 'Calcular período'), ('cierre', 'Cerrar período'), ('envio_recibos', 'Enviar recibos por correo')], max_length=20),
+        ),
+        migrations.CreateModel(
+            name='DestinoEnvio',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('enviado', 'Enviado'), ('fallido', 'Fallido')], default='pendiente', max_length=10)),
+                ('intentos', models.PositiveSmallIntegerField(default=0)),
+                ('ultimo_error', models.TextField(blank=True)),
+                ('actualizado_en', models.DateTimeField(blank=True, null=True)),
+                ('corrida', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='destinos', to='nomina_cal.corridanomina')),
+                ('liquidacion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='destinos_envio', to='nomina_cal.liquidacion')),
+            ],
+            options={
+                'verbose_name': 'Destino de envío',
+                'verbose_name_plural': 'Destinos de envío',
+                'indexes': [models.Index(fields=['corrida', 'estado'], name='destino_envio_estado_idx')],
+                'constraints': [models.UniqueConstraint(fields=('corrida', 'liquidacion'), name='destino_envio_unico')],
+            },
+        ),
+    ]
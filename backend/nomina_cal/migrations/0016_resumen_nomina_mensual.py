@@ -0,0 +1,71 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:15
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def marcar_periodos_existentes(apps, schema_editor):
+    # El resumen se agrega en la primera lectura de cada período
+    Liquidacion = apps.get_model("nomina_cal", "Liquidacion")
+    PeriodoResumenPendiente = apps.get_model("nomina_cal", "PeriodoResumenPendiente")
+    periodos = Liquidacion.objects.order_by().values_list("anio", "mes").distinct()
+    PeriodoResumenPendiente.objects.bulk_create(
+        [PeriodoResumenPendiente(anio=anio, mes=mes) for anio, mes in periodos], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('empleados', '0010_restaurar_area_tipo_contrato'),
+        ('nomina_cal', '0015_destinoenvio'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PeriodoResumenPendiente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('anio', models.IntegerField()),
+                ('mes', models.IntegerField()),
+                ('marcado_en', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ResumenNominaMensual',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('anio', models.IntegerField()),
+                ('mes', models.IntegerField()),
+                ('area', models.CharField(blank=True, default='', max_length=20)),
+                ('tipo_contrato', models.CharField(blank=True, default='', max_length=20)),
+                ('cantidad', models.PositiveIntegerField(default=0)),
+                ('cerradas', models.PositiveIntegerField(default=0)),
+                ('total_ingresos', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('total_descuentos', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('total_neto', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('total_ips', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('actualizado_en', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Resumen mensual de nómina',
+                'verbose_name_plural': 'Resúmenes mensuales de nómina',
+                'ordering': ['-anio', '-mes', 'area', 'tipo_contrato'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='liquidacion',
+            index=models.Index(fields=['anio', 'mes'], name='liquidacion_periodo_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='periodoresumenpendiente',
+            constraint=models.UniqueConstraint(fields=('anio', 'mes'), name='resumen_pendiente_periodo_unico'),
+        ),
+        migrations.AddConstraint(
+            model_name='resumennominamensual',
+            constraint=models.UniqueConstraint(fields=('anio', 'mes', 'area', 'tipo_contrato'), name='resumen_nomina_grupo_unico'),
+        ),
+        migrations.RunPython(marcar_periodos_existentes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:29
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+
+def _codigo(descripcion):
+    # Copia de models.inferir_codigo_concepto al momento de la migración
+    texto = unicodedata.normalize("NFKD", descripcion or "").encode("ascii", "ignore").decode().lower()
+    if re.search(r"\bips\b", texto):
+        return "IPS"
+    if texto.startswith("descuento:"):
+        tipo = re.findall(r"[a-z]+", texto[len("descuento:"):])
+        return "DESCUENTO_" + (tipo[0].upper() if tipo else "OTRO")
+    if "hijo" in texto:
+        return "BONIF_FAMILIAR"
+    if re.search(r"(sueldo|salario) base", texto):
+        return "SUELDO_BASE"
+    if "aguinaldo" in texto:
+        return "AGUINALDO"
+    if "vacacion" in texto:
+        return "VACACIONES"
+    if "retencion" in texto or "anticipo" in texto:
+        return "DESCUENTO_RETENCION"
+    return ""
+
+
+def poblar_codigos(apps, schema_editor):
+    Concepto = apps.get_model("nomina_cal", "Concepto")
+    conceptos = list(Concepto.objects.only("id", "descripcion"))
+    for concepto in conceptos:
+        concepto.codigo = _codigo(concepto.descripcion)
+    Concepto.objects.bulk_update(conceptos, ["codigo"], batch_size=500)
+
+    # El IPS del resumen mensual pasa a salir del código: se reagrega todo
+    Liquidacion = apps.get_model("nomina_cal", "Liquidacion")
+    PeriodoResumenPendiente = apps.get_model("nomina_cal", "PeriodoResumenPendiente")
+    periodos = Liquidacion.objects.order_by().values_list("anio", "mes").distinct()
+    PeriodoResumenPendiente.objects.bulk_create(
+        [PeriodoResumenPendiente(anio=anio, mes=mes) for anio, mes in periodos],
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nomina_cal', '0016_resumen_nomina_mensual'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='concepto',
+            name='codigo',
+            field=models.CharField(blank=True, db_index=True, default='', help_text='SUELDO_BASE, IPS, BONIF_FAMILIAR, AGUINALDO, VACACIONES o DESCUENTO_<TIPO>; vacío se deduce de la descripción', max_length=40),
+        ),
+        migrations.RunPython(poblar_codigos, migrations.RunPython.noop),
+    ]
@@ -3,6 +3,8 @@
 # Cumple los requisitos de los Sprint 2–5 y la rúbrica final
 #
 
+import re
+import unicodedata
 from django.db import models
 from django.conf import settings
 from empleados.models import Empleado, Hijo
@@ -60,29 +62,65 @@ class SalarioMinimo(models.Model):
         """
         Obtiene el salario mínimo vigente para una fecha dada.
         Se prioriza el registro con 'vigente=True' para evitar duplicidades.
+        Resuelve sobre la línea de tiempo en memoria (sin consulta por llamada).
         """
+        from nomina_cal.services.linea_salario_minimo import linea_salario_minimo
+
         if not fecha:
             fecha = date.today()
-        vigente = (
-            SalarioMinimo.objects
-            .filter(vigente_desde__lte=fecha, vigente=True)
-            .order_by("-vigente_desde")
-            .first()
-        )
-        return vigente
+        return linea_salario_minimo.vigente(fecha)
 
 
 #
 # # CONCEPTO SALARIAL
 #
+def inferir_codigo_concepto(descripcion) -> str:
+    """Código de un concepto a partir de su descripción ("" si no encaja en ninguno)."""
+    texto = unicodedata.normalize("NFKD", descripcion or "").encode("ascii", "ignore").decode().lower()
+    if re.search(r"\bips\b", texto):
+        return Concepto.IPS
+    if texto.startswith("descuento:"):
+        tipo = re.findall(r"[a-z]+", texto[len("descuento:"):])
+        return Concepto.PREFIJO_DESCUENTO + (tipo[0].upper() if tipo else "OTRO")
+    if "hijo" in texto:
+        return Concepto.BONIF_FAMILIAR
+    if re.search(r"(sueldo|salario) base", texto):
+        return Concepto.SUELDO_BASE
+    if "aguinaldo" in texto:
+        return Concepto.AGUINALDO
+    if "vacacion" in texto:
+        return Concepto.VACACIONES
+    if "retencion" in texto or "anticipo" in texto:
+        return Concepto.PREFIJO_DESCUENTO + "RETENCION"
+    return ""
+
+
 class Concepto(AuditoriaModel):
     """Define un concepto salarial: crédito o débito."""
+    # Códigos estables para agregados y filtros (la descripción es texto libre)
+    SUELDO_BASE = "SUELDO_BASE"
+    IPS = "IPS"
+    BONIF_FAMILIAR = "BONIF_FAMILIAR"
+    AGUINALDO = "AGUINALDO"
+    VACACIONES = "VACACIONES"
+    PREFIJO_DESCUENTO = "DESCUENTO_"
+
     descripcion = models.CharField(max_length=150, unique=True)
+    codigo = models.CharField(
+        max_length=40, blank=True, default="", db_index=True,
+        help_text="SUELDO_BASE, IPS, BONIF_FAMILIAR, AGUINALDO, VACACIONES o DESCUENTO_<TIPO>; "
+                  "vacío se deduce de la descripción",
+    )
     es_debito = models.BooleanField(default=False, help_text="True = descuento, False = ingreso")
     es_recurrente = models.BooleanField(default=True)
     afecta_ips = models.BooleanField(default=True)
     para_aguinaldo = models.BooleanField(default=True)
 
+    def save(self, *args, **kwargs):
+        if not self.codigo:
+            self.codigo = inferir_codigo_concepto(self.descripcion)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         tipo = "Débito" if self.es_debito else "Crédito"
         return f"{self.descripcion} ({tipo})"
@@ -106,11 +144,23 @@ class Liquidacion(AuditoriaModel):
     cerrada = models.BooleanField(default=False)
     enviado_email = models.BooleanField(default=False, help_text="Indica si el recibo ya fue enviado por correo")
     fecha_envio = models.DateTimeField(null=True, blank=True)
+    requiere_recalculo = models.BooleanField(
+        default=True, db_index=True,
+        help_text="Marcada cuando cambió algún dato que afecta el cálculo (ver services/recalculo_incremental.py)",
+    )
+    recibo_pdf = models.CharField(
+        max_length=255, blank=True, default="",
+        help_text="Ruta del recibo PDF cacheado en el storage (ver services/cache_recibos.py)",
+    )
 
     class Meta:
         unique_together = ("empleado", "mes", "anio")
         ordering = ["-anio", "-mes"]
         ordering = ["-anio", "-mes"]
+        indexes = [
+            # Reagregado por período del resumen mensual (services/resumen_nomina.py)
+            models.Index(fields=["anio", "mes"], name="liquidacion_periodo_idx"),
+        ]
         verbose_name = "Liquidación"
         verbose_name_plural = "Liquidaciones"
 
@@ -149,30 +199,22 @@ class Liquidacion(AuditoriaModel):
         - Solo si gana ≤ 3 salarios mínimos.
         - Solo hijos residentes en Paraguay con residencia vigente.
         """
-        salario_minimo = SalarioMinimo.get_vigente(date(self.anio, self.mes, 1))
-        
-        if not salario_minimo:
-            return Decimal("0.00")
-
-        # # Tope legal: hasta 2 salarios mínimos (ajustado según MTESS)
-        if self.sueldo_base > salario_minimo.monto * Decimal("3"):
-            return Decimal("0.00")
-
-        # # Filtrar hijos válidos según requisitos legales
-        hijos_validos = [
-            h for h in self.empleado.hijos.all()
-            if h.es_menor() and h.residente and hasattr(h, "residencia_valida") and h.residencia_valida() and h.activo
-        ][:4]  # Máximo 4 hijos
+        from nomina_cal.services import motor_calculo
+        from nomina_cal.services.adaptador_motor import hijos_elegibles, salario_minimo_monto
 
-        bonificacion = salario_minimo.monto * Decimal("0.05") * Decimal(len(hijos_validos))
-        return bonificacion.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+        return motor_calculo.calcular_bonificacion(
+            Decimal(self.sueldo_base),
+            salario_minimo_monto(self.mes, self.anio),
+            hijos_elegibles([self.empleado_id], self.mes, self.anio).get(self.empleado_id, 0),
+        )
 
     #
     #  CÁLCULO DE IPS Y TOTALES
     #
     def calcular_ips(self, imponible):
         """Calcula el aporte IPS del empleado (9%)."""
-        return (imponible * Decimal("0.09")).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+        from nomina_cal.services.motor_calculo import calcular_ips
+        return calcular_ips(imponible)
 
     def calcular_totales(self):
         """
@@ -180,69 +222,22 @@ class Liquidacion(AuditoriaModel):
         Sueldo, bonificación, IPS y descuentos adicionales.
         Aplica reglas del MTESS y bloquea recalculo si fue enviado.
         """
+        from nomina_cal.services import motor_calculo
+        from nomina_cal.services.adaptador_motor import (
+            aplicar_resultado, fecha_referencia, salario_minimo_monto, snapshot_empleado,
+        )
+
         if self.cerrada:
             raise ValueError("No se puede recalcular una liquidación cerrada.")
         if self.enviado_email:
             raise ValueError("No se puede recalcular una liquidación ya enviada por correo.")
 
-        # Eliminar detalles previos para regenerar el cálculo
-        self.detalles.all().delete()
-
-        ingresos = Decimal(self.sueldo_base)
-        descuentos = Decimal("0.00")
-
-        
-        #  Sueldo Base
-        
-        concepto_base, _ = Concepto.objects.get_or_create(
-            descripcion="Sueldo Base",
-            defaults={"es_debito": False, "afecta_ips": True, "para_aguinaldo": True},
-        )
-        DetalleLiquidacion.objects.create(liquidacion=self, concepto=concepto_base, monto=self.sueldo_base)
-
-        
-        #  Bonificación Familiar (MTESS)
-        
-        bonificacion = self.calcular_bonificacion_hijos()
-        if bonificacion > 0:
-            concepto_bono, _ = Concepto.objects.get_or_create(
-                descripcion="Bonificación Familiar",
-                defaults={"es_debito": False, "afecta_ips": False, "para_aguinaldo": False},
-            )
-            DetalleLiquidacion.objects.create(liquidacion=self, concepto=concepto_bono, monto=bonificacion)
-            ingresos += bonificacion
-
-        
-        #  Descuento IPS (9%)
-        
-        descuento_ips = self.calcular_ips(self.sueldo_base)
-        concepto_ips, _ = Concepto.objects.get_or_create(
-            descripcion="Descuento IPS 9%",
-            defaults={"es_debito": True, "afecta_ips": False, "para_aguinaldo": False},
+        resultado = motor_calculo.calcular(
+            snapshot_empleado(self.empleado, self.mes, self.anio, sueldo_base=self.sueldo_base),
+            salario_minimo_monto(self.mes, self.anio),
+            fecha_referencia(self.mes, self.anio),
         )
-        DetalleLiquidacion.objects.create(liquidacion=self, concepto=concepto_ips, monto=descuento_ips)
-        descuentos += descuento_ips
-
-        
-        #  Descuentos adicionales (Préstamos, embargos, etc.)
-        
-        descuentos_extra = Descuento.objects.filter(empleado=self.empleado, activo=True)
-        for d in descuentos_extra:
-            if d.es_vigente(self.mes, self.anio):
-                concepto_extra, _ = Concepto.objects.get_or_create(
-                    descripcion=f"Descuento: {d.tipo.title()}",
-                    defaults={"es_debito": True, "afecta_ips": False, "para_aguinaldo": False},
-                )
-                DetalleLiquidacion.objects.create(liquidacion=self, concepto=concepto_extra, monto=d.monto)
-                descuentos += d.monto
-
-        
-        #  Totales finales
-        
-        self.total_ingresos = ingresos
-        self.total_descuentos = descuentos
-        self.neto_cobrar = ingresos - descuentos
-        self.save(update_fields=["total_ingresos", "total_descuentos", "neto_cobrar"])
+        aplicar_resultado(self, resultado)
 
         # Log informativo
         import logging
@@ -252,11 +247,12 @@ class Liquidacion(AuditoriaModel):
         return self.neto_cobrar
 
     def cerrar(self):
-        """Bloquea la edición de la liquidación.
-        (El envío del recibo ahora se realiza vía EnviarReciboView por API.)
+        """Bloquea la edición de la liquidación y encola el envío del recibo
+        (services/salida_correos.py).
         """
+        from nomina_cal.services.salida_correos import cerrar_liquidaciones
+        cerrar_liquidaciones(Liquidacion.objects.filter(pk=self.pk))
         self.cerrada = True
-        self.save(update_fields=["cerrada"])
 
             
 
@@ -282,3 +278,10 @@ class DetalleLiquidacion(AuditoriaModel):
 
     def __str__(self):
         return f"{self.liquidacion} - {self.concepto.descripcion}: {self.monto:,.0f} Gs"
+
+
+# Modelos definidos en módulos aparte (se importan para registrarlos en la app)
+from .models_corrida import CorridaNomina, DestinoEnvio  # noqa: E402,F401
+from .models_exportacion import ExportacionReporte  # noqa: E402,F401
+from .models_envio import EnvioCorreo, SalidaCorreo  # noqa: E402,F401
+from .models_resumen import PeriodoResumenPendiente, ResumenNominaMensual  # noqa: E402,F401
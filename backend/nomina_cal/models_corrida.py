@@ -0,0 +1,98 @@
+# backend/nomina_cal/models_corrida.py
+#
+#  CORRIDAS DE NÓMINA (trabajos asíncronos con progreso)
+#
+# Una corrida registra un proceso masivo (recalcular abiertas, calcular un
+# período, cerrarlo o enviar sus recibos) que se ejecuta fuera del request
+# HTTP, en un worker Celery o en un pool de hilos local (ver services/corridas.py).
+#
+# Las corridas de envío guardan el estado de cada destinatario en
+# DestinoEnvio: reanudarlas sólo envía a los pendientes o fallidos.
+#
+
+from django.db import models
+from django.conf import settings
+
+
+class CorridaNomina(models.Model):
+    TIPOS = [
+        ("calcular_todas", "Recalcular liquidaciones abiertas"),
+        ("periodo", "Calcular período"),
+        ("cierre", "Cerrar período"),
+        ("envio_recibos", "Enviar recibos por correo"),
+    ]
+    ESTADOS = [
+        ("pendiente", "Pendiente"),
+        ("en_proceso", "En proceso"),
+        ("completada", "Completada"),
+        ("con_errores", "Completada con errores"),
+        ("fallida", "Fallida"),
+    ]
+
+    tipo = models.CharField(max_length=20, choices=TIPOS)
+    estado = models.CharField(max_length=20, choices=ESTADOS, default="pendiente", db_index=True)
+    parametros = models.JSONField(default=dict, blank=True)
+    total = models.PositiveIntegerField(default=0)
+    procesadas = models.PositiveIntegerField(default=0)
+    errores = models.JSONField(default=list, blank=True, help_text="[{liquidacion_id, empleado_id, empleado, error}]")
+    resultado = models.JSONField(null=True, blank=True)
+    creado_por = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="corridas_nomina",
+    )
+    creado_en = models.DateTimeField(auto_now_add=True)
+    iniciado_en = models.DateTimeField(null=True, blank=True)
+    finalizado_en = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-creado_en"]
+        verbose_name = "Corrida de nómina"
+        verbose_name_plural = "Corridas de nómina"
+
+    def __str__(self):
+        return f"Corrida #{self.pk} {self.get_tipo_display()} ({self.estado})"
+
+    @property
+    def progreso(self):
+        """Porcentaje de avance (0–100)."""
+        if self.estado in ("completada", "con_errores"):
+            return 100
+        if not self.total:
+            return 0
+        return min(100, round(self.procesadas * 100 / self.total))
+
+    @property
+    def terminada(self):
+        return self.estado in ("completada", "con_errores", "fallida")
+
+
+class DestinoEnvio(models.Model):
+    """Estado de entrega del recibo de una liquidación dentro de una corrida de envío."""
+    ESTADOS = [
+        ("pendiente", "Pendiente"),
+        ("enviado", "Enviado"),
+        ("fallido", "Fallido"),
+    ]
+
+    corrida = models.ForeignKey(CorridaNomina, on_delete=models.CASCADE, related_name="destinos")
+    liquidacion = models.ForeignKey("nomina_cal.Liquidacion", on_delete=models.CASCADE, related_name="destinos_envio")
+    estado = models.CharField(max_length=10, choices=ESTADOS, default="pendiente")
+    intentos = models.PositiveSmallIntegerField(default=0)
+    ultimo_error = models.TextField(blank=True)
+    actualizado_en = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Destino de envío"
+        verbose_name_plural = "Destinos de envío"
+        constraints = [
+            models.UniqueConstraint(fields=["corrida", "liquidacion"], name="destino_envio_unico"),
+        ]
+        indexes = [
+            models.Index(fields=["corrida", "estado"], name="destino_envio_estado_idx"),
+        ]
+
+    def __str__(self):
+        return f"Corrida #{self.corrida_id} → liquidación {self.liquidacion_id} ({self.estado})"
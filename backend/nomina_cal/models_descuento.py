@@ -10,6 +10,45 @@ from decimal import Decimal
 from empleados.models import Empleado
 
 
+def _limites_mes(mes, anio):
+    """Primer día del mes y primer día del mes siguiente."""
+    inicio = date(anio, mes, 1)
+    siguiente = date(anio + 1, 1, 1) if mes == 12 else date(anio, mes + 1, 1)
+    return inicio, siguiente
+
+
+#
+# # QUERYSET: vigencia del lado de la base
+#
+class DescuentoQuerySet(models.QuerySet):
+    def vigentes_en(self, mes, anio):
+        """
+        Descuentos activos que aplican en mes/año, con las mismas reglas
+        que Descuento.es_vigente (que sigue siendo la referencia):
+        - Puntual: fecha_inicio ≥ inicio del mes y (sin fecha_fin o
+          fecha_fin < inicio del mes siguiente).
+        - Recurrente: fecha_inicio ≤ inicio del mes siguiente y (sin
+          fecha_fin o fecha_fin ≥ inicio del mes).
+        Usa el índice (empleado, activo, fecha_inicio, fecha_fin).
+        """
+        inicio, siguiente = _limites_mes(mes, anio)
+        sin_fin = models.Q(fecha_fin__isnull=True)
+        puntual = models.Q(recurrente=False, fecha_inicio__gte=inicio) & (
+            sin_fin | models.Q(fecha_fin__lt=siguiente)
+        )
+        recurrente = models.Q(recurrente=True, fecha_inicio__lte=siguiente) & (
+            sin_fin | models.Q(fecha_fin__gte=inicio)
+        )
+        return self.filter(activo=True).filter(puntual | recurrente)
+
+    def por_empleado(self):
+        """Agrupa el queryset en {empleado_id: [descuentos]} (orden por id)."""
+        agrupados = {}
+        for d in self.order_by("empleado_id", "id"):
+            agrupados.setdefault(d.empleado_id, []).append(d)
+        return agrupados
+
+
 #
 # # MODELO: Descuento
 #
@@ -51,8 +90,13 @@ class Descuento(models.Model):
         related_name="descuentos_creados"
     )
 
+    objects = DescuentoQuerySet.as_manager()
+
     class Meta:
         ordering = ["-fecha_inicio"]
+        indexes = [
+            models.Index(fields=["empleado", "activo", "fecha_inicio", "fecha_fin"]),
+        ]
 
     def __str__(self):
         return f"{self.get_tipo_display()} - {self.empleado.nombre} ({self.monto} Gs)"
@@ -94,24 +138,21 @@ class Descuento(models.Model):
         """
         Aplica el descuento a una liquidación si está vigente.
         """
-        from .models import Concepto, DetalleLiquidacion
+        from .models import DetalleLiquidacion
+        from .services.motor_calculo import ConceptoDef, codigo_descuento
+        from .services.registro_conceptos import registro_conceptos
 
         if not self.es_vigente(liquidacion.mes, liquidacion.anio):
             return
 
-        concepto_extra, _ = Concepto.objects.get_or_create(
-            descripcion=f"Descuento: {self.get_tipo_display()}",
-            defaults={
-                "es_debito": True,
-                "es_recurrente": self.recurrente,
-                "afecta_ips": False,
-                "para_aguinaldo": False,
-            },
+        concepto_extra = ConceptoDef(
+            f"Descuento: {self.get_tipo_display()}", es_debito=True, es_recurrente=self.recurrente,
+            codigo=codigo_descuento(self.tipo),
         )
 
         DetalleLiquidacion.objects.create(
             liquidacion=liquidacion,
-            concepto=concepto_extra,
+            concepto_id=registro_conceptos.obtener_id(concepto_extra),
             monto=self.monto,
         )
 
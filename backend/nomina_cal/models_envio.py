@@ -1,5 +1,6 @@
 # backend/nomina_cal/models_envio.py
 from django.db import models
+from django.utils import timezone
 from empleados.models import Empleado
 
 class EnvioCorreo(models.Model):
@@ -15,3 +16,42 @@ class EnvioCorreo(models.Model):
 
     def __str__(self):
         return f"{self.empleado} -> {self.destinatario} ({self.estado})"
+
+
+class SalidaCorreo(models.Model):
+    """
+    Salida de correos (outbox transaccional): el cierre inserta la intención
+    de envío en su misma transacción y un worker la procesa después del
+    commit, con reintentos (ver services/salida_correos.py).
+    """
+    TIPOS = [("recibo", "Recibo de sueldo")]
+    ESTADOS = [
+        ("pendiente", "Pendiente"),
+        ("enviando", "Enviando"),
+        ("enviado", "Enviado"),
+        ("fallido", "Fallido"),
+    ]
+
+    liquidacion = models.ForeignKey("nomina_cal.Liquidacion", on_delete=models.CASCADE, related_name="salidas_correo")
+    tipo = models.CharField(max_length=20, choices=TIPOS, default="recibo")
+    estado = models.CharField(max_length=20, choices=ESTADOS, default="pendiente")
+    intentos = models.PositiveSmallIntegerField(default=0)
+    proximo_intento = models.DateTimeField(default=timezone.now)
+    ultimo_error = models.TextField(blank=True, default="")
+    creado_en = models.DateTimeField(auto_now_add=True)
+    enviado_en = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["proximo_intento", "id"]
+        indexes = [models.Index(fields=["estado", "proximo_intento"], name="salida_correo_cola_idx")]
+        constraints = [
+            # Una sola intención en curso por liquidación y tipo
+            models.UniqueConstraint(
+                fields=["liquidacion", "tipo"],
+                condition=models.Q(estado__in=["pendiente", "enviando"]),
+                name="salida_correo_en_curso_unica",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Salida #{self.pk} {self.tipo} liquidación {self.liquidacion_id} ({self.estado})"
@@ -0,0 +1,64 @@
+# backend/nomina_cal/models_exportacion.py
+#
+#  EXPORTACIONES EN SEGUNDO PLANO (reportes pesados descargables)
+#
+# Una exportación genera el archivo de un reporte registrado en
+# services/exportaciones.py fuera del request (Celery o pool local), lo
+# guarda en el storage con vencimiento y queda disponible para descarga.
+# Dos pedidos idénticos en curso comparten la misma exportación (clave).
+#
+
+from django.db import models
+from django.conf import settings
+
+
+class ExportacionReporte(models.Model):
+    ESTADOS = [
+        ("pendiente", "Pendiente"),
+        ("en_proceso", "En proceso"),
+        ("completada", "Completada"),
+        ("fallida", "Fallida"),
+        ("vencida", "Vencida"),
+    ]
+    ACTIVAS = ("pendiente", "en_proceso")
+
+    tipo = models.CharField(max_length=40)
+    parametros = models.JSONField(default=dict, blank=True)
+    clave = models.CharField(max_length=64, db_index=True, help_text="sha256 de tipo + parámetros")
+    estado = models.CharField(max_length=20, choices=ESTADOS, default="pendiente", db_index=True)
+    archivo = models.CharField(max_length=255, blank=True, default="", help_text="Ruta en default_storage")
+    nombre_archivo = models.CharField(max_length=120, blank=True, default="")
+    content_type = models.CharField(max_length=100, blank=True, default="")
+    tamanio = models.PositiveBigIntegerField(default=0)
+    error = models.TextField(blank=True, default="")
+    creado_por = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="exportaciones_reporte",
+    )
+    creado_en = models.DateTimeField(auto_now_add=True)
+    iniciado_en = models.DateTimeField(null=True, blank=True)
+    finalizado_en = models.DateTimeField(null=True, blank=True)
+    expira_en = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    class Meta:
+        ordering = ["-creado_en"]
+        verbose_name = "Exportación de reporte"
+        verbose_name_plural = "Exportaciones de reportes"
+        constraints = [
+            # Una sola exportación en curso por pedido idéntico
+            models.UniqueConstraint(
+                fields=["clave"],
+                condition=models.Q(estado__in=["pendiente", "en_proceso"]),
+                name="exportacion_activa_unica",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Exportación #{self.pk} {self.tipo} ({self.estado})"
+
+    @property
+    def terminada(self):
+        return self.estado in ("completada", "fallida", "vencida")
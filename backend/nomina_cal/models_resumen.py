@@ -0,0 +1,55 @@
+# backend/nomina_cal/models_resumen.py
+#
+#  RESUMEN MENSUAL DE NÓMINA (tabla materializada para dashboards y KPIs)
+#
+# Una fila por (anio, mes, area, tipo_contrato) con cantidades y sumas de
+# las liquidaciones del grupo. Los dashboards leen de acá en lugar de
+# agregar toda la tabla Liquidacion en cada carga.
+#
+# Las escrituras sólo marcan el período en PeriodoResumenPendiente; el
+# período se vuelve a agregar (una consulta por período, no por historia)
+# la próxima vez que se lee el resumen (ver services/resumen_nomina.py).
+#
+
+from django.db import models
+from django.utils import timezone
+
+
+class ResumenNominaMensual(models.Model):
+    anio = models.IntegerField()
+    mes = models.IntegerField()
+    area = models.CharField(max_length=20, blank=True, default="")
+    tipo_contrato = models.CharField(max_length=20, blank=True, default="")
+    cantidad = models.PositiveIntegerField(default=0)
+    cerradas = models.PositiveIntegerField(default=0)
+    total_ingresos = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    total_descuentos = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    total_neto = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    total_ips = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    actualizado_en = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["-anio", "-mes", "area", "tipo_contrato"]
+        verbose_name = "Resumen mensual de nómina"
+        verbose_name_plural = "Resúmenes mensuales de nómina"
+        constraints = [
+            models.UniqueConstraint(fields=["anio", "mes", "area", "tipo_contrato"], name="resumen_nomina_grupo_unico"),
+        ]
+
+    def __str__(self):
+        return f"Resumen {self.mes}/{self.anio} {self.area or '-'} {self.tipo_contrato or '-'}"
+
+
+class PeriodoResumenPendiente(models.Model):
+    """Período cuyo resumen quedó desactualizado por una escritura."""
+    anio = models.IntegerField()
+    mes = models.IntegerField()
+    marcado_en = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["anio", "mes"], name="resumen_pendiente_periodo_unico"),
+        ]
+
+    def __str__(self):
+        return f"Resumen pendiente {self.mes}/{self.anio}"
@@ -0,0 +1,35 @@
+#
+# Renderers para ?format=csv|ndjson
+#
+# DRF usa ?format= para elegir renderer y responde 404 si no hay uno que
+# coincida. Las vistas de reportes devuelven el CSV/NDJSON ya armado
+# (services/exportacion_plana.py); estos renderers sólo habilitan el
+# formato y serializan como JSON las respuestas de error.
+#
+
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import BaseRenderer
+from rest_framework.settings import api_settings
+
+
+class _RendererPlano(BaseRenderer):
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False).encode("utf-8")
+
+
+class CSVRenderer(_RendererPlano):
+    media_type = "text/csv"
+    format = "csv"
+
+
+class NDJSONRenderer(_RendererPlano):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+
+RENDERERS_REPORTES = [*api_settings.DEFAULT_RENDERER_CLASSES, CSVRenderer, NDJSONRenderer]
@@ -53,6 +53,7 @@ class ConceptoSerializer(serializers.ModelSerializer):
         fields = [
             "id",
             "descripcion",
+            "codigo",
             "es_debito",
             "es_recurrente",
             "afecta_ips",
@@ -231,3 +232,60 @@ class DescuentoSerializer(serializers.ModelSerializer):
             "creado_en",
         ]
         read_only_fields = ["creado_en"]
+
+
+#
+# # SERIALIZER: CorridaNomina (trabajos asíncronos)
+#
+from .models_corrida import CorridaNomina
+
+
+class CorridaNominaSerializer(serializers.ModelSerializer):
+    progreso = serializers.IntegerField(read_only=True)
+    cantidad_errores = serializers.SerializerMethodField()
+
+    class Meta:
+        model = CorridaNomina
+        fields = [
+            "id",
+            "tipo",
+            "estado",
+            "parametros",
+            "total",
+            "procesadas",
+            "progreso",
+            "cantidad_errores",
+            "resultado",
+            "creado_en",
+            "iniciado_en",
+            "finalizado_en",
+        ]
+        read_only_fields = fields
+
+    def get_cantidad_errores(self, obj):
+        return len(obj.errores or [])
+
+
+#
+# # SERIALIZER: ExportacionReporte (exportaciones en segundo plano)
+#
+from .models_exportacion import ExportacionReporte
+
+
+class ExportacionReporteSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ExportacionReporte
+        fields = [
+            "id",
+            "tipo",
+            "estado",
+            "parametros",
+            "nombre_archivo",
+            "tamanio",
+            "error",
+            "creado_en",
+            "iniciado_en",
+            "finalizado_en",
+            "expira_en",
+        ]
+        read_only_fields = fields
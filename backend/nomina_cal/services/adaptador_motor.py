@@ -0,0 +1,108 @@
+#
+# Adaptador entre los modelos Django y el motor de cálculo puro
+#
+# - Arma snapshots (EmpleadoSnapshot, DescuentoSnapshot)
+#   desde la base, de a un empleado o por lote.
+# - Persiste un ResultadoLiquidacion sobre una Liquidacion (detalles y totales).
+#
+
+from datetime import date
+from decimal import Decimal
+from django.utils import timezone
+
+from empleados.models import Hijo
+from nomina_cal.models import DetalleLiquidacion, SalarioMinimo
+from nomina_cal.models_descuento import Descuento
+from nomina_cal.services import cache_recibos, resumen_nomina
+from nomina_cal.services.motor_calculo import (
+    DescuentoSnapshot,
+    EmpleadoSnapshot,
+)
+from nomina_cal.services.registro_conceptos import registro_conceptos
+
+
+def fecha_referencia(mes: int, anio: int) -> date:
+    """Fecha a la que se evalúan edad y residencia de los hijos (inicio del mes)."""
+    return date(anio, mes, 1)
+
+
+def salario_minimo_monto(mes: int, anio: int) -> Decimal:
+    """Monto del salario mínimo vigente del período (0 si no hay)."""
+    sm = SalarioMinimo.get_vigente(fecha_referencia(mes, anio))
+    return sm.monto if sm else Decimal("0.00")
+
+
+#
+# # Snapshots
+#
+def hijos_elegibles(empleado_ids, mes: int, anio: int) -> dict:
+    """{empleado_id: hijos elegibles (máx. 4)} a la fecha de referencia, con una consulta agregada."""
+    return Hijo.objects.filter(empleado_id__in=empleado_ids).conteo_elegibles(fecha_referencia(mes, anio))
+
+
+def descuento_snapshot(d) -> DescuentoSnapshot:
+    return DescuentoSnapshot(tipo=d.tipo, monto=Decimal(d.monto), recurrente=d.recurrente)
+
+
+def snapshot_empleado(empleado, mes: int, anio: int, sueldo_base=None) -> EmpleadoSnapshot:
+    """
+    Snapshot de un empleado para el período.
+    sueldo_base: si se indica, reemplaza al salario del empleado
+    (p. ej. el sueldo congelado en la liquidación).
+    """
+    return snapshots_empleados(
+        [empleado], mes, anio,
+        sueldos=None if sueldo_base is None else {empleado.id: sueldo_base},
+    )[empleado.id]
+
+
+def snapshots_empleados(empleados, mes: int, anio: int, sueldos=None) -> dict:
+    """
+    Snapshots de un lote de empleados con dos consultas
+    (conteo agregado de hijos elegibles y descuentos vigentes).
+    sueldos: {empleado_id: sueldo_base} opcional. Retorna {empleado_id: snapshot}.
+    """
+    ids = [e.id for e in empleados]
+    hijos = hijos_elegibles(ids, mes, anio)
+    descuentos = {}
+    for emp_id, ds in Descuento.objects.filter(empleado_id__in=ids).vigentes_en(mes, anio).por_empleado().items():
+        descuentos[emp_id] = [descuento_snapshot(d) for d in ds]
+
+    sueldos = sueldos or {}
+    return {
+        e.id: EmpleadoSnapshot(
+            id=e.id,
+            sueldo_base=Decimal(sueldos.get(e.id, e.salario_base) or 0),
+            hijos_elegibles=hijos.get(e.id, 0),
+            descuentos=tuple(descuentos.get(e.id, ())),
+        )
+        for e in empleados
+    }
+
+
+#
+# # Persistencia del resultado
+#
+def aplicar_resultado(liquidacion, resultado):
+    """
+    Reemplaza los detalles de la liquidación por las líneas del resultado
+    y actualiza sus totales.
+    """
+    conceptos = registro_conceptos.resolver(linea.concepto for linea in resultado.lineas)
+    cache_recibos.descartar([liquidacion])
+    # Una marca del resumen por liquidación, no una por cada detalle
+    with resumen_nomina.agrupar_marcas():
+        liquidacion.detalles.all().delete()
+        for linea in resultado.lineas:
+            DetalleLiquidacion.objects.create(
+                liquidacion=liquidacion, concepto_id=conceptos[linea.concepto.descripcion], monto=linea.monto
+            )
+        liquidacion.total_ingresos = resultado.total_ingresos
+        liquidacion.total_descuentos = resultado.total_descuentos
+        liquidacion.neto_cobrar = resultado.neto_cobrar
+        liquidacion.requiere_recalculo = False
+        liquidacion.updated_at = timezone.now()
+        liquidacion.save(update_fields=[
+            "total_ingresos", "total_descuentos", "neto_cobrar", "requiere_recalculo", "updated_at", "recibo_pdf",
+        ])
+    return liquidacion
@@ -0,0 +1,170 @@
+#
+# Caché de respuestas de dashboards (por rol y período)
+#
+# obtener(nombre, calcular, ambitos, **parametros) guarda el payload de un
+# dashboard en la caché de Django (settings.CACHES, memoria local por
+# defecto o Redis con REDIS_CACHE_URL) junto con las versiones de los
+# ámbitos de los que depende:
+#
+#   periodo(anio, mes)  liquidaciones y detalles de ese mes
+#   TODOS               cualquier período (totales históricos, "últimas")
+#   EMPLEADOS           altas, bajas y ediciones de Empleado
+#
+# Las escrituras incrementan esas versiones al confirmar la transacción
+# (resumen_nomina.marcar_periodos y las señales de Empleado); una entrada
+# cuyas versiones ya no coinciden está vencida. Nada expira por tiempo
+# salvo DASHBOARD_CACHE_TTL, que acota lo que no pasa por señales.
+#
+# Stale-while-revalidate: una entrada vencida se sigue sirviendo mientras
+# un único hilo (lock con cache.add) la recalcula en segundo plano; durante
+# los recálculos de fin de mes los dashboards responden desde la caché en
+# lugar de agregar en cada carga. Sólo se calcula en línea sin entrada
+# (primera carga o TTL cumplido) o si pasaron DASHBOARD_CACHE_STALE_SEGUNDOS
+# desde que se la vio vencida sin que el recálculo la reemplace (falló);
+# aun así calcula únicamente quien tiene el lock. 0 desactiva la ventana.
+#
+
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+PREFIJO = "dashboards"
+TODOS = "todos"
+EMPLEADOS = "empleados"
+LOCK_SEGUNDOS = 120
+
+_pool_local = None
+_pool_lock = threading.Lock()
+
+
+def periodo(anio, mes):
+    return f"{int(anio)}-{int(mes):02d}"
+
+
+def _ttl():
+    return int(getattr(settings, "DASHBOARD_CACHE_TTL", 3600))
+
+
+def _stale_segundos():
+    return int(getattr(settings, "DASHBOARD_CACHE_STALE_SEGUNDOS", 60))
+
+
+def _clave_version(ambito):
+    return f"{PREFIJO}:v:{ambito}"
+
+
+def _clave(nombre, parametros):
+    # Hash de los parámetros: sin espacios ni paréntesis (claves válidas en memcached)
+    sufijo = ",".join(f"{k}={parametros[k]!r}" for k in sorted(parametros))
+    return f"{PREFIJO}:{nombre}:{hashlib.sha256(sufijo.encode()).hexdigest()}"
+
+
+#
+# # Invalidación (escrituras)
+#
+def _incrementar(ambitos):
+    for ambito in ambitos:
+        clave = _clave_version(ambito)
+        try:
+            cache.incr(clave)
+        except ValueError:
+            # Sin versión (nueva o desalojada): un valor que no puede repetir uno anterior
+            cache.add(clave, time.time_ns(), timeout=None)
+
+
+def invalidar(*ambitos):
+    """Incrementa las versiones de los ámbitos al confirmar la transacción."""
+    ambitos = set(ambitos)
+    if ambitos:
+        transaction.on_commit(lambda: _incrementar(ambitos))
+
+
+def invalidar_periodos(periodos):
+    invalidar(TODOS, *(periodo(anio, mes) for anio, mes in periodos))
+
+
+#
+# # Lectura
+#
+def _versiones(claves, valores):
+    faltantes = [c for c in claves if c not in valores]
+    for c in faltantes:
+        cache.add(c, time.time_ns(), timeout=None)
+    if faltantes:
+        valores = {**valores, **cache.get_many(faltantes)}
+    return tuple(valores.get(c) for c in claves)
+
+
+def _guardar(clave, calcular, versiones):
+    datos = calcular()
+    cache.set(clave, {"versiones": versiones, "datos": datos}, timeout=_ttl())
+    return datos
+
+
+def _pool():
+    global _pool_local
+    with _pool_lock:
+        if _pool_local is None:
+            _pool_local = ThreadPoolExecutor(max_workers=2, thread_name_prefix="dashboards")
+    return _pool_local
+
+
+def _revalidar_en_hilo(clave, calcular, claves_version):
+    try:
+        # Versiones leídas antes de calcular: una escritura concurrente deja la entrada vencida
+        _guardar(clave, calcular, _versiones(claves_version, cache.get_many(claves_version)))
+    except Exception:
+        logger.exception(f"[Dashboards] Error al recalcular {clave}")
+    finally:
+        cache.delete(f"{clave}:lock")
+        connection.close()
+
+
+def _servir_vencida(clave, entrada, calcular, claves_version):
+    """
+    True si se responde con la entrada vencida. Quien toma el lock agenda el
+    recálculo; si la entrada ya lleva vencida más de la ventana, retorna
+    False conservando el lock para calcular en línea (ver obtener()).
+    """
+    if not cache.add(f"{clave}:lock", 1, timeout=LOCK_SEGUNDOS):
+        # Otro hilo la está recalculando
+        return True
+    ahora = time.time()
+    vencida_desde = entrada.get("vencida_desde")
+    if vencida_desde is not None and ahora - vencida_desde >= _stale_segundos():
+        return False
+    if vencida_desde is None:
+        cache.set(clave, {**entrada, "vencida_desde": ahora}, timeout=_ttl())
+    _pool().submit(_revalidar_en_hilo, clave, calcular, claves_version)
+    return True
+
+
+def obtener(nombre, calcular, ambitos, **parametros):
+    """
+    Payload del dashboard `nombre` para `parametros`, recalculado con
+    `calcular()` sólo si cambió alguno de los `ambitos` (ver arriba).
+    """
+    if _ttl() <= 0:
+        return calcular()
+    clave = _clave(nombre, parametros)
+    claves_version = [_clave_version(a) for a in ambitos]
+    valores = cache.get_many([clave, *claves_version])
+    versiones = _versiones(claves_version, valores)
+    entrada = valores.get(clave)
+    if entrada is not None and entrada["versiones"] == versiones:
+        return entrada["datos"]
+    if entrada is None or _stale_segundos() <= 0:
+        return _guardar(clave, calcular, versiones)
+    if _servir_vencida(clave, entrada, calcular, claves_version):
+        return entrada["datos"]
+    try:
+        return _guardar(clave, calcular, versiones)
+    finally:
+        cache.delete(f"{clave}:lock")
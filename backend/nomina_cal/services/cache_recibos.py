@@ -0,0 +1,179 @@
+#
+# Caché de recibos PDF direccionada por contenido
+#
+# Cada recibo se guarda en el storage por defecto bajo una clave SHA-256
+# derivada de lo que se imprime (totales, líneas de detalle, datos del
+# empleado), del updated_at de la liquidación y de VERSION_PLANTILLA:
+#
+#   recibos/<anio>/<mes>/recibo_<id>_<clave>.pdf
+#
+# La ruta vigente queda en Liquidacion.recibo_pdf y es también el ETag
+# (hasheada). Una liquidación cerrada reutiliza su archivo para siempre; un
+# recálculo (que cambia updated_at) limpia la ruta y borra el archivo
+# anterior al confirmar la transacción. Si dos requests generan el mismo
+# recibo a la vez, se conserva la ruta canónica y se borra la copia.
+# La fecha de emisión impresa es la del updated_at, para que el mismo
+# contenido produzca siempre el mismo recibo.
+#
+
+import hashlib
+import json
+import logging
+import posixpath
+from dataclasses import dataclass
+from datetime import datetime, timezone as dt_timezone
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from nomina_cal.models import Liquidacion
+from nomina_cal.services.plantilla_recibo import VERSION_PLANTILLA, datos_recibo, plantilla
+
+logger = logging.getLogger(__name__)
+
+DIRECTORIO = "recibos"
+
+
+@dataclass(frozen=True)
+class ReciboCacheado:
+    ruta: str
+    modificado: datetime  # para Last-Modified
+
+    @property
+    def clave(self) -> str:
+        """ETag: hash de la ruta guardada (que ya incluye la clave de contenido)."""
+        return hashlib.sha256(self.ruta.encode("utf-8")).hexdigest()
+
+    def abrir(self):
+        return default_storage.open(self.ruta, "rb")
+
+    def leer(self) -> bytes:
+        with self.abrir() as f:
+            return f.read()
+
+
+#
+# # Claves y rutas
+#
+def clave_recibo(datos, updated_at) -> str:
+    contenido = [
+        VERSION_PLANTILLA,
+        datos.liquidacion_id, datos.empleado_nombre, datos.cedula, datos.cargo,
+        datos.mes, datos.anio,
+        [[desc, str(monto)] for desc, monto in datos.lineas],
+        str(datos.total_ingresos), str(datos.total_descuentos), str(datos.neto_cobrar),
+        updated_at.isoformat() if updated_at else None,
+    ]
+    return hashlib.sha256(json.dumps(contenido, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def ruta_recibo(datos, clave) -> str:
+    return posixpath.join(
+        DIRECTORIO, str(datos.anio), f"{datos.mes:02d}", f"recibo_{datos.liquidacion_id}_{clave}.pdf"
+    )
+
+
+def _modificado(liq):
+    return liq.updated_at or timezone.now()
+
+
+def _borrar_al_confirmar(rutas):
+    rutas = [r for r in rutas if r]
+    if not rutas:
+        return
+
+    def borrar():
+        for ruta in rutas:
+            try:
+                default_storage.delete(ruta)
+            except Exception:
+                logger.exception(f"[Nómina] No se pudo borrar el recibo cacheado {ruta}")
+
+    transaction.on_commit(borrar)
+
+
+def _renderizar_y_guardar(datos, ruta, updated_at):
+    fecha = timezone.localtime(updated_at).date() if updated_at else None
+    pdf = plantilla().renderizar(datos, fecha_emision=fecha).getvalue()
+    guardada = default_storage.save(ruta, ContentFile(pdf))
+    if guardada != ruta and default_storage.exists(ruta):
+        # Otro request guardó antes el mismo recibo (misma clave, mismo contenido)
+        default_storage.delete(guardada)
+        guardada = ruta
+    return guardada, pdf
+
+
+#
+# # API
+#
+def obtener_recibo(liquidacion) -> ReciboCacheado:
+    """
+    Retorna el recibo cacheado de la liquidación, generándolo y guardándolo
+    si todavía no existe para su estado actual.
+    """
+    if liquidacion.cerrada and liquidacion.recibo_pdf and default_storage.exists(liquidacion.recibo_pdf):
+        return ReciboCacheado(liquidacion.recibo_pdf, _modificado(liquidacion))
+
+    datos = datos_recibo(liquidacion)
+    ruta = ruta_recibo(datos, clave_recibo(datos, liquidacion.updated_at))
+    if not default_storage.exists(ruta):
+        ruta, _ = _renderizar_y_guardar(datos, ruta, liquidacion.updated_at)
+
+    if liquidacion.recibo_pdf != ruta:
+        anterior = liquidacion.recibo_pdf
+        Liquidacion.objects.filter(pk=liquidacion.pk).update(recibo_pdf=ruta)
+        liquidacion.recibo_pdf = ruta
+        _borrar_al_confirmar([anterior])
+    return ReciboCacheado(ruta, _modificado(liquidacion))
+
+
+def recibo_bytes(liquidacion) -> bytes:
+    return obtener_recibo(liquidacion).leer()
+
+
+def recibo_sin_base(datos, updated_at, cerrada=False, ruta_actual="") -> tuple:
+    """
+    Variante de obtener_recibo que no toca la base (para hilos productores
+    que sólo reciben DatosRecibo). Retorna (ruta, pdf_bytes); quien la usa
+    persiste las rutas nuevas con registrar_rutas().
+    """
+    if cerrada and ruta_actual and default_storage.exists(ruta_actual):
+        with default_storage.open(ruta_actual, "rb") as f:
+            return ruta_actual, f.read()
+
+    ruta = ruta_recibo(datos, clave_recibo(datos, updated_at))
+    if default_storage.exists(ruta):
+        with default_storage.open(ruta, "rb") as f:
+            return ruta, f.read()
+    return _renderizar_y_guardar(datos, ruta, updated_at)
+
+
+def registrar_rutas(cambios):
+    """
+    Persiste en bloque las rutas devueltas por recibo_sin_base.
+    cambios: {liquidacion_id: (ruta_anterior, ruta_nueva)}.
+    """
+    cambios = {pk: (anterior, nueva) for pk, (anterior, nueva) in cambios.items() if anterior != nueva}
+    if not cambios:
+        return
+    Liquidacion.objects.bulk_update(
+        [Liquidacion(pk=pk, recibo_pdf=nueva) for pk, (_, nueva) in cambios.items()],
+        ["recibo_pdf"],
+        batch_size=500,
+    )
+    _borrar_al_confirmar([anterior for anterior, _ in cambios.values()])
+
+
+def descartar(liquidaciones):
+    """
+    Olvida el recibo cacheado de liquidaciones que se van a recalcular:
+    limpia recibo_pdf en las instancias (lo persiste quien las guarde)
+    y borra los archivos al confirmar la transacción.
+    """
+    anteriores = []
+    for liq in liquidaciones:
+        if liq.recibo_pdf:
+            anteriores.append(liq.recibo_pdf)
+            liq.recibo_pdf = ""
+    _borrar_al_confirmar(anteriores)
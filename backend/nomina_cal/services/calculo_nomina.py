@@ -4,157 +4,214 @@
 #
 
 from datetime import date
-from decimal import Decimal, ROUND_HALF_UP
-from django.db import transaction
+from decimal import Decimal
+from typing import NamedTuple
+from django.db import connections, router, transaction
+from django.utils import timezone
 from nomina_cal.models import (
     Liquidacion,
     DetalleLiquidacion,
-    Concepto,
     SalarioMinimo,
 )
 from empleados.models import Empleado
-from nomina_cal.models_descuento import Descuento
+from nomina_cal.services import cache_recibos, motor_calculo, resumen_nomina
+from nomina_cal.services.adaptador_motor import (
+    aplicar_resultado,
+    fecha_referencia,
+    snapshots_empleados,
+)
+from nomina_cal.services.registro_conceptos import registro_conceptos
 
 
 #
-# # Funciones auxiliares
+# # Período de referencia (mes/año)
 #
+class PeriodoLiquidacion(NamedTuple):
+    """Período mínimo aceptado por el servicio (cualquier objeto con .anio y .mes sirve)."""
+    anio: int
+    mes: int
+
 
-def _edad_menor_18(fnac: date, ref: date) -> bool:
-    """Calcula si la persona tiene menos de 18 años al momento de referencia."""
-    edad = ref.year - fnac.year - ((ref.month, ref.day) < (fnac.month, fnac.day))
-    return edad < 18
+# Tamaño de lote para las escrituras masivas del modo bulk
+CHUNK_SIZE_BULK = 500
 
 
+#
+# # Funciones auxiliares
+#
+
 def _salario_minimo_vigente(fecha_ref: date) -> Decimal:
-    """Obtiene el salario mínimo vigente a la fecha dada."""
-    sm = SalarioMinimo.objects.filter(vigente_desde__lte=fecha_ref).order_by("-vigente_desde").first()
+    """Obtiene el salario mínimo vigente a la fecha dada (mismo criterio que SalarioMinimo.get_vigente)."""
+    sm = SalarioMinimo.get_vigente(fecha_ref)
     return sm.monto if sm else Decimal("0.00")
 
 
+def _borrar_detalles(liquidacion_ids):
+    """
+    Borra los detalles de `liquidacion_ids` con un único DELETE, sin señales.
+    QuerySet.delete() no puede tomar el camino rápido: auditoría y resumen
+    tienen receptores de post_delete, así que cargaría cada detalle y
+    escribiría un AuditLog por línea (las líneas nuevas van por bulk_create).
+    """
+    conexion = connections[router.db_for_write(DetalleLiquidacion)]
+    tabla = conexion.ops.quote_name(DetalleLiquidacion._meta.db_table)
+    columna = conexion.ops.quote_name(DetalleLiquidacion._meta.get_field("liquidacion").column)
+    marcadores = ", ".join(["%s"] * len(liquidacion_ids))
+    with conexion.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {tabla} WHERE {columna} IN ({marcadores})", list(liquidacion_ids))
+
+
+def _recalculable(liq):
+    # Cerradas o ya enviadas por correo no se recalculan (Liquidacion.save lo impide)
+    return not (liq.cerrada or liq.enviado_email)
+
+
 #
 # 🔸 Cálculo principal del período
 #
 @transaction.atomic
-def calcular_liquidaciones_periodo(periodo) -> int:
+def calcular_liquidaciones_periodo(periodo, modo="fila", chunk_size=CHUNK_SIZE_BULK) -> int:
     """
     Calcula TODAS las liquidaciones del período:
     - Sueldo base (imponible)
     - Bonificación por hijos válidos (no imponible, excluida IPS/aguinaldo)
     - IPS 9% sobre imponibles
     - Descuentos adicionales activos y vigentes
+    Las cerradas o ya enviadas por correo no se recalculan (en ambos modos).
     Retorna la cantidad de liquidaciones recalculadas.
+
+    modo="fila" recorre empleado por empleado (comportamiento histórico);
+    modo="bulk" delega en calcular_liquidaciones_periodo_bulk.
     """
+    if modo == "bulk":
+        return calcular_liquidaciones_periodo_bulk(periodo, chunk_size=chunk_size)
+    if modo != "fila":
+        raise ValueError(f"Modo de cálculo desconocido: {modo!r}")
 
-    ref = date(periodo.anio, periodo.mes, 1)
+    ref = fecha_referencia(periodo.mes, periodo.anio)
     smm = _salario_minimo_vigente(ref)
 
-    
-    # Conceptos base del sistema
-    
-    c_sueldo, _ = Concepto.objects.get_or_create(
-        descripcion="Sueldo Base",
-        defaults={"es_debito": False, "afecta_ips": True, "para_aguinaldo": True, "es_recurrente": True},
-    )
-    c_bonif, _ = Concepto.objects.get_or_create(
-        descripcion="Bonificación Familiar por Hijo",
-        defaults={"es_debito": False, "afecta_ips": False, "para_aguinaldo": False, "es_recurrente": True},
-    )
-    c_ips, _ = Concepto.objects.get_or_create(
-        descripcion="Descuento IPS 9%",
-        defaults={"es_debito": True, "afecta_ips": True, "para_aguinaldo": False, "es_recurrente": True},
-    )
-
-    
-    # Iterar empleados activos
-    
     count = 0
-    for emp in Empleado.objects.filter(activo=True):
-        liq, _ = Liquidacion.objects.get_or_create(empleado=emp, mes=periodo.mes, anio=periodo.anio)
+    # Un upsert del resumen para todo el período
+    with resumen_nomina.agrupar_marcas():
+        for emp in Empleado.objects.filter(activo=True):
+            liq, _ = Liquidacion.objects.get_or_create(empleado=emp, mes=periodo.mes, anio=periodo.anio)
 
-        if liq.cerrada:
-            # Si la liquidación está cerrada, no se recalcula
-            continue
+            if not _recalculable(liq):
+                continue
 
-        # Limpiar detalles anteriores para un recálculo limpio
-        liq.detalles.all().delete()
+            snapshot = snapshots_empleados([emp], periodo.mes, periodo.anio)[emp.id]
+            aplicar_resultado(liq, motor_calculo.calcular(snapshot, smm, ref))
+            count += 1
 
-        ingresos = Decimal(emp.salario_base or 0)
-        descuentos = Decimal("0.00")
+    return count
 
-        
-        # Sueldo base
-        
-        DetalleLiquidacion.objects.create(liquidacion=liq, concepto=c_sueldo, monto=emp.salario_base or 0)
 
-        
-        # Bonificación familiar (tope 3 SMM; máx 4 hijos)
-        
-        bonif_total = Decimal("0.00")
-
-        if smm > 0 and (emp.salario_base or 0) <= smm * Decimal("3"):
-            hijos_validos = []
-
-            for h in emp.hijos.all():
-                try:
-                    # Compatibilidad con tu modelo Hijo
-                    es_menor = h.es_menor() if hasattr(h, "es_menor") else _edad_menor_18(h.fecha_nacimiento, ref)
-                    residente_ok = getattr(h, "residente", True)
-                    residencia_vig = h.residencia_valida() if hasattr(h, "residencia_valida") else True
-                    activo_ok = getattr(h, "activo", True)
-
-                    # 🔧 corrección: condición compuesta con AND
-                    if es_menor and residente_ok and residencia_vig and activo_ok:
-                        hijos_validos.append(h)
-
-                except Exception:
-                    # fallback robusto en caso de errores
-                    es_menor = _edad_menor_18(h.fecha_nacimiento, ref)
-                    residente_ok = getattr(h, "residente", True)
-                    residencia_vig = True
-                    activo_ok = getattr(h, "activo", True)
-                    if es_menor and residente_ok and residencia_vig and activo_ok:
-                        hijos_validos.append(h)
-
-            # máximo 4 hijos válidos
-            hijos_validos = hijos_validos[:4]
-
-            bonif_total = (
-                smm * Decimal("0.05") * Decimal(len(hijos_validos))
-            ).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-
-            if bonif_total > 0:
-                DetalleLiquidacion.objects.create(liquidacion=liq, concepto=c_bonif, monto=bonif_total)
-                ingresos += bonif_total
+#
+# 🔸 Motor bulk del período (lecturas agrupadas + escrituras masivas)
+#
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+@transaction.atomic
+def calcular_liquidaciones_periodo_bulk(periodo, chunk_size=CHUNK_SIZE_BULK, rango=None) -> int:
+    """
+    Variante masiva de calcular_liquidaciones_periodo (mismos montos y conceptos).
+
+    En lugar de 5–10 consultas por empleado:
+    - Carga empleados activos, hijos, descuentos activos y salario mínimo
+      con un puñado de consultas por lote.
+    - Calcula todo en memoria.
+    - Escribe por lote: un DELETE de detalles, un bulk_create de detalles
+      y un bulk_update de los totales de Liquidacion.
+
+    Las liquidaciones cerradas (o ya enviadas por correo) no se recalculan.
+    Nota: las escrituras masivas no disparan señales por fila (post_save/post_delete).
+    rango=(id_desde, id_hasta) limita el cálculo a ese rango de ids de empleado
+    (usado por el runner particionado de services/calculo_paralelo.py).
+    Retorna la cantidad de liquidaciones recalculadas.
+    """
+    mes, anio = periodo.mes, periodo.anio
+    ref = fecha_referencia(mes, anio)
+    smm = _salario_minimo_vigente(ref)
+
+    empleados_qs = Empleado.objects.filter(activo=True)
+    if rango is not None:
+        empleados_qs = empleados_qs.filter(id__gte=rango[0], id__lte=rango[1])
+    empleados = list(empleados_qs.only("id", "salario_base").order_by("id"))
+
+    count = 0
+    for lote in _chunks(empleados, chunk_size):
+        ids = [e.id for e in lote]
 
         
-        # IPS (9% del salario base)
+        # Lecturas agrupadas del lote
         
-        desc_ips = ((emp.salario_base or 0) * Decimal("0.09")).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-        if desc_ips > 0:
-            DetalleLiquidacion.objects.create(liquidacion=liq, concepto=c_ips, monto=desc_ips)
-            descuentos += desc_ips
+        liqs = {
+            l.empleado_id: l
+            for l in Liquidacion.objects.filter(mes=mes, anio=anio, empleado_id__in=ids)
+        }
+        nuevas = [
+            Liquidacion(empleado_id=e.id, mes=mes, anio=anio, sueldo_base=e.salario_base or Decimal("0.00"))
+            for e in lote if e.id not in liqs
+        ]
+        if nuevas:
+            Liquidacion.objects.bulk_create(nuevas)
+            if any(l.pk is None for l in nuevas):
+                # Backends sin RETURNING: se recuperan los ids recién creados
+                liqs = {
+                    l.empleado_id: l
+                    for l in Liquidacion.objects.filter(mes=mes, anio=anio, empleado_id__in=ids)
+                }
+            else:
+                liqs.update({l.empleado_id: l for l in nuevas})
+
+        abiertos = [e for e in lote if _recalculable(liqs[e.id])]
+        snapshots = snapshots_empleados(abiertos, mes, anio)
 
         
-        # Descuentos adicionales (vigentes)
+        # Cálculo en memoria (motor puro)
         
-        for d in Descuento.objects.filter(empleado=emp, activo=True):
-            if d.es_vigente(periodo.mes, periodo.anio):
-                concepto_extra, _ = Concepto.objects.get_or_create(
-                    descripcion=f"Descuento: {d.tipo.title()}",
-                    defaults={"es_debito": True, "afecta_ips": False, "para_aguinaldo": False},
+        resultados = list(motor_calculo.calcular_lote(snapshots.values(), smm, ref))
+        conceptos = registro_conceptos.resolver(
+            linea.concepto for r in resultados for linea in r.lineas
+        )
+
+        ahora = timezone.now()
+        detalles, actualizadas = [], []
+        for r in resultados:
+            liq = liqs[r.empleado_id]
+            detalles.extend(
+                DetalleLiquidacion(
+                    liquidacion=liq, concepto_id=conceptos[linea.concepto.descripcion], monto=linea.monto
                 )
-                DetalleLiquidacion.objects.create(liquidacion=liq, concepto=concepto_extra, monto=d.monto)
-                descuentos += d.monto
+                for linea in r.lineas
+            )
+            liq.total_ingresos = r.total_ingresos
+            liq.total_descuentos = r.total_descuentos
+            liq.neto_cobrar = r.neto_cobrar
+            liq.requiere_recalculo = False
+            liq.updated_at = ahora
+            actualizadas.append(liq)
+
+        if not actualizadas:
+            continue
 
         
-        # Totales finales
+        # Escrituras masivas del lote
         
-        liq.total_ingresos = ingresos
-        liq.total_descuentos = descuentos
-        liq.neto_cobrar = ingresos - descuentos
-        liq.save(update_fields=["total_ingresos", "total_descuentos", "neto_cobrar"])
-
-        count += 1
-
+        cache_recibos.descartar(actualizadas)
+        _borrar_detalles([l.pk for l in actualizadas])
+        DetalleLiquidacion.objects.bulk_create(detalles, batch_size=chunk_size)
+        Liquidacion.objects.bulk_update(
+            actualizadas,
+            ["total_ingresos", "total_descuentos", "neto_cobrar", "requiere_recalculo", "updated_at", "recibo_pdf"],
+            batch_size=chunk_size,
+        )
+        count += len(actualizadas)
+
+    if count:
+        resumen_nomina.marcar_periodo(anio, mes)
     return count
@@ -0,0 +1,239 @@
+#
+# Runner particionado del cálculo de nómina por período
+#
+# Divide los empleados activos en rangos de ids, calcula cada rango con el
+# motor bulk en su propia transacción corta (proceso aparte o worker Celery)
+# y consolida conteos y totales en un único resumen de corrida.
+# Un rango fallido queda registrado en el resumen y se puede reintentar
+# sin recalcular el resto del período.
+#
+# Desde una tarea Celery no se puede esperar a otras tareas: ahí se usa
+# encolar_periodo_celery(), un chord cuyo callback (consolidar_rangos)
+# arma el resumen y cierra la corrida. El backend "celery" síncrono queda
+# para el comando y la vista, que no corren dentro de un worker.
+#
+
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from decimal import Decimal
+from celery import chord, group
+from django.db import connections
+from django.db.models import Sum
+
+from empleados.models import Empleado
+from nomina_cal.models import Liquidacion
+from nomina_cal.services.calculo_nomina import (
+    calcular_liquidaciones_periodo_bulk,
+    PeriodoLiquidacion,
+)
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("procesos", "celery", "secuencial")
+CHUNK_SIZE_RANGO = 1000
+CENTAVOS = Decimal("0.01")
+
+
+#
+# # Particionado
+#
+def particionar_empleados(chunk_size=CHUNK_SIZE_RANGO) -> list:
+    """
+    Parte los empleados activos en rangos contiguos de ids [(desde, hasta), ...]
+    de a lo sumo chunk_size empleados cada uno.
+    """
+    ids = list(Empleado.objects.filter(activo=True).order_by("id").values_list("id", flat=True))
+    return [
+        (ids[i], ids[min(i + chunk_size, len(ids)) - 1])
+        for i in range(0, len(ids), chunk_size)
+    ]
+
+
+#
+# # Unidad de trabajo: un rango en una transacción corta
+#
+def calcular_rango(anio, mes, id_desde, id_hasta) -> dict:
+    """
+    Calcula las liquidaciones de los empleados con id en [id_desde, id_hasta].
+    Es idempotente: repetirlo recalcula el mismo rango desde cero.
+    Retorna conteo y totales del rango (valores como str para poder
+    serializarse entre procesos y en Celery).
+    """
+    count = calcular_liquidaciones_periodo_bulk(
+        PeriodoLiquidacion(anio=anio, mes=mes), rango=(id_desde, id_hasta)
+    )
+    totales = Liquidacion.objects.filter(
+        mes=mes, anio=anio, empleado_id__gte=id_desde, empleado_id__lte=id_hasta
+    ).aggregate(
+        total_ingresos=Sum("total_ingresos"),
+        total_descuentos=Sum("total_descuentos"),
+        neto_cobrar=Sum("neto_cobrar"),
+    )
+    return {
+        "rango": [id_desde, id_hasta],
+        "count": count,
+        **{k: str((v or Decimal("0")).quantize(CENTAVOS)) for k, v in totales.items()},
+    }
+
+
+def rango_fallido(anio, mes, rango, error) -> dict:
+    """Resultado de un rango que no se pudo calcular (llamar desde el except)."""
+    logger.exception(f"[Nómina] Falló el rango {rango} de {mes}/{anio}")
+    return {"rango": list(rango), "error": str(error)}
+
+
+def _calcular_rango_seguro(anio, mes, rango) -> dict:
+    """Envuelve calcular_rango para devolver el error en lugar de propagarlo."""
+    try:
+        return calcular_rango(anio, mes, *rango)
+    except Exception as e:
+        return rango_fallido(anio, mes, rango, e)
+
+
+def _inicializar_worker():
+    """Inicializa Django en procesos hijos (necesario con start method 'spawn')."""
+    import django
+    django.setup()
+
+
+#
+# # Ejecución por backend
+#
+def _avisar(progreso, resultado):
+    if progreso is not None:
+        progreso(resultado)
+    return resultado
+
+
+def _ejecutar_secuencial(anio, mes, rangos, progreso=None):
+    return [_avisar(progreso, _calcular_rango_seguro(anio, mes, r)) for r in rangos]
+
+
+def _ejecutar_procesos(anio, mes, rangos, workers, progreso=None):
+    # Los hijos no deben heredar conexiones abiertas del proceso padre
+    connections.close_all()
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context(),
+        initializer=_inicializar_worker,
+    ) as pool:
+        futuros = [pool.submit(_calcular_rango_seguro, anio, mes, r) for r in rangos]
+        for f in as_completed(futuros):
+            _avisar(progreso, f.result())
+        return [f.result() for f in futuros]
+
+
+def _ejecutar_celery(anio, mes, rangos, progreso=None):
+    # Espera al grupo: sólo fuera de un worker (ver encolar_periodo_celery)
+    from nomina_cal.tasks import calcular_rango_periodo
+
+    resultado = group(calcular_rango_periodo.s(anio, mes, d, h) for d, h in rangos).apply_async()
+    salida = []
+    for rango, res in zip(rangos, resultado.get(propagate=False)):
+        if isinstance(res, Exception):
+            salida.append(_avisar(progreso, {"rango": list(rango), "error": str(res)}))
+        else:
+            salida.append(_avisar(progreso, res))
+    return salida
+
+
+def _ejecutar(anio, mes, rangos, backend, workers, progreso=None):
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend desconocido: {backend!r} (use {', '.join(BACKENDS)})")
+    if not rangos:
+        return []
+    if backend == "celery":
+        return _ejecutar_celery(anio, mes, rangos, progreso)
+    if backend == "procesos" and len(rangos) > 1 and workers != 1:
+        return _ejecutar_procesos(anio, mes, rangos, workers, progreso)
+    return _ejecutar_secuencial(anio, mes, rangos, progreso)
+
+
+#
+# # Consolidación del resumen
+#
+def _consolidar(anio, mes, resultados, previos=None) -> dict:
+    """
+    Fusiona resultados por rango en un resumen único.
+    previos: resultados OK de una corrida anterior (para reintentos).
+    """
+    ok = list(previos or []) + [r for r in resultados if "error" not in r]
+    fallidos = [r for r in resultados if "error" in r]
+    totales = {
+        campo: str(sum((Decimal(r[campo]) for r in ok), Decimal("0")).quantize(CENTAVOS))
+        for campo in ("total_ingresos", "total_descuentos", "neto_cobrar")
+    }
+    return {
+        "anio": anio,
+        "mes": mes,
+        "chunks": len(ok) + len(fallidos),
+        "chunks_ok": len(ok),
+        "count": sum(r["count"] for r in ok),
+        **totales,
+        "resultados": sorted(ok, key=lambda r: r["rango"][0]),
+        "fallidos": fallidos,
+    }
+
+
+def calcular_periodo_particionado(
+    periodo, backend="procesos", workers=None, chunk_size=CHUNK_SIZE_RANGO, progreso=None, al_particionar=None
+) -> dict:
+    """
+    Calcula el período completo repartiendo rangos de empleados entre
+    procesos ("procesos"), workers Celery ("celery") o en el mismo proceso
+    ("secuencial"). Cada rango corre en su propia transacción.
+
+    Retorna el resumen consolidado:
+        {anio, mes, chunks, chunks_ok, count, total_ingresos,
+         total_descuentos, neto_cobrar, resultados: [...], fallidos: [...]}
+
+    al_particionar(rangos) se llama con la lista de rangos antes de empezar y
+    progreso(resultado) al terminar cada rango (usado por las corridas).
+    """
+    rangos = particionar_empleados(chunk_size)
+    if al_particionar is not None:
+        al_particionar(rangos)
+    resultados = _ejecutar(periodo.anio, periodo.mes, rangos, backend, workers, progreso)
+    return resumir_periodo(periodo.anio, periodo.mes, resultados, backend)
+
+
+def resumir_periodo(anio, mes, resultados, backend) -> dict:
+    resumen = _consolidar(anio, mes, resultados)
+    logger.info(
+        f"[Nómina] Período {mes}/{anio}: {resumen['count']} liquidaciones "
+        f"en {resumen['chunks_ok']}/{resumen['chunks']} rangos (backend={backend})"
+    )
+    return resumen
+
+
+def encolar_periodo_celery(periodo, chunk_size=CHUNK_SIZE_RANGO, corrida_id=None, al_particionar=None, despues=None):
+    """
+    Encola el período como chord: una tarea por rango y, al terminar todas,
+    consolidar_rangos (seguida de la firma `despues`, si se pasa). No espera
+    resultados, así que se puede llamar desde una tarea Celery.
+    Retorna los rangos encolados (sin rangos no se encola nada).
+    """
+    from nomina_cal.tasks import calcular_rango_periodo, consolidar_rangos
+
+    rangos = particionar_empleados(chunk_size)
+    if al_particionar is not None:
+        al_particionar(rangos)
+    if rangos:
+        callback = consolidar_rangos.s(periodo.anio, periodo.mes, corrida_id)
+        if despues is not None:
+            callback = callback | despues
+        chord(group(
+            calcular_rango_periodo.s(periodo.anio, periodo.mes, d, h, corrida_id) for d, h in rangos
+        ))(callback)
+    return rangos
+
+
+def reintentar_fallidos(resumen, backend="procesos", workers=None) -> dict:
+    """
+    Reintenta solo los rangos fallidos de un resumen previo y devuelve
+    el resumen actualizado (los rangos OK no se recalculan).
+    """
+    rangos = [tuple(r["rango"]) for r in resumen.get("fallidos", [])]
+    resultados = _ejecutar(resumen["anio"], resumen["mes"], rangos, backend, workers)
+    return _consolidar(resumen["anio"], resumen["mes"], resultados, previos=resumen["resultados"])
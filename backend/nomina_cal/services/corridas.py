@@ -0,0 +1,341 @@
+#
+# Ejecución asíncrona de corridas de nómina (CorridaNomina)
+#
+# crear_y_despachar() persiste la corrida y, al confirmar la transacción,
+# la encola en Celery (si hay CELERY_BROKER_URL configurado) o en un pool
+# de hilos local. ejecutar_corrida() hace el trabajo, actualiza el progreso
+# cada PASO_PROGRESO elementos y registra los errores por empleado.
+#
+# Una corrida de período con backend "celery" no espera a sus rangos:
+# ejecutar_corrida() la deja en proceso, cada rango la hace avanzar
+# (avanzar_corrida) y el callback del chord la cierra
+# (finalizar_corrida_periodo).
+#
+# Las corridas de envío de recibos guardan un punto de control por bloque
+# (DestinoEnvio); reanudar_corrida() las vuelve a encolar y sólo se envía
+# a los destinatarios pendientes o fallidos.
+#
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, OuterRef, Subquery
+from django.utils import timezone
+
+from nomina_cal.models import Liquidacion
+from nomina_cal.models_corrida import CorridaNomina, DestinoEnvio
+
+logger = logging.getLogger(__name__)
+
+PASO_PROGRESO = 25
+MAX_HILOS_LOCALES = 2
+LOTE_CIERRE = 500
+
+_pool_local = None
+
+
+#
+# # Despacho
+#
+def usa_celery() -> bool:
+    return bool(getattr(settings, "CELERY_BROKER_URL", None))
+
+
+def _pool():
+    global _pool_local
+    if _pool_local is None:
+        _pool_local = ThreadPoolExecutor(max_workers=MAX_HILOS_LOCALES, thread_name_prefix="corrida-nomina")
+    return _pool_local
+
+
+def _ejecutar_en_hilo(corrida_id):
+    try:
+        ejecutar_corrida(corrida_id)
+    finally:
+        # Cada hilo abre su propia conexión: se cierra al terminar
+        connection.close()
+
+
+def despachar(corrida: CorridaNomina):
+    """Encola la corrida una vez confirmada la transacción que la creó."""
+    if usa_celery():
+        from nomina_cal.tasks import ejecutar_corrida_nomina
+        transaction.on_commit(lambda: ejecutar_corrida_nomina.delay(corrida.pk))
+    else:
+        transaction.on_commit(lambda: _pool().submit(_ejecutar_en_hilo, corrida.pk))
+
+
+def crear_y_despachar(tipo, parametros=None, usuario=None) -> CorridaNomina:
+    corrida = CorridaNomina.objects.create(
+        tipo=tipo,
+        parametros=parametros or {},
+        creado_por=usuario if usuario and usuario.is_authenticated else None,
+    )
+    despachar(corrida)
+    return corrida
+
+
+def reanudar_corrida(corrida: CorridaNomina) -> CorridaNomina:
+    """
+    Deja lista para volver a ejecutar una corrida de envío interrumpida o
+    con errores: los destinos fallidos vuelven a pendientes y los enviados
+    no se tocan. Una corrida "en_proceso" sólo debe reanudarse si su worker
+    murió. El llamador la despacha (despachar) o la ejecuta.
+    """
+    if corrida.tipo != "envio_recibos":
+        raise ValueError("Sólo se pueden reanudar corridas de envío de recibos.")
+    if corrida.estado in ("pendiente", "completada"):
+        raise ValueError(f"La corrida está {corrida.get_estado_display().lower()}.")
+    with transaction.atomic():
+        corrida.destinos.filter(estado="fallido").update(estado="pendiente")
+        CorridaNomina.objects.filter(pk=corrida.pk).update(
+            estado="pendiente", errores=[], resultado=None, finalizado_en=None
+        )
+    corrida.refresh_from_db()
+    return corrida
+
+
+#
+# # Progreso
+#
+class _Progreso:
+    """Acumula avance y errores y los persiste cada PASO_PROGRESO elementos."""
+
+    def __init__(self, corrida, total=0):
+        self.corrida = corrida
+        self.procesadas = 0
+        self.errores = []
+        self.fijar_total(total)
+
+    def fijar_total(self, total):
+        self.corrida.total = total
+        CorridaNomina.objects.filter(pk=self.corrida.pk).update(total=total)
+
+    def error(self, liq, e):
+        self.errores.append({
+            "liquidacion_id": liq.pk,
+            "empleado_id": liq.empleado_id,
+            "empleado": str(liq.empleado),
+            "error": str(e),
+        })
+
+    def avanzar(self, n=1):
+        self.procesadas += n
+        if self.procesadas % PASO_PROGRESO < n or self.procesadas >= self.corrida.total:
+            self.guardar()
+
+    def guardar(self):
+        CorridaNomina.objects.filter(pk=self.corrida.pk).update(
+            procesadas=self.procesadas, errores=self.errores
+        )
+
+
+#
+# # Trabajos
+#
+def _calcular_todas(corrida, parametros):
+    from nomina_cal.services.calculo_individual import calcular_liquidacion
+    from nomina_cal.services.recalculo_incremental import liquidaciones_pendientes
+
+    if parametros.get("forzar"):
+        qs = Liquidacion.objects.filter(cerrada=False, enviado_email=False)
+    else:
+        qs = liquidaciones_pendientes()
+    ids = list(qs.values_list("id", flat=True))
+    progreso = _Progreso(corrida, len(ids))
+    for liq in Liquidacion.objects.filter(id__in=ids).select_related("empleado").iterator():
+        try:
+            with transaction.atomic():
+                calcular_liquidacion(liq)
+        except Exception as e:
+            progreso.error(liq, e)
+        progreso.avanzar()
+    progreso.guardar()
+    return {"recalculadas": len(ids) - len(progreso.errores)}, progreso.errores
+
+
+def _calcular_periodo(corrida, parametros):
+    from nomina_cal.services.calculo_nomina import PeriodoLiquidacion
+    from nomina_cal.services.calculo_paralelo import (
+        CHUNK_SIZE_RANGO, calcular_periodo_particionado, encolar_periodo_celery,
+    )
+
+    progreso = _Progreso(corrida)
+    periodo = PeriodoLiquidacion(anio=int(parametros["anio"]), mes=int(parametros["mes"]))
+    backend = parametros.get("backend", "secuencial")
+    chunk_size = int(parametros.get("chunk", CHUNK_SIZE_RANGO))
+
+    if backend == "celery":
+        rangos = encolar_periodo_celery(
+            periodo, chunk_size, corrida_id=corrida.pk,
+            al_particionar=lambda rangos: progreso.fijar_total(len(rangos)),
+        )
+        if rangos:
+            # La cierra consolidar_rangos cuando terminan todos los rangos
+            return None
+
+    def rango_terminado(r):
+        if "error" in r:
+            progreso.errores.append({"rango": r["rango"], "error": r["error"]})
+        progreso.avanzar()
+
+    resumen = calcular_periodo_particionado(
+        periodo,
+        backend=backend,
+        chunk_size=chunk_size,
+        progreso=rango_terminado,
+        al_particionar=lambda rangos: progreso.fijar_total(len(rangos)),
+    )
+    progreso.guardar()
+    resumen.pop("resultados")
+    return resumen, progreso.errores
+
+
+def _cerrar_periodo(corrida, parametros):
+    from nomina_cal.services.cache_recibos import obtener_recibo
+    from nomina_cal.services.salida_correos import cerrar_liquidaciones
+
+    anio, mes = int(parametros["anio"]), int(parametros["mes"])
+    ids = list(Liquidacion.objects.filter(mes=mes, anio=anio, cerrada=False).values_list("id", flat=True))
+    progreso = _Progreso(corrida, len(ids))
+    cerradas = 0
+    for i in range(0, len(ids), LOTE_CIERRE):
+        # El cierre (y el encolado de recibos) es un update por bloque; los
+        # PDF se pre-generan fuera de la transacción.
+        bloque = ids[i:i + LOTE_CIERRE]
+        cerradas += len(cerrar_liquidaciones(Liquidacion.objects.filter(id__in=bloque)))
+        for liq in Liquidacion.objects.filter(id__in=bloque).select_related("empleado").iterator():
+            try:
+                obtener_recibo(liq)
+            except Exception as e:
+                progreso.error(liq, e)
+            progreso.avanzar()
+    progreso.guardar()
+    return {"cerradas": cerradas}, progreso.errores
+
+
+def _destinatarios(parametros):
+    """Liquidaciones del período o, sin período, la última de cada empleado."""
+    if "mes" in parametros:
+        qs = Liquidacion.objects.filter(mes=int(parametros["mes"]), anio=int(parametros["anio"]))
+    else:
+        ultima = (
+            Liquidacion.objects.filter(empleado_id=OuterRef("empleado_id"))
+            .order_by("-anio", "-mes", "-id")
+            .values("id")[:1]
+        )
+        qs = Liquidacion.objects.filter(id=Subquery(ultima))
+    if not parametros.get("reenviar"):
+        qs = qs.filter(enviado_email=False)
+    return qs
+
+
+def _enviar_recibos(corrida, parametros):
+    from nomina_cal.services.envio_masivo import LOTE_ENVIO, enviar_recibos
+
+    destinos = DestinoEnvio.objects.filter(corrida=corrida)
+    if not destinos.exists():
+        DestinoEnvio.objects.bulk_create(
+            [DestinoEnvio(corrida=corrida, liquidacion_id=pk) for pk in _destinatarios(parametros).values_list("id", flat=True)],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+    progreso = _Progreso(corrida, destinos.count())
+    progreso.procesadas = destinos.exclude(estado="pendiente").count()
+    lote = int(parametros.get("lote", LOTE_ENVIO))
+
+    # Un bloque por vez: se envía y se guarda su estado (punto de control).
+    # Si el proceso muere, se pierde a lo sumo el bloque en curso, y sus
+    # recibos ya enviados quedan marcados en enviado_email.
+    ultimo = 0
+    while bloque := list(
+        destinos.filter(estado="pendiente", id__gt=ultimo)
+        .select_related("liquidacion__empleado")
+        .order_by("id")[:lote]
+    ):
+        ultimo = bloque[-1].pk
+        errores = {}
+        enviar_recibos(
+            Liquidacion.objects.filter(id__in=[d.liquidacion_id for d in bloque]),
+            por_minuto=parametros.get("por_minuto"),
+            lote=lote,
+            reenviar=parametros.get("reenviar", False),
+            notificar=lambda pk, error, _reintentable: errores.__setitem__(pk, error),
+        )
+        ahora = timezone.now()
+        for destino in bloque:
+            # Sin resultado: ya estaba enviada (enviado_email) y no se reenvía
+            error = errores.get(destino.liquidacion_id)
+            destino.estado = "fallido" if error else "enviado"
+            destino.intentos += 1
+            destino.ultimo_error = error or ""
+            destino.actualizado_en = ahora
+            if error:
+                progreso.error(destino.liquidacion, error)
+        with transaction.atomic():
+            DestinoEnvio.objects.bulk_update(bloque, ["estado", "intentos", "ultimo_error", "actualizado_en"])
+            progreso.procesadas += len(bloque)
+            progreso.guardar()
+
+    enviados = destinos.filter(estado="enviado").count()
+    return {"enviados": enviados, "fallidos": progreso.corrida.total - enviados}, progreso.errores
+
+
+TRABAJOS = {
+    "calcular_todas": _calcular_todas,
+    "periodo": _calcular_periodo,
+    "cierre": _cerrar_periodo,
+    "envio_recibos": _enviar_recibos,
+}
+
+
+def ejecutar_corrida(corrida_id):
+    """
+    Ejecuta una corrida pendiente (desde Celery o desde el pool local).
+    Un trabajo que retorna None siguió en segundo plano y se cierra después.
+    """
+    # Sólo un worker toma la corrida aunque se haya despachado dos veces
+    tomada = CorridaNomina.objects.filter(pk=corrida_id, estado="pendiente").update(
+        estado="en_proceso", iniciado_en=timezone.now()
+    )
+    corrida = CorridaNomina.objects.get(pk=corrida_id)
+    if not tomada:
+        return corrida
+    try:
+        salida = TRABAJOS[corrida.tipo](corrida, corrida.parametros)
+        if salida is None:
+            corrida.refresh_from_db()
+            return corrida
+        resultado, errores = salida
+        corrida.refresh_from_db()
+        corrida.resultado = resultado
+        corrida.estado = "con_errores" if errores else "completada"
+    except Exception as e:
+        logger.exception(f"[Nómina] Falló la corrida #{corrida_id}")
+        corrida.refresh_from_db()
+        corrida.resultado = {"error": str(e)}
+        corrida.estado = "fallida"
+    return _finalizar(corrida)
+
+
+def _finalizar(corrida, *campos):
+    corrida.finalizado_en = timezone.now()
+    corrida.save(update_fields=["resultado", "estado", "finalizado_en", *campos])
+    logger.info(f"[Nómina] {corrida} — {corrida.procesadas}/{corrida.total}")
+    return corrida
+
+
+def avanzar_corrida(corrida_id):
+    """Suma un rango terminado a una corrida de período en Celery."""
+    CorridaNomina.objects.filter(pk=corrida_id).update(procesadas=F("procesadas") + 1)
+
+
+def finalizar_corrida_periodo(corrida_id, resumen):
+    """Cierra una corrida de período con el resumen consolidado del chord."""
+    errores = [{"rango": f["rango"], "error": f["error"]} for f in resumen["fallidos"]]
+    corrida = CorridaNomina.objects.get(pk=corrida_id)
+    corrida.errores = errores
+    corrida.resultado = {k: v for k, v in resumen.items() if k != "resultados"}
+    corrida.estado = "con_errores" if errores else "completada"
+    return _finalizar(corrida, "errores")
@@ -1,8 +1,8 @@
 # backend/nomina_cal/services/emailing.py
 from django.core.mail import EmailMessage
 from django.conf import settings
-from django.utils import timezone
 from nomina_cal.services.pdf_recibo import pdf_recibo_bytes
+from nomina_cal.utils_email import marcar_enviadas
 
 def enviar_recibo_liquidacion(liq) -> bool:
     """Genera PDF en memoria y envía por correo al empleado. Marca enviado_email/fecha_envio."""
@@ -19,7 +19,5 @@ def enviar_recibo_liquidacion(liq) -> bool:
     msg.attach(filename, pdf, "application/pdf")
     msg.send(fail_silently=False)
 
-    liq.enviado_email = True
-    liq.fecha_envio = timezone.now()
-    liq.save(update_fields=["enviado_email", "fecha_envio"])
+    marcar_enviadas([liq.pk])
     return True
@@ -0,0 +1,317 @@
+#
+# Envío masivo de recibos por correo
+#
+# Pipeline de tres etapas solapadas:
+#   1. Lectura (hilo actual): lee los destinatarios de a un bloque
+#      (LOTE_DATOS) y lo pasa al productor por una cola de BLOQUES_ADELANTE
+#      bloques; recién lee el siguiente cuando hay lugar, así la memoria no
+#      crece con el tamaño del envío.
+#   2. Productor (hilo): por cada destinatario toma el PDF de la caché de
+#      recibos o lo renderiza, arma el EmailMessage y lo deja en una cola
+#      acotada (PREPARADOS mensajes por delante del envío). No toca la base.
+#   3. Envío (hilo actual, entre lecturas): manda los mensajes por una única conexión
+#      get_connection() abierta una vez, respeta ENVIO_CORREOS_POR_MINUTO
+#      y cada LOTE_ENVIO mensajes registra los resultados con bulk_create en
+#      EnvioCorreo y marca las liquidaciones enviadas con un solo update().
+#      Si la conexión envía en paralelo (enviar_lote, p. ej. el backend de
+#      utils/sendgrid_async.py), los mensajes salen en tandas de LOTE_ENVIO.
+#
+
+import logging
+import queue
+import smtplib
+import threading
+import time
+from dataclasses import dataclass
+from django.conf import settings
+from django.core.mail import get_connection
+
+from nomina_cal.models import Liquidacion
+from nomina_cal.models_envio import EnvioCorreo
+from nomina_cal.services.cache_recibos import recibo_sin_base, registrar_rutas
+from nomina_cal.services.recibos_lote import LOTE_DATOS, datos_bloque
+from nomina_cal.utils_email import marcar_enviadas, mensaje_recibo
+
+logger = logging.getLogger(__name__)
+
+LOTE_ENVIO = 100
+PREPARADOS = 200
+BLOQUES_ADELANTE = 2
+
+_FIN = object()
+SIN_CORREO = "Empleado sin email registrado."
+
+
+@dataclass(frozen=True)
+class Destino:
+    """Lo que el productor necesita de una liquidación (leído en el hilo principal)."""
+    liquidacion_id: int
+    empleado_id: int
+    destinatario: str
+    nombre: str
+    datos: object           # DatosRecibo
+    updated_at: object
+    cerrada: bool
+    recibo_pdf: str
+
+
+#
+# # Lectura de destinatarios
+#
+def _email(empleado):
+    usuario = getattr(empleado, "usuario", None)
+    return empleado.email or getattr(usuario, "email", None) or ""
+
+
+def destinos(queryset, lote=LOTE_DATOS):
+    """Itera bloques de Destino en orden de id (destinatario vacío si no hay email)."""
+    ids = list(queryset.order_by("id").values_list("id", flat=True))
+    for i in range(0, len(ids), lote):
+        bloque = ids[i:i + lote]
+        por_id = Liquidacion.objects.select_related("empleado", "empleado__usuario").in_bulk(bloque)
+        liquidaciones = [por_id[pk] for pk in bloque]
+        yield [
+            Destino(
+                liquidacion_id=liq.pk,
+                empleado_id=liq.empleado_id,
+                destinatario=_email(liq.empleado),
+                nombre=liq.empleado.nombre,
+                datos=datos,
+                updated_at=liq.updated_at,
+                cerrada=liq.cerrada,
+                recibo_pdf=liq.recibo_pdf,
+            )
+            for liq, datos in zip(liquidaciones, datos_bloque(liquidaciones))
+        ]
+
+
+#
+# # Etapas
+#
+class Limitador:
+    """Espacia los envíos para no superar `por_minuto` mensajes por minuto."""
+
+    def __init__(self, por_minuto, reloj=time.monotonic, dormir=time.sleep):
+        self.intervalo = 60.0 / por_minuto if por_minuto else 0.0
+        self.reloj = reloj
+        self.dormir = dormir
+        self.proximo = None
+
+    def esperar(self):
+        if not self.intervalo:
+            return
+        ahora = self.reloj()
+        if self.proximo is not None and ahora < self.proximo:
+            self.dormir(self.proximo - ahora)
+            ahora = self.proximo
+        self.proximo = ahora + self.intervalo
+
+
+def _producir(entrada, cola, detener):
+    """
+    Hilo productor: toma bloques de Destino de `entrada` y deja en la cola
+    (destino, mensaje, ruta) o (destino, None, error) por cada destino.
+    """
+    try:
+        while not detener.is_set():
+            try:
+                bloque = entrada.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if bloque is _FIN:
+                return
+            for destino in bloque:
+                if detener.is_set():
+                    return
+                try:
+                    ruta, pdf = recibo_sin_base(destino.datos, destino.updated_at, destino.cerrada, destino.recibo_pdf)
+                    mensaje = mensaje_recibo(
+                        destino.destinatario, destino.nombre, destino.datos.mes, destino.datos.anio,
+                        destino.liquidacion_id, pdf,
+                    )
+                    cola.put((destino, mensaje, ruta))
+                except Exception as e:
+                    logger.exception(f"[Nómina] No se pudo preparar el recibo de la liquidación {destino.liquidacion_id}")
+                    cola.put((destino, None, e))
+    finally:
+        cola.put(_FIN)
+
+
+def es_permanente(error) -> bool:
+    """
+    Rechazos que no se arreglan reintentando: destinatarios rechazados con
+    5xx, respuesta SMTP 5xx o dirección inválida. Conexión caída y 4xx sí.
+    """
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(codigo >= 500 for codigo, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code >= 500
+    return isinstance(error, ValueError)
+
+
+def _http_permanente(estado) -> bool:
+    # API HTTP (enviar_lote): 4xx salvo 429; los 5xx ya los reintenta el backend
+    return estado is not None and 400 <= estado < 500 and estado != 429
+
+
+def _enviar(conexion, mensaje):
+    """Envía por la conexión abierta; si el servidor la cortó, reconecta una vez."""
+    mensaje.connection = conexion
+    try:
+        enviados = conexion.send_messages([mensaje])
+    except smtplib.SMTPServerDisconnected:
+        conexion.close()
+        conexion.open()
+        enviados = conexion.send_messages([mensaje])
+    if not enviados:
+        raise smtplib.SMTPException("El servidor no aceptó el mensaje.")
+
+
+class _Registro:
+    """Acumula resultados y los persiste en bloque cada LOTE_ENVIO mensajes."""
+
+    def __init__(self, lote, notificar=None):
+        self.lote = lote
+        self.notificar = notificar
+        self.envios = []
+        self.enviadas = []
+        self.rutas = {}
+        self.totales = {"enviados": 0, "errores": 0}
+
+    def anotar(self, destino, asunto, error=None, ruta=None, permanente=None):
+        self.envios.append(EnvioCorreo(
+            empleado_id=destino.empleado_id,
+            asunto=asunto[:200],
+            destinatario=destino.destinatario,
+            estado="error" if error else "enviado",
+            detalle_error=str(error) if error else "",
+        ))
+        if error:
+            self.totales["errores"] += 1
+        else:
+            self.totales["enviados"] += 1
+            self.enviadas.append(destino.liquidacion_id)
+        if ruta:
+            self.rutas[destino.liquidacion_id] = (destino.recibo_pdf, ruta)
+        if self.notificar:
+            if permanente is None:
+                permanente = es_permanente(error)
+            self.notificar(destino.liquidacion_id, str(error) if error else None, not permanente)
+        if len(self.envios) >= self.lote:
+            self.guardar()
+
+    def guardar(self):
+        if self.envios:
+            EnvioCorreo.objects.bulk_create(self.envios, batch_size=self.lote)
+        if self.enviadas:
+            marcar_enviadas(self.enviadas)
+        registrar_rutas(self.rutas)
+        self.envios, self.enviadas, self.rutas = [], [], {}
+
+
+#
+# # API
+#
+def enviar_recibos(queryset, por_minuto=None, lote=LOTE_ENVIO, reenviar=False, conexion=None, limitador=None,
+                   notificar=None):
+    """
+    Envía el recibo de cada liquidación del queryset a su empleado.
+    Sin reenviar=True omite las ya enviadas (enviado_email).
+    notificar(liquidacion_id, error, reintentable) se llama por cada resultado
+    (error None si se envió; sin email o rechazo permanente, ver
+    es_permanente(), no es reintentable).
+    Retorna {"enviados", "errores", "sin_correo"}.
+    """
+    if not reenviar:
+        queryset = queryset.filter(enviado_email=False)
+    if por_minuto is None:
+        por_minuto = getattr(settings, "ENVIO_CORREOS_POR_MINUTO", 0)
+    limitador = limitador or Limitador(por_minuto)
+    registro = _Registro(lote, notificar)
+    sin_correo = 0
+
+    def con_correo():
+        """Bloques de destinos con email (nunca vacíos: el productor no respondería)."""
+        nonlocal sin_correo
+        for bloque in destinos(queryset):
+            validos = []
+            for destino in bloque:
+                if destino.destinatario:
+                    validos.append(destino)
+                else:
+                    sin_correo += 1
+                    if notificar:
+                        notificar(destino.liquidacion_id, SIN_CORREO, False)
+            if validos:
+                yield validos
+
+    # La base se lee en este hilo, un bloque por delante a medida que el productor avanza
+    bloques = con_correo()
+    entrada = queue.Queue(maxsize=BLOQUES_ADELANTE)
+    cola = queue.Queue(maxsize=PREPARADOS)
+    detener = threading.Event()
+    leyendo = True
+    productor = threading.Thread(
+        target=_producir, args=(entrada, cola, detener), name="envio-recibos", daemon=True
+    )
+
+    def alimentar():
+        # Nunca bloquea: lee sólo si el productor tiene lugar para otro bloque
+        nonlocal leyendo
+        while leyendo and not entrada.full():
+            bloque = next(bloques, None)
+            entrada.put(_FIN if bloque is None else bloque)
+            leyendo = bloque is not None
+
+    conexion = conexion or get_connection(fail_silently=False)
+    en_tandas = getattr(conexion, "enviar_lote", None)
+    tanda = []
+
+    def enviar_tanda():
+        for (destino, mensaje, ruta), envio in zip(tanda, en_tandas([m for _, m, _ in tanda])):
+            registro.anotar(
+                destino, mensaje.subject, error=envio.error or None, ruta=ruta,
+                permanente=_http_permanente(envio.estado),
+            )
+        tanda.clear()
+
+    try:
+        # Si el servidor no responde, open() falla antes de renderizar nada
+        conexion.open()
+        productor.start()
+        while True:
+            alimentar()
+            item = cola.get()
+            if item is _FIN:
+                break
+            destino, mensaje, resultado = item
+            if mensaje is None:
+                registro.anotar(destino, "", error=resultado)
+                continue
+            limitador.esperar()
+            if en_tandas:
+                tanda.append(item)
+                if len(tanda) >= lote:
+                    enviar_tanda()
+                continue
+            try:
+                _enviar(conexion, mensaje)
+                registro.anotar(destino, mensaje.subject, ruta=resultado)
+            except Exception as e:
+                registro.anotar(destino, mensaje.subject, error=e, ruta=resultado)
+        if tanda:
+            enviar_tanda()
+    finally:
+        detener.set()
+        # Libera al productor si quedó bloqueado en una cola llena
+        while productor.is_alive():
+            try:
+                cola.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        conexion.close()
+        registro.guardar()
+
+    resultado = {**registro.totales, "sin_correo": sin_correo}
+    logger.info(f"[Nómina] Envío masivo de recibos: {resultado}")
+    return resultado
@@ -0,0 +1,94 @@
+#
+# Exportación plana por streaming (CSV / JSON lines)
+#
+# Para cargas a BI que sólo necesitan las filas crudas: los reportes
+# aceptan ?format=csv|ndjson y responden con un generador que recorre
+# .values_list(...).iterator(), que en PostgreSQL usa un cursor del lado
+# del servidor. Memoria constante y primer byte en milisegundos sin
+# importar cuántos períodos abarque la consulta.
+#
+
+import csv
+import itertools
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+from nomina_cal.services.exportacion_xlsx import CHUNK_SIZE, FILAS_POR_BLOQUE
+
+FORMATOS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+# Columnas comunes de los reportes de liquidaciones
+CAMPOS_LIQUIDACION = {
+    "liquidacion_id": "id",
+    "empleado_id": "empleado_id",
+    "nombre": "empleado__nombre",
+    "apellido": "empleado__apellido",
+    "cedula": "empleado__cedula",
+    # Mismas dimensiones que el resumen y los dashboards
+    "area": "empleado__area",
+    "tipo_contrato": "empleado__tipo_contrato",
+    "mes": "mes",
+    "anio": "anio",
+    "total_ingresos": "total_ingresos",
+    "total_descuentos": "total_descuentos",
+    "neto_cobrar": "neto_cobrar",
+    "cerrada": "cerrada",
+}
+
+
+def formato_plano(request):
+    """Formato plano pedido por querystring (?format=csv|ndjson) o None."""
+    formato = request.GET.get("format")
+    return formato if formato in FORMATOS else None
+
+
+class _Eco:
+    """Pseudo-archivo para csv.writer: devuelve la línea en vez de guardarla."""
+
+    def write(self, linea):
+        return linea
+
+
+def _en_bloques(lineas, filas_por_bloque):
+    while True:
+        bloque = "".join(itertools.islice(lineas, filas_por_bloque))
+        if not bloque:
+            return
+        yield bloque.encode("utf-8")
+
+
+def generar_csv(filas, columnas, filas_por_bloque=FILAS_POR_BLOQUE):
+    escritor = csv.writer(_Eco())
+    lineas = itertools.chain([escritor.writerow(columnas)], (escritor.writerow(f) for f in filas))
+    return _en_bloques(lineas, filas_por_bloque)
+
+
+def generar_ndjson(filas, columnas, filas_por_bloque=FILAS_POR_BLOQUE):
+    lineas = (
+        json.dumps(dict(zip(columnas, f)), cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
+        for f in filas
+    )
+    return _en_bloques(lineas, filas_por_bloque)
+
+
+GENERADORES = {"csv": generar_csv, "ndjson": generar_ndjson}
+
+
+def respuesta_plana(formato, queryset, campos, nombre_archivo) -> StreamingHttpResponse:
+    """
+    Responde el queryset como CSV o NDJSON por streaming.
+    campos: {columna: lookup} en el orden de salida (p. ej. {"cedula": "empleado__cedula"}).
+    Como en respuesta_xlsx, la primera fila se lee antes de responder.
+    """
+    filas = queryset.values_list(*campos.values()).iterator(chunk_size=CHUNK_SIZE)
+    primera = list(itertools.islice(filas, 1))
+    response = StreamingHttpResponse(
+        GENERADORES[formato](itertools.chain(primera, filas), list(campos)),
+        content_type=FORMATOS[formato],
+    )
+    response["Content-Disposition"] = f'attachment; filename="{nombre_archivo}.{formato}"'
+    return response
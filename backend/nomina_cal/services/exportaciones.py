@@ -0,0 +1,250 @@
+#
+# Exportaciones de reportes en segundo plano (ExportacionReporte)
+#
+# solicitar_exportacion() valida el pedido y, si ya hay una exportación
+# idéntica en curso, la reutiliza; si no, la crea y la despacha igual que
+# las corridas (Celery si hay broker, si no un pool de hilos local). Antes
+# libera las que quedaron colgadas más de EXPORTACIONES_TIEMPO_TOMA_MINUTOS
+# (worker caído, pool local perdido en un reinicio) para no unir pedidos
+# nuevos a una exportación que nunca va a terminar.
+# Cada Reporte guarda los permisos de su endpoint síncrono; la vista los
+# exige al pedir y al descargar, así la vía asíncrona no amplía el acceso.
+# ejecutar_exportacion() genera el archivo en un temporal, lo sube a
+# default_storage y fija el vencimiento; purgar_vencidas() borra los
+# archivos vencidos.
+#
+
+import hashlib
+import json
+import logging
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.permissions import IsAdminUser
+
+from nomina_cal.models_exportacion import ExportacionReporte
+from nomina_cal.services.corridas import usa_celery
+from usuarios.permissions import IsAdmin, IsAsistenteRRHH, IsGerenteRRHH
+
+logger = logging.getLogger(__name__)
+
+MAX_HILOS_LOCALES = 1
+
+_pool_local = None
+
+
+#
+# # Reportes disponibles
+#
+@dataclass(frozen=True)
+class Reporte:
+    generar: Callable            # generar(destino, **parametros)
+    nombre_archivo: str          # se formatea con los parámetros
+    content_type: str = "application/pdf"
+    parametros: tuple = ()       # parámetros enteros obligatorios
+    filtros: tuple = ()          # parámetros de texto opcionales
+    permisos: tuple = ((IsAdmin | IsGerenteRRHH | IsAsistenteRRHH),)  # los del endpoint síncrono
+
+
+def _liquidaciones_pdf(destino):
+    from nomina_cal.services.reportes_pdf import reporte_liquidaciones_pdf
+    reporte_liquidaciones_pdf(destino)
+
+
+def _empleados_pdf(destino):
+    from empleados.reportes import empleados_pdf
+    empleados_pdf(destino)
+
+
+def _asistencia_pdf(destino, mes, anio):
+    from asistencia.reportes import asistencia_pdf
+    asistencia_pdf(destino, mes, anio)
+
+
+def _libro_nomina(destino, mes, anio, area=None):
+    from nomina_cal.services.libro_nomina import generar_libro, liquidaciones_libro
+    for parte in generar_libro(liquidaciones_libro(mes, anio, area=area), mes, anio):
+        destino.write(parte)
+
+
+REPORTES = {
+    # views.exportar_reporte_pdf
+    "liquidaciones_pdf": Reporte(_liquidaciones_pdf, "reporte_liquidaciones.pdf", permisos=(IsAdmin,)),
+    # empleados.views.exportar_empleados_pdf
+    "empleados_pdf": Reporte(_empleados_pdf, "empleados.pdf", permisos=(IsAdminUser,)),
+    # asistencia.views.exportar_reporte_pdf_asistencia y views_export.LibroNominaView: roles RRHH
+    "asistencia_pdf": Reporte(_asistencia_pdf, "reporte_asistencia_{mes}-{anio}.pdf", parametros=("mes", "anio")),
+    "libro_nomina": Reporte(
+        _libro_nomina, "libro_nomina_{anio}_{mes:02d}.pdf", parametros=("mes", "anio"), filtros=("area",)
+    ),
+}
+
+
+def validar_pedido(tipo, data):
+    """
+    Valida tipo y parámetros de una exportación.
+    Retorna (parametros, error); error es None si todo es válido.
+    """
+    reporte = REPORTES.get(tipo)
+    if reporte is None:
+        return None, f"Tipo inválido (use {', '.join(REPORTES)})."
+    parametros = {}
+    for nombre in reporte.parametros:
+        try:
+            parametros[nombre] = int(data.get(nombre))
+        except (TypeError, ValueError):
+            return None, f"Parámetro '{nombre}' inválido."
+    if "mes" in parametros and not (1 <= parametros["mes"] <= 12):
+        return None, "El mes debe estar entre 1 y 12."
+    for nombre in reporte.filtros:
+        valor = str(data.get(nombre) or "").strip()
+        if valor:
+            parametros[nombre] = valor
+    return parametros, None
+
+
+def clave_exportacion(tipo, parametros) -> str:
+    contenido = json.dumps({"tipo": tipo, "parametros": parametros}, sort_keys=True)
+    return hashlib.sha256(contenido.encode("utf-8")).hexdigest()
+
+
+#
+# # Despacho
+#
+def _pool():
+    global _pool_local
+    if _pool_local is None:
+        _pool_local = ThreadPoolExecutor(max_workers=MAX_HILOS_LOCALES, thread_name_prefix="exportacion")
+    return _pool_local
+
+
+def _ejecutar_en_hilo(exportacion_id):
+    try:
+        ejecutar_exportacion(exportacion_id)
+    finally:
+        connection.close()
+
+
+def despachar(exportacion: ExportacionReporte):
+    """Encola la exportación una vez confirmada la transacción que la creó."""
+    if usa_celery():
+        from nomina_cal.tasks import generar_exportacion_reporte
+        transaction.on_commit(lambda: generar_exportacion_reporte.delay(exportacion.pk))
+    else:
+        transaction.on_commit(lambda: _pool().submit(_ejecutar_en_hilo, exportacion.pk))
+
+
+def _tiempo_toma():
+    return timedelta(minutes=getattr(settings, "EXPORTACIONES_TIEMPO_TOMA_MINUTOS", 30))
+
+
+def liberar_colgadas(ahora=None) -> int:
+    """Da por fallidas las exportaciones activas más viejas que el tiempo de toma."""
+    ahora = ahora or timezone.now()
+    limite = ahora - _tiempo_toma()
+    return ExportacionReporte.objects.filter(
+        Q(estado="pendiente", creado_en__lte=limite) | Q(estado="en_proceso", iniciado_en__lte=limite)
+    ).update(estado="fallida", error="Sin respuesta del worker; vuelva a solicitarla.", finalizado_en=ahora)
+
+
+def solicitar_exportacion(tipo, parametros, usuario=None):
+    """
+    Retorna (exportacion, reutilizada). Un pedido idéntico a uno pendiente
+    o en proceso se une a esa exportación en vez de generar otra.
+    """
+    clave = clave_exportacion(tipo, parametros)
+    liberar_colgadas()
+    while True:
+        activa = ExportacionReporte.objects.filter(clave=clave, estado__in=ExportacionReporte.ACTIVAS).first()
+        if activa:
+            return activa, True
+        try:
+            # La restricción única parcial resuelve la carrera entre dos pedidos
+            with transaction.atomic():
+                exportacion = ExportacionReporte.objects.create(
+                    tipo=tipo,
+                    parametros=parametros,
+                    clave=clave,
+                    creado_por=usuario if usuario and usuario.is_authenticated else None,
+                )
+        except IntegrityError:
+            continue
+        despachar(exportacion)
+        return exportacion, False
+
+
+#
+# # Ejecución
+#
+def _vigencia():
+    return timedelta(hours=getattr(settings, "EXPORTACIONES_VIGENCIA_HORAS", 24))
+
+
+def ejecutar_exportacion(exportacion_id):
+    """Genera el archivo de una exportación pendiente (desde Celery o el pool local)."""
+    tomada = ExportacionReporte.objects.filter(pk=exportacion_id, estado="pendiente").update(
+        estado="en_proceso", iniciado_en=timezone.now()
+    )
+    exportacion = ExportacionReporte.objects.get(pk=exportacion_id)
+    if not tomada:
+        return exportacion
+
+    purgar_vencidas()
+    reporte = REPORTES[exportacion.tipo]
+    nombre = reporte.nombre_archivo.format(**exportacion.parametros)
+    try:
+        with tempfile.TemporaryFile() as tmp:
+            reporte.generar(tmp, **exportacion.parametros)
+            exportacion.tamanio = tmp.tell()
+            tmp.seek(0)
+            exportacion.archivo = default_storage.save(
+                f"exportaciones/{exportacion.pk}_{exportacion.clave[:12]}/{nombre}", File(tmp, name=nombre)
+            )
+        exportacion.nombre_archivo = nombre
+        exportacion.content_type = reporte.content_type
+        exportacion.estado = "completada"
+        exportacion.expira_en = timezone.now() + _vigencia()
+    except Exception as e:
+        logger.exception(f"[Nómina] Falló la exportación #{exportacion_id}")
+        exportacion.estado = "fallida"
+        exportacion.error = str(e)
+    exportacion.finalizado_en = timezone.now()
+    exportacion.save(update_fields=[
+        "archivo", "nombre_archivo", "content_type", "tamanio",
+        "estado", "error", "expira_en", "finalizado_en",
+    ])
+    logger.info(f"[Nómina] {exportacion} — {exportacion.tamanio} bytes")
+    return exportacion
+
+
+def vencida(exportacion, ahora=None) -> bool:
+    return exportacion.estado == "vencida" or (
+        exportacion.estado == "completada"
+        and exportacion.expira_en is not None
+        and exportacion.expira_en <= (ahora or timezone.now())
+    )
+
+
+def purgar_vencidas(ahora=None) -> int:
+    """Borra los archivos de exportaciones vencidas y las marca como tales."""
+    ahora = ahora or timezone.now()
+    vencidas = ExportacionReporte.objects.filter(estado="completada", expira_en__lte=ahora)
+    purgadas = 0
+    for exportacion in vencidas.only("pk", "archivo").iterator():
+        if exportacion.archivo:
+            try:
+                default_storage.delete(exportacion.archivo)
+            except Exception:
+                logger.warning(f"[Nómina] No se pudo borrar {exportacion.archivo}")
+        purgadas += ExportacionReporte.objects.filter(pk=exportacion.pk, estado="completada").update(
+            estado="vencida", archivo=""
+        )
+    return purgadas
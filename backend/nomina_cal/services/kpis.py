@@ -0,0 +1,82 @@
+#
+# KPIs de liquidaciones en una sola consulta
+#
+# kpis(queryset, *metricas) calcula todas las métricas pedidas sobre un
+# queryset de Liquidacion con un único SELECT: conteos condicionales
+# (Count(..., filter=...)) y, para el aporte IPS, un Sum con cláusula
+# FILTER sobre los detalles de cada liquidación en una subconsulta
+# correlacionada (unir los detalles directamente multiplicaría las sumas
+# de la liquidación).
+#
+# kpis_por_grupo(queryset, campos, *metricas) es lo mismo agrupado por
+# `campos` (lo usa el resumen mensual).
+#
+
+from decimal import Decimal
+from django.db.models import Avg, Count, DecimalField, OuterRef, Q, Subquery, Sum
+
+from nomina_cal.models import Concepto, DetalleLiquidacion
+
+# Líneas de aporte IPS entre los detalles de una liquidación (Concepto.codigo indexado)
+FILTRO_IPS = Q(concepto__codigo=Concepto.IPS)
+
+
+def _ips_de_la_liquidacion():
+    return Subquery(
+        DetalleLiquidacion.objects.filter(liquidacion=OuterRef("pk"))
+        .values("liquidacion")
+        .annotate(s=Sum("monto", filter=FILTRO_IPS))
+        .values("s")[:1],
+        output_field=DecimalField(max_digits=14, decimal_places=2),
+    )
+
+
+def _metricas():
+    return {
+        "cantidad": Count("id"),
+        "cerradas": Count("id", filter=Q(cerrada=True)),
+        "abiertas": Count("id", filter=Q(cerrada=False)),
+        "enviadas": Count("id", filter=Q(enviado_email=True)),
+        "empleados": Count("empleado", distinct=True),
+        "total_ingresos": Sum("total_ingresos"),
+        "total_descuentos": Sum("total_descuentos"),
+        "total_neto": Sum("neto_cobrar"),
+        "promedio_neto": Avg("neto_cobrar"),
+        "total_ips": Sum(_ips_de_la_liquidacion()),
+    }
+
+
+METRICAS = tuple(_metricas())
+CONTEOS = ("cantidad", "cerradas", "abiertas", "enviadas", "empleados")
+
+
+def _expresiones(metricas):
+    disponibles = _metricas()
+    desconocidas = set(metricas) - set(disponibles)
+    if desconocidas:
+        raise ValueError(f"Métricas desconocidas: {', '.join(sorted(desconocidas))}")
+    return {m: disponibles[m] for m in (metricas or METRICAS)}
+
+
+def _completar(fila, metricas):
+    for m in metricas:
+        if fila[m] is None:
+            fila[m] = 0 if m in CONTEOS else Decimal("0")
+        elif m not in CONTEOS:
+            fila[m] = Decimal(fila[m])
+    return fila
+
+
+def kpis(queryset, *metricas) -> dict:
+    """{métrica: valor} de `queryset` (todas las métricas si no se piden), en una consulta."""
+    expresiones = _expresiones(metricas)
+    return _completar(queryset.order_by().aggregate(**expresiones), expresiones)
+
+
+def kpis_por_grupo(queryset, campos, *metricas):
+    """Filas {campo..., métrica...} agrupadas por `campos`, en una consulta."""
+    expresiones = _expresiones(metricas)
+    return [
+        _completar(fila, expresiones)
+        for fila in queryset.values(*campos).annotate(**expresiones).order_by()
+    ]
@@ -0,0 +1,350 @@
+#
+# Libro de sueldos del período en un único PDF
+#
+# Reúne los recibos de un mes/año (opcionalmente de un área) en un solo PDF
+# que se emite por partes, página a página: cada página se escribe apenas se
+# arma y solo se retienen los offsets del xref y una línea por empleado para
+# el índice. Así el libro de 50.000 recibos se puede servir por streaming
+# sin cargarlo entero en memoria (ReportLab arma el documento completo antes
+# de escribirlo, por eso aquí se generan los objetos PDF directamente).
+#
+# Estructura: un recibo por página (continúa en la siguiente si no entra),
+# con el acumulado del libro al pie; al final, el índice de empleados con su
+# página, los totales por concepto y los totales generales. Además incluye
+# marcadores (outline) por empleado.
+#
+
+import zlib
+from collections import defaultdict
+from decimal import Decimal
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+from nomina_cal.models import Liquidacion
+from nomina_cal.services.recibos_lote import LOTE_DATOS, bloques_datos
+
+ANCHO, ALTO = 595.28, 841.89  # A4 en puntos
+MARGEN_IZQ, MARGEN_DER = 50, ANCHO - 50
+Y_MINIMO = 110
+FUENTES = {"Helvetica": b"F1", "Helvetica-Bold": b"F2"}
+FILAS_INDICE = 45
+AZUL = (0.043, 0.325, 0.580)  # #0b5394, igual que el recibo individual
+
+# Objetos fijos: 1 catálogo, 2 árbol de páginas, 3 y 4 fuentes
+OBJ_CATALOGO, OBJ_PAGINAS, OBJ_F1, OBJ_F2 = 1, 2, 3, 4
+
+
+def _gs(valor) -> str:
+    return f"{valor:,.0f}"
+
+
+def _texto_pdf(texto) -> bytes:
+    crudo = str(texto).encode("cp1252", "replace")
+    return crudo.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def _titulo_outline(texto) -> bytes:
+    return b"<" + ("\ufeff" + str(texto)).encode("utf-16-be").hex().upper().encode() + b">"
+
+
+#
+# # Contenido de una página
+#
+class _Lienzo:
+    def __init__(self):
+        self.ops = []
+
+    def texto(self, x, y, texto, fuente="Helvetica", tam=10):
+        self.ops.append(b"BT /%s %d Tf %.2f %.2f Td (%s) Tj ET" % (FUENTES[fuente], tam, x, y, _texto_pdf(texto)))
+
+    def texto_der(self, x, y, texto, fuente="Helvetica", tam=10):
+        self.texto(x - stringWidth(str(texto), fuente, tam), y, texto, fuente, tam)
+
+    def texto_centro(self, y, texto, fuente="Helvetica", tam=10):
+        self.texto((ANCHO - stringWidth(str(texto), fuente, tam)) / 2, y, texto, fuente, tam)
+
+    def color(self, rgb):
+        self.ops.append(b"%.3f %.3f %.3f rg" % rgb)
+
+    def linea(self, x1, y1, x2, y2, grosor=0.5):
+        self.ops.append(b"%.2f w %.2f %.2f m %.2f %.2f l S" % (grosor, x1, y1, x2, y2))
+
+    def barra(self, x, y, ancho, alto, rgb):
+        self.ops.append(b"q %.3f %.3f %.3f rg %.2f %.2f %.2f %.2f re f Q" % (*rgb, x, y, ancho, alto))
+
+    def contenido(self) -> bytes:
+        return b"\n".join(self.ops)
+
+
+#
+# # Escritor PDF incremental
+#
+class EscritorPDF:
+    """Emite objetos PDF como bytes y recuerda sus offsets para el xref final."""
+
+    def __init__(self):
+        self.pos = 0
+        self.offsets = {}
+        self.paginas = []
+        self._siguiente = OBJ_F2 + 1
+
+    def _nuevo(self):
+        num = self._siguiente
+        self._siguiente += 1
+        return num
+
+    def _objeto(self, num, cuerpo: bytes) -> bytes:
+        self.offsets[num] = self.pos
+        datos = b"%d 0 obj\n" % num + cuerpo + b"\nendobj\n"
+        self.pos += len(datos)
+        return datos
+
+    def inicio(self) -> bytes:
+        cabecera = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"
+        self.pos = len(cabecera)
+        fuentes = b"".join(
+            self._objeto(num, b"<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>" % nombre.encode())
+            for num, nombre in ((OBJ_F1, "Helvetica"), (OBJ_F2, "Helvetica-Bold"))
+        )
+        return cabecera + fuentes
+
+    def pagina(self, lienzo: _Lienzo) -> bytes:
+        """Escribe la página y retorna sus bytes; su número queda en self.paginas."""
+        flujo = zlib.compress(lienzo.contenido())
+        num_flujo, num_pagina = self._nuevo(), self._nuevo()
+        self.paginas.append(num_pagina)
+        return self._objeto(
+            num_flujo, b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(flujo) + flujo + b"\nendstream"
+        ) + self._objeto(num_pagina, (
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %.2f %.2f] "
+            b"/Resources << /Font << /F1 %d 0 R /F2 %d 0 R >> >> /Contents %d 0 R >>"
+        ) % (OBJ_PAGINAS, ANCHO, ALTO, OBJ_F1, OBJ_F2, num_flujo))
+
+    def _outline(self, marcadores) -> tuple:
+        """marcadores: [(titulo, indice_de_pagina)]. Retorna (bytes, num_raiz | None)."""
+        if not marcadores:
+            return b"", None
+        raiz = self._nuevo()
+        nums = [self._nuevo() for _ in marcadores]
+        partes = []
+        for i, (titulo, pagina) in enumerate(marcadores):
+            enlaces = b"/Parent %d 0 R" % raiz
+            if i:
+                enlaces += b" /Prev %d 0 R" % nums[i - 1]
+            if i + 1 < len(nums):
+                enlaces += b" /Next %d 0 R" % nums[i + 1]
+            partes.append(self._objeto(nums[i], b"<< /Title %s %s /Dest [%d 0 R /XYZ null null null] >>" % (
+                _titulo_outline(titulo), enlaces, self.paginas[pagina],
+            )))
+        partes.append(self._objeto(raiz, b"<< /Type /Outlines /First %d 0 R /Last %d 0 R /Count %d >>" % (
+            nums[0], nums[-1], len(nums),
+        )))
+        return b"".join(partes), raiz
+
+    def fin(self, titulo, marcadores=()) -> bytes:
+        outline, raiz = self._outline(marcadores)
+        kids = b" ".join(b"%d 0 R" % n for n in self.paginas)
+        partes = [
+            outline,
+            self._objeto(OBJ_PAGINAS, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self.paginas))),
+            self._objeto(OBJ_CATALOGO, b"<< /Type /Catalog /Pages %d 0 R%s >>" % (
+                OBJ_PAGINAS, b" /Outlines %d 0 R /PageMode /UseOutlines" % raiz if raiz else b"",
+            )),
+        ]
+        info = self._objeto(self._nuevo(), b"<< /Title %s /Producer (Sistema de Nomina IS2) >>" % _titulo_outline(titulo))
+        partes.append(info)
+        cuerpo = b"".join(partes)
+
+        total = self._siguiente
+        xref = [b"xref\n0 %d\n" % total, b"0000000000 65535 f \n"]
+        xref += [b"%010d 00000 n \n" % self.offsets.get(n, 0) for n in range(1, total)]
+        trailer = b"trailer\n<< /Size %d /Root %d 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+            total, OBJ_CATALOGO, total - 1, self.pos,
+        )
+        return cuerpo + b"".join(xref) + trailer
+
+
+#
+# # Armado del libro
+#
+class _Acumulado:
+    def __init__(self):
+        self.recibos = 0
+        self.ingresos = Decimal("0")
+        self.descuentos = Decimal("0")
+        self.neto = Decimal("0")
+        self.por_concepto = defaultdict(Decimal)
+
+    def sumar(self, datos):
+        self.recibos += 1
+        self.ingresos += datos.total_ingresos or 0
+        self.descuentos += datos.total_descuentos or 0
+        self.neto += datos.neto_cobrar or 0
+        for desc, monto in datos.lineas:
+            self.por_concepto[desc] += monto or 0
+
+
+def _encabezado(lienzo, titulo, subtitulo):
+    lienzo.color(AZUL)
+    lienzo.texto_centro(800, "SISTEMA DE NÓMINA — IS2 GRUPO 1", "Helvetica-Bold", 14)
+    lienzo.color((0, 0, 0))
+    lienzo.texto_centro(782, titulo, "Helvetica", 11)
+    if subtitulo:
+        lienzo.texto_centro(768, subtitulo, "Helvetica", 9)
+    lienzo.linea(MARGEN_IZQ, 758, MARGEN_DER, 758)
+
+
+def _pie(lienzo, numero, acumulado=None):
+    lienzo.linea(MARGEN_IZQ, 70, MARGEN_DER, 70)
+    if acumulado is not None:
+        lienzo.texto(MARGEN_IZQ, 56, (
+            f"Acumulado del libro ({acumulado.recibos} recibos): ingresos {_gs(acumulado.ingresos)} | "
+            f"descuentos {_gs(acumulado.descuentos)} | neto {_gs(acumulado.neto)} Gs"
+        ), "Helvetica", 8)
+    lienzo.texto_der(MARGEN_DER, 40, f"Página {numero}", "Helvetica", 8)
+
+
+def _paginas_recibo(datos, titulo, numero, acumulado):
+    """Arma las páginas (lienzos) de un recibo; acumulado ya incluye este recibo."""
+    lienzo = _Lienzo()
+    _encabezado(lienzo, titulo, None)
+    y = 735
+    for etiqueta, valor in (
+        ("Empleado:", f"{datos.empleado_apellido}, {datos.empleado_nombre}".strip(", ")),
+        ("Cédula:", datos.cedula),
+        ("Cargo:", datos.cargo),
+        ("Periodo:", f"{datos.mes}/{datos.anio}"),
+    ):
+        lienzo.texto(MARGEN_IZQ, y, etiqueta, "Helvetica-Bold")
+        lienzo.texto(MARGEN_IZQ + 90, y, valor)
+        y -= 16
+
+    y -= 10
+    lienzo.barra(MARGEN_IZQ, y - 4, MARGEN_DER - MARGEN_IZQ, 16, AZUL)
+    lienzo.color((1, 1, 1))
+    lienzo.texto(MARGEN_IZQ + 5, y, "Concepto", "Helvetica-Bold", 9)
+    lienzo.texto_der(MARGEN_DER - 5, y, "Monto (Gs)", "Helvetica-Bold", 9)
+    lienzo.color((0, 0, 0))
+    y -= 18
+
+    paginas = []
+    for desc, monto in datos.lineas:
+        if y < Y_MINIMO:
+            lienzo.texto(MARGEN_IZQ, y, "(continúa en la página siguiente)", "Helvetica", 8)
+            _pie(lienzo, numero + len(paginas))
+            paginas.append(lienzo)
+            lienzo = _Lienzo()
+            _encabezado(lienzo, titulo, f"{datos.empleado_apellido}, {datos.empleado_nombre} (continuación)")
+            y = 735
+        lienzo.texto(MARGEN_IZQ + 5, y, desc, "Helvetica", 9)
+        lienzo.texto_der(MARGEN_DER - 5, y, _gs(monto), "Helvetica", 9)
+        lienzo.linea(MARGEN_IZQ, y - 4, MARGEN_DER, y - 4, 0.25)
+        y -= 15
+
+    y -= 12
+    for etiqueta, valor in (
+        ("Total Ingresos:", datos.total_ingresos),
+        ("Total Descuentos:", datos.total_descuentos),
+        ("Neto a Cobrar:", datos.neto_cobrar),
+    ):
+        lienzo.texto(MARGEN_IZQ + 5, y, etiqueta, "Helvetica-Bold")
+        lienzo.texto_der(MARGEN_DER - 5, y, _gs(valor), "Helvetica-Bold")
+        y -= 16
+
+    _pie(lienzo, numero + len(paginas), acumulado)
+    paginas.append(lienzo)
+    return paginas
+
+
+def _paginas_indice(indice, titulo, numero):
+    """indice: [(empleado, cedula, neto, pagina)]."""
+    paginas = []
+    for i in range(0, max(len(indice), 1), FILAS_INDICE):
+        lienzo = _Lienzo()
+        _encabezado(lienzo, titulo, "Índice de empleados")
+        y = 735
+        lienzo.texto(MARGEN_IZQ, y, "Empleado", "Helvetica-Bold", 9)
+        lienzo.texto(MARGEN_IZQ + 270, y, "Cédula", "Helvetica-Bold", 9)
+        lienzo.texto_der(MARGEN_DER - 60, y, "Neto (Gs)", "Helvetica-Bold", 9)
+        lienzo.texto_der(MARGEN_DER, y, "Página", "Helvetica-Bold", 9)
+        y -= 14
+        for empleado, cedula, neto, pagina in indice[i:i + FILAS_INDICE]:
+            lienzo.texto(MARGEN_IZQ, y, empleado[:55], "Helvetica", 9)
+            lienzo.texto(MARGEN_IZQ + 270, y, cedula, "Helvetica", 9)
+            lienzo.texto_der(MARGEN_DER - 60, y, _gs(neto), "Helvetica", 9)
+            lienzo.texto_der(MARGEN_DER, y, str(pagina), "Helvetica", 9)
+            y -= 14
+        _pie(lienzo, numero + len(paginas))
+        paginas.append(lienzo)
+    return paginas
+
+
+def _paginas_totales(acumulado, titulo, numero):
+    paginas = []
+    conceptos = sorted(acumulado.por_concepto.items())
+    lienzo, y = None, 0
+    for desc, monto in conceptos or [(None, None)]:
+        if lienzo is None or y < Y_MINIMO + 80:
+            if lienzo is not None:
+                _pie(lienzo, numero + len(paginas))
+                paginas.append(lienzo)
+            lienzo = _Lienzo()
+            _encabezado(lienzo, titulo, "Totales del período")
+            y = 735
+            lienzo.texto(MARGEN_IZQ, y, "Totales por concepto", "Helvetica-Bold", 11)
+            y -= 18
+        if desc is not None:
+            lienzo.texto(MARGEN_IZQ + 5, y, desc, "Helvetica", 9)
+            lienzo.texto_der(MARGEN_DER - 5, y, _gs(monto), "Helvetica", 9)
+            y -= 14
+
+    y -= 16
+    for etiqueta, valor in (
+        ("Recibos:", acumulado.recibos),
+        ("Total Ingresos:", _gs(acumulado.ingresos)),
+        ("Total Descuentos:", _gs(acumulado.descuentos)),
+        ("Neto a Cobrar:", _gs(acumulado.neto)),
+    ):
+        lienzo.texto(MARGEN_IZQ + 5, y, etiqueta, "Helvetica-Bold", 11)
+        lienzo.texto_der(MARGEN_DER - 5, y, str(valor), "Helvetica-Bold", 11)
+        y -= 18
+    _pie(lienzo, numero + len(paginas))
+    paginas.append(lienzo)
+    return paginas
+
+
+def liquidaciones_libro(mes, anio, area=None):
+    qs = Liquidacion.objects.filter(mes=mes, anio=anio)
+    if area:
+        qs = qs.filter(empleado__area=area)
+    return qs
+
+
+def generar_libro(queryset, mes, anio, lote=LOTE_DATOS):
+    """
+    Genera el libro de sueldos como una secuencia de bytes (para
+    StreamingHttpResponse o para escribir a un archivo por partes).
+    """
+    titulo = f"Libro de sueldos — Período {mes:02d}/{anio}"
+    pdf = EscritorPDF()
+    acumulado = _Acumulado()
+    indice, marcadores = [], []
+
+    yield pdf.inicio()
+    for bloque in bloques_datos(queryset, lote, orden=("empleado__apellido", "empleado__nombre", "id")):
+        for datos in bloque:
+            acumulado.sumar(datos)
+            nombre = f"{datos.empleado_apellido}, {datos.empleado_nombre}".strip(", ")
+            primera = len(pdf.paginas)
+            indice.append((nombre, datos.cedula, datos.neto_cobrar, primera + 1))
+            marcadores.append((nombre, primera))
+            for lienzo in _paginas_recibo(datos, titulo, primera + 1, acumulado):
+                yield pdf.pagina(lienzo)
+
+    marcadores.append(("Índice de empleados", len(pdf.paginas)))
+    for lienzo in _paginas_indice(indice, titulo, len(pdf.paginas) + 1):
+        yield pdf.pagina(lienzo)
+    marcadores.append(("Totales del período", len(pdf.paginas)))
+    for lienzo in _paginas_totales(acumulado, titulo, len(pdf.paginas) + 1):
+        yield pdf.pagina(lienzo)
+
+    yield pdf.fin(titulo, marcadores)
@@ -0,0 +1,72 @@
+#
+# Línea de tiempo en memoria del salario mínimo
+#
+# Reemplaza la consulta ordenada de SalarioMinimo.get_vigente por una
+# búsqueda binaria (bisect) sobre los registros con vigente=True ordenados
+# por vigente_desde. Se comparte por proceso y se invalida con las señales
+# post_save/post_delete de SalarioMinimo (ver nomina_cal/signals.py).
+#
+# Igual que el registro de conceptos, lo leído dentro de una transacción se
+# guarda recién al hacer commit, salvo que la línea se haya invalidado
+# mientras tanto (contador de generación). Como las señales no cruzan
+# procesos, la línea además se recarga pasado TTL_SEGUNDOS.
+#
+
+import threading
+import time
+from bisect import bisect_right
+from datetime import datetime
+from django.db import transaction
+
+from nomina_cal.models import SalarioMinimo
+
+TTL_SEGUNDOS = 300
+
+
+class LineaSalarioMinimo:
+    def __init__(self):
+        self._fechas = None
+        self._registros = None
+        self._cargado_en = 0.0
+        self._generacion = 0
+        self._lock = threading.Lock()
+
+    def invalidar(self):
+        with self._lock:
+            self._fechas = None
+            self._registros = None
+            self._generacion += 1
+
+    def _cargar(self):
+        generacion = self._generacion
+        registros = list(
+            SalarioMinimo.objects.filter(vigente=True).order_by("vigente_desde", "id")
+        )
+        fechas = [r.vigente_desde for r in registros]
+
+        def guardar():
+            with self._lock:
+                if generacion != self._generacion:
+                    return
+                self._fechas, self._registros = fechas, registros
+                self._cargado_en = time.monotonic()
+
+        transaction.on_commit(guardar)
+        return fechas, registros
+
+    def _linea(self):
+        with self._lock:
+            if self._fechas is not None and time.monotonic() - self._cargado_en < TTL_SEGUNDOS:
+                return self._fechas, self._registros
+        return self._cargar()
+
+    def vigente(self, fecha):
+        """Registro vigente a la fecha (el de mayor vigente_desde ≤ fecha) o None."""
+        if isinstance(fecha, datetime):
+            fecha = fecha.date()
+        fechas, registros = self._linea()
+        i = bisect_right(fechas, fecha)
+        return registros[i - 1] if i else None
+
+
+linea_salario_minimo = LineaSalarioMinimo()
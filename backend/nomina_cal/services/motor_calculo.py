@@ -0,0 +1,214 @@
+#
+# Motor de cálculo de nómina (funciones puras, sin base de datos)
+#
+# Única fuente de verdad de las reglas de liquidación mensual:
+#   - Sueldo base (imponible)
+#   - Bonificación familiar MTESS: 5% del salario mínimo por hijo válido,
+#     hasta 4 hijos, solo si el sueldo base es ≤ 3 salarios mínimos
+#   - IPS 9% sobre el sueldo base
+#   - Descuentos adicionales vigentes (préstamos, embargos, etc.)
+#
+# El aguinaldo y las vacaciones no forman parte de la liquidación mensual:
+# ningún punto de entrada (cálculo del período, individual o
+# Liquidacion.calcular_totales) los agrega, así el neto no depende de cuál
+# recalculó la liquidación por última vez.
+#
+# Recibe snapshots planos (dataclasses) y devuelve líneas de concepto y
+# totales. Las funciones que leen/escriben la base están en
+# services/adaptador_motor.py; este módulo no importa modelos.
+#
+
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Iterable, Optional
+
+CENTAVOS = Decimal("0.01")
+
+TASA_IPS = Decimal("0.09")
+TASA_BONIFICACION_HIJO = Decimal("0.05")
+TOPE_SALARIOS_MINIMOS_BONIFICACION = Decimal("3")
+MAX_HIJOS_BONIFICACION = 4
+
+
+#
+# # Conceptos emitidos por el motor (descripción + valores por defecto)
+#
+@dataclass(frozen=True)
+class ConceptoDef:
+    descripcion: str
+    es_debito: bool = False
+    es_recurrente: bool = True
+    afecta_ips: bool = False
+    para_aguinaldo: bool = False
+    codigo: str = ""  # Concepto.codigo (SUELDO_BASE, IPS, ...)
+
+    def defaults(self) -> dict:
+        """Valores para Concepto.objects.get_or_create(defaults=...)."""
+        return {
+            "codigo": self.codigo,
+            "es_debito": self.es_debito,
+            "es_recurrente": self.es_recurrente,
+            "afecta_ips": self.afecta_ips,
+            "para_aguinaldo": self.para_aguinaldo,
+        }
+
+
+CONCEPTO_SUELDO = ConceptoDef("Sueldo Base", afecta_ips=True, para_aguinaldo=True, codigo="SUELDO_BASE")
+CONCEPTO_BONIFICACION = ConceptoDef("Bonificación Familiar por Hijo", codigo="BONIF_FAMILIAR")
+CONCEPTO_IPS = ConceptoDef("Descuento IPS 9%", es_debito=True, afecta_ips=True, codigo="IPS")
+
+
+def codigo_descuento(tipo: str) -> str:
+    """Concepto.codigo de un tipo de Descuento ("prestamo" → "DESCUENTO_PRESTAMO")."""
+    return f"DESCUENTO_{tipo.upper()}"
+
+
+def concepto_descuento(tipo: str, recurrente: bool = False) -> ConceptoDef:
+    """Concepto "Descuento: <Tipo>" para un descuento adicional."""
+    return ConceptoDef(
+        f"Descuento: {tipo.title()}", es_debito=True, es_recurrente=recurrente, codigo=codigo_descuento(tipo)
+    )
+
+
+#
+# # Snapshots de entrada
+#
+@dataclass(frozen=True)
+class HijoSnapshot:
+    fecha_nacimiento: date
+    residente: bool = True
+    fecha_vencimiento_residencia: Optional[date] = None
+    activo: bool = True
+
+
+@dataclass(frozen=True)
+class DescuentoSnapshot:
+    tipo: str
+    monto: Decimal
+    recurrente: bool = False
+
+
+@dataclass(frozen=True)
+class EmpleadoSnapshot:
+    """
+    Datos de un empleado necesarios para liquidar un mes.
+    sueldo_base: base imponible (de la liquidación o del empleado).
+    hijos_elegibles: conteo ya calculado (p. ej. por la base); si es None
+    se evalúan los HijoSnapshot de hijos.
+    descuentos: solo los ya vigentes para el período.
+    """
+    id: int
+    sueldo_base: Decimal
+    hijos: tuple = ()
+    descuentos: tuple = ()
+    hijos_elegibles: Optional[int] = None
+
+
+#
+# # Resultado
+#
+@dataclass(frozen=True)
+class LineaConcepto:
+    concepto: ConceptoDef
+    monto: Decimal
+
+
+@dataclass
+class ResultadoLiquidacion:
+    empleado_id: int
+    lineas: list = field(default_factory=list)
+    total_ingresos: Decimal = Decimal("0.00")
+    total_descuentos: Decimal = Decimal("0.00")
+
+    @property
+    def neto_cobrar(self) -> Decimal:
+        return self.total_ingresos - self.total_descuentos
+
+    def agregar(self, concepto: ConceptoDef, monto: Decimal):
+        self.lineas.append(LineaConcepto(concepto, monto))
+        if concepto.es_debito:
+            self.total_descuentos += monto
+        else:
+            self.total_ingresos += monto
+
+
+#
+# # Reglas
+#
+def _redondear(valor: Decimal) -> Decimal:
+    return valor.quantize(CENTAVOS, rounding=ROUND_HALF_UP)
+
+
+def es_menor(fecha_nacimiento: date, ref: date) -> bool:
+    edad = ref.year - fecha_nacimiento.year - (
+        (ref.month, ref.day) < (fecha_nacimiento.month, fecha_nacimiento.day)
+    )
+    return edad < 18
+
+
+def hijo_elegible(hijo: HijoSnapshot, ref: date) -> bool:
+    """Menor de 18, activo, residente y con residencia vigente a la fecha ref."""
+    if not (hijo.activo and hijo.residente):
+        return False
+    if hijo.fecha_vencimiento_residencia and hijo.fecha_vencimiento_residencia < ref:
+        return False
+    return es_menor(hijo.fecha_nacimiento, ref)
+
+
+def contar_hijos_elegibles(hijos: Iterable[HijoSnapshot], ref: date) -> int:
+    """Cantidad de hijos válidos para la bonificación (máximo 4)."""
+    return min(sum(1 for h in hijos if hijo_elegible(h, ref)), MAX_HIJOS_BONIFICACION)
+
+
+def calcular_bonificacion(sueldo_base: Decimal, salario_minimo: Decimal, hijos_elegibles: int) -> Decimal:
+    """Bonificación familiar MTESS: 5% SM por hijo (máx. 4) si sueldo ≤ 3 SM."""
+    if not salario_minimo or salario_minimo <= 0:
+        return Decimal("0.00")
+    if sueldo_base > salario_minimo * TOPE_SALARIOS_MINIMOS_BONIFICACION:
+        return Decimal("0.00")
+    hijos = min(hijos_elegibles, MAX_HIJOS_BONIFICACION)
+    return _redondear(salario_minimo * TASA_BONIFICACION_HIJO * Decimal(hijos))
+
+
+def calcular_ips(imponible: Decimal) -> Decimal:
+    """Aporte IPS del empleado (9%)."""
+    return _redondear(Decimal(imponible) * TASA_IPS)
+
+
+def calcular(
+    empleado: EmpleadoSnapshot,
+    salario_minimo: Decimal,
+    fecha_elegibilidad: date,
+) -> ResultadoLiquidacion:
+    """
+    Liquida un empleado. fecha_elegibilidad es la fecha a la que se evalúan
+    edad y residencia de los hijos.
+    """
+    sueldo = Decimal(empleado.sueldo_base or 0)
+    salario_minimo = Decimal(salario_minimo or 0)
+    resultado = ResultadoLiquidacion(empleado_id=empleado.id)
+
+    resultado.agregar(CONCEPTO_SUELDO, sueldo)
+
+    hijos = empleado.hijos_elegibles
+    if hijos is None:
+        hijos = contar_hijos_elegibles(empleado.hijos, fecha_elegibilidad)
+    bonificacion = calcular_bonificacion(sueldo, salario_minimo, hijos)
+    if bonificacion > 0:
+        resultado.agregar(CONCEPTO_BONIFICACION, bonificacion)
+
+    ips = calcular_ips(sueldo)
+    if ips > 0:
+        resultado.agregar(CONCEPTO_IPS, ips)
+
+    for d in empleado.descuentos:
+        resultado.agregar(concepto_descuento(d.tipo, d.recurrente), Decimal(d.monto))
+
+    return resultado
+
+
+def calcular_lote(empleados: Iterable[EmpleadoSnapshot], salario_minimo, fecha_elegibilidad):
+    """Aplica calcular() a un iterable de snapshots (generador, memoria constante)."""
+    for emp in empleados:
+        yield calcular(emp, salario_minimo, fecha_elegibilidad)
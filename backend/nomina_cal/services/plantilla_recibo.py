@@ -0,0 +1,168 @@
+#
+# Plantilla compartida del recibo PDF (membrete IS2 Grupo 1)
+#
+# Los estilos, los TableStyle y los flowables estáticos (membrete, pie,
+# espaciadores) se construyen una sola vez por proceso; cada recibo solo
+# arma sus tablas de datos. Trabaja sobre DatosRecibo, una foto plana y
+# serializable de la liquidación, para poder renderizar en procesos hijos
+# sin acceso a la base.
+#
+
+import io
+from dataclasses import dataclass
+from datetime import date
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import mm
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+# Subir al cambiar el diseño: invalida los recibos cacheados (services/cache_recibos.py)
+VERSION_PLANTILLA = 1
+
+ENCABEZADO = """
+    <para align=center>
+    <b><font size=14 color="#0b5394">SISTEMA DE NÓMINA — IS2 GRUPO 1</font></b><br/>
+    <font size=11 color="#555555">Departamento de RRHH — Gestión de Salarios</font><br/>
+    <font size=10 color="#777777">Fecha de emisión: {}</font>
+    </para>
+    """
+
+PIE = """
+    <para align=center>
+    <font size=9 color="#777777">
+    Sistema desarrollado por <b>IS2 Grupo 1</b> — Ingeniería de Software II<br/>
+    Universidad Nacional de Asunción — Facultad Politécnica<br/>
+    </font>
+    </para>
+    """
+
+
+@dataclass(frozen=True)
+class DatosRecibo:
+    liquidacion_id: int
+    empleado_nombre: str
+    cedula: str
+    cargo: str
+    mes: int
+    anio: int
+    lineas: tuple  # ((descripcion, monto), ...)
+    total_ingresos: object
+    total_descuentos: object
+    neto_cobrar: object
+    empleado_apellido: str = ""
+
+    @property
+    def nombre_archivo(self):
+        return f"recibo_{self.liquidacion_id}.pdf"
+
+
+def datos_recibo(liquidacion) -> DatosRecibo:
+    """Foto de una liquidación (usa los detalles prefetcheados si los hay)."""
+    empleado = liquidacion.empleado
+    return DatosRecibo(
+        liquidacion_id=liquidacion.pk,
+        empleado_nombre=f"{empleado.nombre}",
+        cedula=f"{empleado.cedula}",
+        cargo=empleado.cargo or "-",
+        mes=liquidacion.mes,
+        anio=liquidacion.anio,
+        lineas=tuple(
+            (det.concepto.descripcion, det.monto)
+            for det in liquidacion.detalles.all()
+        ),
+        total_ingresos=liquidacion.total_ingresos,
+        total_descuentos=liquidacion.total_descuentos,
+        neto_cobrar=liquidacion.neto_cobrar,
+        empleado_apellido=f"{empleado.apellido}",
+    )
+
+
+class PlantillaRecibo:
+    def __init__(self):
+        self.styles = getSampleStyleSheet()
+        self.estilo_info = TableStyle([
+            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#dae3f3")),
+            ("TEXTCOLOR", (0, 0), (-1, -1), colors.black),
+            ("BOX", (0, 0), (-1, -1), 0.5, colors.gray),
+            ("INNERGRID", (0, 0), (-1, -1), 0.3, colors.gray),
+            ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+            ("FONTNAME", (0, 0), (-1, -1), "Helvetica"),
+            ("FONTSIZE", (0, 0), (-1, -1), 10),
+        ])
+        self.estilo_detalle = TableStyle([
+            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#0b5394")),
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+            ("BOX", (0, 0), (-1, -1), 0.5, colors.gray),
+            ("INNERGRID", (0, 0), (-1, -1), 0.25, colors.gray),
+            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+            ("FONTNAME", (0, 1), (-1, -1), "Helvetica"),
+            ("FONTSIZE", (0, 0), (-1, -1), 9),
+            ("ALIGN", (1, 1), (1, -1), "RIGHT"),
+        ])
+        self.estilo_totales = TableStyle([
+            ("FONTNAME", (0, 0), (-1, -1), "Helvetica-Bold"),
+            ("ALIGN", (1, 0), (1, -1), "RIGHT"),
+            ("TEXTCOLOR", (0, 2), (-1, 2), colors.HexColor("#0b5394")),
+            ("FONTSIZE", (0, 0), (-1, -1), 10),
+        ])
+        self.pie = Paragraph(PIE, self.styles["Normal"])
+        self._encabezados = {}
+
+    def encabezado(self, fecha):
+        """El membrete depende solo de la fecha de emisión: se arma una vez por día."""
+        if fecha not in self._encabezados:
+            self._encabezados[fecha] = Paragraph(
+                ENCABEZADO.format(fecha.strftime("%d/%m/%Y")), self.styles["Normal"]
+            )
+        return self._encabezados[fecha]
+
+    def elementos(self, datos: DatosRecibo, fecha_emision=None) -> list:
+        info = Table([
+            ["Empleado:", datos.empleado_nombre],
+            ["Cédula:", datos.cedula],
+            ["Cargo:", datos.cargo],
+            ["Periodo:", f"{datos.mes}/{datos.anio}"],
+        ], colWidths=[90 * mm, 90 * mm])
+        info.setStyle(self.estilo_info)
+
+        filas = [["Concepto", "Monto (Gs)"]]
+        filas.extend([desc, f"{monto:,.0f}"] for desc, monto in datos.lineas)
+        detalle = Table(filas, colWidths=[110 * mm, 50 * mm])
+        detalle.setStyle(self.estilo_detalle)
+
+        totales = Table([
+            ["Total Ingresos:", f"{datos.total_ingresos:,.0f}"],
+            ["Total Descuentos:", f"{datos.total_descuentos:,.0f}"],
+            ["Neto a Cobrar:", f"{datos.neto_cobrar:,.0f}"],
+        ], colWidths=[100 * mm, 60 * mm])
+        totales.setStyle(self.estilo_totales)
+
+        return [
+            self.encabezado(fecha_emision or date.today()), Spacer(1, 12),
+            info, Spacer(1, 14),
+            detalle, Spacer(1, 14),
+            totales, Spacer(1, 20),
+            self.pie,
+        ]
+
+    def renderizar(self, datos: DatosRecibo, destino=None, fecha_emision=None):
+        """Escribe el recibo en destino (un BytesIO nuevo si no se indica) y lo retorna."""
+        buffer = destino if destino is not None else io.BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=A4,
+                                rightMargin=30, leftMargin=30,
+                                topMargin=40, bottomMargin=30)
+        doc.build(self.elementos(datos, fecha_emision))
+        return buffer
+
+
+_plantilla = None
+
+
+def plantilla() -> PlantillaRecibo:
+    """Plantilla única del proceso."""
+    global _plantilla
+    if _plantilla is None:
+        _plantilla = PlantillaRecibo()
+    return _plantilla
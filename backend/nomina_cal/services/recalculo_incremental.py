@@ -0,0 +1,60 @@
+#
+# Recálculo incremental de liquidaciones abiertas
+#
+# Las señales de nomina_cal/signals.py marcan requiere_recalculo=True en las
+# liquidaciones afectadas cuando cambia:
+#   - Empleado.salario_base
+#   - Hijo (alta/edición/baja)
+#   - Descuento (incluye los generados por ausencias)
+#   - SalarioMinimo (períodos desde su vigencia)
+#   - RegistroAsistencia (mes del registro)
+# Cada cálculo deja la marca en False; calcular_todas solo procesa las marcadas.
+#
+
+from django.db.models import Q
+
+from nomina_cal.models import Liquidacion
+from nomina_cal.services import resumen_nomina
+
+
+def _abiertas():
+    return Liquidacion.objects.filter(cerrada=False, enviado_email=False)
+
+
+def marcar_empleado(empleado_id, mes=None, anio=None) -> int:
+    """Marca las liquidaciones abiertas del empleado (opcionalmente de un período)."""
+    qs = _abiertas().filter(empleado_id=empleado_id, requiere_recalculo=False)
+    if mes is not None:
+        qs = qs.filter(mes=mes, anio=anio)
+    return qs.update(requiere_recalculo=True)
+
+
+def marcar_desde(fecha) -> int:
+    """Marca las liquidaciones abiertas de todos los períodos desde el mes de fecha."""
+    return _abiertas().filter(
+        Q(anio__gt=fecha.year) | Q(anio=fecha.year, mes__gte=fecha.month),
+        requiere_recalculo=False,
+    ).update(requiere_recalculo=True)
+
+
+def liquidaciones_pendientes():
+    """Liquidaciones abiertas que necesitan recálculo."""
+    return _abiertas().filter(requiere_recalculo=True)
+
+
+def recalcular_pendientes(calcular, forzar=False) -> tuple:
+    """
+    Aplica calcular(liquidacion) a las liquidaciones pendientes
+    (o a todas las abiertas si forzar=True).
+    Retorna (recalculadas, omitidas_por_estar_al_dia).
+    """
+    abiertas = _abiertas()
+    pendientes = abiertas if forzar else abiertas.filter(requiere_recalculo=True)
+    omitidas = 0 if forzar else abiertas.filter(requiere_recalculo=False).count()
+
+    recalculadas = 0
+    with resumen_nomina.agrupar_marcas():
+        for liq in pendientes.select_related("empleado").iterator():
+            calcular(liq)
+            recalculadas += 1
+    return recalculadas, omitidas
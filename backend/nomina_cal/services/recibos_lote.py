@@ -0,0 +1,144 @@
+#
+# Generación de recibos PDF por lote (cierre de mes)
+#
+# - Los datos del período se leen por bloques de LOTE_DATOS liquidaciones:
+#   una consulta para las liquidaciones (select_related empleado) y otra
+#   para todos sus detalles (select_related concepto), en vez de una consulta
+#   de detalles y una de concepto por recibo.
+# - El render se reparte en un pool de procesos; cada proceso arma la
+#   plantilla (estilos y flowables estáticos) una sola vez.
+# - Los recibos se escriben a un directorio o a un ZIP (archivo o stream),
+#   en orden y sin retener en memoria más de un bloque.
+#
+
+import logging
+import multiprocessing
+import os
+import zipfile
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from pathlib import Path
+
+from nomina_cal.models import DetalleLiquidacion, Liquidacion
+from nomina_cal.services.plantilla_recibo import DatosRecibo, plantilla
+
+logger = logging.getLogger(__name__)
+
+LOTE_DATOS = 2000
+CHUNK_POOL = 50
+
+
+#
+# # Lectura de datos
+#
+def datos_bloque(liquidaciones) -> list:
+    """DatosRecibo de liquidaciones ya cargadas (con empleado): una consulta para todos los detalles."""
+    lineas = defaultdict(list)
+    detalles = (
+        DetalleLiquidacion.objects.filter(liquidacion_id__in=[l.pk for l in liquidaciones])
+        .select_related("concepto")
+        .order_by("liquidacion_id", "id")
+    )
+    for det in detalles:
+        lineas[det.liquidacion_id].append((det.concepto.descripcion, det.monto))
+
+    return [
+        DatosRecibo(
+            liquidacion_id=liq.pk,
+            empleado_nombre=f"{liq.empleado.nombre}",
+            cedula=f"{liq.empleado.cedula}",
+            cargo=liq.empleado.cargo or "-",
+            mes=liq.mes,
+            anio=liq.anio,
+            lineas=tuple(lineas[liq.pk]),
+            total_ingresos=liq.total_ingresos,
+            total_descuentos=liq.total_descuentos,
+            neto_cobrar=liq.neto_cobrar,
+            empleado_apellido=f"{liq.empleado.apellido}",
+        )
+        for liq in liquidaciones
+    ]
+
+
+def bloques_datos(queryset, lote=LOTE_DATOS, orden=("id",)):
+    """Itera listas de DatosRecibo de a lo sumo `lote` liquidaciones, en el orden indicado."""
+    ids = list(queryset.order_by(*orden).values_list("id", flat=True))
+    for i in range(0, len(ids), lote):
+        bloque = ids[i:i + lote]
+        por_id = Liquidacion.objects.select_related("empleado").in_bulk(bloque)
+        yield datos_bloque([por_id[pk] for pk in bloque])
+
+
+def liquidaciones_periodo(mes, anio):
+    return Liquidacion.objects.filter(mes=mes, anio=anio)
+
+
+#
+# # Render
+#
+def _renderizar(datos, fecha_emision):
+    return plantilla().renderizar(datos, fecha_emision=fecha_emision).getvalue()
+
+
+def _procesos(procesos):
+    return procesos or os.cpu_count() or 1
+
+
+def renderizar_lote(bloques, procesos=None, fecha_emision=None):
+    """
+    Renderiza los bloques de DatosRecibo y produce (datos, pdf_bytes) en orden.
+    Con procesos=1 renderiza en el proceso actual.
+    """
+    fecha_emision = fecha_emision or date.today()
+    procesos = _procesos(procesos)
+    if procesos == 1:
+        for bloque in bloques:
+            for datos in bloque:
+                yield datos, _renderizar(datos, fecha_emision)
+        return
+
+    # Los hijos solo reciben DatosRecibo y nunca tocan la base: no hace falta
+    # cerrar conexiones (y se puede llamar dentro de una transacción).
+    with ProcessPoolExecutor(max_workers=procesos, mp_context=multiprocessing.get_context()) as pool:
+        for bloque in bloques:
+            pdfs = pool.map(_renderizar, bloque, [fecha_emision] * len(bloque), chunksize=CHUNK_POOL)
+            yield from zip(bloque, pdfs)
+
+
+#
+# # Destinos
+#
+def escribir_directorio(recibos, destino) -> int:
+    destino = Path(destino)
+    destino.mkdir(parents=True, exist_ok=True)
+    n = 0
+    for datos, pdf in recibos:
+        (destino / datos.nombre_archivo).write_bytes(pdf)
+        n += 1
+    return n
+
+
+def escribir_zip(recibos, salida) -> int:
+    """Escribe los recibos en un ZIP; salida puede ser una ruta o un stream no posicionable."""
+    n = 0
+    with zipfile.ZipFile(salida, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for datos, pdf in recibos:
+            zf.writestr(datos.nombre_archivo, pdf)
+            n += 1
+    return n
+
+
+def generar_recibos(queryset, destino, procesos=None, lote=LOTE_DATOS) -> int:
+    """
+    Genera los recibos de las liquidaciones del queryset en destino:
+    directorio, ruta terminada en .zip o stream binario (ZIP).
+    Retorna la cantidad de recibos escritos.
+    """
+    recibos = renderizar_lote(bloques_datos(queryset, lote), procesos=procesos)
+    if hasattr(destino, "write") or str(destino).lower().endswith(".zip"):
+        n = escribir_zip(recibos, destino)
+    else:
+        n = escribir_directorio(recibos, destino)
+    logger.info(f"[Nómina] {n} recibos generados en {destino}")
+    return n
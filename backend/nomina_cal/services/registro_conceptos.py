@@ -0,0 +1,97 @@
+#
+# Registro en memoria de Conceptos (descripción → id)
+#
+# Evita Concepto.objects.get_or_create por línea de liquidación: el registro
+# se carga una vez por proceso, crea los conceptos faltantes en un único
+# INSERT y se invalida con las señales post_save/post_delete de Concepto
+# (ver nomina_cal/signals.py).
+#
+# Lo leído o creado dentro de una transacción recién se guarda en el
+# registro al hacer commit, para no retener ids de un rollback. Cada
+# invalidación incrementa la generación: lo leído bajo una generación
+# anterior se descarta al hacer commit en lugar de restaurar datos viejos.
+# Cada proceso (worker Celery, proceso del pool) tiene su propio registro.
+#
+
+import threading
+from django.db import transaction
+
+from nomina_cal.models import Concepto
+
+
+class RegistroConceptos:
+    def __init__(self):
+        self._ids = {}
+        self._cargado = False
+        self._generacion = 0
+        self._lock = threading.Lock()
+
+    #
+    # # Carga / invalidación
+    #
+    def calentar(self):
+        """Carga todos los conceptos existentes (una consulta)."""
+        generacion = self._generacion
+        ids = dict(Concepto.objects.values_list("descripcion", "id"))
+        transaction.on_commit(lambda: self._guardar(ids, generacion, cargado=True))
+        return ids
+
+    def invalidar(self):
+        with self._lock:
+            self._ids = {}
+            self._cargado = False
+            self._generacion += 1
+
+    def _guardar(self, ids, generacion, cargado=False):
+        with self._lock:
+            if generacion != self._generacion:
+                return
+            self._ids.update(ids)
+            self._cargado = self._cargado or cargado
+
+    #
+    # # Resolución
+    #
+    def resolver(self, conceptos_def) -> dict:
+        """
+        Retorna {descripcion: concepto_id} para los ConceptoDef indicados,
+        creando en un solo bulk_create los que no existen.
+        Con el registro caliente no hace ninguna consulta.
+        """
+        defs = {c.descripcion: c for c in conceptos_def}
+        with self._lock:
+            cargado = self._cargado
+            generacion = self._generacion
+            ids = {d: self._ids[d] for d in defs if d in self._ids}
+        if len(ids) == len(defs):
+            return ids
+
+        faltantes = defs.keys() - ids.keys()
+        if not cargado:
+            conocidos = self.calentar()
+            ids.update({d: conocidos[d] for d in faltantes if d in conocidos})
+        else:
+            encontrados = dict(
+                Concepto.objects.filter(descripcion__in=faltantes).values_list("descripcion", "id")
+            )
+            ids.update(encontrados)
+            transaction.on_commit(lambda: self._guardar(encontrados, generacion))
+
+        nuevos = defs.keys() - ids.keys()
+        if nuevos:
+            Concepto.objects.bulk_create(
+                [Concepto(descripcion=d, **defs[d].defaults()) for d in sorted(nuevos)],
+                ignore_conflicts=True,
+            )
+            creados = dict(
+                Concepto.objects.filter(descripcion__in=nuevos).values_list("descripcion", "id")
+            )
+            ids.update(creados)
+            transaction.on_commit(lambda: self._guardar(creados, generacion))
+        return ids
+
+    def obtener_id(self, concepto_def) -> int:
+        return self.resolver([concepto_def])[concepto_def.descripcion]
+
+
+registro_conceptos = RegistroConceptos()
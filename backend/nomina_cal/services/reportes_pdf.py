@@ -0,0 +1,34 @@
+#
+# Reporte general de liquidaciones en PDF
+#
+# Dibuja sobre un destino de archivo; lo usan exportar_reporte_pdf y el
+# trabajo de exportación en segundo plano (services/exportaciones.py).
+#
+
+from datetime import date
+from reportlab.pdfgen import canvas
+
+from nomina_cal.models import Liquidacion
+from nomina_cal.services.exportacion_xlsx import CHUNK_SIZE
+
+
+def reporte_liquidaciones_pdf(destino):
+    """Todas las liquidaciones (historial completo), una línea por liquidación."""
+    p = canvas.Canvas(destino)
+    p.setFont("Helvetica-Bold", 14)
+    p.drawString(180, 800, "Reporte General de Liquidaciones")
+
+    y = 770
+    filas = Liquidacion.objects.values_list(
+        "empleado__nombre", "empleado__cedula", "mes", "anio", "neto_cobrar"
+    ).iterator(chunk_size=CHUNK_SIZE)
+    for nombre, cedula, mes, anio, neto in filas:
+        p.setFont("Helvetica", 10)
+        p.drawString(50, y, f"{nombre} ({cedula}) - {mes}/{anio} - {neto} Gs")
+        y -= 20
+        if y < 50:
+            p.showPage()
+            y = 770
+
+    p.drawString(50, 40, f"Generado el {date.today().strftime('%d/%m/%Y')}")
+    p.save()
@@ -0,0 +1,204 @@
+#
+# Resumen mensual de nómina (ResumenNominaMensual)
+#
+# • marcar_periodos() / marcar_liquidaciones(): lo llaman las señales de
+#   Liquidacion y DetalleLiquidacion y los procesos masivos (cálculo por
+#   lotes, cierre). Es un upsert en PeriodoResumenPendiente: escribir una
+#   liquidación no agrega nada.
+# • agrupar_marcas(): dentro del bloque las marcas sólo se anotan y al salir
+#   se escribe un upsert por período. Lo usan aplicar_resultado() y los
+#   recálculos masivos: recalcular N liquidaciones del mes no repite el
+#   upsert por cada detalle ni toma el bloqueo de la fila del período
+#   hasta el final del cálculo.
+# • resumen(): antes de leer, reagrega los períodos pendientes con una
+#   consulta agrupada por período (services/kpis.py; su costo depende del
+#   tamaño del mes, no de la historia) y devuelve el queryset del resumen.
+# • reconstruir(): rehace todo el resumen (comando reconstruir_resumen_nomina).
+# • Marcar un período también invalida los dashboards cacheados que dependen
+#   de él (services/cache_dashboards.py).
+#
+
+import logging
+import threading
+from contextlib import contextmanager
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from nomina_cal.models import Liquidacion
+from nomina_cal.models_resumen import PeriodoResumenPendiente, ResumenNominaMensual
+from nomina_cal.services import cache_dashboards, kpis
+
+logger = logging.getLogger(__name__)
+
+CAMPOS_TOTALES = ("total_ingresos", "total_descuentos", "total_neto", "total_ips")
+
+
+#
+# # Marcado (escrituras)
+#
+_agrupadas = threading.local()
+
+
+def _escribir_marcas(periodos):
+    ahora = timezone.now()
+    PeriodoResumenPendiente.objects.bulk_create(
+        [PeriodoResumenPendiente(anio=anio, mes=mes, marcado_en=ahora) for anio, mes in periodos],
+        update_conflicts=True,
+        unique_fields=["anio", "mes"],
+        update_fields=["marcado_en"],
+    )
+    cache_dashboards.invalidar_periodos(periodos)
+
+
+def _periodos_de(liquidacion_ids):
+    return set(
+        Liquidacion.objects.filter(id__in=liquidacion_ids).order_by().values_list("anio", "mes").distinct()
+    )
+
+
+@contextmanager
+def agrupar_marcas():
+    """
+    Junta las marcas del bloque y escribe un upsert por período al salir.
+    Anidado, las escribe el bloque externo. Si el bloque falla dentro de
+    una transacción se descartan (se revierte con ella); en autocommit se
+    escriben igual, porque lo ya guardado queda.
+    """
+    if getattr(_agrupadas, "marcas", None) is not None:
+        yield
+        return
+    _agrupadas.marcas = marcas = {"periodos": set(), "liquidaciones": set()}
+    try:
+        yield
+    except BaseException:
+        _agrupadas.marcas = None
+        if not transaction.get_connection().in_atomic_block:
+            _escribir_agrupadas(marcas)
+        raise
+    _agrupadas.marcas = None
+    _escribir_agrupadas(marcas)
+
+
+def _escribir_agrupadas(marcas):
+    periodos = marcas["periodos"]
+    if marcas["liquidaciones"]:
+        periodos |= _periodos_de(marcas["liquidaciones"])
+    if periodos:
+        _escribir_marcas(periodos)
+
+
+def _agrupada(tipo, valores):
+    marcas = getattr(_agrupadas, "marcas", None)
+    if marcas is None:
+        return False
+    marcas[tipo].update(valores)
+    return True
+
+
+def marcar_periodos(periodos):
+    periodos = set(periodos)
+    if periodos and not _agrupada("periodos", periodos):
+        _escribir_marcas(periodos)
+
+
+def marcar_periodo(anio, mes):
+    marcar_periodos([(anio, mes)])
+
+
+def marcar_liquidaciones(liquidacion_ids):
+    liquidacion_ids = set(liquidacion_ids)
+    if liquidacion_ids and not _agrupada("liquidaciones", liquidacion_ids):
+        marcar_periodos(_periodos_de(liquidacion_ids))
+
+
+#
+# # Agregación de un período
+#
+def agregar_periodo(anio, mes) -> int:
+    """Reemplaza las filas del resumen del período. Retorna la cantidad de grupos."""
+    filas = kpis.kpis_por_grupo(
+        Liquidacion.objects.filter(anio=anio, mes=mes),
+        ["empleado__area", "empleado__tipo_contrato"],
+        "cantidad", "cerradas", "total_ingresos", "total_descuentos", "total_neto", "total_ips",
+    )
+    ahora = timezone.now()
+    resumenes = [
+        ResumenNominaMensual(
+            anio=anio,
+            mes=mes,
+            area=f["empleado__area"] or "",
+            tipo_contrato=f["empleado__tipo_contrato"] or "",
+            cantidad=f["cantidad"],
+            cerradas=f["cerradas"],
+            total_ingresos=f["total_ingresos"],
+            total_descuentos=f["total_descuentos"],
+            total_neto=f["total_neto"],
+            total_ips=f["total_ips"],
+            actualizado_en=ahora,
+        )
+        for f in filas
+    ]
+    with transaction.atomic():
+        ResumenNominaMensual.objects.filter(anio=anio, mes=mes).delete()
+        ResumenNominaMensual.objects.bulk_create(resumenes)
+    return len(resumenes)
+
+
+def refrescar_pendientes() -> int:
+    """Reagrega los períodos marcados. Retorna cuántos se refrescaron."""
+    refrescados = 0
+    for pk in PeriodoResumenPendiente.objects.values_list("pk", flat=True):
+        with transaction.atomic():
+            # Otro proceso que ya lo está refrescando lo tiene bloqueado
+            pendiente = PeriodoResumenPendiente.objects.select_for_update(skip_locked=True).filter(pk=pk).first()
+            if pendiente is None:
+                continue
+            agregar_periodo(pendiente.anio, pendiente.mes)
+            # Si se volvió a marcar mientras tanto, queda para la próxima lectura
+            PeriodoResumenPendiente.objects.filter(pk=pk, marcado_en=pendiente.marcado_en).delete()
+        refrescados += 1
+    return refrescados
+
+
+def reconstruir() -> int:
+    """Rehace el resumen de todos los períodos. Retorna la cantidad de períodos."""
+    periodos = list(Liquidacion.objects.order_by().values_list("anio", "mes").distinct())
+    with transaction.atomic():
+        ResumenNominaMensual.objects.all().delete()
+        PeriodoResumenPendiente.objects.all().delete()
+        for anio, mes in periodos:
+            agregar_periodo(anio, mes)
+    logger.info(f"[Nómina] Resumen mensual reconstruido: {len(periodos)} períodos")
+    return len(periodos)
+
+
+#
+# # Lecturas (dashboards)
+#
+def resumen(**filtros):
+    """Queryset del resumen al día (refresca antes los períodos pendientes)."""
+    refrescar_pendientes()
+    return ResumenNominaMensual.objects.filter(**filtros)
+
+
+def totales(**filtros) -> dict:
+    """Cantidad, sumas y neto promedio de las filas del resumen que cumplen los filtros."""
+    datos = resumen(**filtros).aggregate(
+        cantidad=Sum("cantidad"), cerradas=Sum("cerradas"), **{c: Sum(c) for c in CAMPOS_TOTALES}
+    )
+    datos["cantidad"] = datos["cantidad"] or 0
+    datos["cerradas"] = datos["cerradas"] or 0
+    for campo in CAMPOS_TOTALES:
+        datos[campo] = Decimal(datos[campo] or 0)
+    datos["promedio_neto"] = datos["total_neto"] / datos["cantidad"] if datos["cantidad"] else Decimal("0")
+    return datos
+
+
+def distribucion(campo, **filtros):
+    """[(valor de `campo`, neto total)] ordenado de mayor a menor."""
+    return [
+        (fila[campo], Decimal(fila["total"] or 0))
+        for fila in resumen(**filtros).values(campo).annotate(total=Sum("total_neto")).order_by("-total")
+    ]
@@ -0,0 +1,238 @@
+#
+# Salida de correos (outbox transaccional) para los recibos del cierre
+#
+# cerrar_liquidaciones() marca las liquidaciones como cerradas con un
+# update() e inserta en la misma transacción una SalidaCorreo por recibo a
+# enviar: si el cierre se revierte, no queda nada por enviar, y el cierre
+# nunca espera al servidor de correo.
+#
+# Confirmada la transacción, drenar_salida() corre en Celery (si hay broker)
+# o en un hilo local: toma lotes de salidas vencidas (SKIP LOCKED en
+# PostgreSQL), los envía con el pipeline masivo (services/envio_masivo.py)
+# y reprograma los fallos con espera exponencial hasta MAX_INTENTOS. Si el
+# servidor de correo no responde (falla la conexión del lote), todas las
+# salidas tomadas cuentan un intento reintentable; los rechazos permanentes
+# (destinatario inválido, SMTP 5xx) fallan en el acto. Al terminar, el
+# drenaje se reprograma para la próxima salida vencida o toma por liberar,
+# salvo que ya haya un drenaje programado antes (CLAVE_REINTENTO): cierres
+# y ticks de Beat no abren cadenas de reprogramación paralelas.
+#
+
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+
+from nomina_cal.models import Liquidacion
+from nomina_cal.models_envio import SalidaCorreo
+from nomina_cal.services import resumen_nomina
+from nomina_cal.services.corridas import usa_celery
+
+logger = logging.getLogger(__name__)
+
+LOTE_SALIDA = 200
+MAX_INTENTOS = 5
+ESPERA_BASE = 60            # segundos; se duplica en cada reintento
+TIEMPO_TOMA = timedelta(minutes=30)   # una salida "enviando" más vieja se libera
+CLAVE_PROGRAMADA = "nomina_cal:salida_correos:programada"
+CLAVE_REINTENTO = "nomina_cal:salida_correos:reintento"
+
+_pool_local = None
+
+
+#
+# # Encolado (dentro de la transacción del cierre)
+#
+def encolar_recibos(liquidacion_ids):
+    """Registra el envío del recibo de cada liquidación y programa el drenaje al confirmar."""
+    SalidaCorreo.objects.bulk_create(
+        [SalidaCorreo(liquidacion_id=pk, tipo="recibo") for pk in liquidacion_ids],
+        batch_size=500,
+        ignore_conflicts=True,  # ya hay una salida en curso para esa liquidación
+    )
+    programar_drenaje()
+
+
+def cerrar_liquidaciones(queryset) -> list:
+    """
+    Cierra las liquidaciones abiertas del queryset y encola sus recibos.
+    Retorna los ids cerrados.
+    """
+    with transaction.atomic():
+        ids = list(queryset.filter(cerrada=False).select_for_update().values_list("id", flat=True))
+        if not ids:
+            return []
+        Liquidacion.objects.filter(id__in=ids).update(cerrada=True)
+        resumen_nomina.marcar_liquidaciones(ids)
+        encolar_recibos(
+            Liquidacion.objects.filter(id__in=ids, enviado_email=False).values_list("id", flat=True)
+        )
+    return ids
+
+
+#
+# # Despacho
+#
+def _pool():
+    global _pool_local
+    if _pool_local is None:
+        _pool_local = ThreadPoolExecutor(max_workers=1, thread_name_prefix="salida-correos")
+    return _pool_local
+
+
+def _drenar_en_hilo(reintento=None):
+    try:
+        drenar_salida(reintento=reintento)
+    finally:
+        connection.close()
+
+
+def _despachar(retraso=0, reintento=None):
+    if usa_celery():
+        from nomina_cal.tasks import drenar_salida_correos
+        drenar_salida_correos.apply_async(countdown=retraso, kwargs={"reintento": reintento})
+    elif retraso:
+        temporizador = threading.Timer(retraso, lambda: _pool().submit(_drenar_en_hilo, reintento))
+        temporizador.daemon = True
+        temporizador.start()
+    else:
+        _pool().submit(_drenar_en_hilo, reintento)
+
+
+def _despachar_si_libre():
+    # Un cierre de N liquidaciones programa un solo drenaje: la clave se
+    # libera cuando el drenaje empieza, y todo lo confirmado antes lo ve.
+    if cache.add(CLAVE_PROGRAMADA, True, timeout=300):
+        _despachar()
+
+
+def programar_drenaje():
+    transaction.on_commit(_despachar_si_libre)
+
+
+def _programar_reintento(proximo):
+    """Programa el drenaje para `proximo` salvo que ya haya uno programado antes o a la par."""
+    programado = cache.get(CLAVE_REINTENTO)
+    if programado and programado["momento"] <= proximo:
+        return
+    retraso = max(0, (proximo - timezone.now()).total_seconds())
+    token = uuid.uuid4().hex
+    # Vence poco después del momento: si el temporizador se pierde, otro drenaje reprograma
+    cache.set(CLAVE_REINTENTO, {"token": token, "momento": proximo}, timeout=int(retraso) + 300)
+    _despachar(retraso=retraso, reintento=token)
+
+
+def _soltar_reintento(token):
+    # El drenaje programado libera su marca para poder reprogramarse al terminar
+    programado = cache.get(CLAVE_REINTENTO)
+    if token and programado and programado["token"] == token:
+        cache.delete(CLAVE_REINTENTO)
+
+
+#
+# # Drenaje (worker)
+#
+def _tomar(lote, ahora):
+    """Marca como "enviando" hasta `lote` salidas vencidas; otro worker no las ve."""
+    with transaction.atomic():
+        ids = list(
+            SalidaCorreo.objects.select_for_update(skip_locked=True)
+            .filter(estado="pendiente", proximo_intento__lte=ahora)
+            .order_by("proximo_intento", "id")
+            .values_list("id", flat=True)[:lote]
+        )
+        SalidaCorreo.objects.filter(id__in=ids).update(estado="enviando", proximo_intento=ahora)
+    return list(SalidaCorreo.objects.filter(id__in=ids))
+
+
+def _espera(intentos) -> timedelta:
+    return timedelta(seconds=ESPERA_BASE * 2 ** (intentos - 1))
+
+
+def _procesar(salidas, totales, ahora):
+    from nomina_cal.services.envio_masivo import enviar_recibos
+
+    resultados = {}
+    try:
+        enviar_recibos(
+            Liquidacion.objects.filter(id__in=[s.liquidacion_id for s in salidas]),
+            notificar=lambda pk, error, reintentable: resultados.__setitem__(pk, (error, reintentable)),
+        )
+    except Exception as e:
+        # Falla de conexión: lo que no llegó a tener resultado se reintenta
+        logger.exception(f"[Nómina] Sin conexión con el servidor de correo ({len(salidas)} salidas)")
+        for salida in salidas:
+            resultados.setdefault(salida.liquidacion_id, (f"Sin conexión con el servidor de correo: {e}", True))
+
+    enviadas, fallidas, reintentos = [], [], []
+    for salida in salidas:
+        # Sin resultado: ya estaba enviada (enviado_email) y no se reenvía
+        error, reintentable = resultados.get(salida.liquidacion_id, (None, False))
+        if error is None:
+            enviadas.append(salida.pk)
+            continue
+        salida.intentos += 1
+        salida.ultimo_error = error
+        if reintentable and salida.intentos < MAX_INTENTOS:
+            salida.estado = "pendiente"
+            salida.proximo_intento = ahora + _espera(salida.intentos)
+            reintentos.append(salida)
+        else:
+            salida.estado = "fallido"
+            fallidas.append(salida)
+
+    SalidaCorreo.objects.filter(id__in=enviadas).update(estado="enviado", enviado_en=timezone.now(), ultimo_error="")
+    SalidaCorreo.objects.bulk_update(
+        reintentos + fallidas, ["estado", "intentos", "proximo_intento", "ultimo_error"], batch_size=500
+    )
+    totales["enviados"] += len(enviadas)
+    totales["reintentos"] += len(reintentos)
+    totales["fallidos"] += len(fallidas)
+
+
+def _proximo_drenaje():
+    """Momento del próximo reintento o de la próxima toma vencida (None si no queda nada)."""
+    pendiente = (
+        SalidaCorreo.objects.filter(estado="pendiente")
+        .order_by("proximo_intento")
+        .values_list("proximo_intento", flat=True)
+        .first()
+    )
+    tomada = (
+        SalidaCorreo.objects.filter(estado="enviando")
+        .order_by("proximo_intento")
+        .values_list("proximo_intento", flat=True)
+        .first()
+    )
+    candidatos = [m for m in (pendiente, tomada and tomada + TIEMPO_TOMA) if m]
+    return min(candidatos) if candidatos else None
+
+
+def drenar_salida(lote=LOTE_SALIDA, reprogramar=True, reintento=None) -> dict:
+    """
+    Envía las salidas pendientes vencidas por lotes y, si quedan
+    reintentos a futuro (o tomas por liberar), se reprograma para el más
+    próximo, aunque el drenaje termine con error. `reintento` es la marca
+    con la que lo programó _programar_reintento (None: cierre o Beat).
+    """
+    cache.delete(CLAVE_PROGRAMADA)
+    _soltar_reintento(reintento)
+    ahora = timezone.now()
+    # Salidas tomadas por un worker que murió a mitad del envío
+    SalidaCorreo.objects.filter(estado="enviando", proximo_intento__lte=ahora - TIEMPO_TOMA).update(estado="pendiente")
+
+    totales = {"enviados": 0, "reintentos": 0, "fallidos": 0}
+    try:
+        while salidas := _tomar(lote, ahora):
+            _procesar(salidas, totales, ahora)
+    finally:
+        proximo = _proximo_drenaje()
+        if reprogramar and proximo:
+            _programar_reintento(proximo)
+    if any(totales.values()):
+        logger.info(f"[Nómina] Salida de correos: {totales}")
+    return totales
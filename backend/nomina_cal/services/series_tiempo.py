@@ -0,0 +1,135 @@
+#
+# Series de tiempo mensuales para gráficos
+#
+# • ventana(n, hasta) / meses(desde, hasta): meses calendario consecutivos
+#   [(anio, mes)], sin saltos ni duplicados (nada de timedelta(days=30)).
+# • serie(periodos, medida, agrupar, **filtros): una sola consulta agrupada
+#   por (anio, mes[, grupo]) acotada al rango de la ventana; los meses sin
+#   datos quedan en 0.
+#
+#   agrupar=None / "area" / "tipo_contrato" leen del resumen mensual
+#   (services/resumen_nomina.py); agrupar="concepto" suma los montos de
+#   DetalleLiquidacion. Los **filtros se aplican tal cual al queryset de
+#   la fuente (p. ej. area="IT" o concepto__es_debito=True).
+#
+
+from decimal import Decimal
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+
+from nomina_cal.models import DetalleLiquidacion
+from nomina_cal.services import resumen_nomina
+
+# Medidas disponibles sobre el resumen mensual
+MEDIDAS = {
+    "neto": "total_neto",
+    "ingresos": "total_ingresos",
+    "descuentos": "total_descuentos",
+    "ips": "total_ips",
+    "cantidad": "cantidad",
+}
+AGRUPACIONES = ("area", "tipo_contrato", "concepto")
+TOTAL = "total"
+
+
+#
+# # Ventanas de meses
+#
+def siguiente(periodo):
+    anio, mes = periodo
+    return (anio + 1, 1) if mes == 12 else (anio, mes + 1)
+
+
+def anterior(periodo):
+    anio, mes = periodo
+    return (anio - 1, 12) if mes == 1 else (anio, mes - 1)
+
+
+def meses(desde, hasta):
+    """[(anio, mes)] de `desde` a `hasta` inclusive."""
+    if desde > hasta:
+        raise ValueError("El período inicial es posterior al final.")
+    periodos = [desde]
+    while periodos[-1] != hasta:
+        periodos.append(siguiente(periodos[-1]))
+    return periodos
+
+
+def mes_actual():
+    hoy = timezone.localdate()
+    return hoy.year, hoy.month
+
+
+def ventana(n, hasta=None):
+    """Los n meses calendario que terminan en `hasta` (mes actual por defecto)."""
+    if n < 1:
+        raise ValueError("La ventana debe tener al menos un mes.")
+    hasta = hasta or mes_actual()
+    desde = hasta
+    for _ in range(n - 1):
+        desde = anterior(desde)
+    return meses(desde, hasta)
+
+
+def filtro_rango(desde, hasta, prefijo=""):
+    """Q de los períodos entre `desde` y `hasta` (usa el índice (anio, mes))."""
+    anio, mes = f"{prefijo}anio", f"{prefijo}mes"
+    return (
+        (Q(**{f"{anio}__gt": desde[0]}) | Q(**{anio: desde[0], f"{mes}__gte": desde[1]}))
+        & (Q(**{f"{anio}__lt": hasta[0]}) | Q(**{anio: hasta[0], f"{mes}__lte": hasta[1]}))
+    )
+
+
+#
+# # Series
+#
+def _filas(periodos, medida, agrupar, filtros):
+    if agrupar == "concepto":
+        return (
+            DetalleLiquidacion.objects.filter(filtro_rango(periodos[0], periodos[-1], "liquidacion__"), **filtros)
+            .values(anio_=F("liquidacion__anio"), mes_=F("liquidacion__mes"), grupo_=F("concepto__descripcion"))
+            .annotate(valor=Sum("monto"))
+            .order_by()
+        )
+    if medida not in MEDIDAS:
+        raise ValueError(f"Medida desconocida: {medida}")
+    claves = {"anio_": F("anio"), "mes_": F("mes")}
+    if agrupar:
+        claves["grupo_"] = F(agrupar)
+    return (
+        resumen_nomina.resumen()
+        .filter(filtro_rango(periodos[0], periodos[-1]), **filtros)
+        .values(**claves)
+        .annotate(valor=Sum(MEDIDAS[medida]))
+        .order_by()
+    )
+
+
+def serie(periodos, medida="neto", agrupar=None, **filtros) -> dict:
+    """{grupo: [valor por período]} alineado con `periodos`.
+
+    Sin agrupar la única clave es TOTAL. Los grupos quedan ordenados por
+    su total en la ventana, de mayor a menor.
+    """
+    if agrupar is not None and agrupar not in AGRUPACIONES:
+        raise ValueError(f"Agrupación desconocida: {agrupar}")
+    periodos = list(periodos)
+    if not periodos:
+        return {}
+    posicion = {p: i for i, p in enumerate(periodos)}
+    series = {} if agrupar else {TOTAL: [Decimal("0")] * len(periodos)}
+    for fila in _filas(periodos, medida, agrupar, filtros):
+        i = posicion.get((fila["anio_"], fila["mes_"]))
+        if i is None:
+            continue
+        grupo = (fila.get("grupo_") or "") if agrupar else TOTAL
+        valores = series.setdefault(grupo, [Decimal("0")] * len(periodos))
+        valores[i] += Decimal(fila["valor"] or 0)
+    return dict(sorted(series.items(), key=lambda item: sum(item[1]), reverse=True))
+
+
+def serie_total(periodos, medida="neto", **filtros):
+    """[(anio, mes, valor)] sin agrupar."""
+    periodos = list(periodos)
+    valores = serie(periodos, medida, **filtros).get(TOTAL, [])
+    return [(anio, mes, valor) for (anio, mes), valor in zip(periodos, valores)]
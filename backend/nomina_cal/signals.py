@@ -1,34 +1,101 @@
 #
-# Señales de la app Nómina (envío automático de recibos)
+# Señales de la app Nómina (encolado de recibos al cerrar)
 #
 
 import logging
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
-from .models import Liquidacion
+from .models import Liquidacion, DetalleLiquidacion, Concepto, SalarioMinimo
+from .models_descuento import Descuento
+from .services import cache_dashboards, recalculo_incremental, resumen_nomina
+from empleados.models import Empleado, Hijo
+from asistencia.models import RegistroAsistencia
 
 logger = logging.getLogger(__name__)
 
 @receiver(post_save, sender=Liquidacion)
-def auto_enviar_recibo_al_cerrar(sender, instance: Liquidacion, created, **kwargs):
+def encolar_recibo_al_cerrar(sender, instance: Liquidacion, created, **kwargs):
     """
-    Si la liquidación está cerrada y aún no se envió el recibo,
-    dispara el envío automático por email.
+    Si la liquidación quedó cerrada y aún no se envió el recibo, lo deja en
+    la salida de correos; el envío ocurre después del commit, fuera del request.
     """
-    try:
-        if instance.cerrada and not instance.enviado_email:
-            # Import local para evitar import circular
-            from .utils_email import enviar_recibo_email
-            ok = enviar_recibo_email(instance)
-            if ok:
-                logger.info(
-                    f"[Nómina] Recibo enviado automáticamente: "
-                    f"{instance.empleado} - {instance.mes}/{instance.anio}"
-                )
-            else:
-                logger.error(
-                    f"[Nómina] Falló el envío automático del recibo: "
-                    f"{instance.empleado} - {instance.mes}/{instance.anio}"
-                )
-    except Exception as e:
-        logger.exception(f"[Nómina] Error en signal auto_enviar_recibo_al_cerrar: {e}")
+    if instance.cerrada and not instance.enviado_email:
+        from .services.salida_correos import encolar_recibos
+        encolar_recibos([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=Concepto)
+def invalidar_registro_conceptos(sender, **kwargs):
+    """Un alta/edición/baja de Concepto invalida el registro en memoria."""
+    from .services.registro_conceptos import registro_conceptos
+    registro_conceptos.invalidar()
+
+
+@receiver([post_save, post_delete], sender=SalarioMinimo)
+def invalidar_linea_salario_minimo(sender, **kwargs):
+    """Un alta/edición/baja de SalarioMinimo invalida la línea de tiempo en memoria."""
+    from .services.linea_salario_minimo import linea_salario_minimo
+    linea_salario_minimo.invalidar()
+
+
+#
+# # Recálculo incremental: marcar liquidaciones afectadas
+#
+@receiver(pre_save, sender=Empleado)
+def marcar_por_cambio_salario(sender, instance: Empleado, **kwargs):
+    if not instance.pk:
+        return
+    anterior = Empleado.objects.filter(pk=instance.pk).values_list("salario_base", flat=True).first()
+    if anterior != instance.salario_base:
+        recalculo_incremental.marcar_empleado(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Hijo)
+@receiver([post_save, post_delete], sender=Descuento)
+def marcar_por_hijo_o_descuento(sender, instance, **kwargs):
+    recalculo_incremental.marcar_empleado(instance.empleado_id)
+
+
+@receiver([post_save, post_delete], sender=SalarioMinimo)
+def marcar_por_salario_minimo(sender, instance: SalarioMinimo, **kwargs):
+    recalculo_incremental.marcar_desde(instance.vigente_desde)
+
+
+@receiver([post_save, post_delete], sender=RegistroAsistencia)
+def marcar_por_asistencia(sender, instance: RegistroAsistencia, **kwargs):
+    recalculo_incremental.marcar_empleado(
+        instance.empleado_id, mes=instance.fecha.month, anio=instance.fecha.year
+    )
+
+
+#
+# # Resumen mensual: marcar períodos a reagregar
+#
+@receiver([post_save, post_delete], sender=Liquidacion)
+def marcar_resumen_por_liquidacion(sender, instance: Liquidacion, **kwargs):
+    resumen_nomina.marcar_periodo(instance.anio, instance.mes)
+
+
+@receiver(pre_save, sender=Empleado)
+def marcar_resumen_por_area_o_contrato(sender, instance: Empleado, **kwargs):
+    if not instance.pk:
+        return
+    anterior = Empleado.objects.filter(pk=instance.pk).values_list("area", "tipo_contrato").first()
+    if anterior and anterior != (instance.area, instance.tipo_contrato):
+        resumen_nomina.marcar_periodos(
+            Liquidacion.objects.filter(empleado_id=instance.pk).order_by().values_list("anio", "mes").distinct()
+        )
+
+
+@receiver([post_save, post_delete], sender=DetalleLiquidacion)
+def marcar_resumen_por_detalle(sender, instance: DetalleLiquidacion, **kwargs):
+    # Dentro de agrupar_marcas() sólo se anota el id; el período se resuelve al salir
+    resumen_nomina.marcar_liquidaciones([instance.liquidacion_id])
+
+
+#
+# # Dashboards cacheados: empleados activos, nombres y cargos
+#
+@receiver([post_save, post_delete], sender=Empleado)
+def invalidar_dashboards_por_empleado(sender, **kwargs):
+    cache_dashboards.invalidar(cache_dashboards.EMPLEADOS)
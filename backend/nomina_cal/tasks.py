@@ -4,46 +4,24 @@
 # Incluye:
 # - Debug de prueba con logger
 # - Generación automática de nóminas
-# - Envío de recibos de sueldo por email (PDF + HTML)
+# - Cálculo particionado de un período (un rango de empleados por tarea)
+# - Corridas de nómina asíncronas (calcular abiertas, período, cierre)
+# - Exportaciones de reportes en segundo plano (y purga de vencidas)
+# - Envío masivo de recibos de sueldo por email (PDF adjunto)
 # - Tarea combinada (generar + enviar)
 #
 
 from celery import shared_task
-from django.core.mail import EmailMessage, send_mail
-from django.template.loader import render_to_string
+from django.core.mail import send_mail
 from django.conf import settings
 from datetime import date, datetime
-from empleados.models import Empleado
-from .models import Nomina
-from .views import calcular_nomina_internal
-import io
-from reportlab.pdfgen import canvas
+from django.db import OperationalError
+from .models import Liquidacion
 import logging
 
 # Configuración de logger
 logger = logging.getLogger(__name__)
 
-#
-# # Helper: Generar PDF de recibo
-#
-def generar_pdf_nomina(nomina, empleado):
-    """
-    Genera un PDF simple en memoria con datos de la nómina.
-    Retorna un buffer listo para adjuntar en email.
-    """
-    buffer = io.BytesIO()
-    p = canvas.Canvas(buffer)
-    p.setFont("Helvetica-Bold", 14)
-    p.drawString(200, 800, "Recibo de Pago")
-    p.setFont("Helvetica", 12)
-    p.drawString(50, 770, f"Empleado: {empleado.nombre} {empleado.apellido}")
-    p.drawString(50, 750, f"Fecha: {nomina.fecha}")
-    p.drawString(50, 730, f"Total Neto: {float(nomina.total):,.0f} Gs")
-    p.showPage()
-    p.save()
-    buffer.seek(0)
-    return buffer
-
 #
 # # Tarea de prueba
 #
@@ -59,58 +37,120 @@ def debug_task():
 #
 # # Generar Nóminas Automáticamente
 #
+def _periodo_actual():
+    from .services.calculo_nomina import PeriodoLiquidacion
+
+    hoy = date.today()
+    return PeriodoLiquidacion(anio=hoy.year, mes=hoy.month)
+
+
 @shared_task
 def generar_nominas_mensuales():
     """
-    Genera todas las nóminas de empleados automáticamente.
+    Genera todas las liquidaciones del mes en curso automáticamente,
+    repartiendo rangos de empleados entre workers Celery (chord: no espera
+    a los rangos; consolidar_rangos registra el resumen).
      Ejecutar a fin de mes con Celery Beat.
     """
-    empleados = Empleado.objects.all()
-    generadas = []
-
-    for emp in empleados:
-        nomina = calcular_nomina_internal(emp)  #  usamos la lógica central
-        generadas.append(nomina.id)
+    from .services.calculo_paralelo import encolar_periodo_celery
 
-    mensaje = f" {len(generadas)} nóminas generadas automáticamente el {date.today()}"
+    rangos = encolar_periodo_celery(_periodo_actual())
+    mensaje = f" {len(rangos)} rangos de liquidaciones encolados el {date.today()}"
     logger.info(mensaje)
     return mensaje
 
 #
-# # Enviar Recibos por Correo (PDF + HTML)
+# # Cálculo de un rango de empleados (unidad del runner particionado)
 #
-@shared_task
-def enviar_recibos_email():
+@shared_task(bind=True, max_retries=3)
+def calcular_rango_periodo(self, anio, mes, id_desde, id_hasta, corrida_id=None):
     """
-    Envía un PDF por correo a cada empleado con su último recibo de sueldo.
-    - PDF en memoria adjunto.
-    - Soporte HTML en cuerpo de email.
-    - Envía resumen al administrador.
+    Calcula las liquidaciones de un rango de ids de empleado en una
+    transacción corta. Idempotente: puede reintentarse sin efectos extra.
+    No propaga errores: un rango fallido (agotados los reintentos por
+    OperationalError) vuelve como {"rango", "error"} y el chord consolida igual.
     """
-    enviados = 0
+    from .services.calculo_paralelo import calcular_rango, rango_fallido
+    from .services.corridas import avanzar_corrida
 
-    for empleado in Empleado.objects.all():
-        nomina = Nomina.objects.filter(empleado=empleado).last()
-        if not nomina or not empleado.usuario.email:  #  validación extra
-            continue
+    try:
+        resultado = calcular_rango(anio, mes, id_desde, id_hasta)
+    except Exception as e:
+        if isinstance(e, OperationalError) and self.request.retries < self.max_retries:
+            raise self.retry(exc=e, countdown=2 ** self.request.retries)
+        resultado = rango_fallido(anio, mes, (id_desde, id_hasta), e)
+    if corrida_id is not None:
+        avanzar_corrida(corrida_id)
+    return resultado
 
-        # Generar PDF
-        pdf_buffer = generar_pdf_nomina(nomina, empleado)
 
-        # Renderizar cuerpo en HTML
-        cuerpo_html = render_to_string(
-            "emails/recibo_nomina.html",  #  plantilla HTML en templates/emails/
-            {"empleado": empleado, "nomina": nomina}
-        )
+@shared_task
+def consolidar_rangos(resultados, anio, mes, corrida_id=None):
+    """Callback del chord: consolida los rangos y cierra la corrida, si la hay."""
+    from .services.calculo_paralelo import resumir_periodo
+    from .services.corridas import finalizar_corrida_periodo
+
+    resumen = resumir_periodo(anio, mes, resultados, "celery")
+    if corrida_id is not None:
+        finalizar_corrida_periodo(corrida_id, resumen)
+    resumen.pop("resultados")
+    return resumen
+
+
+#
+# # Corridas de nómina (CorridaNomina) encoladas desde la API
+#
+@shared_task
+def ejecutar_corrida_nomina(corrida_id):
+    """Ejecuta una corrida asíncrona y reporta su progreso en la base."""
+    from .services.corridas import ejecutar_corrida
+
+    return ejecutar_corrida(corrida_id).estado
 
-        # Crear y enviar email
-        asunto = f" Recibo de Sueldo - {nomina.fecha}"
-        email = EmailMessage(asunto, cuerpo_html, to=[empleado.usuario.email])
-        email.content_subtype = "html"  #  especificamos que es HTML
-        email.attach("recibo.pdf", pdf_buffer.read(), "application/pdf")
-        email.send()
+#
+# # Exportaciones de reportes en segundo plano
+#
+@shared_task
+def generar_exportacion_reporte(exportacion_id):
+    """Genera el archivo de una ExportacionReporte encolada desde la API."""
+    from .services.exportaciones import ejecutar_exportacion
+
+    return ejecutar_exportacion(exportacion_id).estado
+
+
+@shared_task
+def purgar_exportaciones_vencidas():
+    """Borra los archivos de exportaciones vencidas (programable con Celery Beat)."""
+    from .services.exportaciones import purgar_vencidas
+
+    return purgar_vencidas()
+
+
+@shared_task
+def drenar_salida_correos(reintento=None):
+    """Envía los recibos pendientes de la salida de correos (services/salida_correos.py)."""
+    from .services.salida_correos import drenar_salida
 
-        enviados += 1
+    return drenar_salida(reintento=reintento)
+
+#
+# # Enviar Recibos por Correo (envío masivo)
+#
+@shared_task
+def enviar_recibos_email():
+    """
+    Envía por correo a cada empleado su último recibo de sueldo aún no enviado.
+    - Corrida de envío (CorridaNomina "envio_recibos") con punto de control
+      por bloque: si se interrumpe, volver a ejecutarla no reenvía lo enviado.
+    - Envía resumen al administrador.
+    """
+    from .models_corrida import CorridaNomina
+    from .services.corridas import ejecutar_corrida
+
+    corrida = ejecutar_corrida(
+        CorridaNomina.objects.create(tipo="envio_recibos", parametros={"reenviar": False}).pk
+    )
+    enviados = (corrida.resultado or {}).get("enviados", 0)
 
     # Notificación al admin con resumen
     if enviados > 0 and hasattr(settings, "EMAIL_HOST_USER"):
@@ -132,11 +172,13 @@ def enviar_recibos_email():
 @shared_task
 def generar_y_enviar_nominas():
     """
-    Genera las nóminas del mes y luego envía los recibos.
+    Genera las nóminas del mes y luego envía los recibos (el envío es el
+    paso siguiente del chord, cuando terminaron todos los rangos).
      Ideal para programar con Celery Beat (ej: 28 de cada mes).
     """
-    generar_nominas_mensuales()
-    enviar_recibos_email()
-    mensaje = f" Nóminas generadas y recibos enviados el {date.today()}"
+    from .services.calculo_paralelo import encolar_periodo_celery
+
+    encolar_periodo_celery(_periodo_actual(), despues=enviar_recibos_email.si())
+    mensaje = f" Nóminas y envío de recibos encolados el {date.today()}"
     logger.info(mensaje)
     return mensaje
@@ -0,0 +1,89 @@
+# backend/nomina_cal/tests/test_benchmark.py
+#
+# Tests del benchmark de nómina: generador de empresa sintética, medición
+# (consultas, memoria, errores) y comando benchmark_nomina con línea base
+# y comparación de regresiones.
+#
+
+import io
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from empleados.models import Empleado, Hijo
+from nomina_cal.benchmarks.generador import ParametrosEmpresa, generar_empresa
+from nomina_cal.benchmarks.medicion import medir
+from nomina_cal.models import Liquidacion
+from nomina_cal.tests.utils import SinAuditoriaMixin
+
+
+class GeneradorEmpresaTests(TestCase):
+    def test_genera_cantidades_deterministas(self):
+        p = ParametrosEmpresa(empleados=30, hijos_por_empleado=1.5, descuentos_por_empleado=0.5,
+                              dias_asistencia=2, meses_historial=2, semilla=7)
+        empresa = generar_empresa(10, 2025, p)
+
+        self.assertEqual(empresa.cantidades["empleados"], 30)
+        self.assertEqual(Empleado.objects.count(), 30)
+        self.assertEqual(Hijo.objects.count(), empresa.cantidades["hijos"])
+        self.assertEqual(empresa.cantidades["asistencias"], 60)
+        self.assertEqual(Liquidacion.objects.filter(cerrada=True).count(), 60)
+        self.assertFalse(Liquidacion.objects.filter(mes=10, anio=2025).exists())
+
+
+class MedicionTests(TestCase):
+    def test_registra_error_sin_propagar(self):
+        m = medir(lambda: 1 / 0)
+        self.assertIn("ZeroDivisionError", m["error"])
+        self.assertEqual(m["consultas"], 0)
+        self.assertIsNotNone(m["memoria_pico_kb"])
+
+    def test_cuenta_consultas(self):
+        m = medir(lambda: list(Empleado.objects.all()), memoria=False)
+        self.assertEqual(m["consultas"], 1)
+        self.assertIsNone(m["memoria_pico_kb"])
+
+
+class BenchmarkNominaCommandTests(SinAuditoriaMixin, TestCase):
+    def _ejecutar(self, *args):
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio, ignore_errors=True)
+        salida = Path(directorio) / "base.json"
+        call_command(
+            "benchmark_nomina", "--tamanios", "15", "--mes", "10", "--anio", "2025",
+            "--escenarios", "calculo_periodo,dashboard_admin,recibos", "--max-recibos", "3",
+            "--salida", str(salida), *args, stdout=io.StringIO(),
+        )
+        return salida, json.loads(salida.read_text(encoding="utf-8"))
+
+    def test_guarda_linea_base_y_revierte_los_datos(self):
+        _, informe = self._ejecutar()
+
+        datos = informe["tamanios"]["15"]
+        self.assertEqual(datos["empresa"]["empleados"], 15)
+        self.assertEqual(datos["escenarios"]["calculo_periodo"]["resultado"], {"liquidaciones": 15})
+        self.assertEqual(datos["escenarios"]["recibos"]["resultado"]["recibos"], 3)
+        for m in datos["escenarios"].values():
+            self.assertNotIn("error", m)
+            self.assertGreater(m["consultas"], 0)
+        self.assertEqual(Empleado.objects.count(), 0)
+
+    def test_comparar_detecta_regresion_de_consultas(self):
+        salida, informe = self._ejecutar()
+        informe["tamanios"]["15"]["escenarios"]["calculo_periodo"]["consultas"] = 1
+        salida.write_text(json.dumps(informe), encoding="utf-8")
+
+        with self.assertRaises(CommandError):
+            call_command(
+                "benchmark_nomina", "--tamanios", "15", "--mes", "10", "--anio", "2025",
+                "--escenarios", "calculo_periodo", "--comparar", str(salida),
+                stdout=io.StringIO(),
+            )
+
+    def test_escenario_desconocido(self):
+        with self.assertRaises(CommandError):
+            call_command("benchmark_nomina", "--escenarios", "inexistente")
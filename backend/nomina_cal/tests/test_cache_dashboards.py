@@ -0,0 +1,163 @@
+# backend/nomina_cal/tests/test_cache_dashboards.py
+#
+# Tests de la caché de dashboards: aciertos sin consultas, invalidación
+# sólo de los períodos tocados (al confirmar), stale-while-revalidate y
+# claves válidas para memcached.
+#
+
+import time
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from empleados.models import Empleado
+from nomina_cal.models import Liquidacion
+from nomina_cal.services import cache_dashboards
+from nomina_cal.tests.utils import SinAuditoriaMixin
+
+User = get_user_model()
+
+
+class _PoolDiferido:
+    """Guarda las tareas de revalidación para ejecutarlas desde el test."""
+
+    def __init__(self):
+        self.tareas = []
+
+    def submit(self, fn, *args):
+        self.tareas.append((fn, args))
+
+
+@override_settings(DASHBOARD_CACHE_TTL=3600, DASHBOARD_CACHE_STALE_SEGUNDOS=0)
+class CacheDashboardsTests(SinAuditoriaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.empleado = self._empleado("550000")
+        with self.captureOnCommitCallbacks(execute=True):
+            self._liquidar(2025, 10, "1000000.00")
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser("admin", "a@a.com", "x"))
+
+    def _empleado(self, cedula):
+        return Empleado.objects.create(
+            nombre="Emp", apellido="Cache", cedula=cedula,
+            fecha_ingreso=date(2020, 1, 1), salario_base=Decimal("1000000.00"),
+        )
+
+    def _liquidar(self, anio, mes, neto, empleado=None):
+        return Liquidacion.objects.create(
+            empleado=empleado or self.empleado, mes=mes, anio=anio, neto_cobrar=Decimal(neto)
+        )
+
+    def _kpis(self):
+        return self.client.get(reverse("analytics_kpis"), {"mes": 10, "anio": 2025}).data
+
+    def test_acierto_sin_consultas(self):
+        primera = self.client.get(reverse("dashboard_gerente_cbv")).data
+        with self.assertNumQueries(0):
+            segunda = self.client.get(reverse("dashboard_gerente_cbv")).data
+        self.assertEqual(primera, segunda)
+
+    def test_invalida_solo_los_periodos_tocados(self):
+        self.assertEqual(self._kpis()["total_nomina_mes"], 1000000.0)
+
+        # Un período fuera de la ventana de 12 meses no invalida los KPIs de 10/2025
+        with self.captureOnCommitCallbacks(execute=True):
+            self._liquidar(2023, 1, "5000000.00")
+        with self.assertNumQueries(0):
+            self._kpis()
+
+        # Sin confirmar la transacción, la versión no cambia
+        otro = self._empleado("550001")
+        self._liquidar(2025, 10, "2000000.00", otro)
+        self.assertEqual(self._kpis()["total_nomina_mes"], 1000000.0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            cache_dashboards.invalidar_periodos([(2025, 10)])
+        self.assertEqual(self._kpis()["total_nomina_mes"], 3000000.0)
+
+        # El dashboard por rol depende de toda la historia y de los empleados
+        r = self.client.get(reverse("dashboard_admin_cbv")).data
+        self.assertEqual(r["kpis"]["total_empleados"], 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            Empleado.objects.filter(pk=otro.pk).update(activo=False)
+            otro.refresh_from_db()
+            otro.save()
+        r = self.client.get(reverse("dashboard_admin_cbv")).data
+        self.assertEqual(r["kpis"]["total_empleados"], 1)
+
+    def _invalidar_10_2025(self, neto):
+        with self.captureOnCommitCallbacks(execute=True):
+            self._liquidar(2025, 10, neto, self._empleado(f"55{Liquidacion.objects.count():04d}"))
+
+    @override_settings(DASHBOARD_CACHE_STALE_SEGUNDOS=60)
+    def test_stale_while_revalidate(self):
+        self.assertEqual(self._kpis()["total_nomina_mes"], 1000000.0)
+        self._invalidar_10_2025("2000000.00")
+
+        pool = _PoolDiferido()
+        # La antigüedad de la entrada no importa: se sirve vencida y se agenda un único recálculo
+        reloj = SimpleNamespace(time=lambda: time.time() + 7200, time_ns=time.time_ns)
+        with mock.patch.object(cache_dashboards, "_pool", return_value=pool), \
+                mock.patch.object(cache_dashboards, "time", reloj):
+            with self.assertNumQueries(0):
+                self.assertEqual(self._kpis()["total_nomina_mes"], 1000000.0)
+                self.assertEqual(self._kpis()["total_nomina_mes"], 1000000.0)
+        self.assertEqual(len(pool.tareas), 1)
+
+        fn, args = pool.tareas[0]
+        with mock.patch.object(cache_dashboards, "connection"):
+            fn(*args)
+        with self.assertNumQueries(0):
+            self.assertEqual(self._kpis()["total_nomina_mes"], 3000000.0)
+
+    @override_settings(DASHBOARD_CACHE_STALE_SEGUNDOS=60)
+    def test_vencida_sin_recalculo_se_calcula_en_linea(self):
+        self._kpis()
+        self._invalidar_10_2025("2000000.00")
+        pool = _PoolDiferido()
+        with mock.patch.object(cache_dashboards, "_pool", return_value=pool):
+            self.assertEqual(self._kpis()["total_nomina_mes"], 1000000.0)
+        # El recálculo de fondo falla: libera el lock sin reemplazar la entrada
+        self._fallar(pool.tareas[-1])
+
+        # Dentro de la ventana (medida desde que se vio vencida) se reintenta en segundo plano
+        reloj = SimpleNamespace(time=lambda: time.time() + 30, time_ns=time.time_ns)
+        with mock.patch.object(cache_dashboards, "_pool", return_value=pool), \
+                mock.patch.object(cache_dashboards, "time", reloj):
+            self.assertEqual(self._kpis()["total_nomina_mes"], 1000000.0)
+        self.assertEqual(len(pool.tareas), 2)
+        self._fallar(pool.tareas[-1])
+
+        # Pasada la ventana, quien toma el lock calcula en línea
+        reloj = SimpleNamespace(time=lambda: time.time() + 90, time_ns=time.time_ns)
+        with mock.patch.object(cache_dashboards, "_pool", return_value=pool), \
+                mock.patch.object(cache_dashboards, "time", reloj):
+            self.assertEqual(self._kpis()["total_nomina_mes"], 3000000.0)
+        self.assertEqual(len(pool.tareas), 2)
+        clave = pool.tareas[0][1][0]
+        self.assertIsNone(cache.get(f"{clave}:lock"))
+
+    def _fallar(self, tarea):
+        fn, (clave, _, claves_version) = tarea
+        with mock.patch.object(cache_dashboards, "connection"), \
+                mock.patch.object(cache_dashboards.logger, "exception"):
+            fn(clave, mock.Mock(side_effect=RuntimeError("sin base")), claves_version)
+
+    def test_claves_validas_para_memcached(self):
+        clave = cache_dashboards._clave("kpis", {"anio": 2025, "areas": ("IT", "RRHH"), "mes": None})
+        self.assertRegex(clave, r"^dashboards:kpis:[0-9a-f]{64}$")
+        self.assertNotEqual(clave, cache_dashboards._clave("kpis", {"anio": "2025", "areas": ("IT", "RRHH")}))
+
+    @override_settings(DASHBOARD_CACHE_TTL=0)
+    def test_desactivada(self):
+        self._kpis()
+        with self.assertNumQueries(5):
+            self._kpis()
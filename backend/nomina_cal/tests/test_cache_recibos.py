@@ -0,0 +1,122 @@
+# backend/nomina_cal/tests/test_cache_recibos.py
+#
+# Tests de la caché de recibos PDF: reutilización por contenido,
+# invalidación al recalcular y respuestas condicionales (ETag).
+#
+
+import shutil
+import tempfile
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from empleados.models import Empleado
+from nomina_cal.models import Liquidacion, SalarioMinimo
+from nomina_cal.services import cache_recibos
+from nomina_cal.services.cache_recibos import obtener_recibo
+from nomina_cal.services.linea_salario_minimo import linea_salario_minimo
+from nomina_cal.services.registro_conceptos import registro_conceptos
+from nomina_cal.services.calculo_individual import calcular_liquidacion
+from nomina_cal.services.plantilla_recibo import PlantillaRecibo
+from nomina_cal.tests.utils import SinAuditoriaMixin
+
+User = get_user_model()
+
+
+class CacheRecibosTests(SinAuditoriaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        ajuste = override_settings(MEDIA_ROOT=media)
+        ajuste.enable()
+        self.addCleanup(ajuste.disable)
+        # Los callbacks on_commit ejecutados guardan ids de este test en los registros
+        self.addCleanup(registro_conceptos.invalidar)
+        self.addCleanup(linea_salario_minimo.invalidar)
+
+        SalarioMinimo.objects.create(monto=Decimal("2800000.00"), vigente_desde=date(2025, 1, 1), vigente=True)
+        self.emp = Empleado.objects.create(
+            nombre="Ana", apellido="Cache", cedula="660001",
+            fecha_ingreso=date(2020, 1, 1), salario_base=Decimal("3000000.00"),
+        )
+        self.liq = Liquidacion.objects.create(empleado=self.emp, mes=10, anio=2025)
+        calcular_liquidacion(self.liq)
+        self.liq.refresh_from_db()
+
+    def _contar_renders(self):
+        original = PlantillaRecibo.renderizar
+        patcher = mock.patch.object(PlantillaRecibo, "renderizar", autospec=True, side_effect=original)
+        renders = patcher.start()
+        self.addCleanup(patcher.stop)
+        return renders
+
+    def test_mismo_estado_reutiliza_el_archivo(self):
+        renders = self._contar_renders()
+        primero = obtener_recibo(self.liq)
+        segundo = obtener_recibo(Liquidacion.objects.get(pk=self.liq.pk))
+
+        self.assertEqual(renders.call_count, 1)
+        self.assertEqual(primero, segundo)
+        self.assertTrue(default_storage.exists(primero.ruta))
+        self.assertEqual(Liquidacion.objects.get(pk=self.liq.pk).recibo_pdf, primero.ruta)
+        self.assertTrue(primero.leer().startswith(b"%PDF"))
+
+    def test_recalculo_invalida_y_borra_la_copia(self):
+        anterior = obtener_recibo(self.liq)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            calcular_liquidacion(self.liq)
+        self.liq.refresh_from_db()
+
+        self.assertEqual(self.liq.recibo_pdf, "")
+        self.assertFalse(default_storage.exists(anterior.ruta))
+        self.assertNotEqual(obtener_recibo(self.liq).clave, anterior.clave)
+
+    def test_cerrada_reutiliza_sin_consultas(self):
+        recibo = obtener_recibo(self.liq)
+        Liquidacion.objects.filter(pk=self.liq.pk).update(cerrada=True)
+        cerrada = Liquidacion.objects.get(pk=self.liq.pk)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(obtener_recibo(cerrada), recibo)
+
+    def test_generacion_concurrente_conserva_la_ruta_canonica(self):
+        recibo = obtener_recibo(self.liq)
+        renders = self._contar_renders()
+        existe, llamadas = default_storage.exists, []
+
+        def no_ve_el_primero(ruta):
+            # El segundo request no ve el archivo del primero en su primer exists()
+            llamadas.append(ruta)
+            return len(llamadas) > 1 and existe(ruta)
+
+        with mock.patch.object(default_storage, "exists", side_effect=no_ve_el_primero):
+            segundo = obtener_recibo(Liquidacion.objects.get(pk=self.liq.pk))
+
+        self.assertEqual(renders.call_count, 1)
+        self.assertEqual(segundo, recibo)
+        self.assertEqual(Liquidacion.objects.get(pk=self.liq.pk).recibo_pdf, recibo.ruta)
+        directorio, nombre = cache_recibos.posixpath.split(recibo.ruta)
+        self.assertEqual(default_storage.listdir(directorio)[1], [nombre])
+
+    def test_vista_pdf_con_etag_y_last_modified(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_superuser("admin", "a@a.com", "x"))
+        url = reverse("nomina-pdf", args=[self.liq.pk])
+
+        r = client.get(url)
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r["Content-Type"], "application/pdf")
+        self.assertTrue(b"".join(r.streaming_content).startswith(b"%PDF"))
+        etag = r["ETag"]
+
+        r = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(r.status_code, 304)
+        r = client.get(url, HTTP_IF_MODIFIED_SINCE=r["Last-Modified"])
+        self.assertEqual(r.status_code, 304)
@@ -0,0 +1,95 @@
+# backend/nomina_cal/tests/test_calculo_bulk.py
+#
+# Tests del motor bulk de calcular_liquidaciones_periodo:
+# debe producir exactamente los mismos detalles y totales que el modo fila
+# con muchas menos consultas.
+#
+
+from datetime import date
+from decimal import Decimal
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from empleados.models import Empleado, Hijo
+from nomina_cal.models import Liquidacion, SalarioMinimo, DetalleLiquidacion
+from nomina_cal.models_descuento import Descuento
+from nomina_cal.services.calculo_nomina import calcular_liquidaciones_periodo, PeriodoLiquidacion
+from nomina_cal.tests.utils import SinAuditoriaMixin
+
+
+class CalculoPeriodoBulkTests(SinAuditoriaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        SalarioMinimo.objects.create(monto=Decimal("2800000.00"), vigente_desde=date(2025, 1, 1), vigente=True)
+        self.periodo = PeriodoLiquidacion(anio=2025, mes=10)
+
+        for i in range(12):
+            emp = Empleado.objects.create(
+                nombre=f"Emp{i}",
+                apellido="Bulk",
+                cedula=f"90{i:04d}",
+                fecha_ingreso=date(2020, 1, 1),
+                salario_base=Decimal("2500000.00") + Decimal(i * 500000),
+            )
+            for j in range(i % 6):
+                Hijo.objects.create(empleado=emp, nombre=f"H{i}{j}", fecha_nacimiento=date(2015, 1, 1))
+            if i % 3 == 0:
+                Descuento.objects.create(
+                    empleado=emp, tipo="prestamo", monto=Decimal("100000.00"),
+                    fecha_inicio=date(2025, 1, 1), recurrente=True,
+                )
+            if i % 4 == 0:
+                Descuento.objects.create(
+                    empleado=emp, tipo="embargo", monto=Decimal("55000.00"),
+                    fecha_inicio=date(2025, 10, 5),
+                )
+
+        # Una liquidación cerrada no debe tocarse en ningún modo
+        self.cerrada = Liquidacion.objects.create(
+            empleado=Empleado.objects.get(cedula="900011"), mes=10, anio=2025, neto_cobrar=Decimal("1.00")
+        )
+        Liquidacion.objects.filter(pk=self.cerrada.pk).update(cerrada=True)
+        # Ni una ya enviada por correo (en modo fila Liquidacion.save la rechaza)
+        self.enviada = Liquidacion.objects.create(
+            empleado=Empleado.objects.get(cedula="900010"), mes=10, anio=2025, neto_cobrar=Decimal("2.00")
+        )
+        Liquidacion.objects.filter(pk=self.enviada.pk).update(enviado_email=True)
+
+    def _snapshot(self):
+        liqs = {
+            l.empleado_id: (l.total_ingresos, l.total_descuentos, l.neto_cobrar)
+            for l in Liquidacion.objects.filter(mes=10, anio=2025)
+        }
+        detalles = sorted(
+            DetalleLiquidacion.objects.filter(liquidacion__mes=10, liquidacion__anio=2025)
+            .values_list("liquidacion__empleado_id", "concepto__descripcion", "monto")
+        )
+        return liqs, detalles
+
+    def test_bulk_produce_los_mismos_totales_que_fila(self):
+        count_fila = calcular_liquidaciones_periodo(self.periodo, modo="fila")
+        esperado = self._snapshot()
+
+        count_bulk = calcular_liquidaciones_periodo(self.periodo, modo="bulk", chunk_size=5)
+        self.assertEqual(count_fila, count_bulk)
+        self.assertEqual(count_bulk, 10)
+        self.assertEqual(self._snapshot(), esperado)
+        self.enviada.refresh_from_db()
+        self.assertEqual(self.enviada.neto_cobrar, Decimal("2.00"))
+
+    def test_bulk_crea_liquidaciones_faltantes(self):
+        count = calcular_liquidaciones_periodo(self.periodo, modo="bulk")
+        self.assertEqual(count, 10)
+        self.assertEqual(Liquidacion.objects.filter(mes=10, anio=2025).count(), 12)
+        self.cerrada.refresh_from_db()
+        self.assertEqual(self.cerrada.neto_cobrar, Decimal("1.00"))
+        self.assertFalse(self.cerrada.detalles.exists())
+
+    def test_bulk_usa_menos_consultas(self):
+        calcular_liquidaciones_periodo(self.periodo, modo="fila")
+        with CaptureQueriesContext(connection) as fila:
+            calcular_liquidaciones_periodo(self.periodo, modo="fila")
+        with CaptureQueriesContext(connection) as bulk:
+            calcular_liquidaciones_periodo(self.periodo, modo="bulk")
+        self.assertLess(len(bulk.captured_queries) * 5, len(fila.captured_queries))
@@ -0,0 +1,70 @@
+# backend/nomina_cal/tests/test_calculo_paralelo.py
+#
+# Tests del runner particionado: consolidación de totales por rango
+# y reintento de rangos fallidos sin recalcular el resto.
+#
+
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+from django.db.models import Sum
+from django.test import TestCase
+
+from empleados.models import Empleado
+from nomina_cal.models import Liquidacion, SalarioMinimo
+from nomina_cal.services import calculo_paralelo
+from nomina_cal.services.calculo_nomina import PeriodoLiquidacion
+from nomina_cal.services.calculo_paralelo import (
+    calcular_periodo_particionado,
+    particionar_empleados,
+    reintentar_fallidos,
+)
+from nomina_cal.tests.utils import SinAuditoriaMixin
+
+
+class CalculoParticionadoTests(SinAuditoriaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        SalarioMinimo.objects.create(monto=Decimal("2800000.00"), vigente_desde=date(2025, 1, 1), vigente=True)
+        for i in range(7):
+            Empleado.objects.create(
+                nombre=f"Emp{i}", apellido="Rango", cedula=f"70{i:04d}",
+                fecha_ingreso=date(2021, 1, 1), salario_base=Decimal("3000000.00") + i,
+            )
+        self.periodo = PeriodoLiquidacion(anio=2025, mes=11)
+
+    def test_particiona_en_rangos_contiguos(self):
+        rangos = particionar_empleados(chunk_size=3)
+        self.assertEqual(len(rangos), 3)
+        ids = list(Empleado.objects.order_by("id").values_list("id", flat=True))
+        self.assertEqual(rangos[0], (ids[0], ids[2]))
+        self.assertEqual(rangos[-1], (ids[6], ids[6]))
+
+    def test_resumen_consolida_totales(self):
+        resumen = calcular_periodo_particionado(self.periodo, backend="secuencial", chunk_size=3)
+        self.assertEqual(resumen["chunks"], 3)
+        self.assertEqual(resumen["count"], 7)
+        self.assertEqual(resumen["fallidos"], [])
+        neto_db = Liquidacion.objects.filter(mes=11, anio=2025).aggregate(s=Sum("neto_cobrar"))["s"]
+        self.assertEqual(Decimal(resumen["neto_cobrar"]), neto_db)
+
+    def test_reintento_solo_recalcula_rangos_fallidos(self):
+        original = calculo_paralelo.calcular_liquidaciones_periodo_bulk
+        rango_malo = particionar_empleados(chunk_size=3)[1]
+
+        def falla_en_rango(periodo, rango=None, **kw):
+            if rango == rango_malo:
+                raise RuntimeError("conexión perdida")
+            return original(periodo, rango=rango, **kw)
+
+        with mock.patch.object(calculo_paralelo, "calcular_liquidaciones_periodo_bulk", side_effect=falla_en_rango):
+            resumen = calcular_periodo_particionado(self.periodo, backend="secuencial", chunk_size=3)
+        self.assertEqual(resumen["count"], 4)
+        self.assertEqual([f["rango"] for f in resumen["fallidos"]], [list(rango_malo)])
+
+        with mock.patch.object(calculo_paralelo, "calcular_liquidaciones_periodo_bulk", wraps=original) as spy:
+            resumen = reintentar_fallidos(resumen, backend="secuencial")
+        self.assertEqual(spy.call_count, 1)
+        self.assertEqual(resumen["count"], 7)
+        self.assertEqual(resumen["chunks_ok"], 3)
+        self.assertEqual(resumen["fallidos"], [])
@@ -0,0 +1,95 @@
+# backend/nomina_cal/tests/test_concepto_codigo.py
+#
+# Tests de Concepto.codigo: deducción desde la descripción, migración de
+# datos, códigos de los conceptos del motor y filtros/agregados por código.
+#
+
+import importlib
+from datetime import date
+from decimal import Decimal
+from django.apps import apps
+from django.contrib.admin.sites import site
+from django.test import RequestFactory, TestCase
+
+from empleados.models import Empleado
+from nomina_cal.admin import IPSFilter
+from nomina_cal.models import Concepto, DetalleLiquidacion, Liquidacion, inferir_codigo_concepto
+from nomina_cal.services.kpis import kpis
+from nomina_cal.services.motor_calculo import CONCEPTO_BONIFICACION, CONCEPTO_IPS, concepto_descuento
+from nomina_cal.services.registro_conceptos import registro_conceptos
+from nomina_cal.tests.utils import SinAuditoriaMixin
+
+migracion = importlib.import_module("nomina_cal.migrations.0017_concepto_codigo")
+
+
+class InferirCodigoTests(TestCase):
+    def test_descripciones_conocidas(self):
+        casos = {
+            "Descuento IPS 9%": "IPS",
+            "Aporte IPS (Empleado)": "IPS",
+            "Bonificación Familiar por Hijo": "BONIF_FAMILIAR",
+            "Salario Base": "SUELDO_BASE",
+            "Aguinaldo Proporcional": "AGUINALDO",
+            "Vacaciones Pagadas": "VACACIONES",
+            "Descuento: Préstamo": "DESCUENTO_PRESTAMO",
+            "Descuento: Embargo Judicial": "DESCUENTO_EMBARGO",
+            "Retenciones / Anticipos": "DESCUENTO_RETENCION",
+            "Tips de productividad": "",
+        }
+        for descripcion, codigo in casos.items():
+            with self.subTest(descripcion):
+                self.assertEqual(inferir_codigo_concepto(descripcion), codigo)
+                self.assertEqual(migracion._codigo(descripcion), codigo)
+
+
+class ConceptoCodigoTests(SinAuditoriaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        registro_conceptos.invalidar()
+        self.addCleanup(registro_conceptos.invalidar)
+
+    def test_migracion_y_conceptos_del_motor(self):
+        Concepto.objects.create(descripcion="Aporte IPS (Empleado)")
+        Concepto.objects.create(descripcion="Bonificación por hijos")
+        Concepto.objects.update(codigo="")
+
+        migracion.poblar_codigos(apps, None)
+        self.assertEqual(
+            dict(Concepto.objects.values_list("descripcion", "codigo")),
+            {"Aporte IPS (Empleado)": "IPS", "Bonificación por hijos": "BONIF_FAMILIAR"},
+        )
+
+        ids = registro_conceptos.resolver([CONCEPTO_IPS, CONCEPTO_BONIFICACION, concepto_descuento("prestamo")])
+        self.assertEqual(
+            sorted(Concepto.objects.filter(id__in=ids.values()).values_list("codigo", flat=True)),
+            ["BONIF_FAMILIAR", "DESCUENTO_PRESTAMO", "IPS"],
+        )
+
+    def test_filtros_y_agregados_por_codigo(self):
+        # El código manda, no el texto de la descripción
+        seguro = Concepto.objects.create(descripcion="Seguro social obrero", codigo=Concepto.IPS, es_debito=True)
+        tips = Concepto.objects.create(descripcion="Tips de productividad")
+        bonif = Concepto.objects.create(descripcion="Bonificación por hijos")
+        liqs = []
+        for i, conceptos in enumerate([(seguro, bonif), (tips,)]):
+            emp = Empleado.objects.create(
+                nombre=f"Emp{i}", apellido="Codigo", cedula=f"44{i:04d}",
+                fecha_ingreso=date(2020, 1, 1), salario_base=Decimal("1000000.00"),
+            )
+            liq = Liquidacion.objects.create(empleado=emp, mes=10, anio=2025)
+            for concepto in conceptos:
+                DetalleLiquidacion.objects.create(liquidacion=liq, concepto=concepto, monto=Decimal("90000.00"))
+            liqs.append(liq)
+
+        self.assertEqual(kpis(Liquidacion.objects.all(), "total_ips")["total_ips"], Decimal("90000.00"))
+
+        request = RequestFactory().get("/")
+        admin = site._registry[Liquidacion]
+        filtro = IPSFilter(request, {"con_ips": ["si"]}, Liquidacion, admin)
+        self.assertEqual(list(filtro.queryset(request, Liquidacion.objects.all())), [liqs[0]])
+
+        with self.assertNumQueries(1):
+            filas = {liq.pk: (admin.estado_ips(liq), admin.estado_bonificacion(liq)) for liq in admin.get_queryset(request)}
+        self.assertIn("Sí", filas[liqs[0].pk][0])
+        self.assertIn("Sí", filas[liqs[0].pk][1])
+        self.assertIn("No", filas[liqs[1].pk][0])
@@ -0,0 +1,132 @@
+# backend/nomina_cal/tests/test_corridas.py
+#
+# Tests de las corridas de nómina asíncronas: alta por API, ejecución,
+# progreso y errores por empleado.
+#
+
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from empleados.models import Empleado
+from nomina_cal.models import Liquidacion, SalarioMinimo
+from nomina_cal.models_corrida import CorridaNomina
+from nomina_cal.services.corridas import ejecutar_corrida
+from nomina_cal.tests.utils import SinAuditoriaMixin
+from usuarios.models import Usuario
+
+User = get_user_model()
+
+
+class CorridasNominaTests(SinAuditoriaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        SalarioMinimo.objects.create(monto=Decimal("2800000.00"), vigente_desde=date(2025, 1, 1), vigente=True)
+        for i in range(4):
+            emp = Empleado.objects.create(
+                nombre=f"Emp{i}", apellido="Corrida", cedula=f"44{i:04d}",
+                fecha_ingreso=date(2020, 1, 1), salario_base=Decimal("3000000.00") if i else Decimal("0"),
+            )
+            Liquidacion.objects.create(empleado=emp, mes=10, anio=2025)
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser("admin", "a@a.com", "x"))
+
+    def _crear(self, **data):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            r = self.client.post(reverse("corridas"), data, format="json")
+        self.assertEqual(r.status_code, 202, r.data)
+        self.assertEqual(len(callbacks), 1)
+        return r.data
+
+    def test_alta_polling_y_errores_por_empleado(self):
+        datos = self._crear(tipo="calcular_todas")
+        self.assertEqual(datos["estado"], "pendiente")
+        self.assertTrue(datos["url"].endswith(f"/corridas/{datos['id']}/"))
+
+        ejecutar_corrida(datos["id"])
+
+        r = self.client.get(reverse("corrida_detalle", args=[datos["id"]]))
+        self.assertEqual(r.data["estado"], "con_errores")
+        self.assertEqual((r.data["total"], r.data["procesadas"], r.data["progreso"]), (4, 4, 100))
+        self.assertEqual(r.data["resultado"], {"recalculadas": 3})
+
+        r = self.client.get(reverse("corrida_errores", args=[datos["id"]]))
+        self.assertEqual(len(r.data["errores"]), 1)
+        self.assertEqual(r.data["errores"][0]["empleado_id"], Empleado.objects.get(cedula="440000").id)
+        self.assertIn("salario base", r.data["errores"][0]["error"])
+
+    def test_corrida_de_periodo_por_rangos(self):
+        datos = self._crear(tipo="periodo", anio=2025, mes=10)
+        corrida = ejecutar_corrida(datos["id"])
+        self.assertEqual(corrida.estado, "completada")
+        self.assertEqual(corrida.resultado["count"], 4)
+        self.assertEqual(corrida.procesadas, corrida.total)
+
+    def test_corrida_de_periodo_en_celery_no_espera_a_los_rangos(self):
+        from sistema_nomina.celery import app
+
+        datos = self._crear(tipo="periodo", anio=2025, mes=10, backend="celery")
+        CorridaNomina.objects.filter(pk=datos["id"]).update(
+            parametros={"anio": 2025, "mes": 10, "backend": "celery", "chunk": 2}
+        )
+        # El worker no espera al grupo: la corrida queda en proceso hasta el callback
+        with mock.patch("nomina_cal.services.calculo_paralelo.chord") as chord:
+            corrida = ejecutar_corrida(datos["id"])
+        self.assertEqual((corrida.estado, corrida.total), ("en_proceso", 2))
+        chord.return_value.assert_called_once()
+
+        CorridaNomina.objects.filter(pk=datos["id"]).update(estado="pendiente")
+        # Modo eager: el chord corre en el proceso del test
+        app.conf.task_always_eager = True
+        self.addCleanup(setattr, app.conf, "task_always_eager", False)
+        ejecutar_corrida(datos["id"])
+        corrida = CorridaNomina.objects.get(pk=datos["id"])
+        self.assertEqual(corrida.estado, "completada")
+        self.assertEqual((corrida.total, corrida.procesadas), (2, 2))
+        self.assertEqual(corrida.resultado["count"], 4)
+        self.assertIsNotNone(corrida.finalizado_en)
+
+    def test_parametros_invalidos(self):
+        r = self.client.post(reverse("corridas"), {"tipo": "cierre", "mes": 13, "anio": 2025}, format="json")
+        self.assertEqual(r.status_code, 400)
+        self.assertFalse(CorridaNomina.objects.exists())
+
+    def test_permisos_por_tipo_iguales_a_los_sincronos(self):
+        roles = {
+            rol: User.objects.create_user(rol, f"{rol}@a.com", "x", rol=rol)
+            for rol in (Usuario.GERENTE, Usuario.ASISTENTE)
+        }
+        esperado = {
+            (Usuario.GERENTE, "calcular_todas"): 403,
+            (Usuario.GERENTE, "periodo"): 403,
+            (Usuario.GERENTE, "envio_recibos"): 403,
+            (Usuario.GERENTE, "cierre"): 202,
+            (Usuario.ASISTENTE, "calcular_todas"): 202,
+            (Usuario.ASISTENTE, "periodo"): 403,
+            (Usuario.ASISTENTE, "envio_recibos"): 202,
+            (Usuario.ASISTENTE, "cierre"): 202,
+        }
+        for (rol, tipo), codigo in esperado.items():
+            with self.subTest(rol=rol, tipo=tipo):
+                self.client.force_authenticate(roles[rol])
+                with self.captureOnCommitCallbacks(execute=False):
+                    r = self.client.post(reverse("corridas"), {"tipo": tipo, "anio": 2025, "mes": 10}, format="json")
+                self.assertEqual(r.status_code, codigo, r.data)
+        self.assertEqual(CorridaNomina.objects.count(), 4)
+
+    def test_endpoints_existentes_aceptan_asincrono(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            r = self.client.post(reverse("calcular_todas_alias"), {"asincrono": True}, format="json")
+        self.assertEqual(r.status_code, 202)
+        self.assertEqual(CorridaNomina.objects.get().tipo, "calcular_todas")
+
+    @override_settings(CELERY_BROKER_URL="memory://")
+    def test_con_broker_se_encola_en_celery(self):
+        with mock.patch("nomina_cal.tasks.ejecutar_corrida_nomina.delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                r = self.client.post(reverse("corridas"), {"tipo": "cierre", "mes": 10, "anio": 2025}, format="json")
+        delay.assert_called_once_with(r.data["id"])
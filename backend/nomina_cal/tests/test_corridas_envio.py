@@ -0,0 +1,113 @@
+# backend/nomina_cal/tests/test_corridas_envio.py
+#
+# Tests de las corridas de envío de recibos: estado por destinatario,
+# punto de control por bloque y reanudación sin reenvíos.
+#
+
+import shutil
+import tempfile
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from empleados.models import Empleado
+from nomina_cal.models import Liquidacion
+from nomina_cal.models_corrida import CorridaNomina, DestinoEnvio
+from nomina_cal.services import envio_masivo
+from nomina_cal.services.corridas import ejecutar_corrida, reanudar_corrida
+from nomina_cal.tests.utils import SinAuditoriaMixin
+
+User = get_user_model()
+
+
+@override_settings(ENVIO_CORREOS_POR_MINUTO=0)
+class CorridasEnvioTests(SinAuditoriaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        ajuste = override_settings(MEDIA_ROOT=media)
+        ajuste.enable()
+        self.addCleanup(ajuste.disable)
+
+        self.empleados = []
+        for i in range(5):
+            emp = Empleado.objects.create(
+                nombre=f"Emp{i}", apellido="Envio", cedula=f"77{i:04d}",
+                email="" if i == 4 else f"emp{i}@empresa.com",
+                fecha_ingreso=date(2020, 1, 1), salario_base=Decimal("3000000.00"),
+            )
+            Liquidacion.objects.create(empleado=emp, mes=10, anio=2025, neto_cobrar=Decimal("2730000.00"))
+            self.empleados.append(emp)
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser("admin", "a@a.com", "x"))
+
+    def _corrida(self, **parametros):
+        return CorridaNomina.objects.create(
+            tipo="envio_recibos", parametros={"mes": 10, "anio": 2025, "lote": 2, **parametros}
+        )
+
+    def test_estado_por_destinatario_e_idempotencia(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            r = self.client.post(reverse("corridas"), {"tipo": "envio_recibos", "mes": 10, "anio": 2025}, format="json")
+        self.assertEqual(r.status_code, 202, r.data)
+        self.assertEqual(r.data["parametros"], {"anio": 2025, "mes": 10, "reenviar": False})
+
+        corrida = ejecutar_corrida(r.data["id"])
+        self.assertEqual(corrida.estado, "con_errores")
+        self.assertEqual(corrida.resultado, {"enviados": 4, "fallidos": 1})
+        self.assertEqual((corrida.total, corrida.procesadas), (5, 5))
+        self.assertEqual(len(mail.outbox), 4)
+        fallido = DestinoEnvio.objects.get(corrida=corrida, estado="fallido")
+        self.assertEqual(fallido.liquidacion.empleado, self.empleados[4])
+        self.assertEqual(Liquidacion.objects.filter(enviado_email=True).count(), 4)
+
+        # Una corrida nueva no reenvía lo ya enviado
+        otra = ejecutar_corrida(self._corrida().pk)
+        self.assertEqual(otra.total, 1)
+        self.assertEqual(len(mail.outbox), 4)
+
+    def test_reanuda_despues_de_una_caida_sin_reenviar(self):
+        real = envio_masivo.enviar_recibos
+        llamadas = []
+
+        def cae_en_el_segundo_bloque(*args, **kwargs):
+            llamadas.append(1)
+            if len(llamadas) == 2:
+                raise RuntimeError("worker caído")
+            return real(*args, **kwargs)
+
+        corrida = self._corrida()
+        with mock.patch.object(envio_masivo, "enviar_recibos", side_effect=cae_en_el_segundo_bloque):
+            corrida = ejecutar_corrida(corrida.pk)
+        self.assertEqual(corrida.estado, "fallida")
+        self.assertEqual(corrida.procesadas, 2)
+        self.assertEqual(DestinoEnvio.objects.filter(corrida=corrida, estado="enviado").count(), 2)
+
+        corrida = ejecutar_corrida(reanudar_corrida(corrida).pk)
+        self.assertEqual(corrida.resultado, {"enviados": 4, "fallidos": 1})
+        # Cada empleado con email recibió exactamente un correo
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), [f"emp{i}@empresa.com" for i in range(4)])
+
+    def test_reanudar_reintenta_solo_fallidos(self):
+        corrida = ejecutar_corrida(self._corrida().pk)
+        Empleado.objects.filter(pk=self.empleados[4].pk).update(email="emp4@empresa.com")
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            r = self.client.post(reverse("corrida_reanudar", args=[corrida.pk]))
+        self.assertEqual(r.status_code, 202, r.data)
+        self.assertEqual(len(callbacks), 1)
+
+        corrida = ejecutar_corrida(corrida.pk)
+        self.assertEqual(corrida.estado, "completada")
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(mail.outbox[-1].to, ["emp4@empresa.com"])
+        self.assertEqual(DestinoEnvio.objects.get(liquidacion__empleado=self.empleados[4]).intentos, 2)
+
+        r = self.client.post(reverse("corrida_reanudar", args=[corrida.pk]))
+        self.assertEqual(r.status_code, 409)
@@ -0,0 +1,43 @@
+# backend/nomina_cal/tests/test_descuento_vigencia.py
+#
+# Descuento.objects.vigentes_en (filtro en la base) debe coincidir con
+# Descuento.es_vigente (implementación de referencia en Python).
+#
+
+from datetime import date
+from decimal import Decimal
+from itertools import product
+from django.test import TestCase
+
+from empleados.models import Empleado
+from nomina_cal.models_descuento import Descuento
+from nomina_cal.tests.utils import SinAuditoriaMixin
+
+
+class DescuentoVigenciaTests(SinAuditoriaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        emp = Empleado.objects.create(
+            nombre="Vig", apellido="Test", cedula="880001",
+            fecha_ingreso=date(2020, 1, 1), salario_base=Decimal("3000000.00"),
+        )
+        inicios = [date(2024, 12, 31), date(2025, 1, 1), date(2025, 3, 15), date(2025, 4, 1), date(2025, 12, 31)]
+        fines = [None, date(2025, 2, 28), date(2025, 3, 1), date(2025, 3, 31), date(2025, 4, 1), date(2026, 1, 1)]
+        for inicio, fin, recurrente, activo in product(inicios, fines, (False, True), (True, False)):
+            Descuento.objects.create(
+                empleado=emp, tipo="otro", monto=Decimal("1000.00"),
+                fecha_inicio=inicio, fecha_fin=fin, recurrente=recurrente, activo=activo,
+            )
+
+    def test_filtro_en_base_coincide_con_es_vigente(self):
+        todos = list(Descuento.objects.all())
+        for anio, mes in [(2024, 12)] + [(2025, m) for m in range(1, 13)] + [(2026, 1)]:
+            with self.subTest(mes=mes, anio=anio):
+                esperado = {d.id for d in todos if d.es_vigente(mes, anio)}
+                obtenido = set(Descuento.objects.vigentes_en(mes, anio).values_list("id", flat=True))
+                self.assertEqual(obtenido, esperado)
+
+    def test_una_consulta_agrupada_por_empleado(self):
+        with self.assertNumQueries(1):
+            agrupados = Descuento.objects.vigentes_en(3, 2025).por_empleado()
+        self.assertEqual(len(agrupados), 1)
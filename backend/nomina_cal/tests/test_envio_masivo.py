@@ -0,0 +1,152 @@
+# backend/nomina_cal/tests/test_envio_masivo.py
+#
+# Tests del envío masivo de recibos: una sola conexión, registro en bloque
+# en EnvioCorreo, errores por destinatario, caché de recibos y cupo por minuto.
+#
+
+import shutil
+import smtplib
+import tempfile
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from empleados.models import Empleado
+from nomina_cal.models import Liquidacion
+from nomina_cal.models_envio import EnvioCorreo
+from nomina_cal.services import envio_masivo
+from nomina_cal.services.cache_recibos import obtener_recibo
+from nomina_cal.services.envio_masivo import Limitador, enviar_recibos
+from nomina_cal.services.plantilla_recibo import PlantillaRecibo
+from nomina_cal.tests.utils import SinAuditoriaMixin
+
+
+class _Conexion(EmailBackend):
+    """Backend locmem que cuenta aperturas y rechaza algunos destinatarios."""
+
+    def __init__(self, rechazados=(), **kwargs):
+        super().__init__(**kwargs)
+        self.rechazados = set(rechazados)
+        self.aperturas = 0
+
+    def open(self):
+        self.aperturas += 1
+        return True
+
+    def send_messages(self, messages):
+        for m in messages:
+            if set(m.to) & self.rechazados:
+                raise smtplib.SMTPRecipientsRefused({m.to[0]: (550, b"no existe")})
+        return super().send_messages(messages)
+
+
+class EnvioMasivoTests(SinAuditoriaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        ajuste = override_settings(MEDIA_ROOT=media)
+        ajuste.enable()
+        self.addCleanup(ajuste.disable)
+
+        self.liqs = []
+        for i in range(5):
+            emp = Empleado.objects.create(
+                nombre=f"Emp{i}", apellido="Envio", cedula=f"33{i:04d}",
+                email="" if i == 3 else f"emp{i}@empresa.com",
+                fecha_ingreso=date(2020, 1, 1), salario_base=Decimal("3000000.00"),
+            )
+            self.liqs.append(Liquidacion.objects.create(
+                empleado=emp, mes=10, anio=2025, neto_cobrar=Decimal("2730000.00"),
+            ))
+        Liquidacion.objects.filter(pk=self.liqs[4].pk).update(enviado_email=True)
+
+    def test_envio_por_una_conexion_con_registro_en_bloque(self):
+        conexion = _Conexion()
+        with CaptureQueriesContext(connection) as consultas:
+            resultado = enviar_recibos(Liquidacion.objects.all(), por_minuto=0, conexion=conexion)
+
+        self.assertEqual(resultado, {"enviados": 3, "errores": 0, "sin_correo": 1})
+        self.assertEqual(conexion.aperturas, 1)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(mail.outbox[0].attachments[0][2], "application/pdf")
+        self.assertTrue(mail.outbox[0].attachments[0][1].startswith(b"%PDF"))
+        self.assertEqual(EnvioCorreo.objects.filter(estado="enviado").count(), 3)
+        self.assertEqual(Liquidacion.objects.filter(enviado_email=True).count(), 4)
+        # Las rutas de los recibos generados quedan registradas en la caché
+        self.assertEqual(Liquidacion.objects.exclude(recibo_pdf="").count(), 3)
+        # Consultas por bloque, no por recibo
+        self.assertLess(len(consultas), 15)
+
+    def test_error_por_destinatario(self):
+        resultado = enviar_recibos(
+            Liquidacion.objects.all(), por_minuto=0, conexion=_Conexion(rechazados={"emp1@empresa.com"})
+        )
+        self.assertEqual(resultado["enviados"], 2)
+        self.assertEqual(resultado["errores"], 1)
+        error = EnvioCorreo.objects.get(estado="error")
+        self.assertEqual(error.destinatario, "emp1@empresa.com")
+        self.assertIn("no existe", error.detalle_error)
+        self.assertFalse(Liquidacion.objects.get(pk=self.liqs[1].pk).enviado_email)
+
+    def test_reutiliza_recibo_cacheado_de_liquidacion_cerrada(self):
+        Liquidacion.objects.filter(pk=self.liqs[0].pk).update(cerrada=True)
+        liq = Liquidacion.objects.get(pk=self.liqs[0].pk)
+        ruta = obtener_recibo(liq).ruta
+
+        with mock.patch.object(PlantillaRecibo, "renderizar") as renderizar:
+            enviar_recibos(Liquidacion.objects.filter(pk=liq.pk), por_minuto=0, conexion=_Conexion())
+        renderizar.assert_not_called()
+        self.assertEqual(Liquidacion.objects.get(pk=liq.pk).recibo_pdf, ruta)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_lectura_por_bloques_solapada_con_el_envio(self):
+        for i in range(10):
+            emp = Empleado.objects.create(
+                nombre=f"Extra{i}", apellido="Envio", cedula=f"34{i:04d}", email=f"extra{i}@empresa.com",
+                fecha_ingreso=date(2020, 1, 1), salario_base=Decimal("3000000.00"),
+            )
+            Liquidacion.objects.create(empleado=emp, mes=10, anio=2025, neto_cobrar=Decimal("2730000.00"))
+        leidos, adelantados = [0], []
+        destinos = envio_masivo.destinos
+
+        def de_a_uno(queryset):
+            for bloque in destinos(queryset, lote=1):
+                leidos[0] += 1
+                yield bloque
+
+        class _Contando(_Conexion):
+            def send_messages(self, messages):
+                adelantados.append(leidos[0] - len(mail.outbox))
+                return super().send_messages(messages)
+
+        with mock.patch.object(envio_masivo, "destinos", de_a_uno), \
+                mock.patch.object(envio_masivo, "BLOQUES_ADELANTE", 1), \
+                mock.patch.object(envio_masivo, "PREPARADOS", 1):
+            resultado = enviar_recibos(Liquidacion.objects.all(), por_minuto=0, conexion=_Contando())
+
+        self.assertEqual(resultado["enviados"], 13)
+        # Nunca se leyó más que lo que cabe entre la lectura y el envío (entrada, productor, cola)
+        self.assertLessEqual(max(adelantados), 4)
+
+    def test_limitador(self):
+        reloj = [100.0]
+        esperas = []
+
+        def dormir(segundos):
+            esperas.append(segundos)
+            reloj[0] += segundos
+
+        limitador = Limitador(60, reloj=lambda: reloj[0], dormir=dormir)
+        for _ in range(3):
+            limitador.esperar()
+        self.assertEqual(esperas, [1.0, 1.0])
+        reloj[0] += 5
+        limitador.esperar()
+        self.assertEqual(len(esperas), 2)
+        self.assertEqual(Limitador(0).intervalo, 0.0)
@@ -0,0 +1,84 @@
+# backend/nomina_cal/tests/test_exportacion_plana.py
+#
+# Tests de ?format=csv|ndjson en los reportes: filas crudas por streaming,
+# filtros respetados y sin consultas por fila.
+#
+
+import csv
+import io
+import json
+from datetime import date
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from empleados.models import Empleado
+from nomina_cal.models import Liquidacion
+from nomina_cal.services.exportacion_plana import CAMPOS_LIQUIDACION, generar_csv
+from nomina_cal.tests.utils import SinAuditoriaMixin
+
+User = get_user_model()
+
+
+class ExportacionPlanaTests(SinAuditoriaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        for i in range(20):
+            emp = Empleado.objects.create(
+                nombre=f"Emp{i}", apellido="Núñez, Jr.", cedula=f"99{i:04d}", area="IT", tipo_contrato="INDEFINIDO",
+                fecha_ingreso=date(2020, 1, 1), salario_base=Decimal("3000000.00"),
+            )
+            for mes in (9, 10):
+                Liquidacion.objects.create(empleado=emp, mes=mes, anio=2025, neto_cobrar=Decimal("1000000.50"))
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser("admin", "a@a.com", "x"))
+
+    def _descargar(self, nombre_url, **params):
+        with CaptureQueriesContext(connection) as consultas:
+            r = self.client.get(reverse(nombre_url), params)
+            contenido = b"".join(r.streaming_content).decode("utf-8")
+        self.assertEqual(r.status_code, 200)
+        self.assertTrue(r.streaming)
+        self.assertLess(len(consultas), 10)
+        return r, contenido
+
+    def test_csv_con_filtros(self):
+        r, contenido = self._descargar("reporte_general_detallado", format="csv", mes=10, anio=2025)
+        self.assertTrue(r["Content-Type"].startswith("text/csv"))
+        self.assertIn('filename="reporte_general.csv"', r["Content-Disposition"])
+
+        filas = list(csv.reader(io.StringIO(contenido)))
+        self.assertEqual(filas[0], list(CAMPOS_LIQUIDACION))
+        self.assertEqual(len(filas), 21)
+        fila = dict(zip(filas[0], filas[1]))
+        self.assertEqual(fila["apellido"], "Núñez, Jr.")
+        self.assertEqual((fila["area"], fila["tipo_contrato"]), ("IT", "INDEFINIDO"))
+        self.assertEqual(fila["neto_cobrar"], "1000000.50")
+
+    def test_ndjson(self):
+        r, contenido = self._descargar("exportar_reporte_excel", format="ndjson")
+        self.assertEqual(r["Content-Type"], "application/x-ndjson")
+        filas = [json.loads(linea) for linea in contenido.splitlines()]
+        self.assertEqual(len(filas), 40)
+        self.assertEqual(filas[0]["neto_cobrar"], "1000000.50")
+        self.assertEqual(filas[0]["cedula"], "990000")
+
+    def test_exportaciones_del_periodo(self):
+        for nombre_url in ("export_excel_cbv", "export_pdf_cbv", "exportar_reporte_pdf"):
+            _, contenido = self._descargar(nombre_url, format="csv", mes=9, anio=2025)
+            self.assertGreater(len(contenido.splitlines()), 20, nombre_url)
+
+    def test_sin_format_mantiene_json(self):
+        r = self.client.get(reverse("reporte_general_detallado"), {"mes": 10, "anio": 2025})
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(len(r.json()["detalle"]), 20)
+        self.assertEqual(Decimal(r.json()["total_general"]), Decimal("20000010.00"))
+
+    def test_csv_en_bloques(self):
+        partes = list(generar_csv(iter([[i, "x"] for i in range(25)]), ["n", "v"], filas_por_bloque=10))
+        self.assertEqual(len(partes), 3)
+        self.assertEqual(b"".join(partes).count(b"\r\n"), 26)
@@ -0,0 +1,99 @@
+# backend/nomina_cal/tests/test_exportacion_xlsx.py
+#
+# Tests del motor XLSX por streaming: el archivo se abre con openpyxl,
+# los bytes salen antes de consumir todas las filas y el endpoint responde
+# en streaming con una cantidad de consultas acotada.
+#
+
+import io
+from datetime import date
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from openpyxl import load_workbook
+from rest_framework.test import APIClient
+
+from empleados.models import Empleado
+from nomina_cal.models import Liquidacion
+from nomina_cal.services.exportacion_xlsx import con_total, generar_xlsx
+from nomina_cal.tests.utils import SinAuditoriaMixin
+
+User = get_user_model()
+
+
+def _hoja(contenido: bytes):
+    return load_workbook(io.BytesIO(contenido)).active
+
+
+class GenerarXlsxTests(TestCase):
+    def test_archivo_legible_con_tipos(self):
+        filas = [
+            ["Ana <Pérez> & Cía", 1500000, Decimal("2730000.50"), date(2025, 10, 31)],
+            ["", None, 0, True],
+        ]
+        hoja = _hoja(b"".join(generar_xlsx(filas, hoja="Nómina", encabezado=[["Título"], ["A", "B", "C", "D"]])))
+
+        self.assertEqual(hoja.title, "Nómina")
+        self.assertEqual(hoja["A1"].value, "Título")
+        self.assertTrue(hoja["A2"].font.b)
+        self.assertEqual(hoja["A3"].value, "Ana <Pérez> & Cía")
+        self.assertEqual(hoja["B3"].value, 1500000)
+        self.assertEqual(hoja["C3"].value, 2730000.5)
+        self.assertEqual(hoja["D3"].value, "31/10/2025")
+        self.assertIsNone(hoja["A4"].value)
+        self.assertIs(hoja["D4"].value, True)
+        self.assertEqual(hoja.max_row, 4)
+
+    def test_emite_bytes_antes_de_consumir_las_filas(self):
+        consumidas = []
+
+        def filas():
+            for i in range(2000):
+                consumidas.append(i)
+                yield [f"Empleado {i}", i]
+
+        partes = generar_xlsx(filas(), filas_por_bloque=100)
+        emitidas = [next(partes)]
+        self.assertEqual(consumidas, [])
+        emitidas.append(next(partes))
+        self.assertEqual(len(consumidas), 100)
+
+        emitidas.extend(partes)
+        self.assertEqual(_hoja(b"".join(emitidas)).max_row, 2000)
+
+    def test_con_total(self):
+        filas = list(con_total(iter([["a", Decimal("10.50")], ["b", None]]), 1, lambda t: ["TOTAL", t]))
+        self.assertEqual(filas[-1], ["TOTAL", Decimal("10.50")])
+
+
+class ExportarReporteExcelTests(SinAuditoriaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        for i in range(30):
+            emp = Empleado.objects.create(
+                nombre=f"Emp{i}", apellido="Test", cedula=f"88{i:04d}",
+                fecha_ingreso=date(2020, 1, 1), salario_base=Decimal("3000000.00"),
+            )
+            Liquidacion.objects.create(empleado=emp, mes=10, anio=2025, neto_cobrar=Decimal("1000000.00"))
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser("admin", "a@a.com", "x"))
+
+    def test_streaming_con_consultas_acotadas(self):
+        with CaptureQueriesContext(connection) as consultas:
+            r = self.client.get(reverse("exportar_reporte_excel"))
+            contenido = b"".join(r.streaming_content)
+
+        self.assertEqual(r.status_code, 200)
+        self.assertTrue(r.streaming)
+        self.assertIn("reporte_liquidaciones.xlsx", r["Content-Disposition"])
+        # Sin consultas por fila (antes: una por empleado más el aggregate)
+        self.assertLess(len(consultas), 10)
+
+        hoja = _hoja(contenido)
+        self.assertEqual(hoja.max_row, 32)
+        self.assertEqual(hoja["A1"].value, "Empleado")
+        self.assertEqual(hoja["C32"].value, "TOTAL GENERAL")
+        self.assertEqual(hoja["D32"].value, 30000000)
@@ -0,0 +1,148 @@
+# backend/nomina_cal/tests/test_exportaciones.py
+#
+# Tests de las exportaciones en segundo plano: alta por API, reutilización
+# de pedidos idénticos en curso, generación, descarga y vencimiento.
+#
+
+import shutil
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from empleados.models import Empleado
+from nomina_cal.models import Liquidacion
+from nomina_cal.models_exportacion import ExportacionReporte
+from nomina_cal.services.exportaciones import REPORTES, Reporte, ejecutar_exportacion, purgar_vencidas
+from nomina_cal.tests.utils import SinAuditoriaMixin
+from usuarios.models import Usuario
+
+User = get_user_model()
+
+
+class ExportacionesTests(SinAuditoriaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        ajuste = override_settings(MEDIA_ROOT=media)
+        ajuste.enable()
+        self.addCleanup(ajuste.disable)
+
+        for i in range(3):
+            emp = Empleado.objects.create(
+                nombre=f"Emp{i}", apellido="Export", cedula=f"55{i:04d}", cargo="Analista",
+                fecha_ingreso=date(2020, 1, 1), salario_base=Decimal("3000000.00"),
+            )
+            Liquidacion.objects.create(empleado=emp, mes=10, anio=2025, neto_cobrar=Decimal("2730000.00"))
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser("admin", "a@a.com", "x"))
+
+    def _pedir(self, **data):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            r = self.client.post(reverse("exportaciones"), data, format="json")
+        self.assertEqual(r.status_code, 202, r.data)
+        return r.data, callbacks
+
+    def test_pedidos_identicos_comparten_exportacion(self):
+        primero, callbacks = self._pedir(tipo="asistencia_pdf", mes=10, anio=2025)
+        segundo, callbacks_2 = self._pedir(tipo="asistencia_pdf", mes="10", anio="2025")
+        otro, _ = self._pedir(tipo="asistencia_pdf", mes=9, anio=2025)
+
+        self.assertEqual(primero["id"], segundo["id"])
+        self.assertFalse(primero["reutilizada"])
+        self.assertTrue(segundo["reutilizada"])
+        self.assertEqual((len(callbacks), len(callbacks_2)), (1, 0))
+        self.assertNotEqual(otro["id"], primero["id"])
+
+        # Terminada la exportación, un pedido nuevo genera otra
+        ejecutar_exportacion(primero["id"])
+        tercero, _ = self._pedir(tipo="asistencia_pdf", mes=10, anio=2025)
+        self.assertNotEqual(tercero["id"], primero["id"])
+
+    def test_generacion_y_descarga(self):
+        datos, _ = self._pedir(tipo="libro_nomina", mes=10, anio=2025)
+        self.assertEqual(self.client.get(reverse("exportacion_descarga", args=[datos["id"]])).status_code, 409)
+
+        exportacion = ejecutar_exportacion(datos["id"])
+        self.assertEqual(exportacion.estado, "completada")
+        self.assertEqual(exportacion.nombre_archivo, "libro_nomina_2025_10.pdf")
+        self.assertTrue(default_storage.exists(exportacion.archivo))
+
+        detalle = self.client.get(reverse("exportacion_detalle", args=[datos["id"]])).data
+        self.assertIn("url_descarga", detalle)
+        r = self.client.get(reverse("exportacion_descarga", args=[datos["id"]]))
+        self.assertEqual(r.status_code, 200)
+        contenido = b"".join(r.streaming_content)
+        self.assertTrue(contenido.startswith(b"%PDF"))
+        self.assertEqual(len(contenido), exportacion.tamanio)
+        self.assertIn("libro_nomina_2025_10.pdf", r["Content-Disposition"])
+
+    def test_colgadas_se_liberan_y_no_atan_pedidos_nuevos(self):
+        pendiente, _ = self._pedir(tipo="asistencia_pdf", mes=10, anio=2025)
+        en_proceso, _ = self._pedir(tipo="asistencia_pdf", mes=9, anio=2025)
+        hace_una_hora = timezone.now() - timedelta(hours=1)
+        # El pool local perdió la primera en un reinicio; el worker de la segunda murió
+        ExportacionReporte.objects.filter(pk=pendiente["id"]).update(creado_en=hace_una_hora)
+        ExportacionReporte.objects.filter(pk=en_proceso["id"]).update(estado="en_proceso", iniciado_en=hace_una_hora)
+
+        for viejo, mes in ((pendiente, 10), (en_proceso, 9)):
+            with self.subTest(mes=mes):
+                nuevo, callbacks = self._pedir(tipo="asistencia_pdf", mes=mes, anio=2025)
+                self.assertNotEqual(nuevo["id"], viejo["id"])
+                self.assertFalse(nuevo["reutilizada"])
+                self.assertEqual(len(callbacks), 1)
+                self.assertEqual(ExportacionReporte.objects.get(pk=viejo["id"]).estado, "fallida")
+
+        # Si la tarea perdida llega a ejecutarse, no hace nada
+        self.assertEqual(ejecutar_exportacion(pendiente["id"]).estado, "fallida")
+
+    def test_vencimiento(self):
+        datos, _ = self._pedir(tipo="empleados_pdf")
+        exportacion = ejecutar_exportacion(datos["id"])
+        ExportacionReporte.objects.filter(pk=exportacion.pk).update(expira_en=timezone.now() - timedelta(minutes=1))
+
+        self.assertEqual(self.client.get(reverse("exportacion_descarga", args=[exportacion.pk])).status_code, 410)
+        self.assertEqual(purgar_vencidas(), 1)
+        self.assertFalse(default_storage.exists(exportacion.archivo))
+        self.assertEqual(ExportacionReporte.objects.get(pk=exportacion.pk).estado, "vencida")
+
+    def test_error_de_generacion(self):
+        datos, _ = self._pedir(tipo="empleados_pdf")
+        falla = Reporte(mock.Mock(side_effect=RuntimeError("sin fuentes")), "x.pdf")
+        with mock.patch.dict(REPORTES, {"empleados_pdf": falla}):
+            exportacion = ejecutar_exportacion(datos["id"])
+        self.assertEqual(exportacion.estado, "fallida")
+        self.assertEqual(exportacion.error, "sin fuentes")
+        # Una exportación ya tomada no se vuelve a ejecutar
+        self.assertEqual(ejecutar_exportacion(datos["id"]).estado, "fallida")
+
+    def test_validacion_y_atajo_asincrono(self):
+        r = self.client.post(reverse("exportaciones"), {"tipo": "asistencia_pdf", "mes": 13, "anio": 2025}, format="json")
+        self.assertEqual(r.status_code, 400)
+        r = self.client.post(reverse("exportaciones"), {"tipo": "otro"}, format="json")
+        self.assertEqual(r.status_code, 400)
+
+        with self.captureOnCommitCallbacks(execute=False):
+            r = self.client.get(reverse("exportar_reporte_pdf"), {"asincrono": 1})
+        self.assertEqual(r.status_code, 202)
+        self.assertEqual(r.data["tipo"], "liquidaciones_pdf")
+
+    def test_permisos_del_endpoint_sincrono(self):
+        admin = self._pedir(tipo="liquidaciones_pdf")[0]
+        ejecutar_exportacion(admin["id"])
+        gerente = User.objects.create_user("gerente", "g@a.com", "x", rol=Usuario.GERENTE)
+        self.client.force_authenticate(gerente)
+
+        for tipo in ("liquidaciones_pdf", "empleados_pdf"):
+            with self.subTest(tipo=tipo):
+                r = self.client.post(reverse("exportaciones"), {"tipo": tipo}, format="json")
+                self.assertEqual(r.status_code, 403)
+        self.assertEqual(self.client.get(reverse("exportacion_descarga", args=[admin["id"]])).status_code, 403)
+        self._pedir(tipo="asistencia_pdf", mes=10, anio=2025)
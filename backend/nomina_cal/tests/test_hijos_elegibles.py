@@ -0,0 +1,54 @@
+# backend/nomina_cal/tests/test_hijos_elegibles.py
+#
+# El conteo agregado de hijos elegibles (Hijo.objects.conteo_elegibles)
+# debe coincidir con las reglas del motor (motor_calculo.hijo_elegible).
+#
+
+from datetime import date
+from decimal import Decimal
+from django.test import TestCase
+
+from empleados.models import Empleado, Hijo
+from nomina_cal.services.motor_calculo import HijoSnapshot, hijo_elegible
+from nomina_cal.tests.utils import SinAuditoriaMixin
+
+
+class HijosElegiblesTests(SinAuditoriaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.emps = []
+        nacimientos = [
+            date(2008, 2, 29), date(2008, 2, 28), date(2008, 3, 1), date(2007, 10, 1),
+            date(2007, 10, 2), date(2015, 6, 1), date(2020, 1, 1),
+        ]
+        for i, fnac in enumerate(nacimientos):
+            emp = Empleado.objects.create(
+                nombre=f"E{i}", apellido="Hijos", cedula=f"66{i:04d}",
+                fecha_ingreso=date(2020, 1, 1), salario_base=Decimal("3000000.00"),
+            )
+            self.emps.append(emp)
+            Hijo.objects.create(empleado=emp, nombre="a", fecha_nacimiento=fnac)
+            Hijo.objects.create(empleado=emp, nombre="b", fecha_nacimiento=fnac, activo=False)
+            Hijo.objects.create(empleado=emp, nombre="c", fecha_nacimiento=fnac, residente=False)
+            Hijo.objects.create(
+                empleado=emp, nombre="d", fecha_nacimiento=fnac, fecha_vencimiento_residencia=date(2025, 10, 1),
+            )
+        for j in range(5):
+            Hijo.objects.create(empleado=self.emps[-1], nombre=f"x{j}", fecha_nacimiento=date(2019, 1, 1))
+
+    def test_conteo_agregado_coincide_con_el_motor(self):
+        hijos = list(Hijo.objects.all())
+        for ref in [date(2025, 10, 1), date(2025, 10, 2), date(2026, 2, 28), date(2026, 3, 1),
+                    date(2028, 2, 29), date(2024, 2, 29)]:
+            with self.subTest(ref=ref):
+                esperado = {}
+                for h in hijos:
+                    snap = HijoSnapshot(h.fecha_nacimiento, h.residente, h.fecha_vencimiento_residencia, h.activo)
+                    if hijo_elegible(snap, ref):
+                        esperado[h.empleado_id] = min(esperado.get(h.empleado_id, 0) + 1, 4)
+                with self.assertNumQueries(1):
+                    obtenido = Hijo.objects.conteo_elegibles(ref)
+                self.assertEqual(obtenido, esperado)
+
+    def test_tope_de_4_hijos(self):
+        self.assertEqual(Hijo.objects.conteo_elegibles(date(2025, 10, 1))[self.emps[-1].id], 4)
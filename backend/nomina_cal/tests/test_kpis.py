@@ -0,0 +1,112 @@
+# backend/nomina_cal/tests/test_kpis.py
+#
+# Tests del constructor de KPIs: todas las métricas en una consulta (IPS
+# con FILTER sin multiplicar las sumas) y cantidad de consultas fija por
+# endpoint de dashboard/reporte, sin importar cuántas liquidaciones haya.
+#
+
+from datetime import date
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from empleados.models import Empleado
+from nomina_cal import views_reportes
+from nomina_cal.models import Concepto, DetalleLiquidacion, Liquidacion
+from nomina_cal.services import resumen_nomina
+from nomina_cal.services.kpis import kpis, kpis_por_grupo
+from nomina_cal.tests.utils import SinAuditoriaMixin
+from usuarios.models import Usuario
+
+User = get_user_model()
+
+# Endpoint → consultas (el resumen ya está al día y la caché desactivada)
+CONSULTAS_POR_ENDPOINT = {
+    ("admin", "/api/nomina_cal/reportes/simple/"): 2,
+    ("admin", "/api/nomina_cal/reporte-general/"): 2,
+    ("admin", "/api/nomina_cal/analytics/kpis/?mes=10&anio=2025"): 5,
+    ("admin", "/api/nomina_cal/analytics/serie6/"): 2,
+    ("admin", "/api/nomina_cal/dashboard/admin/"): 8,
+    ("admin", "/api/nomina_cal/dashboard/gerente/"): 5,
+    ("admin", "/api/nomina_cal/dashboard/asistente/"): 3,
+    ("admin", "/api/nomina_cal/dashboard/admin/json/"): 4,
+    ("gerente", "/api/nomina_cal/dashboard/gerente/json/"): 5,
+    ("asistente", "/api/nomina_cal/dashboard/asistente/json/"): 1,
+}
+
+
+@override_settings(DASHBOARD_CACHE_TTL=0)
+class KpisTests(SinAuditoriaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.ips = Concepto.objects.create(descripcion="Aporte IPS 9%", es_debito=True)
+        self.otro = Concepto.objects.create(descripcion="Bonificación")
+        self.usuarios = {
+            "admin": User.objects.create_superuser("admin", "a@a.com", "x"),
+            "gerente": User.objects.create_user("gerente", "g@a.com", "x", rol=Usuario.GERENTE),
+            "asistente": User.objects.create_user("asistente", "s@a.com", "x", rol=Usuario.ASISTENTE),
+        }
+
+    def _cargar(self, n):
+        for i in range(n):
+            emp = Empleado.objects.create(
+                nombre=f"Emp{i}", apellido="Kpi", cedula=f"{n}{i:05d}", area="IT" if i % 2 else "RRHH",
+                fecha_ingreso=date(2020, 1, 1), salario_base=Decimal("1000000.00"),
+            )
+            liq = Liquidacion.objects.create(
+                empleado=emp, mes=10, anio=2025, cerrada=i == 0, total_ingresos=Decimal("1000000.00"),
+                total_descuentos=Decimal("90000.00"), neto_cobrar=Decimal("910000.00"),
+            )
+            # Dos líneas IPS y una que no lo es: la suma no debe multiplicarse
+            DetalleLiquidacion.objects.bulk_create([
+                DetalleLiquidacion(liquidacion=liq, concepto=self.ips, monto=Decimal("50000.00")),
+                DetalleLiquidacion(liquidacion=liq, concepto=self.ips, monto=Decimal("40000.00")),
+                DetalleLiquidacion(liquidacion=liq, concepto=self.otro, monto=Decimal("10000.00")),
+            ])
+        resumen_nomina.reconstruir()
+
+    def test_todas_las_metricas_en_una_consulta(self):
+        self._cargar(3)
+        with self.assertNumQueries(1):
+            datos = kpis(Liquidacion.objects.filter(mes=10, anio=2025))
+        self.assertEqual((datos["cantidad"], datos["cerradas"], datos["abiertas"], datos["empleados"]), (3, 1, 2, 3))
+        self.assertEqual(datos["total_neto"], Decimal("2730000.00"))
+        self.assertEqual(datos["total_ips"], Decimal("270000.00"))
+        self.assertEqual(datos["promedio_neto"], Decimal("910000.00"))
+
+        vacio = kpis(Liquidacion.objects.filter(anio=1990), "cantidad", "total_ips")
+        self.assertEqual(vacio, {"cantidad": 0, "total_ips": Decimal("0")})
+
+        with self.assertNumQueries(1):
+            grupos = kpis_por_grupo(Liquidacion.objects.all(), ["empleado__area"], "cantidad", "total_ips")
+        self.assertEqual(
+            sorted((g["empleado__area"], g["cantidad"], g["total_ips"]) for g in grupos),
+            [("IT", 1, Decimal("90000.00")), ("RRHH", 2, Decimal("180000.00"))],
+        )
+        with self.assertRaises(ValueError):
+            kpis(Liquidacion.objects.all(), "mediana")
+
+    def _consultas(self, rol, ruta):
+        client = APIClient()
+        client.force_authenticate(self.usuarios[rol])
+        with self.assertNumQueries(CONSULTAS_POR_ENDPOINT[(rol, ruta)]):
+            r = client.get(ruta)
+        self.assertEqual(r.status_code, 200, ruta)
+        return r
+
+    def test_consultas_por_endpoint_constantes(self):
+        for n in (2, 6):
+            self._cargar(n)
+            for rol, ruta in CONSULTAS_POR_ENDPOINT:
+                with self.subTest(n=n, ruta=ruta):
+                    self._consultas(rol, ruta)
+
+            request = RequestFactory().get("/reportes/general/", {"mes": 10, "anio": 2025})
+            request.user = self.usuarios["admin"]
+            with self.assertNumQueries(3):
+                views_reportes.reporte_general(request)
+
+        r = self._consultas("admin", "/api/nomina_cal/reportes/simple/")
+        self.assertEqual(r.data["total_liquidaciones"], 8)
+        self.assertEqual(Decimal(r.data["total_nomina"]), Decimal("7280000.00"))
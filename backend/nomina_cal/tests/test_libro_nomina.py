@@ -0,0 +1,96 @@
+# backend/nomina_cal/tests/test_libro_nomina.py
+#
+# Tests del libro de sueldos: PDF único emitido por partes, con xref
+# consistente, índice y totales al final, filtro por área y endpoint.
+#
+
+import re
+import zlib
+from datetime import date
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from empleados.models import Empleado
+from nomina_cal.models import Concepto, DetalleLiquidacion, Liquidacion
+from nomina_cal.models_exportacion import ExportacionReporte
+from nomina_cal.services.libro_nomina import generar_libro, liquidaciones_libro
+from nomina_cal.tests.utils import SinAuditoriaMixin
+
+User = get_user_model()
+
+
+def _validar_pdf(test, pdf: bytes):
+    """Cada entrada del xref apunta a su objeto y startxref al xref."""
+    test.assertTrue(pdf.startswith(b"%PDF-1.4"))
+    test.assertTrue(pdf.endswith(b"%%EOF\n"))
+    inicio_xref = int(re.search(rb"startxref\n(\d+)\n", pdf).group(1))
+    test.assertTrue(pdf[inicio_xref:].startswith(b"xref\n"))
+    total = int(re.match(rb"xref\n0 (\d+)\n", pdf[inicio_xref:]).group(1))
+    entradas = re.findall(rb"(\d{10}) 00000 n \n", pdf[inicio_xref:])
+    test.assertEqual(len(entradas), total - 1)
+    for num, offset in enumerate(entradas, start=1):
+        test.assertTrue(pdf[int(offset):].startswith(b"%d 0 obj\n" % num), num)
+
+
+def _textos(pdf: bytes) -> bytes:
+    flujos = re.findall(rb"stream\n(.*?)\nendstream", pdf, re.S)
+    return b"\n".join(zlib.decompress(f) for f in flujos)
+
+
+class LibroNominaTests(SinAuditoriaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        sueldo = Concepto.objects.create(descripcion="Sueldo Base", es_debito=False)
+        for i, (apellido, area) in enumerate([("Zapata", "IT"), ("Acosta", "Planta"), ("Benítez", "IT")]):
+            emp = Empleado.objects.create(
+                nombre=f"Emp{i}", apellido=apellido, cedula=f"77{i:04d}", area=area,
+                fecha_ingreso=date(2020, 1, 1), salario_base=Decimal("3000000.00"),
+            )
+            liq = Liquidacion.objects.create(
+                empleado=emp, mes=10, anio=2025, total_ingresos=Decimal("3000000.00"),
+                total_descuentos=Decimal("270000.00"), neto_cobrar=Decimal("2730000.00"),
+            )
+            DetalleLiquidacion.objects.create(liquidacion=liq, concepto=sueldo, monto=Decimal("3000000.00"))
+
+    def test_libro_por_partes_con_indice_y_totales(self):
+        partes = list(generar_libro(liquidaciones_libro(10, 2025), 10, 2025, lote=2))
+        pdf = b"".join(partes)
+
+        # inicio + 3 recibos + índice + totales + cierre
+        self.assertEqual(len(partes), 7)
+        _validar_pdf(self, pdf)
+        self.assertIn(b"/Type /Pages", pdf)
+        self.assertIn(b"/Count 5 >>", pdf)
+
+        textos = _textos(pdf)
+        self.assertLess(textos.index(b"Acosta"), textos.index(b"Ben\xedtez"))
+        self.assertLess(textos.index(b"Ben\xedtez"), textos.index(b"Zapata"))
+        self.assertIn("Índice de empleados".encode("cp1252"), textos)
+        self.assertIn(b"8,190,000", textos)  # neto total del período
+        self.assertIn(rb"Acumulado del libro \(2 recibos\)", textos)
+
+    def test_filtro_por_area(self):
+        pdf = b"".join(generar_libro(liquidaciones_libro(10, 2025, area="IT"), 10, 2025))
+        _validar_pdf(self, pdf)
+        self.assertIn(b"/Count 4 >>", pdf)
+        self.assertNotIn(b"Acosta", _textos(pdf))
+
+    def test_endpoint_streaming(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_superuser("admin", "a@a.com", "x"))
+
+        r = client.get(reverse("libro_nomina"), {"mes": 10, "anio": 2025})
+        self.assertEqual(r.status_code, 200)
+        self.assertTrue(r.streaming)
+        _validar_pdf(self, b"".join(r.streaming_content))
+
+        self.assertEqual(client.get(reverse("libro_nomina"), {"mes": 13, "anio": 2025}).status_code, 400)
+
+        # Asíncrono con filtro: el área viaja en los parámetros de la exportación
+        with self.captureOnCommitCallbacks(execute=False):
+            r = client.get(reverse("libro_nomina"), {"mes": 10, "anio": 2025, "area": "IT", "asincrono": 1})
+        self.assertEqual(r.status_code, 202)
+        self.assertEqual(ExportacionReporte.objects.get().parametros, {"mes": 10, "anio": 2025, "area": "IT"})
@@ -0,0 +1,52 @@
+# backend/nomina_cal/tests/test_linea_salario_minimo.py
+#
+# Tests de la línea de tiempo en memoria del salario mínimo.
+#
+
+from datetime import date, datetime
+from decimal import Decimal
+from django.test import TestCase
+
+from nomina_cal.models import SalarioMinimo
+from nomina_cal.services.linea_salario_minimo import linea_salario_minimo
+
+
+class LineaSalarioMinimoTests(TestCase):
+    def setUp(self):
+        linea_salario_minimo.invalidar()
+        self.addCleanup(linea_salario_minimo.invalidar)
+        for desde, monto, vigente in [
+            (date(2023, 7, 1), "2680373.00", True),
+            (date(2024, 7, 1), "2798309.00", True),
+            (date(2025, 1, 1), "9999999.00", False),
+            (date(2025, 7, 1), "2899048.00", True),
+        ]:
+            SalarioMinimo.objects.create(vigente_desde=desde, monto=Decimal(monto), vigente=vigente)
+
+    def test_coincide_con_la_consulta_ordenada(self):
+        for fecha in [date(2023, 6, 30), date(2023, 7, 1), date(2024, 12, 31), date(2025, 3, 1),
+                      date(2025, 7, 1), date(2030, 1, 1)]:
+            with self.subTest(fecha=fecha):
+                esperado = (
+                    SalarioMinimo.objects.filter(vigente_desde__lte=fecha, vigente=True)
+                    .order_by("-vigente_desde").first()
+                )
+                self.assertEqual(SalarioMinimo.get_vigente(fecha), esperado)
+        self.assertEqual(SalarioMinimo.get_vigente(datetime(2025, 8, 1, 10, 0)).monto, Decimal("2899048.00"))
+
+    def test_memoizada_e_invalidada_al_guardar(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            SalarioMinimo.get_vigente(date(2025, 8, 1))
+        with self.assertNumQueries(0):
+            for mes in range(1, 13):
+                SalarioMinimo.get_vigente(date(2025, mes, 1))
+
+        SalarioMinimo.objects.create(vigente_desde=date(2025, 8, 1), monto=Decimal("3000000.00"), vigente=True)
+        self.assertEqual(SalarioMinimo.get_vigente(date(2025, 8, 15)).monto, Decimal("3000000.00"))
+
+    def test_invalidacion_en_la_transaccion_descarta_la_carga_previa(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            SalarioMinimo.get_vigente(date(2025, 8, 1))
+            SalarioMinimo.objects.create(vigente_desde=date(2025, 8, 1), monto=Decimal("3000000.00"), vigente=True)
+        # La línea leída antes del alta no vuelve a la memoria al confirmar
+        self.assertEqual(SalarioMinimo.get_vigente(date(2025, 8, 15)).monto, Decimal("3000000.00"))
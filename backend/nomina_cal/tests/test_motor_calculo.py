@@ -0,0 +1,103 @@
+# backend/nomina_cal/tests/test_motor_calculo.py
+#
+# Tests del motor de cálculo puro (sin base de datos) y de que los
+# puntos de entrada con modelos deleguen en él.
+#
+
+from datetime import date
+from decimal import Decimal
+from django.test import SimpleTestCase, TestCase
+
+from empleados.models import Empleado, Hijo
+from nomina_cal.models import Liquidacion, SalarioMinimo
+from nomina_cal.models_descuento import Descuento
+from nomina_cal.services import motor_calculo
+from nomina_cal.services.motor_calculo import (
+    DescuentoSnapshot,
+    EmpleadoSnapshot,
+    HijoSnapshot,
+)
+from nomina_cal.services.calculo_individual import calcular_liquidacion
+from nomina_cal.services.calculo_nomina import calcular_liquidaciones_periodo, PeriodoLiquidacion
+from nomina_cal.tests.utils import SinAuditoriaMixin
+
+SM = Decimal("2800000.00")
+REF = date(2025, 10, 1)
+
+
+def _lineas(resultado):
+    return {l.concepto.descripcion: l.monto for l in resultado.lineas}
+
+
+class MotorCalculoTests(SimpleTestCase):
+    def test_sueldo_ips_y_descuentos(self):
+        emp = EmpleadoSnapshot(
+            id=1,
+            sueldo_base=Decimal("5000000.00"),
+            descuentos=(DescuentoSnapshot("prestamo", Decimal("100000.00"), recurrente=True),),
+        )
+        r = motor_calculo.calcular(emp, SM, REF)
+        self.assertEqual(_lineas(r), {
+            "Sueldo Base": Decimal("5000000.00"),
+            "Descuento IPS 9%": Decimal("450000.00"),
+            "Descuento: Prestamo": Decimal("100000.00"),
+        })
+        self.assertEqual(r.total_ingresos, Decimal("5000000.00"))
+        self.assertEqual(r.total_descuentos, Decimal("550000.00"))
+        self.assertEqual(r.neto_cobrar, Decimal("4450000.00"))
+
+    def test_bonificacion_maximo_4_hijos_y_tope_3_sm(self):
+        hijos = tuple(HijoSnapshot(fecha_nacimiento=date(2015, 1, 1)) for _ in range(6))
+        r = motor_calculo.calcular(EmpleadoSnapshot(1, SM * 3, hijos=hijos), SM, REF)
+        self.assertEqual(_lineas(r)["Bonificación Familiar por Hijo"], Decimal("560000.00"))
+
+        r = motor_calculo.calcular(EmpleadoSnapshot(1, SM * 3 + 1, hijos=hijos), SM, REF)
+        self.assertNotIn("Bonificación Familiar por Hijo", _lineas(r))
+
+    def test_elegibilidad_de_hijos_a_la_fecha_de_referencia(self):
+        self.assertTrue(motor_calculo.hijo_elegible(HijoSnapshot(date(2007, 10, 2)), REF))
+        self.assertFalse(motor_calculo.hijo_elegible(HijoSnapshot(date(2007, 10, 1)), REF))
+        self.assertFalse(motor_calculo.hijo_elegible(HijoSnapshot(date(2015, 1, 1), residente=False), REF))
+        self.assertFalse(motor_calculo.hijo_elegible(HijoSnapshot(date(2015, 1, 1), activo=False), REF))
+        self.assertFalse(motor_calculo.hijo_elegible(
+            HijoSnapshot(date(2015, 1, 1), fecha_vencimiento_residencia=date(2025, 9, 30)), REF
+        ))
+
+    def test_sin_proporcionales_en_la_liquidacion_mensual(self):
+        lineas = _lineas(motor_calculo.calcular(EmpleadoSnapshot(1, Decimal("1200000.00")), SM, REF))
+        self.assertEqual(set(lineas), {"Sueldo Base", "Descuento IPS 9%"})
+
+
+class PuntosDeEntradaTests(SinAuditoriaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        SalarioMinimo.objects.create(monto=SM, vigente_desde=date(2025, 1, 1), vigente=True)
+        self.emp = Empleado.objects.create(
+            nombre="Ana", apellido="Motor", cedula="777001",
+            fecha_ingreso=date(2020, 1, 1), salario_base=Decimal("3000000.00"),
+        )
+        for i in range(2):
+            Hijo.objects.create(empleado=self.emp, nombre=f"H{i}", fecha_nacimiento=date(2016, 5, 1))
+        Descuento.objects.create(
+            empleado=self.emp, tipo="embargo", monto=Decimal("55000.00"), fecha_inicio=date(2025, 10, 5),
+        )
+
+    def _detalles(self, liq):
+        return dict(liq.detalles.values_list("concepto__descripcion", "monto"))
+
+    def test_calcular_totales_servicio_y_periodo_coinciden(self):
+        liq = Liquidacion.objects.create(empleado=self.emp, mes=10, anio=2025)
+        neto = liq.calcular_totales()
+        por_modelo = self._detalles(liq)
+        self.assertEqual(por_modelo["Bonificación Familiar por Hijo"], Decimal("280000.00"))
+        self.assertEqual(neto, Decimal("3000000.00") + Decimal("280000.00") - Decimal("270000.00") - Decimal("55000.00"))
+
+        calcular_liquidaciones_periodo(PeriodoLiquidacion(anio=2025, mes=10), modo="bulk")
+        liq.refresh_from_db()
+        self.assertEqual(self._detalles(liq), por_modelo)
+        self.assertEqual(liq.neto_cobrar, neto)
+
+        # El cálculo individual aplica las mismas reglas: mismo neto sea cual sea el último
+        calcular_liquidacion(liq)
+        self.assertEqual(self._detalles(liq), por_modelo)
+        self.assertEqual(liq.neto_cobrar, neto)
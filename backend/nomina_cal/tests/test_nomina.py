@@ -55,7 +55,7 @@ class NominaCalculoTests(TestCase):
 
         # Bonificación esperada = hijos (3) * (5% * SM 3.000.000) = 3 * 150.000 = 450.000
         bonificacion_esperada = Decimal("150000.00") * 3  # 450.000
-        detalle_bono = DetalleLiquidacion.objects.filter(liquidacion=self.liq, concepto__descripcion="Bonificación Familiar").first()
+        detalle_bono = DetalleLiquidacion.objects.filter(liquidacion=self.liq, concepto__descripcion="Bonificación Familiar por Hijo").first()
         self.assertIsNotNone(detalle_bono)
         self.assertEqual(detalle_bono.monto, bonificacion_esperada)
 
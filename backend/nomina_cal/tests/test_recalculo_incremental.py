@@ -0,0 +1,90 @@
+# backend/nomina_cal/tests/test_recalculo_incremental.py
+#
+# Tests del recálculo incremental: solo se recalculan las liquidaciones
+# abiertas marcadas por un cambio de datos.
+#
+
+from datetime import date
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from asistencia.models import RegistroAsistencia
+from empleados.models import Empleado, Hijo
+from nomina_cal.models import Liquidacion, SalarioMinimo
+from nomina_cal.models_descuento import Descuento
+from nomina_cal.tests.utils import SinAuditoriaMixin
+
+User = get_user_model()
+
+
+class RecalculoIncrementalTests(SinAuditoriaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        SalarioMinimo.objects.create(monto=Decimal("2800000.00"), vigente_desde=date(2025, 1, 1), vigente=True)
+        self.emps = [
+            Empleado.objects.create(
+                nombre=f"Emp{i}", apellido="Inc", cedula=f"55{i:04d}",
+                fecha_ingreso=date(2020, 1, 1), salario_base=Decimal("3000000.00"),
+            )
+            for i in range(3)
+        ]
+        self.liqs = [Liquidacion.objects.create(empleado=e, mes=10, anio=2025) for e in self.emps]
+
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser("admin", "a@a.com", "x"))
+        self.url = reverse("calcular_todas_alias")
+
+    def _pendientes(self):
+        return set(
+            Liquidacion.objects.filter(requiere_recalculo=True).values_list("empleado_id", flat=True)
+        )
+
+    def test_solo_recalcula_las_marcadas(self):
+        r = self.client.post(self.url)
+        self.assertEqual((r.data["recalculadas"], r.data["omitidas"]), (3, 0))
+        self.assertEqual(self._pendientes(), set())
+
+        r = self.client.post(self.url)
+        self.assertEqual((r.data["recalculadas"], r.data["omitidas"]), (0, 3))
+
+        Hijo.objects.create(empleado=self.emps[1], nombre="H", fecha_nacimiento=date(2016, 1, 1))
+        self.assertEqual(self._pendientes(), {self.emps[1].id})
+        r = self.client.post(self.url)
+        self.assertEqual((r.data["recalculadas"], r.data["omitidas"]), (1, 2))
+        self.liqs[1].refresh_from_db()
+        self.assertTrue(self.liqs[1].detalles.filter(concepto__descripcion="Bonificación Familiar por Hijo").exists())
+
+        r = self.client.post(self.url, {"forzar": True}, format="json")
+        self.assertEqual((r.data["recalculadas"], r.data["omitidas"]), (3, 0))
+
+    def test_cambios_que_marcan_liquidaciones(self):
+        Liquidacion.objects.update(requiere_recalculo=False)
+
+        emp = self.emps[0]
+        emp.nombre = "Otro"
+        emp.save()
+        self.assertEqual(self._pendientes(), set())
+        emp.salario_base = Decimal("3500000.00")
+        emp.save()
+        self.assertEqual(self._pendientes(), {emp.id})
+
+        Liquidacion.objects.update(requiere_recalculo=False)
+        Descuento.objects.create(
+            empleado=self.emps[2], tipo="embargo", monto=Decimal("1000.00"), fecha_inicio=date(2025, 10, 1),
+        )
+        self.assertEqual(self._pendientes(), {self.emps[2].id})
+
+        Liquidacion.objects.update(requiere_recalculo=False)
+        RegistroAsistencia.objects.create(empleado=self.emps[1], fecha=date(2025, 9, 3), estado="ausencia")
+        self.assertEqual(self._pendientes(), set())
+        RegistroAsistencia.objects.create(empleado=self.emps[1], fecha=date(2025, 10, 3), estado="ausencia")
+        self.assertEqual(self._pendientes(), {self.emps[1].id})
+
+        Liquidacion.objects.update(requiere_recalculo=False)
+        SalarioMinimo.objects.create(monto=Decimal("2900000.00"), vigente_desde=date(2025, 11, 1), vigente=True)
+        self.assertEqual(self._pendientes(), set())
+        SalarioMinimo.objects.create(monto=Decimal("2850000.00"), vigente_desde=date(2025, 10, 1), vigente=True)
+        self.assertEqual(self._pendientes(), {e.id for e in self.emps})
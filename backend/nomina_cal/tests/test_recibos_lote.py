@@ -0,0 +1,70 @@
+# backend/nomina_cal/tests/test_recibos_lote.py
+#
+# Tests del render de recibos por lote: mismos datos que el recibo
+# individual, consultas acotadas por bloque y salida a ZIP o directorio.
+#
+
+import io
+import tempfile
+import zipfile
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+from django.test import TestCase
+
+from empleados.models import Empleado
+from nomina_cal.models import Concepto, DetalleLiquidacion, Liquidacion
+from nomina_cal.services.plantilla_recibo import datos_recibo
+from nomina_cal.services.recibos_lote import bloques_datos, generar_recibos, liquidaciones_periodo
+from nomina_cal.tests.utils import SinAuditoriaMixin
+from nomina_cal.utils_email import generar_recibo_pdf
+
+
+class RecibosLoteTests(SinAuditoriaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        sueldo = Concepto.objects.create(descripcion="Sueldo Base", es_debito=False)
+        ips = Concepto.objects.create(descripcion="Aporte IPS (9%)", es_debito=True)
+        for i in range(5):
+            emp = Empleado.objects.create(
+                nombre=f"Emp{i}", apellido="Lote", cedula=f"55{i:04d}",
+                fecha_ingreso=date(2020, 1, 1), salario_base=Decimal("3000000.00"),
+            )
+            liq = Liquidacion.objects.create(
+                empleado=emp, mes=10, anio=2025, total_ingresos=Decimal("3000000.00"),
+                total_descuentos=Decimal("270000.00"), neto_cobrar=Decimal("2730000.00"),
+            )
+            DetalleLiquidacion.objects.create(liquidacion=liq, concepto=sueldo, monto=Decimal("3000000.00"))
+            DetalleLiquidacion.objects.create(liquidacion=liq, concepto=ips, monto=Decimal("270000.00"))
+        Liquidacion.objects.create(empleado=emp, mes=9, anio=2025)
+
+    def test_bloques_con_consultas_acotadas_y_mismos_datos(self):
+        # 1 consulta de ids + 2 por bloque (liquidaciones y detalles)
+        with self.assertNumQueries(5):
+            bloques = list(bloques_datos(liquidaciones_periodo(10, 2025), lote=3))
+        self.assertEqual([len(b) for b in bloques], [3, 2])
+
+        liq = Liquidacion.objects.filter(mes=10, anio=2025).order_by("id").first()
+        self.assertEqual(bloques[0][0], datos_recibo(liq))
+        self.assertEqual(len(bloques[0][0].lineas), 2)
+
+    def test_recibo_individual_sigue_generando_pdf(self):
+        liq = Liquidacion.objects.filter(mes=10).first()
+        self.assertTrue(generar_recibo_pdf(liq).getvalue().startswith(b"%PDF"))
+
+    def test_zip_en_stream_con_pool_de_procesos(self):
+        salida = io.BytesIO()
+        n = generar_recibos(liquidaciones_periodo(10, 2025), salida, procesos=2, lote=2)
+
+        self.assertEqual(n, 5)
+        with zipfile.ZipFile(io.BytesIO(salida.getvalue())) as zf:
+            nombres = zf.namelist()
+            ids = Liquidacion.objects.filter(mes=10).order_by("id").values_list("id", flat=True)
+            self.assertEqual(nombres, [f"recibo_{i}.pdf" for i in ids])
+            self.assertTrue(zf.read(nombres[0]).startswith(b"%PDF"))
+
+    def test_directorio(self):
+        destino = Path(tempfile.mkdtemp())
+        n = generar_recibos(liquidaciones_periodo(10, 2025), destino, procesos=1)
+        self.assertEqual(n, 5)
+        self.assertEqual(len(list(destino.glob("recibo_*.pdf"))), 5)
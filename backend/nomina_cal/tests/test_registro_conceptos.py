@@ -0,0 +1,59 @@
+# backend/nomina_cal/tests/test_registro_conceptos.py
+#
+# Tests del registro en memoria de Conceptos usado por los calculadores.
+#
+
+from django.test import TestCase
+
+from nomina_cal.models import Concepto
+from nomina_cal.services.motor_calculo import (
+    CONCEPTO_IPS,
+    CONCEPTO_SUELDO,
+    concepto_descuento,
+)
+from nomina_cal.services.registro_conceptos import registro_conceptos
+
+
+class RegistroConceptosTests(TestCase):
+    def setUp(self):
+        registro_conceptos.invalidar()
+        self.addCleanup(registro_conceptos.invalidar)
+        self.sueldo = Concepto.objects.create(descripcion="Sueldo Base", afecta_ips=True)
+
+    def test_crea_faltantes_en_lote_con_defaults(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ids = registro_conceptos.resolver(
+                [CONCEPTO_SUELDO, CONCEPTO_IPS, concepto_descuento("embargo")]
+            )
+        self.assertEqual(ids["Sueldo Base"], self.sueldo.id)
+        embargo = Concepto.objects.get(descripcion="Descuento: Embargo")
+        self.assertEqual(ids["Descuento: Embargo"], embargo.id)
+        self.assertTrue(embargo.es_debito)
+        self.assertFalse(embargo.para_aguinaldo)
+
+    def test_registro_caliente_no_consulta_la_base(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            registro_conceptos.resolver([CONCEPTO_SUELDO, CONCEPTO_IPS])
+        with self.assertNumQueries(0):
+            ids = registro_conceptos.resolver([CONCEPTO_SUELDO, CONCEPTO_IPS])
+        self.assertEqual(ids["Sueldo Base"], self.sueldo.id)
+
+    def test_cambios_en_concepto_invalidan_el_registro(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            registro_conceptos.resolver([CONCEPTO_SUELDO])
+        self.sueldo.delete()
+        nuevo = Concepto.objects.create(descripcion="Sueldo Base")
+        self.assertEqual(registro_conceptos.obtener_id(CONCEPTO_SUELDO), nuevo.id)
+
+    def test_sin_commit_no_retiene_ids(self):
+        registro_conceptos.resolver([concepto_descuento("prestamo")])
+        with self.assertNumQueries(1):
+            registro_conceptos.resolver([concepto_descuento("prestamo")])
+
+    def test_invalidacion_en_la_transaccion_descarta_la_carga_previa(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            registro_conceptos.resolver([CONCEPTO_SUELDO])
+            self.sueldo.delete()
+            nuevo = Concepto.objects.create(descripcion="Sueldo Base")
+        # El guardado diferido de la carga anterior no restaura el id borrado
+        self.assertEqual(registro_conceptos.obtener_id(CONCEPTO_SUELDO), nuevo.id)
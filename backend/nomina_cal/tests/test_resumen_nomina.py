@@ -0,0 +1,126 @@
+# backend/nomina_cal/tests/test_resumen_nomina.py
+#
+# Tests del resumen mensual de nómina: agregado por (año, mes, área,
+# contrato), marcado incremental por escrituras, reconstrucción y
+# dashboards que leen del resumen.
+#
+
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from empleados.models import Empleado
+from nomina_cal.models import Concepto, DetalleLiquidacion, Liquidacion
+from nomina_cal.models_resumen import PeriodoResumenPendiente, ResumenNominaMensual
+from nomina_cal.services import resumen_nomina
+from nomina_cal.services.salida_correos import cerrar_liquidaciones
+from nomina_cal.tests.utils import SinAuditoriaMixin
+
+User = get_user_model()
+
+
+class ResumenNominaTests(SinAuditoriaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        ips = Concepto.objects.create(descripcion="Aporte IPS 9%", es_debito=True)
+        grupos = [("IT", "INDEFINIDO"), ("IT", "INDEFINIDO"), ("RRHH", "TEMPORAL")]
+        self.liqs = []
+        for i, (area, contrato) in enumerate(grupos):
+            emp = Empleado.objects.create(
+                nombre=f"Emp{i}", apellido="Resumen", cedula=f"88{i:04d}", area=area, tipo_contrato=contrato,
+                fecha_ingreso=date(2020, 1, 1), salario_base=Decimal("3000000.00"),
+            )
+            for mes in (9, 10):
+                liq = Liquidacion.objects.create(
+                    empleado=emp, mes=mes, anio=2025, total_ingresos=Decimal("3000000.00"),
+                    total_descuentos=Decimal("270000.00"), neto_cobrar=Decimal("2730000.00"),
+                )
+                DetalleLiquidacion.objects.create(liquidacion=liq, concepto=ips, monto=Decimal("270000.00"))
+                self.liqs.append(liq)
+
+    def test_agregado_por_grupo(self):
+        self.assertEqual(PeriodoResumenPendiente.objects.count(), 2)
+        fila = resumen_nomina.resumen(anio=2025, mes=10, area="IT").get()
+        self.assertEqual(PeriodoResumenPendiente.objects.count(), 0)
+        self.assertEqual(fila.tipo_contrato, "INDEFINIDO")
+        self.assertEqual(fila.cantidad, 2)
+        self.assertEqual(fila.total_neto, Decimal("5460000.00"))
+        self.assertEqual(fila.total_ips, Decimal("540000.00"))
+
+        totales = resumen_nomina.totales(anio=2025, mes=10)
+        self.assertEqual(totales["cantidad"], 3)
+        self.assertEqual(totales["total_descuentos"], Decimal("810000.00"))
+        self.assertEqual(totales["promedio_neto"], Decimal("2730000.00"))
+
+    def test_escrituras_marcan_solo_su_periodo(self):
+        resumen_nomina.resumen()
+        liq = self.liqs[1]  # Emp0, 10/2025
+        liq.neto_cobrar = Decimal("1000000.00")
+        liq.save()
+        self.assertEqual(list(PeriodoResumenPendiente.objects.values_list("anio", "mes")), [(2025, 10)])
+        self.assertEqual(resumen_nomina.totales(anio=2025, mes=10)["total_neto"], Decimal("6460000.00"))
+
+        # El cierre masivo (update) actualiza las cerradas del período
+        cerrar_liquidaciones(Liquidacion.objects.filter(mes=9))
+        self.assertEqual(resumen_nomina.totales(anio=2025, mes=9)["cerradas"], 3)
+
+        Liquidacion.objects.filter(pk=self.liqs[5].pk).delete()
+        self.assertEqual(resumen_nomina.totales(anio=2025, mes=10)["cantidad"], 2)
+
+        # Cambiar el área de un empleado mueve su historia de grupo
+        emp = Empleado.objects.get(cedula="880000")
+        emp.area = "VENTAS"
+        emp.save()
+        self.assertEqual(resumen_nomina.resumen(area="VENTAS").count(), 2)
+
+    def test_recalculo_marca_una_vez_por_periodo(self):
+        resumen_nomina.resumen()
+        with CaptureQueriesContext(connection) as consultas:
+            for liq in Liquidacion.objects.filter(mes=10):
+                liq.calcular_totales()
+        upserts = [q for q in consultas.captured_queries if "periodoresumenpendiente" in q["sql"].lower()]
+        self.assertEqual(len(upserts), 3)  # uno por liquidación, no uno por detalle
+
+        resumen_nomina.resumen()
+        with CaptureQueriesContext(connection) as consultas, resumen_nomina.agrupar_marcas():
+            for liq in Liquidacion.objects.filter(mes=10):
+                liq.calcular_totales()
+            self.assertFalse(PeriodoResumenPendiente.objects.filter(mes=10).exists())
+        upserts = [q for q in consultas.captured_queries if "periodoresumenpendiente" in q["sql"].lower()]
+        self.assertEqual(len(upserts), 2)  # la consulta de arriba y un único upsert al salir
+        self.assertEqual(list(PeriodoResumenPendiente.objects.values_list("anio", "mes")), [(2025, 10)])
+
+    def test_reconstruccion(self):
+        resumen_nomina.resumen()
+        ResumenNominaMensual.objects.all().delete()
+        salida = StringIO()
+        call_command("reconstruir_resumen_nomina", stdout=salida)
+        self.assertIn("2 períodos", salida.getvalue())
+        self.assertEqual(ResumenNominaMensual.objects.count(), 4)
+
+    def test_dashboards_leen_del_resumen(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_superuser("admin", "a@a.com", "x"))
+        resumen_nomina.resumen()
+
+        # Consultas constantes: no dependen de la cantidad de liquidaciones
+        with self.assertNumQueries(5):
+            r = client.get(reverse("analytics_kpis"), {"mes": 10, "anio": 2025})
+        self.assertEqual(r.data["total_nomina_mes"], 8190000.0)
+        self.assertEqual(r.data["total_ips_mes"], 810000.0)
+
+        r = client.get(reverse("analytics_distribucion_area"), {"mes": 10, "anio": 2025})
+        self.assertEqual(r.data["series"][0], {"empleado__area": "IT", "total": Decimal("5460000.00")})
+
+        r = client.get(reverse("dashboard_gerente_cbv"))
+        self.assertEqual(r.data["total_liquidaciones"], 6)
+        self.assertEqual(r.data["promedio_nomina"], Decimal("2730000.00"))
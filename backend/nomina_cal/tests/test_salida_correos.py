@@ -0,0 +1,155 @@
+# backend/nomina_cal/tests/test_salida_correos.py
+#
+# Tests de la salida de correos: el cierre encola los recibos sin enviar
+# nada, un solo drenaje por commit, envío, reintentos con espera, fallos
+# permanentes sin reintento y una sola cadena de reprogramación.
+#
+
+import shutil
+import smtplib
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+from django.core import mail
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from empleados.models import Empleado
+from nomina_cal.models import Liquidacion
+from nomina_cal.models_envio import SalidaCorreo
+from nomina_cal.services import salida_correos
+from nomina_cal.services.salida_correos import (
+    ESPERA_BASE, MAX_INTENTOS, cerrar_liquidaciones, drenar_salida,
+)
+from nomina_cal.tests.utils import SinAuditoriaMixin
+
+
+@override_settings(ENVIO_CORREOS_POR_MINUTO=0)
+class SalidaCorreosTests(SinAuditoriaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        ajuste = override_settings(MEDIA_ROOT=media)
+        ajuste.enable()
+        self.addCleanup(ajuste.disable)
+        cache.delete_many([salida_correos.CLAVE_PROGRAMADA, salida_correos.CLAVE_REINTENTO])
+
+        self.liqs = []
+        for i in range(3):
+            emp = Empleado.objects.create(
+                nombre=f"Emp{i}", apellido="Salida", cedula=f"44{i:04d}",
+                email="" if i == 2 else f"emp{i}@empresa.com",
+                fecha_ingreso=date(2020, 1, 1), salario_base=Decimal("3000000.00"),
+            )
+            self.liqs.append(Liquidacion.objects.create(
+                empleado=emp, mes=10, anio=2025, neto_cobrar=Decimal("2730000.00"),
+            ))
+
+    def _cerrar(self):
+        with mock.patch.object(salida_correos, "_despachar") as despachar:
+            with self.captureOnCommitCallbacks(execute=True):
+                ids = cerrar_liquidaciones(Liquidacion.objects.filter(mes=10, anio=2025))
+        return ids, despachar
+
+    def test_cierre_encola_sin_enviar(self):
+        ids, despachar = self._cerrar()
+
+        self.assertEqual(len(ids), 3)
+        self.assertEqual(Liquidacion.objects.filter(cerrada=True).count(), 3)
+        self.assertEqual(SalidaCorreo.objects.filter(estado="pendiente").count(), 3)
+        self.assertEqual(len(mail.outbox), 0)
+        despachar.assert_called_once_with()
+        # Un segundo cierre no encuentra nada abierto
+        self.assertEqual(cerrar_liquidaciones(Liquidacion.objects.all()), [])
+
+    def test_drenaje_envia_y_marca(self):
+        self._cerrar()
+        totales = drenar_salida(reprogramar=False)
+
+        self.assertEqual(totales, {"enviados": 2, "reintentos": 0, "fallidos": 1})
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(SalidaCorreo.objects.filter(estado="enviado").count(), 2)
+        self.assertEqual(Liquidacion.objects.filter(enviado_email=True).count(), 2)
+        # Sin email no se reintenta
+        fallida = SalidaCorreo.objects.get(estado="fallido")
+        self.assertEqual(fallida.liquidacion_id, self.liqs[2].pk)
+        self.assertIn("sin email", fallida.ultimo_error)
+
+    def test_reintento_con_espera_y_fallo_definitivo(self):
+        self._cerrar()
+        with mock.patch("nomina_cal.services.envio_masivo._enviar", side_effect=OSError("smtp caído")):
+            antes = timezone.now()
+            totales = drenar_salida(reprogramar=False)
+            self.assertEqual(totales["reintentos"], 2)
+            salida = SalidaCorreo.objects.get(liquidacion=self.liqs[0])
+            self.assertEqual((salida.estado, salida.intentos), ("pendiente", 1))
+            self.assertGreaterEqual(salida.proximo_intento, antes + timedelta(seconds=ESPERA_BASE))
+            # Todavía no venció: un drenaje inmediato no la toma
+            self.assertEqual(drenar_salida(reprogramar=False)["reintentos"], 0)
+
+            for _ in range(MAX_INTENTOS - 1):
+                SalidaCorreo.objects.filter(estado="pendiente").update(proximo_intento=timezone.now())
+                drenar_salida(reprogramar=False)
+
+        salida.refresh_from_db()
+        self.assertEqual((salida.estado, salida.intentos), ("fallido", MAX_INTENTOS))
+        self.assertEqual(salida.ultimo_error, "smtp caído")
+        self.assertFalse(Liquidacion.objects.filter(enviado_email=True).exists())
+
+    def test_servidor_caido_reintenta_todo_el_lote_y_reprograma(self):
+        self._cerrar()
+        with mock.patch("django.core.mail.backends.locmem.EmailBackend.open", side_effect=ConnectionRefusedError("rechazada")), \
+                mock.patch.object(salida_correos, "_despachar") as despachar:
+            antes = timezone.now()
+            totales = drenar_salida()
+
+        self.assertEqual(totales, {"enviados": 0, "reintentos": 3, "fallidos": 0})
+        self.assertFalse(SalidaCorreo.objects.exclude(estado="pendiente").exists())
+        for salida in SalidaCorreo.objects.all():
+            self.assertEqual(salida.intentos, 1)
+            self.assertIn("rechazada", salida.ultimo_error)
+            self.assertGreaterEqual(salida.proximo_intento, antes + timedelta(seconds=ESPERA_BASE))
+        retraso = despachar.call_args.kwargs["retraso"]
+        self.assertAlmostEqual(retraso, ESPERA_BASE, delta=5)
+
+        # Con el servidor de vuelta, el reintento envía
+        SalidaCorreo.objects.update(proximo_intento=timezone.now())
+        self.assertEqual(drenar_salida(reprogramar=False)["enviados"], 2)
+
+    def test_rechazo_permanente_falla_sin_reintentos(self):
+        self._cerrar()
+        rechazo = smtplib.SMTPRecipientsRefused({"emp0@empresa.com": (550, b"No such user")})
+        with mock.patch("nomina_cal.services.envio_masivo._enviar", side_effect=rechazo):
+            totales = drenar_salida(reprogramar=False)
+
+        self.assertEqual(totales, {"enviados": 0, "reintentos": 0, "fallidos": 3})
+        salida = SalidaCorreo.objects.get(liquidacion=self.liqs[0])
+        self.assertEqual((salida.estado, salida.intentos), ("fallido", 1))
+
+        # Un 4xx (p. ej. greylisting) sí se reintenta
+        SalidaCorreo.objects.update(estado="pendiente", intentos=0, proximo_intento=timezone.now())
+        temporal = smtplib.SMTPRecipientsRefused({"emp0@empresa.com": (450, b"Try later")})
+        with mock.patch("nomina_cal.services.envio_masivo._enviar", side_effect=temporal):
+            self.assertEqual(drenar_salida(reprogramar=False)["reintentos"], 2)
+
+    def test_una_sola_cadena_de_reprogramacion(self):
+        self._cerrar()
+        with mock.patch("nomina_cal.services.envio_masivo._enviar", side_effect=OSError("smtp caído")), \
+                mock.patch.object(salida_correos, "_despachar") as despachar:
+            drenar_salida()
+            self.assertEqual(despachar.call_count, 1)
+            token = despachar.call_args.kwargs["reintento"]
+
+            # Un tick de Beat (o un cierre) con el reintento ya programado no abre otra cadena
+            SalidaCorreo.objects.filter(liquidacion=self.liqs[0]).update(proximo_intento=timezone.now())
+            drenar_salida()
+            self.assertEqual(despachar.call_count, 1)
+
+            # El drenaje programado sí se reprograma al terminar
+            SalidaCorreo.objects.filter(estado="pendiente").update(proximo_intento=timezone.now())
+            drenar_salida(reintento=token)
+            self.assertEqual(despachar.call_count, 2)
+            self.assertNotEqual(despachar.call_args.kwargs["reintento"], token)
@@ -0,0 +1,167 @@
+# backend/nomina_cal/tests/test_sendgrid_async.py
+#
+# Tests del cliente asíncrono de SendGrid contra un servidor HTTP local:
+# concurrencia acotada, sesión reutilizada, reintentos ante 429/5xx,
+# métricas del lote y envío masivo de recibos por tandas.
+#
+
+import json
+import shutil
+import tempfile
+import threading
+import time
+from datetime import date
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from django.core.mail import EmailMessage
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from empleados.models import Empleado
+from nomina_cal.models import Liquidacion
+from nomina_cal.models_envio import EnvioCorreo
+from nomina_cal.services.envio_masivo import enviar_recibos
+from nomina_cal.tests.utils import SinAuditoriaMixin
+from utils.sendgrid_async import EmailBackend, ErrorSendGrid, payload
+
+
+class _SendGridFalso:
+    """Servidor local que imita /v3/mail/send y registra lo recibido."""
+
+    def __init__(self, demora=0.0):
+        self.pedidos = []
+        self.puertos = set()
+        self.en_curso = 0
+        self.max_en_curso = 0
+        self.intentos = {}
+        self.lock = threading.Lock()
+        falso = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                cuerpo = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                destinatario = cuerpo["personalizations"][0]["to"][0]["email"]
+                with falso.lock:
+                    falso.en_curso += 1
+                    falso.max_en_curso = max(falso.max_en_curso, falso.en_curso)
+                    falso.puertos.add(self.client_address[1])
+                    falso.pedidos.append((self.headers["Authorization"], cuerpo))
+                    intento = falso.intentos[destinatario] = falso.intentos.get(destinatario, 0) + 1
+                time.sleep(demora)
+                with falso.lock:
+                    falso.en_curso -= 1
+
+                estado, cabeceras = 202, {}
+                if destinatario.startswith("limitado") and intento == 1:
+                    estado, cabeceras = 429, {"Retry-After": "0"}
+                elif destinatario.startswith("caido"):
+                    estado = 503
+                elif destinatario.startswith("invalido"):
+                    estado = 400
+                respuesta = b"" if estado == 202 else b'{"errors": [{"message": "rechazado"}]}'
+                self.send_response(estado)
+                for clave, valor in cabeceras.items():
+                    self.send_header(clave, valor)
+                self.send_header("Content-Length", str(len(respuesta)))
+                self.end_headers()
+                self.wfile.write(respuesta)
+
+        self.servidor = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.servidor.server_port}/v3/mail/send"
+        threading.Thread(target=self.servidor.serve_forever, daemon=True).start()
+
+    def detener(self):
+        self.servidor.shutdown()
+        self.servidor.server_close()
+
+
+def _mensaje(destinatario, adjunto=None):
+    mensaje = EmailMessage("Recibo", "Adjunto su recibo.", "rrhh@empresa.com", [destinatario])
+    if adjunto:
+        mensaje.attach("recibo.pdf", adjunto, "application/pdf")
+    return mensaje
+
+
+class ClienteSendGridTests(SimpleTestCase):
+    def setUp(self):
+        self.falso = _SendGridFalso(demora=0.05)
+        self.addCleanup(self.falso.detener)
+
+    def _backend(self, **kwargs):
+        return EmailBackend(api_key="clave", url=self.falso.url, concurrencia=3, espera_base=0, **kwargs)
+
+    def test_envio_concurrente_acotado_y_sesion_reutilizada(self):
+        backend = self._backend()
+        resultados = backend.enviar_lote([_mensaje(f"emp{i}@empresa.com", b"%PDF-1.4") for i in range(9)])
+
+        self.assertTrue(all(r.ok for r in resultados))
+        self.assertEqual(len(self.falso.pedidos), 9)
+        self.assertGreater(self.falso.max_en_curso, 1)
+        self.assertLessEqual(self.falso.max_en_curso, 3)
+        # Conexiones keep-alive del pool, no una por mensaje
+        self.assertLessEqual(len(self.falso.puertos), 3)
+        autorizacion, cuerpo = self.falso.pedidos[0]
+        self.assertEqual(autorizacion, "Bearer clave")
+        self.assertEqual(cuerpo["attachments"][0]["content"], "JVBERi0xLjQ=")
+        metricas = backend.ultimas_metricas
+        self.assertEqual((metricas.enviados, metricas.fallidos, metricas.reintentos), (9, 0, 0))
+        self.assertGreater(metricas.por_segundo, 0)
+
+    def test_reintentos_ante_429_y_5xx(self):
+        backend = self._backend(max_reintentos=2)
+        resultados = backend.enviar_lote([
+            _mensaje("limitado@empresa.com"), _mensaje("caido@empresa.com"), _mensaje("invalido@empresa.com"),
+        ])
+        limitado, caido, invalido = resultados
+
+        self.assertTrue(limitado.ok)
+        self.assertEqual(limitado.intentos, 2)
+        self.assertEqual((caido.estado, caido.intentos), (503, 3))
+        # Un 4xx que no es 429 no se reintenta
+        self.assertEqual((invalido.estado, invalido.intentos), (400, 1))
+        self.assertIn("rechazado", invalido.error)
+        metricas = backend.ultimas_metricas
+        self.assertEqual((metricas.enviados, metricas.fallidos, metricas.reintentos), (1, 2, 3))
+
+        with self.assertRaises(ErrorSendGrid):
+            backend.send_messages([_mensaje("invalido@empresa.com")])
+        self.assertEqual(self._backend(fail_silently=True).send_messages([_mensaje("invalido@empresa.com")]), 0)
+
+    def test_payload(self):
+        mensaje = _mensaje("a@empresa.com")
+        mensaje.cc = ["b@empresa.com"]
+        mensaje.content_subtype = "html"
+        datos = payload(mensaje)
+        self.assertEqual(datos["personalizations"][0]["cc"], [{"email": "b@empresa.com"}])
+        self.assertEqual(datos["content"][0]["type"], "text/html")
+        self.assertNotIn("attachments", datos)
+
+
+@override_settings(ENVIO_CORREOS_POR_MINUTO=0)
+class EnvioMasivoSendGridTests(SinAuditoriaMixin, TestCase):
+    def test_recibos_por_tandas(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        falso = _SendGridFalso()
+        self.addCleanup(falso.detener)
+        for i in range(4):
+            emp = Empleado.objects.create(
+                nombre=f"Emp{i}", apellido="Api", cedula=f"66{i:04d}",
+                email=f"invalido{i}@empresa.com" if i == 3 else f"emp{i}@empresa.com",
+                fecha_ingreso=date(2020, 1, 1), salario_base=Decimal("3000000.00"),
+            )
+            Liquidacion.objects.create(empleado=emp, mes=10, anio=2025, neto_cobrar=Decimal("2730000.00"))
+
+        conexion = EmailBackend(api_key="clave", url=falso.url, concurrencia=2)
+        with override_settings(MEDIA_ROOT=media):
+            resultado = enviar_recibos(Liquidacion.objects.all(), lote=3, conexion=conexion)
+
+        self.assertEqual(resultado, {"enviados": 3, "errores": 1, "sin_correo": 0})
+        self.assertEqual(len(falso.pedidos), 4)
+        self.assertEqual(falso.pedidos[0][1]["attachments"][0]["type"], "application/pdf")
+        self.assertEqual(Liquidacion.objects.filter(enviado_email=True).count(), 3)
+        self.assertIn("HTTP 400", EnvioCorreo.objects.get(estado="error").detalle_error)
@@ -0,0 +1,84 @@
+# backend/nomina_cal/tests/test_series_tiempo.py
+#
+# Tests de las series mensuales: meses calendario consecutivos, huecos en
+# cero, una consulta por serie y agrupación por área / concepto.
+#
+
+from datetime import date
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from empleados.models import Empleado
+from nomina_cal.models import Concepto, DetalleLiquidacion, Liquidacion
+from nomina_cal.services import resumen_nomina, series_tiempo
+from nomina_cal.tests.utils import SinAuditoriaMixin
+
+User = get_user_model()
+
+
+class VentanaTests(TestCase):
+    def test_meses_calendario_sin_saltos(self):
+        self.assertEqual(
+            series_tiempo.ventana(4, (2025, 2)),
+            [(2024, 11), (2024, 12), (2025, 1), (2025, 2)],
+        )
+        self.assertEqual(len(series_tiempo.meses((2023, 3), (2025, 2))), 24)
+        with self.assertRaises(ValueError):
+            series_tiempo.meses((2025, 3), (2025, 2))
+
+
+class SerieTests(SinAuditoriaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        bonificacion = Concepto.objects.create(descripcion="Bonificación")
+        ips = Concepto.objects.create(descripcion="Aporte IPS 9%", es_debito=True)
+        # Sin liquidaciones en 12/2024
+        datos = [("IT", 2024, 11), ("IT", 2025, 1), ("RRHH", 2025, 1), ("RRHH", 2025, 2)]
+        for i, (area, anio, mes) in enumerate(datos):
+            emp = Empleado.objects.create(
+                nombre=f"Emp{i}", apellido="Serie", cedula=f"66{i:04d}", area=area,
+                fecha_ingreso=date(2020, 1, 1), salario_base=Decimal("1000000.00"),
+            )
+            liq = Liquidacion.objects.create(empleado=emp, mes=mes, anio=anio, neto_cobrar=Decimal("1000000.00"))
+            DetalleLiquidacion.objects.create(liquidacion=liq, concepto=bonificacion, monto=Decimal("100000.00"))
+            DetalleLiquidacion.objects.create(liquidacion=liq, concepto=ips, monto=Decimal("90000.00"))
+        # Fuera de la ventana
+        Liquidacion.objects.create(empleado=emp, mes=10, anio=2024, neto_cobrar=Decimal("5000000.00"))
+        resumen_nomina.resumen()
+        self.periodos = series_tiempo.ventana(4, (2025, 2))
+
+    def test_total_con_huecos_en_cero_en_una_consulta(self):
+        with self.assertNumQueries(2):  # pendientes del resumen + serie
+            serie = series_tiempo.serie_total(self.periodos)
+        self.assertEqual(
+            [(a, m, int(v)) for a, m, v in serie],
+            [(2024, 11, 1000000), (2024, 12, 0), (2025, 1, 2000000), (2025, 2, 1000000)],
+        )
+
+    def test_agrupada_por_area_y_por_concepto(self):
+        por_area = series_tiempo.serie(self.periodos, agrupar="area")
+        self.assertEqual(list(por_area), ["IT", "RRHH"])
+        self.assertEqual([int(v) for v in por_area["RRHH"]], [0, 0, 1000000, 1000000])
+
+        por_concepto = series_tiempo.serie(self.periodos, agrupar="concepto", concepto__es_debito=True)
+        self.assertEqual([int(v) for v in por_concepto["Aporte IPS 9%"]], [90000, 0, 180000, 90000])
+        self.assertNotIn("Bonificación", por_concepto)
+
+        with self.assertRaises(ValueError):
+            series_tiempo.serie(self.periodos, agrupar="cargo")
+
+    def test_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_superuser("admin", "a@a.com", "x"))
+        r = client.get(reverse("analytics_serie"), {"desde": "2024-11", "hasta": "2025-02", "medida": "cantidad"})
+        self.assertEqual(r.status_code, 200, r.data)
+        self.assertEqual(r.data["periodos"], ["2024-11", "2024-12", "2025-01", "2025-02"])
+        self.assertEqual(r.data["series"], [{"grupo": "total", "valores": [1.0, 0.0, 2.0, 1.0]}])
+
+        r = client.get(reverse("analytics_serie"), {"meses": 500})
+        self.assertEqual(r.status_code, 400)
+        r = client.get(reverse("analytics_serie"), {"hasta": "2025-13"})
+        self.assertEqual(r.status_code, 400)
@@ -0,0 +1,24 @@
+# backend/nomina_cal/tests/utils.py
+#
+# Utilidades compartidas por los tests de nómina.
+#
+
+from unittest import mock
+
+from auditoria.auditlog_context import set_request
+
+
+class SinAuditoriaMixin:
+    """
+    Desactiva el registro de AuditLog durante el test.
+    El snapshot de auditoría incluye fechas (fecha_ingreso, fecha_nacimiento…)
+    que el JSONField no serializa, y no es lo que se prueba aquí.
+    También limpia el request que el middleware de auditoría deja en el hilo.
+    """
+
+    def setUp(self):
+        patcher = mock.patch("auditoria.signals._create_audit")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(set_request, None)
+        super().setUp()
@@ -23,6 +23,8 @@ from .views import CierreNominaView, NominaPDFView
 from . import views
 from .views import EnviarReciboView, calcular_todas
 from . import views_export
+from . import views_corridas
+from . import views_exportaciones
 from .views_export import ExportPDFView, ExportExcelView
 
 # # Vistas especializadas
@@ -30,6 +32,7 @@ from .views_export import ExportPDFView, ExportExcelView
 from .views_analytics import (
     kpis_resumen,
     serie_nomina_ultimos_6,
+    serie_temporal,
     top_descuentos_por_concepto,
     distribucion_por_area,
     distribucion_por_tipo_contrato,
@@ -68,6 +71,21 @@ urlpatterns = [
     path("calcular-todas/", calcular_todas, name="calcular_todas_alias"),  # alias opcional interno
 
     
+    #  CORRIDAS ASÍNCRONAS (envío + polling de progreso)
+    
+    path("corridas/", views_corridas.corridas, name="corridas"),
+    path("corridas/<int:pk>/", views_corridas.corrida_detalle, name="corrida_detalle"),
+    path("corridas/<int:pk>/errores/", views_corridas.corrida_errores, name="corrida_errores"),
+    path("corridas/<int:pk>/reanudar/", views_corridas.corrida_reanudar, name="corrida_reanudar"),
+
+    
+    #  EXPORTACIONES EN SEGUNDO PLANO (estado + descarga)
+    
+    path("exportaciones/", views_exportaciones.exportaciones, name="exportaciones"),
+    path("exportaciones/<int:pk>/", views_exportaciones.exportacion_detalle, name="exportacion_detalle"),
+    path("exportaciones/<int:pk>/descarga/", views_exportaciones.exportacion_descarga, name="exportacion_descarga"),
+
+    
     #  REPORTES Y EXPORTACIONES (Sprint 4)
     
     path("reportes/general/", views.reporte_general_detallado, name="reporte_general_detallado"),
@@ -78,6 +96,7 @@ urlpatterns = [
     # # Versiones CBV de exportaciones (para interoperabilidad futura)
     path("export/pdf/", ExportPDFView.as_view(), name="export_pdf_cbv"),
     path("export/excel/", ExportExcelView.as_view(), name="export_excel_cbv"),
+    path("export/libro/", views_export.LibroNominaView.as_view(), name="libro_nomina"),
 
     
     # ENVÍO DE RECIBO (APIView)
@@ -120,6 +139,7 @@ urlpatterns = [
     
     path("analytics/kpis/", kpis_resumen, name="analytics_kpis"),
     path("analytics/serie6/", serie_nomina_ultimos_6, name="analytics_serie6"),
+    path("analytics/serie/", serie_temporal, name="analytics_serie"),
     path("analytics/top-descuentos/", top_descuentos_por_concepto, name="analytics_top_descuentos"),
     path("analytics/distribucion-area/", distribucion_por_area, name="analytics_distribucion_area"),
     path("analytics/distribucion-contrato/", distribucion_por_tipo_contrato, name="analytics_distribucion_contrato"),
@@ -7,10 +7,8 @@
 #
 
 import os
-from utils.email_api import enviar_correo_api
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail, Attachment, FileContent, FileName, FileType, Disposition
-import base64
+from django.core.mail import EmailMessage
+from utils.email_api import enviar_correo_api, enviar_mensaje_api
 
 #
 # Función principal: enviar recibo con PDF adjunto
@@ -24,52 +22,28 @@ def enviar_recibo_pdf(empleado, periodo, pdf_path):
         periodo: texto del periodo (ej. 'Octubre 2025')
         pdf_path: ruta absoluta o relativa del archivo PDF generado
     """
-    try:
-        #  Verificar que el archivo existe
-        if not os.path.exists(pdf_path):
-            print(f" No se encontró el archivo PDF: {pdf_path}")
-            return None
-
-        #  Leer PDF y convertirlo a base64
-        with open(pdf_path, "rb") as f:
-            pdf_data = base64.b64encode(f.read()).decode()
-
-        #  Preparar datos del correo
-        asunto = f" Recibo de Pago — {periodo}"
-        mensaje = (
-            f"Hola {empleado.nombre},\n\n"
-            f"Adjunto encontrarás tu recibo de pago correspondiente al periodo {periodo}.\n\n"
-            "Saludos cordiales,\n"
-            "Sistema de Nómina — FP-UNA / "
-        )
-
-        #  Crear mensaje con adjunto
-        message = Mail(
-            from_email=os.getenv("DEFAULT_FROM_EMAIL", "ojeda.cardozo90@gmail.com"),
-            to_emails=empleado.email,
-            subject=asunto,
-            plain_text_content=mensaje,
-        )
-
-        # Adjuntar PDF
-        attached_file = Attachment(
-            FileContent(pdf_data),
-            FileName(os.path.basename(pdf_path)),
-            FileType("application/pdf"),
-            Disposition("attachment")
-        )
-        message.attachment = attached_file
+    #  Verificar que el archivo existe
+    if not os.path.exists(pdf_path):
+        print(f" No se encontró el archivo PDF: {pdf_path}")
+        return None
 
-        #  Enviar con API Key de SendGrid
-        sg = SendGridAPIClient(os.getenv("EMAIL_HOST_PASSWORD"))
-        response = sg.send(message)
+    #  Preparar datos del correo
+    asunto = f" Recibo de Pago — {periodo}"
+    mensaje = (
+        f"Hola {empleado.nombre},\n\n"
+        f"Adjunto encontrarás tu recibo de pago correspondiente al periodo {periodo}.\n\n"
+        "Saludos cordiales,\n"
+        "Sistema de Nómina — FP-UNA / "
+    )
 
-        print(f" Recibo enviado a {empleado.email} ({response.status_code})")
-        return response.status_code
+    #  Crear mensaje con el PDF adjunto (se codifica al enviar, una vez)
+    message = EmailMessage(
+        asunto, mensaje, os.getenv("DEFAULT_FROM_EMAIL", "ojeda.cardozo90@gmail.com"), [empleado.email]
+    )
+    message.attach_file(pdf_path, "application/pdf")
 
-    except Exception as e:
-        print(f" Error al enviar correo a {empleado.email}: {e}")
-        return None
+    #  Enviar por la sesión HTTP compartida de SendGrid
+    return enviar_mensaje_api(message)
 
 
 #
@@ -5,8 +5,8 @@
 
 # DRF core
 from rest_framework import viewsets, status
-from rest_framework.decorators import api_view, permission_classes, action
-from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.decorators import api_view, permission_classes, action, renderer_classes
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from .models import Concepto, Liquidacion
@@ -14,7 +14,7 @@ from .serializers import ConceptoSerializer, LiquidacionSerializer
 from usuarios.permissions import IsAdmin, IsGerenteRRHH, IsAsistenteRRHH, ReadOnly
 from rest_framework import filters
 # Django core
-from django.db.models import Sum, Avg
+from django.db.models import Avg, Prefetch
 from django.http import HttpResponse, JsonResponse
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required
@@ -24,13 +24,22 @@ from usuarios.permissions import IsAdminOrGerente
 from datetime import date, datetime
 from decimal import Decimal, ROUND_HALF_UP
 import io
-import openpyxl
 import logging
-from reportlab.pdfgen import canvas
 
 #  IMPORT DEL SERVICIO ALIAS: evitamos chocar con tu función local
 #from nomina_cal.services.calculo_individual import calcular_liquidacion as calcular_liquidacion_individual
-from nomina_cal.services.calculo_nomina import calcular_liquidaciones_periodo
+from nomina_cal.services.calculo_individual import calcular_liquidacion as calcular_liquidacion_servicio
+from nomina_cal.services.calculo_nomina import calcular_liquidaciones_periodo, PeriodoLiquidacion
+from nomina_cal.services.calculo_paralelo import calcular_periodo_particionado, BACKENDS as BACKENDS_PARALELO
+from nomina_cal.services.exportacion_plana import CAMPOS_LIQUIDACION, formato_plano, respuesta_plana
+from nomina_cal.services.exportacion_xlsx import CHUNK_SIZE as CHUNK_SIZE_XLSX, con_total, respuesta_xlsx
+from nomina_cal.services.reportes_pdf import reporte_liquidaciones_pdf
+from nomina_cal.services.recalculo_incremental import recalcular_pendientes
+from nomina_cal.services import cache_dashboards, resumen_nomina, series_tiempo
+from nomina_cal.services.kpis import kpis
+from nomina_cal.views_corridas import PERMISOS_POR_TIPO, respuesta_corrida
+from nomina_cal.views_exportaciones import respuesta_exportacion
+from nomina_cal.renderers import RENDERERS_REPORTES
 
 #
 # # Importaciones internas (modelo de negocio)
@@ -51,7 +60,6 @@ from usuarios.permissions import (
     IsGerenteRRHH,
     IsAsistenteRRHH,
     IsEmpleado,
-    IsAdminOrAsistente,
 )
 
 #
@@ -70,16 +78,12 @@ logging.basicConfig(
 @api_view(["GET"])
 def reporte_general(request):
     total_empleados = Empleado.objects.count()
-    total_liquidaciones = Liquidacion.objects.count()
-    #  campo correcto en tu modelo: neto_cobrar
-    total_nomina = (
-        Liquidacion.objects.aggregate(s=Sum("neto_cobrar"))["s"] or Decimal("0.00")
-    )
+    totales = kpis(Liquidacion.objects.all(), "cantidad", "total_neto")
     return Response(
         {
             "total_empleados": total_empleados,
-            "total_liquidaciones": total_liquidaciones,
-            "total_nomina": str(total_nomina),
+            "total_liquidaciones": totales["cantidad"],
+            "total_nomina": str(totales["total_neto"]),
         }
     )
 
@@ -94,7 +98,7 @@ def reporte_general(request):
 
 #
 # # FUNCIÓN CENTRAL DE CÁLCULO (INDIVIDUAL, sobre una Liquidación)
-#    Mantengo tu lógica tal cual, solo comentarios y guardado.
+#    Las reglas viven en el motor de cálculo (services/motor_calculo.py).
 #
 def calcular_liquidacion(liquidacion: Liquidacion):
     """
@@ -104,142 +108,11 @@ def calcular_liquidacion(liquidacion: Liquidacion):
     - Bonificación por hijos (no imponible, excluye IPS/aguinaldo)
     - IPS 9% sobre imponibles
     - Descuentos adicionales (préstamos, embargos, etc.)
-    - Aguinaldo/Vacaciones proporcionales (según política)
     """
-    empleado = liquidacion.empleado
-    salario_base = empleado.salario_base or Decimal("0.00")
-
-    # Validaciones de consistencia
-    if salario_base <= 0:
-        raise ValueError(f"El empleado {empleado} no tiene salario base asignado.")
-
-    salario_minimo = SalarioMinimo.get_vigente(
-        date(liquidacion.anio, liquidacion.mes, 1)
-    )
-    if not salario_minimo:
-        raise ValueError("No existe salario mínimo vigente para la fecha indicada.")
-
-    # Reinicia detalles previos de la liquidación para un recálculo limpio
-    liquidacion.detalles.all().delete()
-    total_ingresos = Decimal("0.00")
-    total_descuentos = Decimal("0.00")
-
-    
-    # 1) Sueldo base (imponible)
-    
-    concepto_base, _ = Concepto.objects.get_or_create(
-        descripcion="Sueldo Base",
-        defaults={
-            "es_debito": False,
-            "es_recurrente": True,
-            "afecta_ips": True,
-            "para_aguinaldo": True,
-        },
-    )
-    DetalleLiquidacion.objects.create(
-        liquidacion=liquidacion, concepto=concepto_base, monto=salario_base
-    )
-    total_ingresos += salario_base
-
-    
-    # 2) Bonificación familiar (usa tu método en el modelo)
-    #    * Debe excluirse del IPS y del Aguinaldo.
-    
-    bonificacion = liquidacion.calcular_bonificacion_hijos()
-    if bonificacion > 0:
-        concepto_bono, _ = Concepto.objects.get_or_create(
-            descripcion="Bonificación Familiar por Hijo",
-            defaults={
-                "es_debito": False,
-                "es_recurrente": True,
-                "afecta_ips": False,
-                "para_aguinaldo": False,
-            },
-        )
-        DetalleLiquidacion.objects.create(
-            liquidacion=liquidacion, concepto=concepto_bono, monto=bonificacion
-        )
-        total_ingresos += bonificacion
-
-    
-    # 3) Descuento IPS (9% sobre imponibles)
-    
-    ips = liquidacion.calcular_ips(salario_base).quantize(
-        Decimal("0.01"), rounding=ROUND_HALF_UP
-    )
-    concepto_ips, _ = Concepto.objects.get_or_create(
-        descripcion="Descuento IPS 9%",
-        defaults={
-            "es_debito": True,
-            "es_recurrente": True,
-            "afecta_ips": True,
-            "para_aguinaldo": False,
-        },
-    )
-    DetalleLiquidacion.objects.create(
-        liquidacion=liquidacion, concepto=concepto_ips, monto=ips
-    )
-    total_descuentos += ips
-
-    
-    # 4) Descuentos adicionales (préstamos, embargos, etc.)
-    
-    descuentos_extra = Descuento.objects.filter(empleado=empleado, activo=True)
-    for d in descuentos_extra:
-        if d.es_vigente(liquidacion.mes, liquidacion.anio):
-            concepto_extra, _ = Concepto.objects.get_or_create(
-                descripcion=f"Descuento: {d.tipo.title()}",
-                defaults={
-                    "es_debito": True,
-                    "es_recurrente": d.recurrente,
-                    "afecta_ips": False,
-                    "para_aguinaldo": False,
-                },
-            )
-            DetalleLiquidacion.objects.create(
-                liquidacion=liquidacion, concepto=concepto_extra, monto=d.monto
-            )
-            total_descuentos += d.monto
-
-    
-    # 5) Aguinaldo + Vacaciones proporcionales (evidencia sprint)
-    
-    aguinaldo = (salario_base / Decimal("12")).quantize(Decimal("0.01"))
-    vacaciones = (salario_base * Decimal("0.04")).quantize(Decimal("0.01"))
-
-    for descripcion, monto in [
-        ("Aguinaldo Proporcional", aguinaldo),
-        ("Vacaciones Proporcionales", vacaciones),
-    ]:
-        if monto > 0:
-            concepto, _ = Concepto.objects.get_or_create(
-                descripcion=descripcion,
-                defaults={
-                    "es_debito": False,
-                    "es_recurrente": True,
-                    "afecta_ips": False,
-                    "para_aguinaldo": (descripcion == "Aguinaldo Proporcional"),
-                },
-            )
-            DetalleLiquidacion.objects.create(
-                liquidacion=liquidacion, concepto=concepto, monto=monto
-            )
-            total_ingresos += monto
-
-    
-    # 6) Persistencia de totales y auditoría
-    
-    liquidacion.total_ingresos = total_ingresos
-    liquidacion.total_descuentos = total_descuentos
-    liquidacion.neto_cobrar = total_ingresos - total_descuentos
-    liquidacion.updated_at = datetime.now()
-    liquidacion.save()
-    liquidacion.refresh_from_db()
-
+    liquidacion = calcular_liquidacion_servicio(liquidacion)
     logger.info(
-        f"Liquidación recalculada: Empleado={empleado.cedula} | Ingresos={total_ingresos} | Descuentos={total_descuentos} | Neto={liquidacion.neto_cobrar}"
+        f"Liquidación recalculada: Empleado={liquidacion.empleado.cedula} | Ingresos={liquidacion.total_ingresos} | Descuentos={liquidacion.total_descuentos} | Neto={liquidacion.neto_cobrar}"
     )
-
     return liquidacion
 
 #
@@ -443,10 +316,12 @@ class DescuentoViewSet(viewsets.ModelViewSet):
 #
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@renderer_classes(RENDERERS_REPORTES)
 def reporte_general_detallado(request):
     """
     Devuelve un resumen JSON de liquidaciones (total general + detalle).
     Soporta filtros por mes, año y empleado_id vía querystring.
+    Con ?format=csv|ndjson emite las filas crudas por streaming.
     """
     qs = Liquidacion.objects.all()
     mes, anio, empleado_id = (
@@ -461,16 +336,16 @@ def reporte_general_detallado(request):
     if empleado_id:
         qs = qs.filter(empleado_id=empleado_id)
 
-    total_general = qs.aggregate(total=Sum("neto_cobrar"))["total"] or 0
+    formato = formato_plano(request)
+    if formato:
+        return respuesta_plana(formato, qs.order_by("id"), CAMPOS_LIQUIDACION, "reporte_general")
+
+    total_general = kpis(qs, "total_neto")["total_neto"]
     detalle = [
-        {
-            "empleado": l.empleado.nombre,
-            "cedula": l.empleado.cedula,
-            "mes": l.mes,
-            "anio": l.anio,
-            "total": str(l.neto_cobrar),
-        }
-        for l in qs
+        {"empleado": nombre, "cedula": cedula, "mes": mes, "anio": anio, "total": str(neto)}
+        for nombre, cedula, mes, anio, neto in qs.values_list(
+            "empleado__nombre", "empleado__cedula", "mes", "anio", "neto_cobrar"
+        ).iterator(chunk_size=CHUNK_SIZE_XLSX)
     ]
     return Response({"total_general": str(total_general), "detalle": detalle})
 
@@ -479,88 +354,88 @@ def reporte_general_detallado(request):
 #
 @api_view(["GET"])
 @permission_classes([IsAdmin])
+@renderer_classes(RENDERERS_REPORTES)
 def exportar_reporte_excel(request):
     """
     Exporta todas las liquidaciones en formato Excel (.xlsx).
-    Devuelve un archivo binario con Content-Disposition: attachment.
+    Se emite por streaming (services/exportacion_xlsx.py) con Content-Disposition: attachment.
+    Con ?format=csv|ndjson emite las filas crudas.
     """
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Liquidaciones"
-    ws.append(["Empleado", "Cédula", "Mes/Año", "Neto a Cobrar"])
-
-    for l in Liquidacion.objects.all():
-        ws.append(
-            [l.empleado.nombre, l.empleado.cedula, f"{l.mes}/{l.anio}", float(l.neto_cobrar)]
-        )
-
-    total_general = Liquidacion.objects.aggregate(total=Sum("neto_cobrar"))["total"] or 0
-    ws.append(["", "", "TOTAL GENERAL", float(total_general)])
-
-    buffer = io.BytesIO()
-    wb.save(buffer)
-    buffer.seek(0)
-    response = HttpResponse(
-        buffer,
-        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    formato = formato_plano(request)
+    if formato:
+        return respuesta_plana(formato, Liquidacion.objects.order_by("id"), CAMPOS_LIQUIDACION, "reporte_liquidaciones")
+    filas = (
+        (nombre, cedula, f"{mes}/{anio}", neto)
+        for nombre, cedula, mes, anio, neto in Liquidacion.objects.values_list(
+            "empleado__nombre", "empleado__cedula", "mes", "anio", "neto_cobrar"
+        ).iterator(chunk_size=CHUNK_SIZE_XLSX)
+    )
+    return respuesta_xlsx(
+        con_total(filas, 3, lambda total: ["", "", "TOTAL GENERAL", total]),
+        "reporte_liquidaciones.xlsx",
+        hoja="Liquidaciones",
+        encabezado=[["Empleado", "Cédula", "Mes/Año", "Neto a Cobrar"]],
     )
-    response["Content-Disposition"] = 'attachment; filename="reporte_liquidaciones.xlsx"'
-    return response
 
 @api_view(["GET"])
 @permission_classes([IsAdmin])
+@renderer_classes(RENDERERS_REPORTES)
 def exportar_reporte_pdf(request):
     """
     Exporta todas las liquidaciones en formato PDF usando ReportLab.
     Devuelve un PDF con Content-Disposition por defecto (inline).
+    Con ?format=csv|ndjson emite las filas crudas.
+    Con ?asincrono=1 se genera como ExportacionReporte y responde 202.
     """
+    formato = formato_plano(request)
+    if formato:
+        return respuesta_plana(formato, Liquidacion.objects.order_by("id"), CAMPOS_LIQUIDACION, "reporte_liquidaciones")
+    if _pide_asincrono(request):
+        return respuesta_exportacion(request, "liquidaciones_pdf", request.query_params)
     buffer = io.BytesIO()
-    p = canvas.Canvas(buffer)
-    p.setFont("Helvetica-Bold", 14)
-    p.drawString(180, 800, "Reporte General de Liquidaciones")
-
-    y = 770
-    for l in Liquidacion.objects.all():
-        p.setFont("Helvetica", 10)
-        p.drawString(
-            50,
-            y,
-            f"{l.empleado.nombre} ({l.empleado.cedula}) - {l.mes}/{l.anio} - {l.neto_cobrar} Gs",
-        )
-        y -= 20
-        if y < 50:
-            p.showPage()
-            y = 770
-
-    p.drawString(50, 40, f"Generado el {date.today().strftime('%d/%m/%Y')}")
-    p.save()
+    reporte_liquidaciones_pdf(buffer)
     buffer.seek(0)
     return HttpResponse(buffer, content_type="application/pdf")
 
 #
 # # CÁLCULO MASIVO: Recalcular TODAS las liquidaciones abiertas
 #
+def _pide_asincrono(request):
+    """True si el body (o la querystring) pide ejecutar el proceso en segundo plano."""
+    valor = request.data.get("asincrono", request.query_params.get("asincrono", ""))
+    return str(valor).lower() in ("1", "true", "si", "sí")
+
+
 @api_view(["POST"])
-@permission_classes([IsAuthenticated, (IsAdmin | IsAsistenteRRHH)])
+@permission_classes(PERMISOS_POR_TIPO["calcular_todas"])
 def calcular_todas(request):
     """
-    Recalcula todas las liquidaciones con estado 'abierta' (cerrada=False).
+    Recalcula las liquidaciones abiertas (cerrada=False) que quedaron
+    marcadas con requiere_recalculo por algún cambio de datos.
+    Con {"forzar": true} recalcula todas las abiertas.
+    Con {"asincrono": true} se encola una CorridaNomina y responde 202.
     Útil para cierres mensuales o recalcular masivamente.
     """
-    liquidaciones = Liquidacion.objects.filter(cerrada=False)
-    if not liquidaciones.exists():
+    if _pide_asincrono(request):
+        return respuesta_corrida(request, "calcular_todas", request.data)
+
+    if not Liquidacion.objects.filter(cerrada=False).exists():
         return Response(
             {"mensaje": "No hay liquidaciones abiertas para calcular."}, status=200
         )
 
-    for liq in liquidaciones:
-        calcular_liquidacion(liq)
+    forzar = str(request.data.get("forzar", "")).lower() in ("1", "true", "si", "sí")
+    recalculadas, omitidas = recalcular_pendientes(calcular_liquidacion, forzar=forzar)
 
     logger.info(
-        f"Recalculo masivo: {liquidaciones.count()} liquidaciones recalculadas."
+        f"Recalculo masivo: {recalculadas} liquidaciones recalculadas, {omitidas} al día."
     )
     return Response(
-        {"mensaje": f"Se recalcularon {liquidaciones.count()} liquidaciones correctamente."},
+        {
+            "mensaje": f"Se recalcularon {recalculadas} liquidaciones correctamente.",
+            "recalculadas": recalculadas,
+            "omitidas": omitidas,
+        },
         status=200,
     )
 
@@ -568,49 +443,66 @@ def calcular_todas(request):
 # # ENDPOINT MASIVO POR PERÍODO (mes/año)
 #
 @api_view(["POST"])
-@permission_classes([IsAdminUser])
+@permission_classes(PERMISOS_POR_TIPO["periodo"])
 def recalcular_liquidaciones_periodo_view(request):
     """
     Recalcula TODAS las liquidaciones de un período (mes y año) utilizando
     la función del servicio nomina_cal.services.calculo_nomina.calcular_liquidaciones_periodo
-    Body esperado: { "anio": 2025, "mes": 10 }
+    Body esperado: { "anio": 2025, "mes": 10, "modo": "fila" | "bulk" | "paralelo" }
+    Con modo "paralelo" se usa el runner particionado y se devuelve el resumen
+    por rangos (opcional: "backend": "procesos" | "celery" | "secuencial").
+    Con "asincrono": true se encola una CorridaNomina por rangos y responde 202.
     """
-    from nomina_cal.models import Periodo
+    if _pide_asincrono(request):
+        return respuesta_corrida(request, "periodo", request.data)
 
     try:
         anio = int(request.data.get("anio"))
         mes = int(request.data.get("mes"))
     except (TypeError, ValueError):
         return Response({"error": "Datos de año o mes inválidos."}, status=400)
+    if not (1 <= mes <= 12):
+        return Response({"error": "El mes debe estar entre 1 y 12."}, status=400)
+
+    modo = request.data.get("modo", "fila")
+    if modo not in ("fila", "bulk", "paralelo"):
+        return Response({"error": "Modo inválido (use 'fila', 'bulk' o 'paralelo')."}, status=400)
+
+    periodo = PeriodoLiquidacion(anio=anio, mes=mes)
+    if modo == "paralelo":
+        backend = request.data.get("backend", "procesos")
+        if backend not in BACKENDS_PARALELO:
+            return Response({"error": f"Backend inválido (use {', '.join(BACKENDS_PARALELO)})."}, status=400)
+        resumen = calcular_periodo_particionado(periodo, backend=backend)
+        logger.info(f" Recalculadas {resumen['count']} liquidaciones para {mes}/{anio} (modo=paralelo)")
+        return Response(
+            {"message": "Liquidaciones recalculadas por rangos.", "modo": modo, **resumen},
+            status=200 if not resumen["fallidos"] else 207,
+        )
 
-    try:
-        periodo = Periodo.objects.get(anio=anio, mes=mes)
-    except Periodo.DoesNotExist:
-        return Response({"error": "El período especificado no existe."}, status=404)
-
-    count = calcular_liquidaciones_periodo(periodo)
-    logger.info(f" Recalculadas {count} liquidaciones para {mes}/{anio}")
+    count = calcular_liquidaciones_periodo(periodo, modo=modo)
+    logger.info(f" Recalculadas {count} liquidaciones para {mes}/{anio} (modo={modo})")
 
     return Response(
-        {"message": "Liquidaciones recalculadas correctamente.", "count": count},
+        {"message": "Liquidaciones recalculadas correctamente.", "count": count, "modo": modo},
         status=200,
     )
 
 #
 #  DASHBOARDS (ADMIN, GERENTE, ASISTENTE, EMPLEADO)
 #
-@api_view(["GET"])
-@permission_classes([IsAdmin])
-def dashboard_admin(request):
+# Las respuestas por rol se cachean hasta que cambian liquidaciones o
+# empleados (services/cache_dashboards.py).
+AMBITOS_DASHBOARD = (cache_dashboards.TODOS, cache_dashboards.EMPLEADOS)
+
+
+def _datos_dashboard_admin():
     total_empleados = Empleado.objects.count()
-    total_liquidaciones = Liquidacion.objects.count()
-    total_general = Liquidacion.objects.aggregate(total=Sum("neto_cobrar"))["total"] or 0
-    promedio_general = (
-        Liquidacion.objects.aggregate(promedio=Avg("neto_cobrar"))["promedio"] or 0
-    )
-    total_descuentos = (
-        Liquidacion.objects.aggregate(desc=Sum("total_descuentos"))["desc"] or 0
-    )
+    totales = resumen_nomina.totales()
+    total_liquidaciones = totales["cantidad"]
+    total_general = totales["total_neto"]
+    promedio_general = totales["promedio_neto"]
+    total_descuentos = totales["total_descuentos"]
     promedio_por_cargo = (
         Empleado.objects.values("cargo")
         .annotate(promedio=Avg("salario_base"))
@@ -621,69 +513,75 @@ def dashboard_admin(request):
         if total_empleados
         else "0%"
     )
-    return Response(
-        {
-            "rol": "Administrador",
-            "total_empleados": total_empleados,
-            "total_liquidaciones": total_liquidaciones,
-            "total_general": str(total_general),
-            "total_descuentos": str(total_descuentos),
-            "promedio_general": str(round(promedio_general, 2)),
-            "porcentaje_cubierto": porcentaje_cubierto,
-            "promedio_por_cargo": list(promedio_por_cargo),
+    return {
+        "rol": "Administrador",
+        "total_empleados": total_empleados,
+        "total_liquidaciones": total_liquidaciones,
+        "total_general": str(total_general),
+        "total_descuentos": str(total_descuentos),
+        "promedio_general": str(round(promedio_general, 2)),
+        "porcentaje_cubierto": porcentaje_cubierto,
+        "promedio_por_cargo": list(promedio_por_cargo),
+    }
+
+
+def _datos_dashboard_gerente():
+    total_empleados = Empleado.objects.count()
+    totales = resumen_nomina.totales()
+    total_liquidaciones = totales["cantidad"]
+    promedio = totales["promedio_neto"]
+    datos_mes = [
+        {"mes": mes, "anio": anio, "total_mes": total_mes}
+        for anio, mes, total_mes in reversed(series_tiempo.serie_total(series_tiempo.ventana(6)))
+    ]
+    return {
+        "rol": "Gerente RRHH",
+        "promedio_nomina": str(round(promedio, 2)),
+        "total_empleados": total_empleados,
+        "total_liquidaciones": total_liquidaciones,
+        "evolucion": datos_mes,
+    }
+
+
+def _datos_dashboard_asistente():
+    ultimas = list(Liquidacion.objects.select_related("empleado").order_by("-anio", "-mes")[:5])
+    if not ultimas:
+        return {
+            "rol": "Asistente RRHH",
+            "mensaje": "Aún no hay nóminas registradas.",
+            "ultimas_liquidaciones": [],
         }
-    )
+    return {
+        "rol": "Asistente RRHH",
+        "ultimas_liquidaciones": [
+            {
+                "empleado": l.empleado.nombre,
+                "cedula": l.empleado.cedula,
+                "mes": l.mes,
+                "anio": l.anio,
+                "total": str(l.neto_cobrar),
+            }
+            for l in ultimas
+        ],
+    }
+
+
+@api_view(["GET"])
+@permission_classes([IsAdmin])
+def dashboard_admin(request):
+    return Response(cache_dashboards.obtener("admin_json", _datos_dashboard_admin, AMBITOS_DASHBOARD))
 
 @api_view(["GET"])
 @permission_classes([IsGerenteRRHH])
 def dashboard_gerente(request):
-    total_empleados = Empleado.objects.count()
-    total_liquidaciones = Liquidacion.objects.count()
-    promedio = (
-        Liquidacion.objects.aggregate(promedio=Avg("neto_cobrar"))["promedio"] or 0
-    )
-    datos_mes = (
-        Liquidacion.objects.values("mes", "anio")
-        .annotate(total_mes=Sum("neto_cobrar"))
-        .order_by("-anio", "-mes")[:6]
-    )
-    return Response(
-        {
-            "rol": "Gerente RRHH",
-            "promedio_nomina": str(round(promedio, 2)),
-            "total_empleados": total_empleados,
-            "total_liquidaciones": total_liquidaciones,
-            "evolucion": list(datos_mes),
-        }
-    )
+    return Response(cache_dashboards.obtener(
+        "gerente_json", _datos_dashboard_gerente, AMBITOS_DASHBOARD, hasta=series_tiempo.mes_actual()
+    ))
 
 @api_view(["GET"])
 @permission_classes([IsAsistenteRRHH])
 def dashboard_asistente(request):
-    ultimas = Liquidacion.objects.all().order_by("-anio", "-mes")[:5]
-    if not ultimas.exists():
-        return Response(
-            {
-                "rol": "Asistente RRHH",
-                "mensaje": "Aún no hay nóminas registradas.",
-                "ultimas_liquidaciones": [],
-            }
-        )
-    return Response(
-        {
-            "rol": "Asistente RRHH",
-            "ultimas_liquidaciones": [
-                {
-                    "empleado": l.empleado.nombre,
-                    "cedula": l.empleado.cedula,
-                    "mes": l.mes,
-                    "anio": l.anio,
-                    "total": str(l.neto_cobrar),
-                }
-                for l in ultimas
-            ],
-        }
-    )
+    return Response(cache_dashboards.obtener("asistente_json", _datos_dashboard_asistente, AMBITOS_DASHBOARD))
 
 @api_view(["GET"])
 @permission_classes([IsEmpleado])
@@ -743,16 +641,13 @@ def panel_empleado(request):
     liquidaciones = (
         Liquidacion.objects.filter(empleado=empleado)
         .order_by("-anio", "-mes")
-        .prefetch_related("detalles")
+        .prefetch_related(Prefetch("detalles", queryset=DetalleLiquidacion.objects.select_related("concepto")))
     )
-    # Enriquecer con banderas de IPS y bonificación
+    # Enriquecer con banderas de IPS y bonificación (sobre los detalles ya cargados)
     for liq in liquidaciones:
-        liq.detalles_ips = liq.detalles.filter(
-            concepto__descripcion__icontains="IPS"
-        ).exists()
-        liq.detalles_bonificacion = liq.detalles.filter(
-            concepto__descripcion__icontains="hijo"
-        ).exists()
+        codigos = {d.concepto.codigo for d in liq.detalles.all()}
+        liq.detalles_ips = Concepto.IPS in codigos
+        liq.detalles_bonificacion = Concepto.BONIF_FAMILIAR in codigos
 
     contexto = {"empleado": empleado, "liquidaciones": liquidaciones}
     return render(request, "nomina_cal/panel_empleado.html", contexto)
@@ -776,13 +671,14 @@ def obtener_salario_empleado(request):
 #  ENVÍO DE RECIBO INDIVIDUAL (por correo electrónico)
 #
 from django.core.mail import EmailMessage
-from nomina_cal.utils_email import generar_recibo_pdf
+from nomina_cal.services.cache_recibos import obtener_recibo, recibo_bytes
 from nomina_cal.models_envio import EnvioCorreo
 from nomina_cal.models import Liquidacion
+from nomina_cal.utils_email import marcar_enviadas
 
 
 class EnviarReciboView(APIView):
-    permission_classes = [IsAuthenticated, IsAdminOrAsistente]
+    permission_classes = PERMISOS_POR_TIPO["envio_recibos"]
 
     def post(self, request, pk):
         liq = get_object_or_404(Liquidacion, pk=pk)
@@ -794,8 +690,8 @@ class EnviarReciboView(APIView):
                 {"ok": False, "error": "Empleado sin email registrado."}, status=400
             )
 
-        #  Generar PDF profesional (nuevo utils_email.py)
-        pdf_bytes = generar_recibo_pdf(liq)
+        #  Recibo PDF cacheado (se genera solo si cambió la liquidación)
+        pdf_bytes = recibo_bytes(liq)
 
         msg = EmailMessage(
             subject=f"Recibo de salario {liq.mes}/{liq.anio}",
@@ -814,8 +710,7 @@ class EnviarReciboView(APIView):
 
         try:
             msg.send()
-            liq.enviado_email = True
-            liq.save(update_fields=["enviado_email"])
+            marcar_enviadas([liq.pk])
 
             EnvioCorreo.objects.create(
                 empleado=emp,
@@ -845,15 +740,11 @@ def resumen_visual(request):
     Render HTML con un resumen de totales (ingresos, descuentos, neto).
     Evidencia Sprint 4 — reporte visual simple.
     """
-    resumen = Liquidacion.objects.aggregate(
-        total_ingresos=Sum("total_ingresos"),
-        total_descuentos=Sum("total_descuentos"),
-        total_general=Sum("neto_cobrar"),
-    )
+    resumen = kpis(Liquidacion.objects.all(), "total_ingresos", "total_descuentos", "total_neto")
     contexto = {
-        "total_ingresos": resumen["total_ingresos"] or 0,
-        "total_descuentos": resumen["total_descuentos"] or 0,
-        "total_general": resumen["total_general"] or 0,
+        "total_ingresos": resumen["total_ingresos"],
+        "total_descuentos": resumen["total_descuentos"],
+        "total_general": resumen["total_neto"],
     }
     return render(request, "nomina_cal/resumen_visual.html", contexto)
 
@@ -864,18 +755,24 @@ def resumen_visual(request):
 
 from django.db import transaction
 from .models import Liquidacion
-from nomina_cal.utils_email import generar_recibo_pdf  # o de donde venga tu función
+from .services.salida_correos import cerrar_liquidaciones
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 
 class CierreNominaView(APIView):
     """
-    Cierra todas las liquidaciones abiertas del mes y año indicados,
-    marcándolas como cerradas y generando los recibos PDF.
+    Cierra todas las liquidaciones abiertas del mes y año indicados y
+    encola sus recibos en la salida de correos (se generan y envían
+    después del commit). Con {"asincrono": true} se encola una
+    CorridaNomina y responde 202.
     """
+    permission_classes = PERMISOS_POR_TIPO["cierre"]
 
     def post(self, request, *args, **kwargs):
+        if _pide_asincrono(request):
+            return respuesta_corrida(request, "cierre", request.data)
+
         mes = request.data.get("mes")
         anio = request.data.get("anio")
 
@@ -885,17 +782,7 @@ class CierreNominaView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        with transaction.atomic():
-            liquidaciones = Liquidacion.objects.filter(mes=mes, anio=anio, cerrada=False)
-            count = liquidaciones.count()
-
-            for liq in liquidaciones:
-                liq.cerrada = True
-                liq.save()
-                try:
-                    generar_recibo_pdf(liq)
-                except Exception as e:
-                    print(f" Error generando recibo: {e}")
+        count = len(cerrar_liquidaciones(Liquidacion.objects.filter(mes=mes, anio=anio)))
 
         return Response(
             {"mensaje": f"Cierre completado. {count} liquidaciones cerradas."},
@@ -909,69 +796,36 @@ class CierreNominaView(APIView):
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from django.http import HttpResponse
-from reportlab.pdfgen import canvas
-import io
+from django.http import FileResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from .models import Liquidacion
 
 
 class NominaPDFView(APIView):
     """
-    Genera el PDF del recibo de salario para una liquidación específica.
+    Sirve el PDF del recibo de salario para una liquidación específica.
+    El archivo sale de la caché de recibos (services/cache_recibos.py) y
+    responde 304 a If-None-Match / If-Modified-Since si no cambió.
     Endpoint: GET /api/nomina_cal/pdf/<id>/
     """
     permission_classes = [IsAuthenticated]
 
     def get(self, request, pk):
         try:
-            liq = Liquidacion.objects.get(pk=pk)
+            liq = Liquidacion.objects.select_related("empleado").get(pk=pk)
         except Liquidacion.DoesNotExist:
             return Response({"error": "Liquidación no encontrada."}, status=404)
 
-        buffer = io.BytesIO()
-        p = canvas.Canvas(buffer)
-        p.setFont("Helvetica-Bold", 14)
-        p.drawString(200, 800, "Recibo de Salario")
-
-        y = 760
-        p.setFont("Helvetica", 11)
-        p.drawString(50, y, f"Empleado: {liq.empleado.nombre}")
-        y -= 20
-        p.drawString(50, y, f"Cédula: {liq.empleado.cedula}")
-        y -= 20
-        p.drawString(50, y, f"Periodo: {liq.mes}/{liq.anio}")
-        y -= 20
-        p.drawString(50, y, f"Sueldo Base: {liq.empleado.salario_base} Gs")
-        y -= 20
-        p.drawString(50, y, f"Total Ingresos: {liq.total_ingresos} Gs")
-        y -= 20
-        p.drawString(50, y, f"Total Descuentos: {liq.total_descuentos} Gs")
-        y -= 20
-        p.drawString(50, y, f"Neto a Cobrar: {liq.neto_cobrar} Gs")
-
-        p.line(50, y - 10, 550, y - 10)
-        y -= 40
-        p.setFont("Helvetica-Bold", 12)
-        p.drawString(50, y, "Detalle de Conceptos:")
-
-        y -= 20
-        p.setFont("Helvetica", 10)
-        for detalle in liq.detalles.all():
-            if y < 80:
-                p.showPage()
-                y = 780
-                p.setFont("Helvetica", 10)
-            p.drawString(
-                60,
-                y,
-                f"{detalle.concepto.descripcion}: {detalle.monto} Gs",
-            )
-            y -= 18
-
-        p.showPage()
-        p.save()
-        buffer.seek(0)
+        recibo = obtener_recibo(liq)
+        etag = quote_etag(recibo.clave)
+        modificado = int(recibo.modificado.timestamp())
 
-        response = HttpResponse(buffer, content_type="application/pdf")
-        response["Content-Disposition"] = f'inline; filename="recibo_{liq.id}.pdf"'
+        response = get_conditional_response(request, etag=etag, last_modified=modificado)
+        if response is None:
+            response = FileResponse(
+                recibo.abrir(), content_type="application/pdf", filename=f"recibo_{liq.id}.pdf"
+            )
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(modificado)
         return response
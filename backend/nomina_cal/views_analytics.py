@@ -51,16 +51,13 @@ def kpis_resumen(request):
     total_nomina_mes = liqs_mes.aggregate(s=Sum("neto_cobrar")).get("s", 0) or 0
     total_descuentos_mes = liqs_mes.aggregate(s=Sum("total_descuentos")).get("s", 0) or 0
 
-    # Cálculo de IPS — búsqueda por nombre o código del concepto
+    # Cálculo de IPS — por código del concepto
     total_ips_mes = (
         DetalleLiquidacion.objects.filter(
             liquidacion__mes=mes,
             liquidacion__anio=anio
         )
-        .filter(
-            Q(concepto__descripcion__icontains="IPS")
-            # | Q(concepto__codigo__icontains="IPS")  #  activar si existe 'codigo' en Concepto
-        )
+        .filter(concepto__codigo=Concepto.IPS)
         .aggregate(s=Sum("monto"))
         .get("s", 0)
         or 0
@@ -228,6 +225,11 @@ def distribucion_por_tipo_contrato(request):
 #   • Ranking de descuentos
 #   • Distribución por área / contrato
 #   • Gráfico simple (chart_data) para iframe o frontend directo
+#
+# Los totales salen del resumen mensual materializado
+# (services/resumen_nomina.py), no de agregar toda la tabla Liquidacion.
+# Las series mensuales salen de services/series_tiempo.py (una consulta
+# agrupada por ventana, meses calendario sin huecos).
 
 # Sprints 5–6 — FP-UNA / Fuerza Aérea Paraguaya
 #
@@ -241,6 +243,10 @@ from datetime import date
 # # Modelos base
 from empleados.models import Empleado
 from .models import Liquidacion, DetalleLiquidacion, Concepto
+from .services import cache_dashboards, resumen_nomina, series_tiempo
+
+# Tope de meses para /analytics/serie/
+MAX_MESES_SERIE = 120
 
 
 #
@@ -254,24 +260,23 @@ def kpis_resumen(request):
     mes = int(request.GET.get("mes", hoy.month))
     anio = int(request.GET.get("anio", hoy.year))
 
-    empleados_activos = Empleado.objects.filter(activo=True).count()
+    # Cacheado por período: sólo depende de los 12 meses de la evolución
+    periodos = series_tiempo.ventana(12, (anio, mes))
+    ambitos = [cache_dashboards.EMPLEADOS, *(cache_dashboards.periodo(a, m) for a, m in periodos)]
+    return Response(cache_dashboards.obtener(
+        "kpis", lambda: _datos_kpis(mes, anio, periodos), ambitos, mes=mes, anio=anio
+    ))
 
-    liqs_mes = Liquidacion.objects.filter(mes=mes, anio=anio)
-    total_nomina_mes = liqs_mes.aggregate(s=Sum("neto_cobrar")).get("s", 0) or 0
-    total_descuentos_mes = liqs_mes.aggregate(s=Sum("total_descuentos")).get("s", 0) or 0
 
-    total_ips_mes = (
-        DetalleLiquidacion.objects.filter(
-            liquidacion__mes=mes,
-            liquidacion__anio=anio
-        )
-        .filter(Q(concepto__descripcion__icontains="IPS"))
-        .aggregate(s=Sum("monto"))
-        .get("s", 0)
-        or 0
-    )
+def _datos_kpis(mes, anio, periodos):
+    empleados_activos = Empleado.objects.filter(activo=True).count()
 
-    return Response({
+    totales_mes = resumen_nomina.totales(mes=mes, anio=anio)
+    total_nomina_mes = totales_mes["total_neto"]
+    total_descuentos_mes = totales_mes["total_descuentos"]
+    total_ips_mes = totales_mes["total_ips"]
+
+    return {
         "empleados_activos": empleados_activos,
         "total_nomina_mes": float(total_nomina_mes),
         "total_descuentos_mes": float(total_descuentos_mes),
@@ -283,8 +288,11 @@ def kpis_resumen(request):
             "promedio_neto": round(total_nomina_mes / empleados_activos, 2) if empleados_activos else 0,
             "total_empleados": empleados_activos,
         },
-        "evolucion": list(Liquidacion.objects.values("mes").annotate(total=Sum("neto_cobrar")).order_by("mes")),
-    })
+        "evolucion": [
+            {"mes": m, "anio": a, "total": total}
+            for a, m, total in series_tiempo.serie_total(periodos)
+        ],
+    }
 
 
 #
@@ -294,24 +302,51 @@ def kpis_resumen(request):
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def serie_nomina_ultimos_6(request):
-    hoy = date.today()
-    datos = []
-    m, a = hoy.month, hoy.year
+    datos = [
+        {"mes": m, "anio": a, "neto_total": float(total)}
+        for a, m, total in series_tiempo.serie_total(series_tiempo.ventana(6))
+    ]
+    return Response(datos)
 
-    for _ in range(6):
-        total = (
-            Liquidacion.objects.filter(mes=m, anio=a)
-            .aggregate(s=Sum("neto_cobrar"))
-            .get("s", 0) or 0
+
+#
+#  FUNCIÓN: Serie temporal genérica
+# Endpoint: /nomina_cal/analytics/serie/
+#   ?meses=12&hasta=2025-10          ventana de N meses hasta un mes (actual por defecto)
+#   ?desde=2025-01&hasta=2025-10     o un rango explícito
+#   &medida=neto|ingresos|descuentos|ips|cantidad
+#   &agrupar=area|tipo_contrato|concepto   (concepto suma montos de detalles)
+#
+def _periodo(texto):
+    anio, mes = (int(x) for x in texto.split("-"))
+    if not 1 <= mes <= 12:
+        raise ValueError(texto)
+    return anio, mes
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def serie_temporal(request):
+    try:
+        hasta = _periodo(request.GET["hasta"]) if request.GET.get("hasta") else None
+        if request.GET.get("desde"):
+            periodos = series_tiempo.meses(_periodo(request.GET["desde"]), hasta or series_tiempo.mes_actual())
+        else:
+            periodos = series_tiempo.ventana(int(request.GET.get("meses", 6)), hasta)
+        if len(periodos) > MAX_MESES_SERIE:
+            raise ValueError(f"La ventana no puede superar {MAX_MESES_SERIE} meses.")
+        series = series_tiempo.serie(
+            periodos,
+            medida=request.GET.get("medida", "neto"),
+            agrupar=request.GET.get("agrupar") or None,
         )
-        datos.append({"mes": m, "anio": a, "neto_total": float(total)})
-        m -= 1
-        if m == 0:
-            m = 12
-            a -= 1
+    except ValueError as e:
+        return Response({"error": str(e) or "Parámetros inválidos."}, status=400)
 
-    datos.reverse()
-    return Response(datos)
+    return Response({
+        "periodos": [f"{a}-{m:02d}" for a, m in periodos],
+        "series": [{"grupo": grupo, "valores": [float(v) for v in valores]} for grupo, valores in series.items()],
+    })
 
 
 #
@@ -357,18 +392,17 @@ def distribucion_por_area(request):
     mes = int(request.GET.get("mes", 0)) or None
     anio = int(request.GET.get("anio", 0)) or None
 
-    qs = Liquidacion.objects.all()
+    filtros = {}
     if mes:
-        qs = qs.filter(mes=mes)
+        filtros["mes"] = mes
     if anio:
-        qs = qs.filter(anio=anio)
+        filtros["anio"] = anio
 
-    data = (
-        qs.values("empleado__area")
-        .annotate(total=Sum("neto_cobrar"))
-        .order_by("-total")
-    )
-    return Response({"series": list(data)})
+    data = [
+        {"empleado__area": valor, "total": total}
+        for valor, total in resumen_nomina.distribucion("area", **filtros)
+    ]
+    return Response({"series": data})
 
 
 #
@@ -381,18 +415,17 @@ def distribucion_por_tipo_contrato(request):
     mes = int(request.GET.get("mes", 0)) or None
     anio = int(request.GET.get("anio", 0)) or None
 
-    qs = Liquidacion.objects.all()
+    filtros = {}
     if mes:
-        qs = qs.filter(mes=mes)
+        filtros["mes"] = mes
     if anio:
-        qs = qs.filter(anio=anio)
+        filtros["anio"] = anio
 
-    data = (
-        qs.values("empleado__tipo_contrato")
-        .annotate(total=Sum("neto_cobrar"))
-        .order_by("-total")
-    )
-    return Response({"series": list(data)})
+    data = [
+        {"empleado__tipo_contrato": valor, "total": total}
+        for valor, total in resumen_nomina.distribucion("tipo_contrato", **filtros)
+    ]
+    return Response({"series": data})
 
 
 #
@@ -404,9 +437,8 @@ def distribucion_por_tipo_contrato(request):
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def chart_data(request):
-    data = (
-        Liquidacion.objects.values("mes")
-        .annotate(total=Sum("neto_cobrar"))
-        .order_by("mes")
-    )
-    return Response(list(data))
+    data = [
+        {"mes": m, "anio": a, "total": total}
+        for a, m, total in series_tiempo.serie_total(series_tiempo.ventana(12))
+    ]
+    return Response(data)
@@ -0,0 +1,129 @@
+# backend/nomina_cal/views_corridas.py
+#
+#  MÓDULO: Corridas de nómina asíncronas
+#
+# Los procesos masivos se ejecutan fuera del request (Celery o pool local):
+#   • POST /corridas/                 → crea y encola una corrida (202)
+#   • GET  /corridas/                 → últimas corridas
+#   • GET  /corridas/<id>/            → estado y progreso (polling)
+#   • GET  /corridas/<id>/errores/    → errores por empleado
+#   • POST /corridas/<id>/reanudar/   → reencola una corrida de envío interrumpida
+#                                       (sólo pendientes y fallidos)
+#
+# Cada tipo exige los mismos permisos que su endpoint síncrono
+# (PERMISOS_POR_TIPO): la vía asíncrona no concede más acceso que la otra.
+#
+
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+
+from usuarios.permissions import IsAdmin, IsAdminOrAsistente, IsGerenteRRHH, IsAsistenteRRHH, verificar_permisos
+from .models_corrida import CorridaNomina
+from .serializers import CorridaNominaSerializer
+from .services.calculo_paralelo import BACKENDS as BACKENDS_PARALELO
+from .services.corridas import crear_y_despachar, despachar, reanudar_corrida
+
+
+# Permisos por tipo; los endpoints síncronos de views.py usan estas mismas listas
+PERMISOS_POR_TIPO = {
+    "calcular_todas": [IsAuthenticated, (IsAdmin | IsAsistenteRRHH)],  # calcular_todas
+    "periodo": [IsAdminUser],  # recalcular_liquidaciones_periodo_view
+    "cierre": [IsAuthenticated],  # CierreNominaView
+    "envio_recibos": [IsAuthenticated, IsAdminOrAsistente],  # EnviarReciboView
+}
+
+
+def _verificar_permisos(request, tipo):
+    verificar_permisos(request, PERMISOS_POR_TIPO[tipo], f"Sin permiso para corridas de tipo '{tipo}'.")
+
+
+def _verdadero(valor):
+    return str(valor or "").lower() in ("1", "true", "si", "sí")
+
+
+def validar_parametros(tipo, data):
+    """
+    Valida y normaliza los parámetros de una corrida.
+    Retorna (parametros, error); error es None si todo es válido.
+    """
+    if tipo not in dict(CorridaNomina.TIPOS):
+        return None, f"Tipo inválido (use {', '.join(dict(CorridaNomina.TIPOS))})."
+
+    if tipo == "calcular_todas":
+        return {"forzar": _verdadero(data.get("forzar"))}, None
+
+    # El envío sin período toma la última liquidación de cada empleado
+    if tipo == "envio_recibos" and data.get("mes") in (None, "") and data.get("anio") in (None, ""):
+        return {"reenviar": _verdadero(data.get("reenviar"))}, None
+
+    try:
+        anio = int(data.get("anio"))
+        mes = int(data.get("mes"))
+    except (TypeError, ValueError):
+        return None, "Datos de año o mes inválidos."
+    if not (1 <= mes <= 12):
+        return None, "El mes debe estar entre 1 y 12."
+    parametros = {"anio": anio, "mes": mes}
+
+    if tipo == "periodo":
+        backend = data.get("backend", "secuencial")
+        if backend not in BACKENDS_PARALELO:
+            return None, f"Backend inválido (use {', '.join(BACKENDS_PARALELO)})."
+        parametros["backend"] = backend
+    if tipo == "envio_recibos":
+        parametros["reenviar"] = _verdadero(data.get("reenviar"))
+    return parametros, None
+
+
+def respuesta_corrida(request, tipo, data):
+    """Crea la corrida y responde 202 con la URL de seguimiento."""
+    parametros, error = validar_parametros(tipo, data)
+    if error:
+        return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+    _verificar_permisos(request, tipo)
+    corrida = crear_y_despachar(tipo, parametros, usuario=request.user)
+    datos = CorridaNominaSerializer(corrida).data
+    datos["url"] = request.build_absolute_uri(reverse("corrida_detalle", args=[corrida.pk]))
+    return Response(datos, status=status.HTTP_202_ACCEPTED)
+
+
+@api_view(["GET", "POST"])
+@permission_classes([IsAuthenticated, (IsAdmin | IsGerenteRRHH | IsAsistenteRRHH)])
+def corridas(request):
+    if request.method == "POST":
+        return respuesta_corrida(request, request.data.get("tipo"), request.data)
+    ultimas = CorridaNomina.objects.all()[:50]
+    return Response(CorridaNominaSerializer(ultimas, many=True).data)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated, (IsAdmin | IsGerenteRRHH | IsAsistenteRRHH)])
+def corrida_detalle(request, pk):
+    corrida = get_object_or_404(CorridaNomina, pk=pk)
+    return Response(CorridaNominaSerializer(corrida).data)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated, (IsAdmin | IsGerenteRRHH | IsAsistenteRRHH)])
+def corrida_errores(request, pk):
+    corrida = get_object_or_404(CorridaNomina, pk=pk)
+    return Response({"id": corrida.pk, "estado": corrida.estado, "errores": corrida.errores})
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated, (IsAdmin | IsGerenteRRHH)])
+def corrida_reanudar(request, pk):
+    corrida = get_object_or_404(CorridaNomina, pk=pk)
+    _verificar_permisos(request, corrida.tipo)
+    try:
+        corrida = reanudar_corrida(corrida)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_409_CONFLICT)
+    despachar(corrida)
+    datos = CorridaNominaSerializer(corrida).data
+    datos["url"] = request.build_absolute_uri(reverse("corrida_detalle", args=[corrida.pk]))
+    return Response(datos, status=status.HTTP_202_ACCEPTED)
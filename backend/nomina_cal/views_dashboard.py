@@ -2,18 +2,22 @@
 #  views_dashboard.py — Dashboards IS2 Grupo 1
 
 # Sprint 6–7: Paneles dinámicos por rol (Admin, Gerente, Asistente, Empleado)
+# Los totales salen del resumen mensual (services/resumen_nomina.py) y las
+# respuestas por rol se cachean (services/cache_dashboards.py).
 #
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Sum, Avg, Count
-from django.utils.timezone import now
-from datetime import timedelta
+from django.db.models import Sum, Count
 from empleados.models import Empleado
 from nomina_cal.models import Liquidacion, DetalleLiquidacion
+from nomina_cal.services import cache_dashboards, resumen_nomina, series_tiempo
 from usuarios.models import Usuario
 
+# Los dashboards por rol agregan toda la historia y nombres de empleados
+AMBITOS_GLOBALES = (cache_dashboards.TODOS, cache_dashboards.EMPLEADOS)
+
 #
 #  PERMISO SIMPLE PARA ADMIN O GERENTE RRHH
 #
@@ -34,68 +38,58 @@ class IsAdminOrRRHH(IsAuthenticated):
 class ReporteGeneralAdminView(APIView):
     permission_classes = [IsAdminOrRRHH]
 
+    @staticmethod
+    def calcular():
+        
+        # Totales básicos
+        
+        total_empleados = Empleado.objects.filter(activo=True).count()
+        totales = resumen_nomina.totales()
+        total_liquidaciones = totales["cantidad"]
+        total_monto = totales["total_neto"]
+        promedio_neto = totales["promedio_neto"]
+
+        
+        #  Evolución últimos 6 meses
+        
+        meses_data = [
+            {"mes": f"{mes}/{anio}", "total": monto}
+            for anio, mes, monto in series_tiempo.serie_total(series_tiempo.ventana(6))
+        ]
+
+        
+        #  Top empleados con mayor salario neto (último período liquidado)
+        
+        ultimo = resumen_nomina.resumen().values("anio", "mes").first()
+        top_empleados = (
+            Liquidacion.objects.filter(**ultimo)
+            .values("empleado__nombre")
+            .annotate(total=Sum("neto_cobrar"))
+            .order_by("-total")[:5]
+            if ultimo else []
+        )
+
+        
+        #  Respuesta JSON estructurada
+        
+        data = {
+            "ok": True,
+            "kpis": {
+                "total_empleados": total_empleados,
+                "total_liquidaciones": total_liquidaciones,
+                "total_monto": f"{total_monto:,.0f}",
+                "promedio_neto": f"{promedio_neto:,.0f}",
+            },
+            "evolucion_mensual": meses_data,
+            "top_empleados": list(top_empleados),
+        }
+        return data
+
     def get(self, request):
         try:
-            
-            # Totales básicos
-            
-            total_empleados = Empleado.objects.filter(activo=True).count()
-            total_liquidaciones = Liquidacion.objects.count()
-
-            total_monto = (
-                Liquidacion.objects.aggregate(Sum("neto_cobrar"))["neto_cobrar__sum"]
-                or 0
-            )
-            promedio_neto = (
-                Liquidacion.objects.aggregate(Avg("neto_cobrar"))["neto_cobrar__avg"]
-                or 0
-            )
-
-            
-            #  Evolución últimos 6 meses
-            
-            hoy = now().date()
-            meses_data = []
-            for i in range(5, -1, -1):
-                fecha = hoy - timedelta(days=30 * i)
-                mes = fecha.month
-                anio = fecha.year
-                monto = (
-                    Liquidacion.objects.filter(mes=mes, anio=anio)
-                    .aggregate(Sum("neto_cobrar"))["neto_cobrar__sum"]
-                    or 0
-                )
-                meses_data.append(
-                    {
-                        "mes": f"{mes}/{anio}",
-                        "total": monto,
-                    }
-                )
-
-            
-            #  Top empleados con mayor salario neto
-            
-            top_empleados = (
-                Liquidacion.objects.values("empleado__nombre")
-                .annotate(total=Sum("neto_cobrar"))
-                .order_by("-total")[:5]
+            data = cache_dashboards.obtener(
+                "admin", self.calcular, AMBITOS_GLOBALES, hasta=series_tiempo.mes_actual()
             )
-
-            
-            #  Respuesta JSON estructurada
-            
-            data = {
-                "ok": True,
-                "kpis": {
-                    "total_empleados": total_empleados,
-                    "total_liquidaciones": total_liquidaciones,
-                    "total_monto": f"{total_monto:,.0f}",
-                    "promedio_neto": f"{promedio_neto:,.0f}",
-                },
-                "evolucion_mensual": meses_data,
-                "top_empleados": list(top_empleados),
-            }
-
             return Response(data, status=200)
 
         except Exception as e:
@@ -112,38 +106,33 @@ class ReporteGeneralAdminView(APIView):
 class DashboardGerenteView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @staticmethod
+    def calcular():
+        # Totales generales
+        total_empleados = Empleado.objects.filter(activo=True).count()
+        totales = resumen_nomina.totales()
+        total_liquidaciones = totales["cantidad"]
+        promedio_nomina = totales["promedio_neto"]
+
+        # Evolución últimos 6 meses (mismo formato que el frontend)
+        evolucion = [
+            {"mes": mes, "anio": anio, "total_mes": round(total_mes, 2)}
+            for anio, mes, total_mes in series_tiempo.serie_total(series_tiempo.ventana(6))
+        ]
+
+        data = {
+            "total_empleados": total_empleados,
+            "total_liquidaciones": total_liquidaciones,
+            "promedio_nomina": promedio_nomina,
+            "evolucion": evolucion,
+        }
+        return data
+
     def get(self, request):
         try:
-            # Totales generales
-            total_empleados = Empleado.objects.filter(activo=True).count()
-            total_liquidaciones = Liquidacion.objects.count()
-            promedio_nomina = (
-                Liquidacion.objects.aggregate(Avg("neto_cobrar"))["neto_cobrar__avg"]
-                or 0
+            data = cache_dashboards.obtener(
+                "gerente", self.calcular, AMBITOS_GLOBALES, hasta=series_tiempo.mes_actual()
             )
-
-            # Evolución últimos 6 meses (mismo formato que el frontend)
-            hoy = now().date()
-            evolucion = []
-            for i in range(5, -1, -1):
-                fecha = hoy - timedelta(days=30 * i)
-                mes = fecha.month
-                anio = fecha.year
-                total_mes = (
-                    Liquidacion.objects.filter(mes=mes, anio=anio)
-                    .aggregate(Sum("neto_cobrar"))["neto_cobrar__sum"]
-                    or 0
-                )
-                evolucion.append(
-                    {"mes": mes, "anio": anio, "total_mes": round(total_mes, 2)}
-                )
-
-            data = {
-                "total_empleados": total_empleados,
-                "total_liquidaciones": total_liquidaciones,
-                "promedio_nomina": promedio_nomina,
-                "evolucion": evolucion,
-            }
             return Response(data, status=200)
 
         except Exception as e:
@@ -161,31 +150,31 @@ class DashboardGerenteView(APIView):
 class DashboardAsistenteView(APIView):
     permission_classes = [IsAuthenticated]
 
-    def get(self, request):
-        try:
-            total_nominas = Liquidacion.objects.count()
-            monto_total = (
-                Liquidacion.objects.aggregate(Sum("neto_cobrar"))["neto_cobrar__sum"]
-                or 0
-            )
-            promedio_nomina = (
-                Liquidacion.objects.aggregate(Avg("neto_cobrar"))["neto_cobrar__avg"]
-                or 0
-            )
+    @staticmethod
+    def calcular():
+        totales = resumen_nomina.totales()
+        total_nominas = totales["cantidad"]
+        monto_total = totales["total_neto"]
+        promedio_nomina = totales["promedio_neto"]
 
-            ultimas_nominas = list(
-                Liquidacion.objects.values(
-                    "id", "empleado__nombre", "mes", "anio", "neto_cobrar"
-                )
-                .order_by("-anio", "-mes")[:6]
+        ultimas_nominas = list(
+            Liquidacion.objects.values(
+                "id", "empleado__nombre", "mes", "anio", "neto_cobrar"
             )
+            .order_by("-anio", "-mes")[:6]
+        )
 
-            data = {
-                "total_nominas": total_nominas,
-                "monto_total": monto_total,
-                "promedio_nomina": promedio_nomina,
-                "ultimas_nominas": ultimas_nominas,
-            }
+        data = {
+            "total_nominas": total_nominas,
+            "monto_total": monto_total,
+            "promedio_nomina": promedio_nomina,
+            "ultimas_nominas": ultimas_nominas,
+        }
+        return data
+
+    def get(self, request):
+        try:
+            data = cache_dashboards.obtener("asistente", self.calcular, AMBITOS_GLOBALES)
             return Response(data, status=200)
 
         except Exception as e:
@@ -226,9 +215,7 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from nomina_cal.models import Liquidacion
-from empleados.models import Empleado
-from datetime import datetime
-from django.db.models import Sum
+from nomina_cal.services.kpis import kpis
 
 class ReporteGeneralView(APIView):
     permission_classes = [IsAuthenticated]
@@ -240,26 +227,28 @@ class ReporteGeneralView(APIView):
         if mes:
             try:
                 año, mes_num = mes.split("-")
-                qs = qs.filter(fecha__year=año, fecha__month=mes_num)
+                qs = qs.filter(anio=int(año), mes=int(mes_num))
             except Exception:
                 pass
 
-        # Totales
-        total_general = qs.aggregate(total=Sum("total"))["total"] or 0
-        total_empleados = qs.values("empleado").distinct().count()
+        # Totales (una consulta)
+        totales = kpis(qs, "total_neto", "empleados")
 
         # Detalle
-        detalle = []
-        for liq in qs.select_related("empleado"):
-            detalle.append({
-                "empleado": f"{liq.empleado.nombre} {liq.empleado.apellido}",
-                "total": float(liq.total or 0),
-                "fecha": liq.fecha.strftime("%Y-%m-%d") if liq.fecha else "",
-            })
+        detalle = [
+            {
+                "empleado": f"{nombre} {apellido}",
+                "total": float(neto or 0),
+                "fecha": f"{anio}-{mes_liq:02d}",
+            }
+            for nombre, apellido, neto, anio, mes_liq in qs.values_list(
+                "empleado__nombre", "empleado__apellido", "neto_cobrar", "anio", "mes"
+            )
+        ]
 
         data = {
-            "total_general": total_general,
-            "total_empleados": total_empleados,
+            "total_general": totales["total_neto"],
+            "total_empleados": totales["empleados"],
             "detalle": detalle,
         }
         return Response(data)
@@ -5,9 +5,10 @@
 # Genera reportes coherentes con los dashboards:
 #   • PDF (resumen general de nómina)
 #   • Excel (detalles por área y tipo de contrato)
+#   • Libro de sueldos del período (todos los recibos en un PDF, por streaming)
 #
 
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from django.utils import timezone
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
@@ -16,21 +17,36 @@ from django.db.models import Sum
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import cm
 from reportlab.pdfgen import canvas
-from openpyxl import Workbook
 
 from empleados.models import Empleado
+from usuarios.permissions import IsAdmin, IsGerenteRRHH, IsAsistenteRRHH
 from .models import Liquidacion
+from .renderers import RENDERERS_REPORTES
+from .services.exportacion_plana import CAMPOS_LIQUIDACION, formato_plano, respuesta_plana
+from .services.exportacion_xlsx import CHUNK_SIZE as CHUNK_SIZE_XLSX, respuesta_xlsx
+from .views_exportaciones import respuesta_exportacion
+from .services.libro_nomina import generar_libro, liquidaciones_libro
 
 #
 #  EXPORTACIÓN A PDF
 #
+def _respuesta_plana_periodo(formato, mes, anio):
+    """Filas crudas del período (?format=csv|ndjson) para PDF y Excel."""
+    qs = Liquidacion.objects.filter(mes=mes, anio=anio).order_by("id")
+    return respuesta_plana(formato, qs, CAMPOS_LIQUIDACION, f"reporte_nomina_{mes}_{anio}")
+
+
 class ExportPDFView(APIView):
     permission_classes = [IsAuthenticated]
+    renderer_classes = RENDERERS_REPORTES
 
     def get(self, request):
         hoy = timezone.now()
         mes = int(request.GET.get("mes", 0)) or hoy.month
         anio = int(request.GET.get("anio", 0)) or hoy.year
+        formato = formato_plano(request)
+        if formato:
+            return _respuesta_plana_periodo(formato, mes, anio)
 
         # # Totales por área
         data = (
@@ -78,16 +94,20 @@ class ExportPDFView(APIView):
 #
 class ExportExcelView(APIView):
     permission_classes = [IsAuthenticated]
+    renderer_classes = RENDERERS_REPORTES
 
     def get(self, request):
         hoy = timezone.now()
         mes = int(request.GET.get("mes", 0)) or hoy.month
         anio = int(request.GET.get("anio", 0)) or hoy.year
+        formato = formato_plano(request)
+        if formato:
+            return _respuesta_plana_periodo(formato, mes, anio)
 
         # # Query coherente con dashboards
         qs = (
             Liquidacion.objects.filter(mes=mes, anio=anio)
-            .values(
+            .values_list(
                 "empleado__nombre",
                 "empleado__apellido",
                 "empleado__area",
@@ -97,27 +117,43 @@ class ExportExcelView(APIView):
             .order_by("empleado__area", "empleado__apellido")
         )
 
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Nómina"
-
-        # Encabezados
-        ws.append(["Nombre", "Apellido", "Área", "Tipo Contrato", "Neto a Cobrar (Gs)"])
-
-        for row in qs:
-            ws.append([
-                row["empleado__nombre"],
-                row["empleado__apellido"],
-                row["empleado__area"],
-                row["empleado__tipo_contrato"],
-                float(row["neto_cobrar"] or 0),
-            ])
-
-        filename = f"reporte_nomina_{mes}_{anio}.xlsx"
-        response = HttpResponse(content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
-        response["Content-Disposition"] = f'attachment; filename={filename}'
-        wb.save(response)
+        return respuesta_xlsx(
+            qs.iterator(chunk_size=CHUNK_SIZE_XLSX),
+            f"reporte_nomina_{mes}_{anio}.xlsx",
+            hoja="Nómina",
+            encabezado=[["Nombre", "Apellido", "Área", "Tipo Contrato", "Neto a Cobrar (Gs)"]],
+        )
+
+
+#
+#  LIBRO DE SUELDOS DEL PERÍODO (PDF único, por streaming)
+#
+class LibroNominaView(APIView):
+    """
+    Todos los recibos de mes/anio en un solo PDF, con índice y totales al final.
+    GET ?mes=10&anio=2025[&area=IT]
+    Con ?asincrono=1 se genera como ExportacionReporte (con el mismo filtro) y responde 202.
+    """
+    permission_classes = [IsAuthenticated, (IsAdmin | IsGerenteRRHH | IsAsistenteRRHH)]
+
+    def get(self, request):
+        try:
+            mes = int(request.GET.get("mes"))
+            anio = int(request.GET.get("anio"))
+        except (TypeError, ValueError):
+            return Response({"error": "Debe especificar mes y anio válidos."}, status=400)
+        if not (1 <= mes <= 12):
+            return Response({"error": "El mes debe estar entre 1 y 12."}, status=400)
+
+        area = request.GET.get("area") or None
+        if request.GET.get("asincrono") in ("1", "true"):
+            return respuesta_exportacion(request, "libro_nomina", {"mes": mes, "anio": anio, "area": area})
+        qs = liquidaciones_libro(mes, anio, area=area)
+        response = StreamingHttpResponse(generar_libro(qs, mes, anio), content_type="application/pdf")
+        response["Content-Disposition"] = f'attachment; filename="libro_nomina_{anio}_{mes:02d}.pdf"'
         return response
+
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
 
@@ -0,0 +1,88 @@
+# backend/nomina_cal/views_exportaciones.py
+#
+#  MÓDULO: Exportaciones de reportes en segundo plano
+#
+# Los reportes pesados se generan fuera del request (Celery o pool local):
+#   • POST /exportaciones/                  → pide un reporte (202); si hay uno
+#                                             idéntico en curso se reutiliza
+#   • GET  /exportaciones/                  → últimas exportaciones
+#   • GET  /exportaciones/<id>/             → estado (polling) y URL de descarga
+#   • GET  /exportaciones/<id>/descarga/    → archivo generado (410 si venció)
+#
+# Pedir y descargar un reporte exige los permisos de su endpoint síncrono
+# (Reporte.permisos).
+#
+
+from django.core.files.storage import default_storage
+from django.http import FileResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from usuarios.permissions import IsAdmin, IsGerenteRRHH, IsAsistenteRRHH, verificar_permisos
+from .models_exportacion import ExportacionReporte
+from .serializers import ExportacionReporteSerializer
+from .services.exportaciones import REPORTES, solicitar_exportacion, validar_pedido, vencida
+
+
+def _verificar_permisos(request, tipo):
+    verificar_permisos(request, REPORTES[tipo].permisos, f"Sin permiso para reportes de tipo '{tipo}'.")
+
+
+def datos_exportacion(request, exportacion):
+    datos = ExportacionReporteSerializer(exportacion).data
+    datos["url"] = request.build_absolute_uri(reverse("exportacion_detalle", args=[exportacion.pk]))
+    if exportacion.estado == "completada" and not vencida(exportacion):
+        datos["url_descarga"] = request.build_absolute_uri(reverse("exportacion_descarga", args=[exportacion.pk]))
+    return datos
+
+
+def respuesta_exportacion(request, tipo, data):
+    """Pide la exportación y responde 202 con la URL de seguimiento."""
+    parametros, error = validar_pedido(tipo, data)
+    if error:
+        return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+    _verificar_permisos(request, tipo)
+    exportacion, reutilizada = solicitar_exportacion(tipo, parametros, usuario=request.user)
+    datos = datos_exportacion(request, exportacion)
+    datos["reutilizada"] = reutilizada
+    return Response(datos, status=status.HTTP_202_ACCEPTED)
+
+
+@api_view(["GET", "POST"])
+@permission_classes([IsAuthenticated, (IsAdmin | IsGerenteRRHH | IsAsistenteRRHH)])
+def exportaciones(request):
+    if request.method == "POST":
+        return respuesta_exportacion(request, request.data.get("tipo"), request.data)
+    ultimas = ExportacionReporte.objects.all()[:50]
+    return Response([datos_exportacion(request, e) for e in ultimas])
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated, (IsAdmin | IsGerenteRRHH | IsAsistenteRRHH)])
+def exportacion_detalle(request, pk):
+    exportacion = get_object_or_404(ExportacionReporte, pk=pk)
+    return Response(datos_exportacion(request, exportacion))
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated, (IsAdmin | IsGerenteRRHH | IsAsistenteRRHH)])
+def exportacion_descarga(request, pk):
+    exportacion = get_object_or_404(ExportacionReporte, pk=pk)
+    _verificar_permisos(request, exportacion.tipo)
+    if vencida(exportacion):
+        return Response({"error": "La exportación venció; solicítela de nuevo."}, status=status.HTTP_410_GONE)
+    if exportacion.estado != "completada":
+        return Response(
+            {"error": f"La exportación está {exportacion.get_estado_display().lower()}."},
+            status=status.HTTP_409_CONFLICT,
+        )
+    return FileResponse(
+        default_storage.open(exportacion.archivo, "rb"),
+        as_attachment=True,
+        filename=exportacion.nombre_archivo,
+        content_type=exportacion.content_type,
+    )
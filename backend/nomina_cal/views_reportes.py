@@ -9,11 +9,14 @@ from django.http import HttpResponse, JsonResponse
 from django.db.models import Sum
 from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
-import io, openpyxl
+import io
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import A4
 
 from .models import Liquidacion
+from .services.exportacion_plana import CAMPOS_LIQUIDACION, formato_plano, respuesta_plana
+from .services.exportacion_xlsx import CHUNK_SIZE as CHUNK_SIZE_XLSX, respuesta_xlsx
+from .services.kpis import kpis
 from empleados.models import Empleado
 
 
@@ -38,15 +41,13 @@ def reporte_general(request):
     mes, anio = _periodo_param(request)
 
     qs = Liquidacion.objects.filter(mes=mes, anio=anio)
+    totales = kpis(qs, "total_neto", "total_descuentos", "total_ips")
     resumen = {
         "periodo": f"{mes}/{anio}",
         "total_empleados": Empleado.objects.filter(activo=True).count(),
-        "total_neto": float(_to_dec(qs.aggregate(v=Sum("neto_cobrar"))["v"])),
-        "total_descuentos": float(_to_dec(qs.aggregate(v=Sum("total_descuentos"))["v"])),
-        "aporte_ips": float(_to_dec(
-            qs.filter(detalles__concepto__descripcion__icontains="IPS")
-              .aggregate(v=Sum("detalles__monto"))["v"]
-        )),
+        "total_neto": float(totales["total_neto"]),
+        "total_descuentos": float(totales["total_descuentos"]),
+        "aporte_ips": float(totales["total_ips"]),
     }
 
     # detalle básico para gráficos (puedes adaptar campos a tu frontend)
@@ -69,9 +70,20 @@ def reporte_general(request):
 
 # PDF: /api/nomina_cal/reportes/pdf/
 
+def _respuesta_plana(request, mes, anio):
+    formato = formato_plano(request)
+    if formato:
+        qs = Liquidacion.objects.filter(mes=mes, anio=anio).order_by("id")
+        return respuesta_plana(formato, qs, CAMPOS_LIQUIDACION, f"reporte_{mes}_{anio}")
+    return None
+
+
 @login_required
 def reporte_pdf(request):
     mes, anio = _periodo_param(request)
+    plana = _respuesta_plana(request, mes, anio)
+    if plana:
+        return plana
     buffer = io.BytesIO()
     p = canvas.Canvas(buffer, pagesize=A4)
     w, h = A4
@@ -128,38 +140,33 @@ def reporte_pdf(request):
 
 # Excel: /api/nomina_cal/reportes/excel/
 
+def _filas_excel(qs):
+    total = Decimal("0.00")
+    for nombre, apellido, cedula, ingresos, descuentos, neto in qs.iterator(chunk_size=CHUNK_SIZE_XLSX):
+        total += _to_dec(neto)
+        yield [f"{nombre} {apellido}", cedula, ingresos or 0, descuentos or 0, neto or 0]
+    yield []
+    yield ["", "", "", "TOTAL NETO", total]
+
+
 @login_required
 def reporte_excel(request):
     mes, anio = _periodo_param(request)
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = f"Nomina_{mes}_{anio}"
-    ws.append(["Sistema de Nómina IS2"])
-    ws.append([f"Reporte de Liquidaciones — {mes}/{anio}"])
-    ws.append([])
-    ws.append(["Empleado", "Cédula", "Total Ingresos", "Descuentos", "Neto"])
-
-    qs = Liquidacion.objects.filter(mes=mes, anio=anio).select_related("empleado")
-    total = Decimal("0.00")
-    for liq in qs:
-        ws.append([
-            f"{liq.empleado.nombre} {liq.empleado.apellido}",
-            liq.empleado.cedula,
-            float(liq.total_ingresos or 0),
-            float(liq.total_descuentos or 0),
-            float(liq.neto_cobrar or 0),
-        ])
-        total += _to_dec(liq.neto_cobrar)
-
-    ws.append([])
-    ws.append(["", "", "", "TOTAL NETO", float(total)])
-
-    bio = io.BytesIO()
-    wb.save(bio)
-    bio.seek(0)
-    response = HttpResponse(
-        bio.getvalue(),
-        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    plana = _respuesta_plana(request, mes, anio)
+    if plana:
+        return plana
+    qs = Liquidacion.objects.filter(mes=mes, anio=anio).values_list(
+        "empleado__nombre", "empleado__apellido", "empleado__cedula",
+        "total_ingresos", "total_descuentos", "neto_cobrar",
+    )
+    return respuesta_xlsx(
+        _filas_excel(qs),
+        f"reporte_{mes}_{anio}.xlsx",
+        hoja=f"Nomina_{mes}_{anio}",
+        encabezado=[
+            ["Sistema de Nómina IS2"],
+            [f"Reporte de Liquidaciones — {mes}/{anio}"],
+            [],
+            ["Empleado", "Cédula", "Total Ingresos", "Descuentos", "Neto"],
+        ],
     )
-    response["Content-Disposition"] = f'attachment; filename="reporte_{mes}_{anio}.xlsx"'
-    return response
@@ -174,6 +174,44 @@ STATIC_URL = "/static/"
 STATICFILES_DIRS = [BASE_DIR / "static"]
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
+# Horas que se conservan los archivos de exportaciones en segundo plano
+EXPORTACIONES_VIGENCIA_HORAS = int(os.getenv("EXPORTACIONES_VIGENCIA_HORAS", "24"))
+# Minutos tras los que una exportación pendiente/en proceso se da por perdida
+EXPORTACIONES_TIEMPO_TOMA_MINUTOS = int(os.getenv("EXPORTACIONES_TIEMPO_TOMA_MINUTOS", "30"))
+
+
+#  CACHÉ
+# Memoria local del proceso por defecto. Con REDIS_CACHE_URL (p. ej.
+# redis://127.0.0.1:6379/1) la caché se comparte entre procesos y workers,
+# y la invalidación de dashboards llega a todos.
+REDIS_CACHE_URL = os.getenv("REDIS_CACHE_URL", "")
+if REDIS_CACHE_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "nomina",
+        }
+    }
+# Dashboards: vigencia máxima (0 desactiva la caché) y cuánto se sigue
+# sirviendo una respuesta vencida sin que el recálculo en segundo plano
+# la reemplace antes de calcularla en línea (0 no sirve vencidas).
+DASHBOARD_CACHE_TTL = int(os.getenv("DASHBOARD_CACHE_TTL", "3600"))
+DASHBOARD_CACHE_STALE_SEGUNDOS = int(os.getenv("DASHBOARD_CACHE_STALE_SEGUNDOS", "60"))
+
+
+#  CELERY
+# Sin CELERY_BROKER_URL las corridas, exportaciones y la salida de correos
+# usan un pool de hilos local. El cálculo por rangos en Celery es un chord:
+# necesita backend de resultados (por defecto, el mismo broker, p. ej. Redis).
+CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "")
+CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", CELERY_BROKER_URL) or None
 
 
 #  DEFAULT AUTO FIELD
@@ -204,6 +242,7 @@ LOGGING = {
 #   outlook  → Outlook / Office365
 #   smtp     → SMTP institucional
 #   sendgrid → SendGrid SMTP con API Key
+#   sendgrid_api → SendGrid API HTTP (asyncio, envíos concurrentes)
 
 FRONTEND_URL = _frontend_url
 EMAIL_MODE = os.getenv("EMAIL_MODE", "gmail").lower()
@@ -248,9 +287,18 @@ elif EMAIL_MODE == "sendgrid":
     EMAIL_HOST_PASSWORD = os.getenv("SENDGRID_API_KEY", "")
     DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL", "notificaciones@nomina.com")
 
+elif EMAIL_MODE == "sendgrid_api":
+    EMAIL_BACKEND = "utils.sendgrid_async.EmailBackend"
+    SENDGRID_API_KEY = os.getenv("SENDGRID_API_KEY", "")
+    SENDGRID_CONCURRENCIA = int(os.getenv("SENDGRID_CONCURRENCIA", "10"))
+    DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL", "notificaciones@nomina.com")
+
 else:
     EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
     DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL", "no-reply@nomina.local")
 
+# Cupo del proveedor para el envío masivo de recibos (0 = sin límite)
+ENVIO_CORREOS_POR_MINUTO = int(os.getenv("ENVIO_CORREOS_POR_MINUTO", "600"))
+
 SMTP_DEBUG = int(os.getenv("SMTP_DEBUG", "0"))
 smtplib.SMTP.debuglevel = SMTP_DEBUG
@@ -8,14 +8,25 @@ from django.db.models import Sum, Q
 from django.http import HttpResponse
 from datetime import date
 import io
-import openpyxl
 from reportlab.pdfgen import canvas
 
 from empleados.models import Empleado
 from .models import Liquidacion
+from nomina_cal.renderers import RENDERERS_REPORTES
+from nomina_cal.services.exportacion_plana import CAMPOS_LIQUIDACION, formato_plano, respuesta_plana
+from nomina_cal.services.exportacion_xlsx import CHUNK_SIZE as CHUNK_SIZE_XLSX, con_total, respuesta_xlsx
+
+def _respuesta_plana(request, qs):
+    """?format=csv|ndjson: filas crudas del reporte filtrado, por streaming."""
+    formato = formato_plano(request)
+    if formato:
+        return respuesta_plana(formato, qs, CAMPOS_LIQUIDACION, "reporte_avanzado")
+    return None
+
 
 class ReporteAvanzadoView(APIView):
     permission_classes = [IsAuthenticated]
+    renderer_classes = RENDERERS_REPORTES
 
     def get_queryset(self, request):
         qs = Liquidacion.objects.select_related("empleado").all()
@@ -48,6 +59,9 @@ class ReporteAvanzadoView(APIView):
 
     def get(self, request):
         qs = self.get_queryset(request)
+        plana = _respuesta_plana(request, qs)
+        if plana:
+            return plana
         payload = [
             {
                 "id": l.id,
@@ -67,39 +81,38 @@ class ReporteAvanzadoView(APIView):
 
 class ReporteAvanzadoExcel(APIView):
     permission_classes = [IsAuthenticated]
+    renderer_classes = RENDERERS_REPORTES
 
     def get(self, request):
         qs = ReporteAvanzadoView().get_queryset(request)
-
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Reporte Avanzado"
-        ws.append(["Empleado", "Cédula", "Mes", "Año", "Área", "Contrato", "Neto (Gs)"])
-
-        for l in qs:
-            ws.append([
-                l.empleado.nombre, l.empleado.cedula, l.mes, l.anio,
-                getattr(l.empleado, "area", ""), getattr(l.empleado, "tipo_contrato", ""),
-                float(l.neto_cobrar)
-            ])
-
-        ws.append(["", "", "", "", "", "TOTAL", float(qs.aggregate(s=Sum("neto_cobrar"))["s"] or 0)])
-
-        buf = io.BytesIO()
-        wb.save(buf); buf.seek(0)
-        res = HttpResponse(
-            buf.getvalue(),
-            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        plana = _respuesta_plana(request, qs)
+        if plana:
+            return plana
+
+        # Área y contrato no existen en Empleado: columnas vacías, como en el JSON
+        filas = (
+            (nombre, cedula, mes, anio, "", "", neto)
+            for nombre, cedula, mes, anio, neto in qs.values_list(
+                "empleado__nombre", "empleado__cedula", "mes", "anio", "neto_cobrar"
+            ).iterator(chunk_size=CHUNK_SIZE_XLSX)
+        )
+        return respuesta_xlsx(
+            con_total(filas, 6, lambda total: ["", "", "", "", "", "TOTAL", total]),
+            "reporte_avanzado.xlsx",
+            hoja="Reporte Avanzado",
+            encabezado=[["Empleado", "Cédula", "Mes", "Año", "Área", "Contrato", "Neto (Gs)"]],
         )
-        res["Content-Disposition"] = 'attachment; filename="reporte_avanzado.xlsx"'
-        return res
 
 
 class ReporteAvanzadoPDF(APIView):
     permission_classes = [IsAuthenticated]
+    renderer_classes = RENDERERS_REPORTES
 
     def get(self, request):
         qs = ReporteAvanzadoView().get_queryset(request)
+        plana = _respuesta_plana(request, qs)
+        if plana:
+            return plana
 
         buf = io.BytesIO()
         p = canvas.Canvas(buf)
@@ -2,6 +2,7 @@
 #  Permisos personalizados según rol del usuario (Sistema Nómina IS2)
 #
 
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 
 #
@@ -85,3 +86,17 @@ class IsAdminOrReadOnly(BasePermission):
         if request.method in SAFE_METHODS:
             return True
         return get_user_role(request.user) == "admin"
+
+
+#
+# # Verificación dentro de la vista
+#
+def verificar_permisos(request, permisos, mensaje=None):
+    """
+    Evalúa clases de permiso de DRF que dependen de lo pedido (p. ej. el
+    tipo de corrida o de reporte) y lanza PermissionDenied (403) si alguna falla.
+    """
+    vista = (request.parser_context or {}).get("view")
+    for permiso in permisos:
+        if not permiso().has_permission(request, vista):
+            raise PermissionDenied(mensaje)
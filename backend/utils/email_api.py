@@ -1,22 +1,42 @@
 #
 # email_api.py — Envío de correos usando SendGrid API HTTP
-# Sistema de Nómina IS2 —  / 
+# Sistema de Nómina IS2 —  /
 
 # Permite enviar correos desde cualquier parte de Django
-# sin depender del backend SMTP.
+# sin depender del backend SMTP. Usa el backend compartido de
+# utils/sendgrid_async.py: una sola sesión HTTP por proceso.
 #
 
 import os
 from pathlib import Path
+from django.core.mail import EmailMessage
 from dotenv import load_dotenv
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
+
+from utils.sendgrid_async import backend_compartido
 
 
 # # Cargar .env (por si no está cargado aún)
 load_dotenv(Path(__file__).resolve().parent.parent / ".env")
 
 
+def enviar_mensaje_api(mensaje, api_key=None):
+    """
+    Envía un EmailMessage por la API HTTP de SendGrid.
+    :return: Código de respuesta HTTP (202 = éxito) o None.
+    """
+    api_key = api_key or os.getenv("EMAIL_HOST_PASSWORD")
+    if not api_key:
+        print(" No se encontró la API Key de SendGrid.")
+        return None
+
+    resultado = backend_compartido(api_key).enviar_lote([mensaje])[0]
+    if resultado.ok:
+        print(f" Correo enviado correctamente ({resultado.estado})")
+        return resultado.estado
+    print(f" Error al enviar correo: {resultado.error}")
+    return None
+
+
 def enviar_correo_api(asunto, mensaje, destinatarios, remitente=None):
     """
     Envía un correo usando la API HTTP de SendGrid.
@@ -26,24 +46,5 @@ def enviar_correo_api(asunto, mensaje, destinatarios, remitente=None):
     :param remitente: Email remitente (por defecto el verificado).
     :return: Código de respuesta HTTP (202 = éxito).
     """
-    api_key = os.getenv("EMAIL_HOST_PASSWORD")
     from_email = remitente or os.getenv("DEFAULT_FROM_EMAIL", "ojeda.cardozo90@gmail.com")
-
-    if not api_key:
-        print(" No se encontró la API Key de SendGrid.")
-        return None
-
-    try:
-        sg = SendGridAPIClient(api_key)
-        msg = Mail(
-            from_email=from_email,
-            to_emails=destinatarios,
-            subject=asunto,
-            plain_text_content=mensaje,
-        )
-        response = sg.send(msg)
-        print(f" Correo enviado correctamente ({response.status_code})")
-        return response.status_code
-    except Exception as e:
-        print(f" Error al enviar correo: {e}")
-        return None
+    return enviar_mensaje_api(EmailMessage(asunto, mensaje, from_email, list(destinatarios)))
@@ -0,0 +1,255 @@
+#
+# sendgrid_async.py — Envío de correos por la API HTTP de SendGrid (asyncio)
+# Sistema de Nómina IS2
+#
+# • ClienteSendGrid: un httpx.AsyncClient por cliente (conexiones keep-alive
+#   reutilizadas), envíos concurrentes acotados por un semáforo y reintentos
+#   con espera exponencial ante 429, 5xx y errores de red (respeta Retry-After).
+# • EmailBackend: backend de correo de Django sobre el cliente, con su propio
+#   event loop; enviar_lote() devuelve un Resultado por mensaje y deja las
+#   métricas del lote en ultimas_metricas.
+#
+#   EMAIL_MODE=sendgrid_api  →  EMAIL_BACKEND = "utils.sendgrid_async.EmailBackend"
+#
+
+import asyncio
+import base64
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from django.conf import settings
+from django.core.mail.backends.base import BaseEmailBackend
+import httpx
+
+logger = logging.getLogger(__name__)
+
+API_URL = "https://api.sendgrid.com/v3/mail/send"
+CONCURRENCIA = 10
+MAX_REINTENTOS = 4
+ESPERA_BASE = 1.0        # segundos; se duplica en cada reintento
+ESPERA_MAXIMA = 30.0
+
+
+class ErrorSendGrid(Exception):
+    """La API rechazó uno o más mensajes del lote."""
+
+
+@dataclass
+class Resultado:
+    mensaje: object
+    estado: int | None       # código HTTP (None si no hubo respuesta)
+    error: str = ""
+    intentos: int = 1
+
+    @property
+    def ok(self):
+        return self.estado is not None and 200 <= self.estado < 300
+
+
+@dataclass
+class Metricas:
+    """Rendimiento de un lote enviado."""
+    enviados: int = 0
+    fallidos: int = 0
+    reintentos: int = 0
+    segundos: float = 0.0
+
+    @property
+    def por_segundo(self):
+        return self.enviados / self.segundos if self.segundos else 0.0
+
+
+#
+# # EmailMessage → JSON de la API v3
+#
+def _direcciones(direcciones):
+    return [{"email": d} for d in direcciones]
+
+
+def payload(mensaje) -> dict:
+    personalizacion = {"to": _direcciones(mensaje.to)}
+    if mensaje.cc:
+        personalizacion["cc"] = _direcciones(mensaje.cc)
+    if mensaje.bcc:
+        personalizacion["bcc"] = _direcciones(mensaje.bcc)
+
+    tipo = "text/html" if mensaje.content_subtype == "html" else "text/plain"
+    contenido = [{"type": tipo, "value": mensaje.body or " "}]
+    for alternativa, mimetype in getattr(mensaje, "alternatives", []):
+        contenido.append({"type": mimetype, "value": alternativa})
+
+    datos = {
+        "personalizations": [personalizacion],
+        "from": {"email": mensaje.from_email},
+        "subject": mensaje.subject,
+        "content": contenido,
+    }
+    if mensaje.reply_to:
+        datos["reply_to"] = {"email": mensaje.reply_to[0]}
+
+    adjuntos = []
+    for adjunto in mensaje.attachments:
+        if not isinstance(adjunto, tuple):
+            continue  # MIMEBase ya armado: la API sólo recibe (nombre, contenido, tipo)
+        nombre, contenido_adjunto, mimetype = adjunto
+        if isinstance(contenido_adjunto, str):
+            contenido_adjunto = contenido_adjunto.encode()
+        adjuntos.append({
+            "content": base64.b64encode(contenido_adjunto).decode("ascii"),
+            "filename": nombre,
+            "type": mimetype or "application/octet-stream",
+            "disposition": "attachment",
+        })
+    if adjuntos:
+        datos["attachments"] = adjuntos
+    return datos
+
+
+#
+# # Cliente asíncrono
+#
+class ClienteSendGrid:
+    def __init__(self, api_key, url=API_URL, concurrencia=CONCURRENCIA, max_reintentos=MAX_REINTENTOS,
+                 espera_base=ESPERA_BASE, espera_maxima=ESPERA_MAXIMA, timeout=30.0, dormir=asyncio.sleep):
+        self.api_key = api_key
+        self.url = url
+        self.concurrencia = concurrencia
+        self.max_reintentos = max_reintentos
+        self.espera_base = espera_base
+        self.espera_maxima = espera_maxima
+        self.timeout = timeout
+        self.dormir = dormir
+        self._http = None
+
+    async def abrir(self):
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                limits=httpx.Limits(max_connections=self.concurrencia, max_keepalive_connections=self.concurrencia),
+                timeout=self.timeout,
+            )
+
+    async def cerrar(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def __aenter__(self):
+        await self.abrir()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.cerrar()
+
+    def _espera(self, intento, respuesta):
+        retry_after = respuesta.headers.get("Retry-After") if respuesta is not None else None
+        try:
+            espera = float(retry_after)
+        except (TypeError, ValueError):
+            espera = self.espera_base * 2 ** intento
+        return min(espera, self.espera_maxima)
+
+    async def _enviar(self, mensaje, semaforo, metricas):
+        cuerpo = payload(mensaje)
+        for intento in range(self.max_reintentos + 1):
+            respuesta = None
+            async with semaforo:
+                try:
+                    respuesta = await self._http.post(self.url, json=cuerpo)
+                    estado, error = respuesta.status_code, ""
+                    if estado >= 300:
+                        error = f"HTTP {estado}: {respuesta.text[:500]}"
+                except httpx.TransportError as e:
+                    estado, error = None, f"{type(e).__name__}: {e}"
+            reintentable = estado is None or estado == 429 or estado >= 500
+            if not reintentable or intento == self.max_reintentos:
+                return Resultado(mensaje, estado, error, intento + 1)
+            # La espera no ocupa un lugar del semáforo
+            metricas.reintentos += 1
+            await self.dormir(self._espera(intento, respuesta))
+
+    async def enviar_lote(self, mensajes):
+        """Envía los mensajes en paralelo (hasta `concurrencia` a la vez). Retorna (resultados, Metricas)."""
+        await self.abrir()
+        metricas = Metricas()
+        semaforo = asyncio.Semaphore(self.concurrencia)
+        inicio = time.perf_counter()
+        resultados = await asyncio.gather(*(self._enviar(m, semaforo, metricas) for m in mensajes))
+        metricas.segundos = time.perf_counter() - inicio
+        metricas.enviados = sum(1 for r in resultados if r.ok)
+        metricas.fallidos = len(resultados) - metricas.enviados
+        logger.info(
+            f"[Correo] SendGrid: {metricas.enviados} enviados, {metricas.fallidos} fallidos, "
+            f"{metricas.reintentos} reintentos en {metricas.segundos:.2f}s ({metricas.por_segundo:.1f}/s)"
+        )
+        return resultados, metricas
+
+
+#
+# # Backend de Django
+#
+class EmailBackend(BaseEmailBackend):
+    def __init__(self, api_key=None, url=None, concurrencia=None, fail_silently=False, **kwargs):
+        super().__init__(fail_silently=fail_silently)
+        self.cliente = ClienteSendGrid(
+            api_key or getattr(settings, "SENDGRID_API_KEY", ""),
+            url=url or getattr(settings, "SENDGRID_API_URL", API_URL),
+            concurrencia=concurrencia or getattr(settings, "SENDGRID_CONCURRENCIA", CONCURRENCIA),
+            **kwargs,
+        )
+        self.ultimas_metricas = None
+        self._loop = None
+        self._lock = threading.Lock()
+
+    def open(self):
+        if self._loop is not None:
+            return False
+        self._loop = asyncio.new_event_loop()
+        self._loop.run_until_complete(self.cliente.abrir())
+        return True
+
+    def close(self):
+        if self._loop is None:
+            return
+        try:
+            self._loop.run_until_complete(self.cliente.cerrar())
+        finally:
+            self._loop.close()
+            self._loop = None
+
+    def enviar_lote(self, mensajes):
+        """Envía los mensajes concurrentemente; un Resultado por mensaje, en el mismo orden."""
+        with self._lock:
+            nueva = self.open()
+            try:
+                resultados, self.ultimas_metricas = self._loop.run_until_complete(
+                    self.cliente.enviar_lote(list(mensajes))
+                )
+            finally:
+                if nueva:
+                    self.close()
+        return resultados
+
+    def send_messages(self, email_messages):
+        if not email_messages:
+            return 0
+        resultados = self.enviar_lote(email_messages)
+        fallidos = [r for r in resultados if not r.ok]
+        if fallidos and not self.fail_silently:
+            raise ErrorSendGrid(fallidos[0].error)
+        return len(resultados) - len(fallidos)
+
+
+_compartidos = {}
+_lock_compartidos = threading.Lock()
+
+
+def backend_compartido(api_key=None):
+    """Backend abierto y reutilizado por proceso (una sesión HTTP por API key)."""
+    with _lock_compartidos:
+        if api_key not in _compartidos:
+            backend = EmailBackend(api_key=api_key)
+            backend.open()
+            _compartidos[api_key] = backend
+        return _compartidos[api_key]